@@ -261,11 +261,17 @@ class ConfigDialog(QtGui.QDialog):
         self.showlevels = True
         #: (:obj:`bool`) show frame rate widget
         self.showframerate = True
+        #: (:obj:`bool`) show pipeline stage latencies over the image
+        self.showmetrics = False
 
         #: (:obj:`int`) number of image sources
         self.nrsources = 1
         #: (:obj:`int`) image source timeout in ms
         self.timeout = 3000
+        #: (:obj:`int`) maximal number of frames in the exchange buffer
+        self.exchangebuffersize = 1
+        #: (:obj:`str`) exchange buffer overflow policy
+        self.exchangepolicy = "coalesce"
         #: (:obj:`bool`) aspect ratio locked
         self.aspectlocked = False
         #: (:obj:`bool`) statistics without intensity scaling
@@ -278,6 +284,17 @@ class ConfigDialog(QtGui.QDialog):
         self.accelbuffersum = False
         #: (:obj:`bool`) lazy image slider
         self.lazyimageslider = True
+        #: (:obj:`int`) memory budget of the file frame cache in MB
+        self.filecachesize = 512
+        #: (:obj:`bool`) process images in a background thread
+        self.backgroundprocessing = False
+        #: (:obj:`float`) maximal percentage of pixels outside
+        #:     auto-levels estimated on sampled pixels, 0 for exact levels
+        self.levelssampling = 0.0
+        #: (:obj:`bool`) overlap HTTP requests with image decoding
+        self.httppipelining = False
+        #: (:obj:`int`) number of image decode workers
+        self.decodeworkers = 0
         #: (:obj:`bool`) crosshair locker switched on
         self.crosshairlocker = True
 
@@ -289,6 +306,9 @@ class ConfigDialog(QtGui.QDialog):
         self.asapobeamtime = ""
         #: (:obj:`list` < :obj:`str` > ) asapo substreams
         self.asapostreams = []
+        #: (:obj:`int`) maximal number of asapo frames to fall behind
+        #:              in the stream mode, 0 for the latest frame mode
+        self.asapomaxlag = 0
 
         #: (:obj:`str`) json hidra detector server list
         self.detservers = "[]"
@@ -313,6 +333,9 @@ class ConfigDialog(QtGui.QDialog):
         #: (:obj:`str`) JSON dictionary with {label: tango attribute}
         #  for Tango Attribute Events source
         self.tangoevattrs = '{}'
+        #: (:obj:`str`) Tango events mode, i.e. auto, change, user,
+        #:     ready or batch
+        self.tangoeventsmode = "auto"
         #: (:obj:`str`) JSON dictionary with {label: file tango attribute}
         #  for Tango Attribute source
         self.tangofileattrs = '{}'
@@ -331,6 +354,8 @@ class ConfigDialog(QtGui.QDialog):
         #: (:obj:`str`) JSON dictionary with {label: epics PV shape}
         #  for Epics PV source
         self.epicspvshapes = '{}'
+        #: (:obj:`bool`) subscribe to Epics PV monitors instead of polling
+        self.epicsmonitor = False
         #: (:obj:`str`) JSON dictionary with {label: url}
         #  for HTTP responce source
         self.httpurls = '{}'
@@ -342,6 +367,9 @@ class ConfigDialog(QtGui.QDialog):
         self.nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.nxslast = False
+        #: (:obj:`bool`) nexus file source follows frames appended
+        #:     to the open SWMR file
+        self.nxsfollow = False
         #: (:obj:`bool`) store detector geometry
         self.storegeometry = False
         #: (:obj:`bool`) fetch geometry from source
@@ -359,6 +387,9 @@ class ConfigDialog(QtGui.QDialog):
         self.sendrois = False
         #: (:obj:`bool`) send results to LavueController flag
         self.sendresults = False
+        #: (:obj:`bool`) send pipeline metrics to LavueController
+        #:    and the security stream flag
+        self.sendmetrics = False
         #: (:obj:`bool`) set roi1, roi2, roi3, ... when alias names are missing
         self.singlerois = False
         #: (:obj:`int`) number of points for diffractogram
@@ -423,6 +454,7 @@ class ConfigDialog(QtGui.QDialog):
         """
         self.__ui.rateDoubleSpinBox.setValue(self.refreshrate)
         self.__ui.nrsourcesSpinBox.setValue(self.nrsources)
+        self.__ui.exchangesizeSpinBox.setValue(self.exchangebuffersize)
         self.__ui.diffsizeSpinBox.setValue(self.diffnpt)
         self.__ui.toolrefreshtimeDoubleSpinBox.setValue(self.toolrefreshtime)
         self.__ui.pollingintervalDoubleSpinBox.setValue(
@@ -432,6 +464,10 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.keepCoordsCheckBox.setChecked(self.keepcoords)
         self.__ui.buffersumCheckBox.setChecked(self.accelbuffersum)
         self.__ui.lazyimageCheckBox.setChecked(self.lazyimageslider)
+        self.__ui.filecacheSpinBox.setValue(self.filecachesize)
+        self.__ui.bkgprocessingCheckBox.setChecked(self.backgroundprocessing)
+        self.__ui.levelssamplingDoubleSpinBox.setValue(self.levelssampling)
+        self.__ui.decodeworkersSpinBox.setValue(self.decodeworkers)
         self.__ui.statsscaleCheckBox.setChecked(not self.statswoscaling)
         self.__ui.sardanaCheckBox.setChecked(self.sardana)
         self.__ui.doorLineEdit.setText(self.door)
@@ -460,6 +496,7 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.showscaleCheckBox.setChecked(self.showscale)
         self.__ui.showlevelsCheckBox.setChecked(self.showlevels)
         self.__ui.showframerateCheckBox.setChecked(self.showframerate)
+        self.__ui.showmetricsCheckBox.setChecked(self.showmetrics)
         self.__ui.timeoutLineEdit.setText(str(self.timeout))
         self.__ui.zmqtopicsLineEdit.setText(" ".join(self.zmqtopics))
         self.__ui.asapostreamsLineEdit.setText(
@@ -469,6 +506,7 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.asaposerverLineEdit.setText(self.asaposerver)
         self.__ui.asapotokenLineEdit.setText(self.asapotoken)
         self.__ui.asapobeamtimeLineEdit.setText(self.asapobeamtime)
+        self.__ui.asapomaxlagSpinBox.setValue(self.asapomaxlag)
         self.__ui.defdetserversCheckBox.setChecked(self.defdetservers)
         self.__ui.autozmqtopicsCheckBox.setChecked(self.autozmqtopics)
         self.__ui.interruptCheckBox.setChecked(self.interruptonerror)
@@ -478,17 +516,21 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.doocspropLineEdit.setText(self.doocsprops)
         self.__ui.pvnameLineEdit.setText(self.epicspvnames)
         self.__ui.pvshapeLineEdit.setText(self.epicspvshapes)
+        self.__ui.pvmonitorCheckBox.setChecked(self.epicsmonitor)
         self.__ui.evattrLineEdit.setText(self.tangoevattrs)
         self.__ui.fileattrLineEdit.setText(self.tangofileattrs)
         self.__ui.dirattrLineEdit.setText(self.tangodirattrs)
         self.__ui.zmqserversLineEdit.setText(self.zmqservers)
         self.__ui.urlsLineEdit.setText(self.httpurls)
+        self.__ui.httppipeliningCheckBox.setChecked(self.httppipelining)
         self.__ui.nxsopenCheckBox.setChecked(self.nxsopen)
         self.__ui.nxslastCheckBox.setChecked(self.nxslast)
+        self.__ui.nxsfollowCheckBox.setChecked(self.nxsfollow)
         self.__ui.storegeometryCheckBox.setChecked(self.storegeometry)
         self.__ui.fetchgeometryCheckBox.setChecked(self.geometryfromsource)
         self.__ui.sendroisCheckBox.setChecked(self.sendrois)
         self.__ui.sendresultsCheckBox.setChecked(self.sendresults)
+        self.__ui.sendmetricsCheckBox.setChecked(self.sendmetrics)
         self.__ui.singleroisCheckBox.setChecked(self.singlerois)
         self.__ui.showallroisCheckBox.setChecked(self.showallrois)
         self.__ui.sourcedisplayCheckBox.setChecked(self.sourcedisplay)
@@ -502,6 +544,17 @@ class ConfigDialog(QtGui.QDialog):
             fid = 0
         self.__ui.floatComboBox.setCurrentIndex(fid)
 
+        fid = self.__ui.exchangepolicyComboBox.findText(self.exchangepolicy)
+        if fid < 0:
+            fid = 0
+        self.__ui.exchangepolicyComboBox.setCurrentIndex(fid)
+
+        fid = self.__ui.tangoeventsmodeComboBox.findText(
+            self.tangoeventsmode)
+        if fid < 0:
+            fid = 0
+        self.__ui.tangoeventsmodeComboBox.setCurrentIndex(fid)
+
         self.__ui.urlsLineEdit.installEventFilter(self)
         self.__objtitles[repr(self.__ui.urlsLineEdit)] = \
             "HTTP responce url string"
@@ -764,6 +817,10 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.pollingintervalDoubleSpinBox.value())
         self.nrsources = int(
             self.__ui.nrsourcesSpinBox.value())
+        self.exchangebuffersize = int(
+            self.__ui.exchangesizeSpinBox.value())
+        self.exchangepolicy = str(
+            self.__ui.exchangepolicyComboBox.currentText())
         self.diffnpt = int(
             self.__ui.diffsizeSpinBox.value())
         self.showsub = self.__ui.showsubCheckBox.isChecked()
@@ -774,6 +831,7 @@ class ConfigDialog(QtGui.QDialog):
         self.showscale = self.__ui.showscaleCheckBox.isChecked()
         self.showlevels = self.__ui.showlevelsCheckBox.isChecked()
         self.showframerate = self.__ui.showframerateCheckBox.isChecked()
+        self.showmetrics = self.__ui.showmetricsCheckBox.isChecked()
         self.showhisto = self.__ui.showhistoCheckBox.isChecked()
         self.showaddhisto = self.__ui.showaddhistoCheckBox.isChecked()
         self.showmask = self.__ui.showmaskCheckBox.isChecked()
@@ -786,13 +844,21 @@ class ConfigDialog(QtGui.QDialog):
         self.keepcoords = self.__ui.keepCoordsCheckBox.isChecked()
         self.accelbuffersum = self.__ui.buffersumCheckBox.isChecked()
         self.lazyimageslider = self.__ui.lazyimageCheckBox.isChecked()
+        self.filecachesize = int(self.__ui.filecacheSpinBox.value())
+        self.backgroundprocessing = \
+            self.__ui.bkgprocessingCheckBox.isChecked()
+        self.levelssampling = float(
+            self.__ui.levelssamplingDoubleSpinBox.value())
+        self.decodeworkers = int(self.__ui.decodeworkersSpinBox.value())
         self.statswoscaling = not self.__ui.statsscaleCheckBox.isChecked()
         self.nxsopen = self.__ui.nxsopenCheckBox.isChecked()
         self.nxslast = self.__ui.nxslastCheckBox.isChecked()
+        self.nxsfollow = self.__ui.nxsfollowCheckBox.isChecked()
         self.storegeometry = self.__ui.storegeometryCheckBox.isChecked()
         self.geometryfromsource = self.__ui.fetchgeometryCheckBox.isChecked()
         self.sendrois = self.__ui.sendroisCheckBox.isChecked()
         self.sendresults = self.__ui.sendresultsCheckBox.isChecked()
+        self.sendmetrics = self.__ui.sendmetricsCheckBox.isChecked()
         self.singlerois = self.__ui.singleroisCheckBox.isChecked()
         self.showallrois = self.__ui.showallroisCheckBox.isChecked()
         self.sourcedisplay = self.__ui.sourcedisplayCheckBox.isChecked()
@@ -857,6 +923,8 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.tabWidget.setCurrentIndex(3)
             self.__ui.evattrLineEdit.setFocus(True)
             return
+        self.tangoeventsmode = str(
+            self.__ui.tangoeventsmodeComboBox.currentText())
         try:
             attr = str(self.__ui.pvnameLineEdit.text()).strip()
             mytr = json.loads(attr)
@@ -879,6 +947,7 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.tabWidget.setCurrentIndex(3)
             self.__ui.pvshapeLineEdit.setFocus(True)
             return
+        self.epicsmonitor = self.__ui.pvmonitorCheckBox.isChecked()
         try:
             fileattr = str(self.__ui.fileattrLineEdit.text()).strip()
             mytr = json.loads(fileattr)
@@ -923,6 +992,7 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.tabWidget.setCurrentIndex(2)
             self.__ui.urlsLineEdit.setFocus(True)
             return
+        self.httppipelining = self.__ui.httppipeliningCheckBox.isChecked()
         zmqtopics = str(self.__ui.zmqtopicsLineEdit.text()).strip().split(" ")
         self.zmqtopics = [tp for tp in zmqtopics if tp]
         self.interruptonerror = self.__ui.interruptCheckBox.isChecked()
@@ -936,6 +1006,7 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.asapotokenLineEdit.text()).strip()
         self.asapobeamtime = str(
             self.__ui.asapobeamtimeLineEdit.text()).strip()
+        self.asapomaxlag = int(self.__ui.asapomaxlagSpinBox.value())
         detservers = str(
             self.__ui.detserversLineEdit.text()).strip().split(" ")
         self.detservers = json.dumps([ds for ds in detservers if ds])
@@ -29,25 +29,91 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from pyqtgraph import QtCore
+import collections
 import time
+import logging
 from .omniQThread import OmniQThread
+from . import stageTimer
+
+logger = logging.getLogger("lavue")
 
 #: (:obj:`float`) refresh rate in seconds
 GLOBALREFRESHRATE = .1
 
+#: (:obj:`list` <:obj:`str`>) overflow policies of the exchange list
+OVERFLOWPOLICIES = ["coalesce", "dropoldest", "dropnewest"]
+
 
 class ExchangeList(object):
 
-    """  subclass for data caching """
+    """  subclass for data caching, i.e. a bounded ring buffer
+    of (name, data, metadata) frames
+    """
 
-    def __init__(self):
+    def __init__(self, size=1, policy="coalesce"):
         """ constructor
+
+        :param size: maximal number of buffered frames
+        :type size: :obj:`int`
+        :param policy: overflow policy, i.e. coalesce, dropoldest, dropnewest
+        :type policy: :obj:`str`
         """
+        #: (:class:`collections.deque` <:obj:`list` <:obj:`str`,
+        #:      :class:`numpy.ndarray`, :obj:`str` > >) ring buffer
+        self.__elist = collections.deque()
         #: (:obj:`list` <:obj:`str`, :class:`numpy.ndarray`, :obj:`str` >)
-        #:      exchange object
-        self.__elist = [None, None, None]
-        #: (:obj:`pyqtgraph.QtCore.QMutex`) mutex lock
+        #:      the last read frame
+        self.__last = [None, None, None]
+        #: (:obj:`int`) maximal number of buffered frames
+        self.__size = 1
+        #: (:obj:`str`) overflow policy
+        self.__policy = "coalesce"
+        #: (:obj:`int`) number of dropped frames
+        self.__dropped = 0
+        #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock
         self.__mutex = QtCore.QMutex()
+        self.setSize(size)
+        self.setPolicy(policy)
+
+    def setSize(self, size):
+        """ sets the maximal number of buffered frames
+
+        :param size: maximal number of buffered frames
+        :type size: :obj:`int`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__size = max(int(size), 1)
+            while len(self.__elist) > self.__size:
+                self.__elist.popleft()
+                self.__dropped += 1
+
+    def setPolicy(self, policy):
+        """ sets the overflow policy
+
+        :param policy: overflow policy, i.e. coalesce, dropoldest, dropnewest
+        :type policy: :obj:`str`
+        """
+        policy = str(policy).lower()
+        if policy not in OVERFLOWPOLICIES:
+            raise ValueError("Unknown overflow policy: %s" % policy)
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__policy = policy
+
+    def size(self):
+        """ provides the maximal number of buffered frames
+
+        :returns: maximal number of buffered frames
+        :rtype: :obj:`int`
+        """
+        return self.__size
+
+    def policy(self):
+        """ provides the overflow policy
+
+        :returns: overflow policy
+        :rtype: :obj:`str`
+        """
+        return self.__policy
 
     def addData(self, name, data, metadata=""):
         """ write data into exchange object
@@ -58,22 +124,61 @@ class ExchangeList(object):
         :type data: :class:`numpy.ndarray`
         :param metadata: json dictionary with image metadata
         :type metadata: :obj:`str`
+        :returns: True if the frame was buffered
+        :rtype: :obj:`bool`
         """
         with QtCore.QMutexLocker(self.__mutex):
-            self.__elist[0] = name
-            self.__elist[1] = data
-            self.__elist[2] = metadata
+            if len(self.__elist) >= self.__size:
+                self.__dropped += 1
+                if self.__policy == "dropnewest":
+                    return False
+                self.__elist.popleft()
+            self.__elist.append([name, data, metadata])
+        return True
 
     def readData(self):
-        """ read data from exchange object
+        """ read data from exchange object. If the buffer is empty
+        the last read frame is returned
 
         :returns: tuple of exchange object (name, data, metadata)
         :rtype: :obj:`list` <:obj:`str`, :class:`numpy.ndarray`, :obj:`str` >
         """
         with QtCore.QMutexLocker(self.__mutex):
-            a, b, c = self.__elist[0], self.__elist[1], self.__elist[2]
+            if self.__elist:
+                if self.__policy == "coalesce":
+                    self.__dropped += len(self.__elist) - 1
+                    self.__last = self.__elist.pop()
+                    self.__elist.clear()
+                else:
+                    self.__last = self.__elist.popleft()
+            a, b, c = self.__last[0], self.__last[1], self.__last[2]
         return a, b, c
 
+    def pending(self):
+        """ provides a number of unread frames
+
+        :returns: a number of unread frames
+        :rtype: :obj:`int`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            return len(self.__elist)
+
+    def dropped(self):
+        """ provides a number of frames dropped from the buffer
+
+        :returns: a number of dropped frames
+        :rtype: :obj:`int`
+        """
+        return self.__dropped
+
+    def clear(self):
+        """ removes all frames and resets the dropped frame counter
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__elist.clear()
+            self.__last = [None, None, None]
+            self.__dropped = 0
+
 
 # subclass for threading
 class DataFetchThread(OmniQThread):
@@ -98,43 +203,99 @@ class DataFetchThread(OmniQThread):
         self.__isConnected = False
         #: (:obj:`bool`) execute loop flag
         self.__loop = False
-        #: (:obj:`bool`) ready flag
+        #: (:obj:`bool`) ready flag, i.e. the consumer waits for new data
         self.__ready = True
+        #: (:obj:`str`) the last fetched image name
+        self.__lastname = ""
+        #: (:obj:`str`) the last fetched metadata
+        self.__lastmetadata = ""
         #: (:class:`pyqtgraph.QtCore.QMutex`) thread mutex
         self.__mutex = QtCore.QMutex()
+        #: (:class:`lavuelib.frameRecorder.FrameRecorder`) frame recorder
+        self.__recorder = None
+        #: (:class:`pyqtgraph.QtCore.QMutex`) ready flag mutex
+        self.__readymutex = QtCore.QMutex()
+        #: (:class:`pyqtgraph.QtCore.QWaitCondition`) consumer ready
+        #:    condition
+        self.__readycondition = QtCore.QWaitCondition()
 
     def _run(self):
         """ run function of the fetching thread
         """
         self.__loop = True
-        dt = 0
-        skip = False
+        tlast = 0
+        tpoll = 0
         while self.__loop:
             if not self.__isConnected:
                 self.msleep(int(1000*GLOBALREFRESHRATE))
-            if skip:
-                self.msleep(int(100*GLOBALREFRESHRATE))
-            else:
-                self.msleep(max(int(1000*GLOBALREFRESHRATE - dt), 0))
-            t1 = time.time()
-            if self.__isConnected and self.__ready:
+                continue
+            backlog = self.__list.pending()
+            if backlog and self.__ready:
+                # buffered frames are passed on without waiting
+                self.__emitNext()
+                continue
+            # keep at least the refresh time between two fetches
+            # or between two source checks with buffered frames
+            dt = time.time() - (max(tlast, tpoll) if backlog else tlast)
+            if dt < GLOBALREFRESHRATE:
+                if backlog:
+                    # ready() wakes the loop for the next buffered frame
+                    self.__waitReady(GLOBALREFRESHRATE - dt)
+                    continue
+                self.msleep(int(1000*(GLOBALREFRESHRATE - dt)))
+            with QtCore.QMutexLocker(self.__mutex):
+                datasource = self.__datasource
+                recorder = self.__recorder
+            # push sources block here until new data arrives
+            # unless buffered frames wait for the consumer
+            tpoll = time.time()
+            try:
+                arrived = datasource.wait(0 if backlog else GLOBALREFRESHRATE)
+            except Exception:
+                arrived = True
+            if self.__isConnected and arrived:
+                tlast = time.time()
+                timer = stageTimer.TIMER
                 try:
-                    with QtCore.QMutexLocker(self.__mutex):
-                        img, name, metadata = self.__datasource.getData()
+                    with timer.measure("getdata"):
+                        with QtCore.QMutexLocker(self.__mutex):
+                            img, name, metadata = \
+                                self.__datasource.getData()
                 except Exception as e:
                     name = "__ERROR__"
                     img = str(e)
                     metadata = ""
                 if name is not None:
+                    timer.increment("fetched")
                     self.__list.addData(name, img, metadata)
-                    self.__ready = False
-                    self.newDataNameFetched.emit(name, metadata)
-                else:
-                    self.__ready = True
-                skip = False
-            else:
-                skip = True
-            dt = (time.time() - t1) * 1000.
+                    self.__lastname = name
+                    self.__lastmetadata = metadata
+                    if recorder is not None:
+                        try:
+                            recorder.write(img, name, metadata, tlast)
+                        except Exception as e:
+                            logger.warning(str(e))
+            self.__emitNext()
+
+    def __emitNext(self):
+        """ notifies the ready consumer about a buffered frame
+        """
+        if self.__isConnected and self.__ready \
+           and self.__list.pending():
+            self.__ready = False
+            self.newDataNameFetched.emit(
+                self.__lastname, self.__lastmetadata)
+
+    def __waitReady(self, timeout):
+        """ waits until the consumer is ready or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        """
+        with QtCore.QMutexLocker(self.__readymutex):
+            if not self.__ready and self.__loop:
+                self.__readycondition.wait(
+                    self.__readymutex, max(int(1000 * timeout), 1))
 
     @QtCore.pyqtSlot(bool)
     def changeStatus(self, status):
@@ -145,6 +306,8 @@ class DataFetchThread(OmniQThread):
         """
         self.__isConnected = status
         self.__ready = True
+        if status:
+            self.__list.clear()
 
     def setDataSource(self, datasource):
         """ sets datasource
@@ -154,22 +317,43 @@ class DataFetchThread(OmniQThread):
         with QtCore.QMutexLocker(self.__mutex):
             self.__datasource = datasource
 
+    def setRecorder(self, recorder):
+        """ sets frame recorder of fetched frames
+
+        :param recorder: frame recorder or None
+        :type recorder: :class:`lavuelib.frameRecorder.FrameRecorder`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__recorder = recorder
+
     def ready(self):
         """ continue acquisition
         """
-        self.__ready = True
+        with QtCore.QMutexLocker(self.__readymutex):
+            self.__ready = True
+            self.__readycondition.wakeAll()
 
     def fetching(self):
         """ provides read flag
         """
         return not self.__ready
 
+    def droppedFrames(self):
+        """ provides a number of frames dropped by the exchange list
+
+        :returns: a number of dropped frames
+        :rtype: :obj:`int`
+        """
+        return self.__list.dropped()
+
     def stop(self):
         """ stop the thread
         """
         self.__isConnected = False
-        self.__ready = True
-        self.__loop = False
+        with QtCore.QMutexLocker(self.__readymutex):
+            self.__ready = True
+            self.__loop = False
+            self.__readycondition.wakeAll()
 
     def isFetching(self):
         """ is datasource source connected
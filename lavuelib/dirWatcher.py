@@ -0,0 +1,264 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" inotify directory watcher """
+
+import os
+import errno
+import select
+import struct
+import fnmatch
+import logging
+
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(
+        ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    _libc.inotify_init1
+    _libc.inotify_add_watch.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    #: (:obj:`bool`) inotify available
+    INOTIFY = True
+except Exception:
+    #: (:obj:`bool`) inotify available
+    INOTIFY = False
+
+
+logger = logging.getLogger("lavue")
+
+#: (:obj:`int`) file opened for writing was closed
+IN_CLOSE_WRITE = 0x00000008
+#: (:obj:`int`) file was moved into the watched directory
+IN_MOVED_TO = 0x00000080
+#: (:obj:`int`) file or directory was created
+IN_CREATE = 0x00000100
+#: (:obj:`int`) watched directory was removed
+IN_DELETE_SELF = 0x00000400
+#: (:obj:`int`) event queue overflowed
+IN_Q_OVERFLOW = 0x00004000
+#: (:obj:`int`) watch was removed
+IN_IGNORED = 0x00008000
+#: (:obj:`int`) event subject is a directory
+IN_ISDIR = 0x40000000
+#: (:obj:`int`) non-blocking inotify descriptor
+IN_NONBLOCK = os.O_NONBLOCK
+#: (:obj:`int`) close-on-exec inotify descriptor
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+#: (:obj:`str`) inotify event header format
+_EVENT = "iIII"
+#: (:obj:`int`) inotify event header size
+_EVENTSIZE = struct.calcsize(_EVENT)
+
+
+class DirWatcher(object):
+
+    """ watches a directory tree with inotify and reports files
+    matching glob patterns when they are closed after writing
+    or moved into the tree. The directory listing is never rescanned
+    """
+
+    def __init__(self, path, patterns=None, recursive=False):
+        """ constructor
+
+        :param path: directory path
+        :type path: :obj:`str`
+        :param patterns: glob patterns of file names
+        :type patterns: :obj:`list` <:obj:`str`>
+        :param recursive: watch also subdirectories
+        :type recursive: :obj:`bool`
+        """
+        if not INOTIFY:
+            raise Exception("DirWatcher: inotify is not available")
+        #: (:obj:`str`) directory path
+        self.__path = os.path.abspath(path)
+        #: (:obj:`list` <:obj:`str`>) glob patterns of file names
+        self.__patterns = list(patterns or ["*"])
+        #: (:obj:`bool`) watch also subdirectories
+        self.__recursive = recursive
+        #: (:obj:`dict` <:obj:`int`, :obj:`str`>) watched directories
+        self.__watches = {}
+        #: (:obj:`int`) a number of event queue overflows
+        self.overflows = 0
+        #: (:obj:`int`) inotify file descriptor
+        self.__fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        try:
+            self.__addWatch(self.__path)
+            if self.__recursive:
+                self.__watchTree(self.__path)
+        except Exception:
+            self.close()
+            raise
+
+    def fileno(self):
+        """ provides the inotify file descriptor
+
+        :returns: file descriptor
+        :rtype: :obj:`int`
+        """
+        return self.__fd
+
+    def __addWatch(self, path):
+        """ adds a directory watch
+
+        :param path: directory path
+        :type path: :obj:`str`
+        """
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF
+        if self.__recursive:
+            mask |= IN_CREATE
+        wd = _libc.inotify_add_watch(
+            self.__fd, path.encode("utf-8"), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self.__watches[wd] = path
+
+    def __watchTree(self, path, files=False):
+        """ adds watches of all subdirectories. It is called only
+        at start and for directories which are added to the tree
+
+        :param path: directory path
+        :type path: :obj:`str`
+        :param files: provide files of the tree
+        :type files: :obj:`bool`
+        :returns: files of the tree
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        found = []
+        for root, dirs, fls in os.walk(path):
+            for dr in dirs:
+                try:
+                    self.__addWatch(os.path.join(root, dr))
+                except OSError as e:
+                    logger.warning(str(e))
+            if files:
+                found.extend(os.path.join(root, fl) for fl in fls)
+        return found
+
+    def matches(self, name):
+        """ checks if the file name matches the glob patterns
+
+        :param name: file name
+        :type name: :obj:`str`
+        :returns: matching flag
+        :rtype: :obj:`bool`
+        """
+        return any(fnmatch.fnmatch(name, pt) for pt in self.__patterns)
+
+    def wait(self, timeout):
+        """ waits until inotify events arrive or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if events can be read
+        :rtype: :obj:`bool`
+        """
+        if self.__fd is None:
+            return False
+        try:
+            return bool(select.select([self.__fd], [], [], timeout)[0])
+        except (OSError, select.error) as e:
+            if getattr(e, "errno", None) == errno.EINTR:
+                return False
+            raise
+
+    def read(self):
+        """ reads all pending inotify events without blocking
+
+        :returns: new files in the order of their events
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        files = []
+        while self.__fd is not None:
+            try:
+                buf = os.read(self.__fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                    break
+                raise
+            if not buf:
+                break
+            offset = 0
+            while offset + _EVENTSIZE <= len(buf):
+                wd, mask, _, length = struct.unpack_from(
+                    _EVENT, buf, offset)
+                offset += _EVENTSIZE
+                name = buf[offset:offset + length].rstrip(b"\0").decode(
+                    "utf-8", "replace")
+                offset += length
+                files.extend(self.__event(wd, mask, name))
+        return files
+
+    def __event(self, wd, mask, name):
+        """ handles one inotify event
+
+        :param wd: watch descriptor
+        :type wd: :obj:`int`
+        :param mask: event mask
+        :type mask: :obj:`int`
+        :param name: file name
+        :type name: :obj:`str`
+        :returns: new files
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if mask & IN_Q_OVERFLOW:
+            self.overflows += 1
+            logger.warning("DirWatcher: inotify event queue overflow")
+            return []
+        if mask & IN_IGNORED:
+            self.__watches.pop(wd, None)
+            return []
+        path = self.__watches.get(wd)
+        if path is None or not name:
+            return []
+        fpath = os.path.join(path, name)
+        if mask & IN_ISDIR:
+            if self.__recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self.__addWatch(fpath)
+                except OSError as e:
+                    logger.warning(str(e))
+                    return []
+                # files written before the watch was added
+                return [fl for fl in self.__watchTree(fpath, True)
+                        if self.matches(os.path.basename(fl))]
+            return []
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self.matches(name):
+            return [fpath]
+        return []
+
+    def close(self):
+        """ closes the inotify file descriptor
+        """
+        if self.__fd is not None:
+            try:
+                os.close(self.__fd)
+            except OSError as e:
+                logger.warning(str(e))
+            self.__fd = None
+            self.__watches = {}
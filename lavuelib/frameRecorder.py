@@ -0,0 +1,389 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" recorder and reader of image source frames """
+
+import os
+import json
+import struct
+import zlib
+import time
+import logging
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import numpy as np
+
+
+logger = logging.getLogger("lavue")
+
+#: (:obj:`bytes`) file magic
+MAGIC = b"LAVUEREC"
+#: (:obj:`int`) file format version
+VERSION = 1
+#: (:obj:`str`) file header format, i.e. magic and version
+_HEADER = "<8sH"
+#: (:obj:`str`) chunk header format, i.e. marker, compression flag,
+#:    a number of frames, raw size and stored size
+_CHUNK = "<4sBIII"
+#: (:obj:`bytes`) chunk marker
+_CHUNKMARKER = b"CHNK"
+#: (:obj:`str`) frame header format, i.e. timestamp,
+#:    header size and data size
+_FRAME = "<dII"
+#: (:obj:`object`) writer queue marker of the chunk flush
+_FLUSH = object()
+
+
+class FrameRecorder(object):
+
+    """ writes image frames with their names and metadata into
+    zlib compressed chunks of a record file. Frames are appended
+    to an existing record file. Frames are serialized and compressed
+    in a writer thread, frames which do not fit into its bounded queue
+    are dropped
+    """
+
+    def __init__(self, filename, chunkframes=16, chunkbytes=64 << 20,
+                 level=1, queueframes=64, queuebytes=512 << 20):
+        """ constructor
+
+        :param filename: record file name
+        :type filename: :obj:`str`
+        :param chunkframes: maximal number of frames in a chunk
+        :type chunkframes: :obj:`int`
+        :param chunkbytes: maximal raw size of a chunk in bytes
+        :type chunkbytes: :obj:`int`
+        :param level: zlib compression level, 0 stores raw chunks
+        :type level: :obj:`int`
+        :param queueframes: maximal number of frames waiting for the writer
+        :type queueframes: :obj:`int`
+        :param queuebytes: maximal size of frames waiting for the writer
+        :type queuebytes: :obj:`int`
+        """
+        #: (:obj:`str`) record file name
+        self.filename = filename
+        #: (:obj:`int`) maximal number of frames in a chunk
+        self.__chunkframes = max(int(chunkframes), 1)
+        #: (:obj:`int`) maximal raw size of a chunk in bytes
+        self.__chunkbytes = max(int(chunkbytes), 1)
+        #: (:obj:`int`) zlib compression level
+        self.__level = int(level)
+        #: (:obj:`int`) maximal size of frames waiting for the writer
+        self.__queuebytes = max(int(queuebytes), 1)
+        #: (:obj:`list` <:obj:`bytes`>) frame records of the current chunk
+        self.__records = []
+        #: (:obj:`int`) raw size of the current chunk
+        self.__size = 0
+        #: (:obj:`int`) a number of written frames
+        self.frames = 0
+        #: (:obj:`int`) a number of frames dropped by a busy writer
+        self.dropped = 0
+        #: (:obj:`int`) a number of written raw bytes
+        self.rawbytes = 0
+        #: (:obj:`int`) a number of stored bytes
+        self.storedbytes = 0
+        #: (:obj:`int`) size of frames waiting for the writer
+        self.__pending = 0
+        #: (:obj:`bool`) recorder is open
+        self.__open = False
+        #: (:class:`threading.Lock`) file lock
+        self.__lock = threading.Lock()
+        #: (:class:`queue.Queue`) frames waiting for the writer
+        self.__queue = queue.Queue(max(int(queueframes), 1))
+        exists = os.path.isfile(filename) and os.path.getsize(filename) > 0
+        if exists:
+            with open(filename, "rb") as fl:
+                _checkHeader(fl, filename)
+        #: (:obj:`file`) record file
+        self.__file = open(filename, "ab")
+        if not exists:
+            self.__file.write(struct.pack(_HEADER, MAGIC, VERSION))
+        self.__open = True
+        #: (:class:`threading.Thread`) writer thread
+        self.__writer = threading.Thread(target=self.__run)
+        self.__writer.daemon = True
+        self.__writer.start()
+
+    def write(self, image, name, metadata=None, timestamp=None):
+        """ queues a frame for the writer. Error frames are not recorded
+
+        :param image: image data
+        :type image: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :param metadata: json dictionary with metadata
+        :type metadata: :obj:`str`
+        :param timestamp: arrival time, the current time by default
+        :type timestamp: :obj:`float`
+        :returns: True if the frame was queued
+        :rtype: :obj:`bool`
+        """
+        if name is None or name == "__ERROR__" \
+           or image is None or isinstance(image, str):
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        nbytes = getattr(image, "nbytes", 0)
+        with self.__lock:
+            if not self.__open:
+                return False
+            if self.__pending and \
+               self.__pending + nbytes > self.__queuebytes:
+                self.dropped += 1
+                return False
+            try:
+                self.__queue.put_nowait(
+                    (image, name, metadata, timestamp, nbytes))
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self.__pending += nbytes
+        return True
+
+    def __run(self):
+        """ writer thread function
+        """
+        while True:
+            frame = self.__queue.get()
+            try:
+                if frame is None or frame is _FLUSH:
+                    self.__flush()
+                    if frame is None:
+                        return
+                    continue
+                image, name, metadata, timestamp, nbytes = frame
+                try:
+                    self.__record(image, name, metadata, timestamp)
+                except Exception as e:
+                    logger.warning("FrameRecorder: %s" % str(e))
+                with self.__lock:
+                    self.__pending -= nbytes
+            finally:
+                self.__queue.task_done()
+
+    def __record(self, image, name, metadata, timestamp):
+        """ serializes a frame and writes full chunks into the file
+
+        :param image: image data
+        :type image: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :param metadata: json dictionary with metadata
+        :type metadata: :obj:`str`
+        :param timestamp: arrival time
+        :type timestamp: :obj:`float`
+        """
+        image = np.ascontiguousarray(image)
+        header = json.dumps({
+            "name": str(name),
+            "shape": list(image.shape),
+            "dtype": image.dtype.str,
+            "metadata": metadata or ""}).encode("utf-8")
+        data = image.tobytes()
+        self.__records.append(
+            struct.pack(_FRAME, timestamp, len(header), len(data)))
+        self.__records.append(header)
+        self.__records.append(data)
+        self.__size += struct.calcsize(_FRAME) + len(header) + len(data)
+        self.frames += 1
+        if len(self.__records) >= 3 * self.__chunkframes \
+           or self.__size >= self.__chunkbytes:
+            self.__flush()
+
+    def flush(self):
+        """ waits for the queued frames and writes the current chunk
+        into the file
+        """
+        with self.__lock:
+            if not self.__open:
+                return
+        self.__queue.put(_FLUSH)
+        self.__queue.join()
+
+    def __flush(self):
+        """ writes the current chunk into the file
+        """
+        if self.__file is None or not self.__records:
+            return
+        raw = b"".join(self.__records)
+        compressed = 0
+        if self.__level > 0:
+            stored = zlib.compress(raw, self.__level)
+            if len(stored) < len(raw):
+                compressed = 1
+                raw = stored
+        self.__file.write(struct.pack(
+            _CHUNK, _CHUNKMARKER, compressed, len(self.__records) // 3,
+            self.__size, len(raw)))
+        self.__file.write(raw)
+        self.__file.flush()
+        self.rawbytes += self.__size
+        self.storedbytes += len(raw)
+        self.__records = []
+        self.__size = 0
+
+    def close(self):
+        """ writes the queued frames and closes the file
+        """
+        with self.__lock:
+            if not self.__open:
+                return
+            self.__open = False
+        self.__queue.put(None)
+        self.__writer.join()
+        self.__file.close()
+        self.__file = None
+        logger.info(
+            "FrameRecorder: %s frames, %s of %s bytes stored in %s, "
+            "%s frames dropped" % (
+                self.frames, self.storedbytes, self.rawbytes,
+                self.filename, self.dropped))
+
+
+class FrameReader(object):
+
+    """ reads image frames of a record file chunk by chunk
+    """
+
+    def __init__(self, filename):
+        """ constructor
+
+        :param filename: record file name
+        :type filename: :obj:`str`
+        """
+        #: (:obj:`str`) record file name
+        self.filename = filename
+        #: (:obj:`file`) record file
+        self.__file = open(filename, "rb")
+        try:
+            _checkHeader(self.__file, filename)
+        except Exception:
+            self.close()
+            raise
+        #: (:obj:`int`) position of the first chunk
+        self.__start = self.__file.tell()
+        #: (:class:`memoryview`) the current raw chunk
+        self.__chunk = None
+        #: (:obj:`int`) read position in the current chunk
+        self.__offset = 0
+        #: (:obj:`int`) a number of unread frames in the current chunk
+        self.__left = 0
+
+    def rewind(self):
+        """ moves to the first frame
+        """
+        if self.__file is not None:
+            self.__file.seek(self.__start)
+        self.__chunk = None
+        self.__left = 0
+
+    def __readChunk(self):
+        """ reads the next chunk
+
+        :returns: True if a chunk was read
+        :rtype: :obj:`bool`
+        """
+        if self.__file is None:
+            return False
+        head = self.__file.read(struct.calcsize(_CHUNK))
+        if not head:
+            return False
+        if len(head) < struct.calcsize(_CHUNK):
+            logger.warning(
+                "FrameReader: truncated chunk in %s" % self.filename)
+            return False
+        marker, compressed, nframes, rawsize, size = struct.unpack(
+            _CHUNK, head)
+        if marker != _CHUNKMARKER:
+            raise Exception(
+                "FrameReader: corrupted chunk in %s" % self.filename)
+        raw = self.__file.read(size)
+        if len(raw) < size:
+            logger.warning(
+                "FrameReader: truncated chunk in %s" % self.filename)
+            return False
+        if compressed:
+            raw = zlib.decompress(raw)
+        self.__chunk = memoryview(raw)
+        self.__offset = 0
+        self.__left = nframes
+        return True
+
+    def read(self):
+        """ reads the next frame
+
+        :returns: timestamp, image data, image name and
+                  json dictionary with metadata or None at the end
+        :rtype: (:obj:`float`, :class:`numpy.ndarray`,
+                 :obj:`str`, :obj:`str`)
+        """
+        while not self.__left:
+            if not self.__readChunk():
+                return None
+        timestamp, hsize, dsize = struct.unpack_from(
+            _FRAME, self.__chunk, self.__offset)
+        offset = self.__offset + struct.calcsize(_FRAME)
+        header = json.loads(
+            bytes(self.__chunk[offset:offset + hsize]).decode("utf-8"))
+        offset += hsize
+        # the image is a read-only view of the chunk
+        image = np.frombuffer(
+            self.__chunk[offset:offset + dsize],
+            dtype=np.dtype(header["dtype"])).reshape(header["shape"])
+        self.__offset = offset + dsize
+        self.__left -= 1
+        return timestamp, image, header["name"], header["metadata"]
+
+    def close(self):
+        """ closes the file
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        self.__chunk = None
+
+
+def _checkHeader(fl, filename):
+    """ checks the record file header
+
+    :param fl: record file
+    :type fl: :obj:`file`
+    :param filename: record file name
+    :type filename: :obj:`str`
+    """
+    head = fl.read(struct.calcsize(_HEADER))
+    if len(head) < struct.calcsize(_HEADER):
+        raise Exception("%s is not a lavue record file" % filename)
+    magic, version = struct.unpack(_HEADER, head)
+    if magic != MAGIC:
+        raise Exception("%s is not a lavue record file" % filename)
+    if version > VERSION:
+        raise Exception(
+            "%s: unsupported record file version %s" % (filename, version))
@@ -30,8 +30,11 @@
 import struct
 import numpy as np
 import sys
+import os
 import json
 import logging
+import threading
+import collections
 
 from . import filewriter
 
@@ -70,6 +73,11 @@ except Exception:
 
 logger = logging.getLogger("lavue")
 
+#: (:obj:`int`) default size of the frame block cache in bytes
+CACHESIZE = 256 * 1024 * 1024
+#: (:obj:`int`) default number of frames to prefetch
+PREFETCH = 8
+
 
 class NexusFieldHandler(object):
 
@@ -419,6 +427,528 @@ class NexusFieldHandler(object):
                         return node[:, :, :, frame]
 
 
+class NexusFrameReader(object):
+
+    """Chunk-aware frame reader of a nexus image field.
+       Reads frames in blocks aligned to the HDF5 chunks, keeps
+       the blocks in a bounded LRU cache and prefetches frames
+       in the stepping direction. Contiguous uncompressed datasets
+       are memory-mapped."""
+
+    def __init__(self, cachesize=None, prefetch=None):
+        """ constructor
+
+        :param cachesize: size of the block cache in bytes
+        :type cachesize: :obj:`int`
+        :param prefetch: number of frames to prefetch
+        :type prefetch: :obj:`int`
+        """
+        #: (:obj:`int`) size of the block cache in bytes
+        self.__cachesize = CACHESIZE if cachesize is None else cachesize
+        #: (:obj:`int`) number of frames to prefetch
+        self.__prefetch = PREFETCH if prefetch is None else prefetch
+        #: (:class:`lavuelib.filewriter.FTField`) nexus field node
+        self.__node = None
+        #: (:obj:`int`) growing dimension
+        self.__growing = 0
+        #: (:obj:`tuple` <:obj:`int`>) field shape
+        self.__shape = None
+        #: (:obj:`tuple`) field layout: dtype, frame shape and block length
+        self.__layout = None
+        #: (:obj:`int`) number of frames in a block
+        self.__blocklen = 1
+        #: (:obj:`int`) frame size in bytes
+        self.__framesize = 0
+        #: (:class:`numpy.memmap`) memory mapped field
+        self.__memmap = None
+        #: (:obj:`any`) fingerprint of the file content
+        self.__fingerprint = None
+        #: (:class:`collections.OrderedDict` <:obj:`int`,
+        #:     :class:`numpy.ndarray`>) LRU cache of frame blocks
+        self.__blocks = collections.OrderedDict()
+        #: (:obj:`int`) size of cached blocks in bytes
+        self.__cached = 0
+        #: (:obj:`list` <:obj:`int`>) blocks to prefetch
+        self.__wanted = []
+        #: (:obj:`int`) the last requested frame
+        self.__lastframe = None
+        #: (:obj:`int`) stepping direction
+        self.__direction = 1
+        #: (:class:`threading.Condition`) guards the node and the cache
+        self.__condition = threading.Condition(threading.RLock())
+        #: (:class:`threading.Thread`) prefetch thread
+        self.__thread = None
+        #: (:obj:`bool`) prefetch thread running flag
+        self.__running = False
+
+    @classmethod
+    def _chunks(cls, node):
+        """ provides chunk shape of the field
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :returns: chunk shape or None for contiguous fields
+        :rtype: :obj:`tuple` <:obj:`int`>
+        """
+        h5object = node.h5object
+        if hasattr(h5object, "chunks"):
+            return h5object.chunks
+        try:
+            chunk = tuple(h5object.creation_list.chunk)
+            return chunk or None
+        except Exception:
+            return None
+
+    @classmethod
+    def _filtered(cls, node):
+        """ checks if the field chunks are filtered, e.g. compressed
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :returns: True if chunks are filtered
+        :rtype: :obj:`bool`
+        """
+        h5object = node.h5object
+        try:
+            if hasattr(h5object, "id"):
+                return h5object.id.get_create_plist().get_nfilters() > 0
+            return h5object.creation_list.nfilters > 0
+        except Exception:
+            return True
+
+    @classmethod
+    def _memmap(cls, node):
+        """ maps a contiguous uncompressed h5py field into memory
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :returns: memory mapped field or None
+        :rtype: :class:`numpy.memmap`
+        """
+        try:
+            h5object = node.h5object
+            if h5object.chunks is not None or \
+               h5object.compression is not None or \
+               h5object.external or \
+               getattr(h5object, "is_virtual", False):
+                return None
+            if h5object.file.driver not in ["sec2", "stdio"] or \
+               h5object.dtype.kind not in "biufc":
+                return None
+            offset = h5object.id.get_offset()
+            filename = h5object.file.filename
+            if offset is None or not os.path.isfile(filename):
+                return None
+            return np.memmap(filename, dtype=h5object.dtype, mode="r",
+                             offset=offset, shape=h5object.shape)
+        except Exception:
+            return None
+
+    def setNode(self, node, growing=0, fingerprint=None):
+        """ attaches the field node
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :param growing: growing dimension
+        :type growing: :obj:`int`
+        :param fingerprint: fingerprint of the file content
+        :type fingerprint: :obj:`any`
+        """
+        with self.__condition:
+            shape = tuple(node.shape or [])
+            chunks = self._chunks(node)
+            memmap = None
+            if fingerprint is None or fingerprint != self.__fingerprint \
+               or self.__memmap is None:
+                memmap = self._memmap(node)
+            else:
+                memmap = self.__memmap
+            fshape = tuple(dm for i, dm in enumerate(shape) if i != growing)
+            try:
+                itemsize = np.dtype(node.dtype).itemsize
+            except Exception:
+                itemsize = 1
+            self.__framesize = 0
+            if len(shape) > 2:
+                self.__framesize = int(np.prod(fshape)) * itemsize
+            blocklen = 1
+            # unfiltered chunks can be read partially without a penalty
+            if chunks and len(chunks) > growing and self.__framesize \
+               and self._filtered(node):
+                blocklen = max(1, min(
+                    chunks[growing],
+                    self.__cachesize // (4 * self.__framesize)))
+            layout = (str(node.dtype), fshape, growing, blocklen)
+            if layout != self.__layout or self.__shape is None or \
+               len(shape) <= growing or \
+               shape[growing] < self.__shape[growing]:
+                self.__clear()
+            self.__layout = layout
+            self.__blocklen = blocklen
+            self.__node = node
+            self.__growing = growing
+            self.__shape = shape
+            self.__memmap = memmap
+            self.__fingerprint = fingerprint
+
+    def detach(self):
+        """ detaches the field node and keeps the cached frames
+        """
+        with self.__condition:
+            self.__node = None
+            self.__wanted = []
+
+    def close(self):
+        """ stops prefetching and releases the cached frames
+        """
+        with self.__condition:
+            self.__running = False
+            self.__node = None
+            self.__memmap = None
+            self.__fingerprint = None
+            self.__layout = None
+            self.__shape = None
+            self.__clear()
+            self.__condition.notify_all()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def matches(self, fingerprint):
+        """ checks if cached frames come from the given file content
+
+        :param fingerprint: fingerprint of the file content
+        :type fingerprint: :obj:`any`
+        :returns: True if cached frames are valid
+        :rtype: :obj:`bool`
+        """
+        with self.__condition:
+            return fingerprint is not None and \
+                self.__shape is not None and \
+                fingerprint == self.__fingerprint
+
+    def setCacheSize(self, cachesize):
+        """ sets size of the block cache
+
+        :param cachesize: size of the block cache in bytes
+        :type cachesize: :obj:`int`
+        """
+        with self.__condition:
+            self.__cachesize = cachesize
+            while self.__cached > self.__cachesize and \
+                    len(self.__blocks) > 1:
+                self.__cached -= \
+                    self.__blocks.popitem(last=False)[1].nbytes
+
+    def request(self, frame):
+        """ requests reading of the frame in the prefetch thread
+            instead of the frames scheduled for prefetching
+
+        :param frame: frame to take, the last one is -1
+        :type frame: :obj:`int`
+        """
+        with self.__condition:
+            shape = self.__shape
+            if self.__node is None or not shape or len(shape) < 3 or \
+               len(shape) > 4 or self.__growing >= len(shape) or \
+               self.__growing < 0:
+                return
+            nframes = shape[self.__growing]
+            if frame < 0:
+                frame += nframes
+            if frame < 0 or frame >= nframes or self.__iscached(frame):
+                return
+            # the requested frame supersedes the pending prefetch
+            self.__wanted = [frame // self.__blocklen]
+            self.__wake()
+
+    def frameCount(self, refresh=True):
+        """ provides the number of frames
+
+        :param refresh: refresh image node
+        :type refresh: :obj:`bool`
+        :returns: a number of frames
+        :rtype: :obj:`int`
+        """
+        with self.__condition:
+            if refresh and self.__node is not None:
+                self.__node.refresh()
+                self.__shape = tuple(self.__node.shape or [])
+            shape = self.__shape
+            if shape and len(shape) > self.__growing and self.__growing > -1:
+                return shape[self.__growing]
+            return 0
+
+    def readFrames(self, start, stop):
+        """ reads frames appended to the field with a single hyperslab
+            selection into the block cache
+
+        :param start: the first frame to read
+        :type start: :obj:`int`
+        :param stop: the frame after the last one to read
+        :type stop: :obj:`int`
+        :returns: number of read frames
+        :rtype: :obj:`int`
+        """
+        with self.__condition:
+            shape = self.__shape
+            if self.__node is None or not shape or len(shape) < 3 or \
+               len(shape) > 4 or self.__growing >= len(shape) or \
+               self.__growing < 0:
+                return 0
+            stop = min(stop, shape[self.__growing])
+            # frames beyond the cache budget are read on demand
+            start = max(start, 0, stop - max(
+                1, self.__cachesize // (2 * max(self.__framesize, 1))))
+            if start >= stop:
+                return 0
+            data = np.asarray(self.__node[self.__index(start, stop)])
+            if len(data.shape) != len(shape):
+                return 0
+            data.setflags(write=False)
+            frame = start
+            while frame < stop:
+                bid = frame // self.__blocklen
+                bstart = bid * self.__blocklen
+                bstop = min(bstart + self.__blocklen, stop)
+                block = data[self.__index(frame - start, bstop - start)]
+                if frame > bstart:
+                    # completes the block read before the frames were added
+                    if not self.__iscached(frame - 1):
+                        frame = bstop
+                        continue
+                    block = np.concatenate(
+                        [self.__blocks[bid][
+                            self.__index(0, frame - bstart)], block],
+                        axis=self.__growing)
+                    block.setflags(write=False)
+                self.__store(bid, block)
+                frame = bstop
+            return stop - start
+
+    def getFrame(self, frame=-1, load=True):
+        """ provides the frame
+
+        :param frame: frame to take, the last one is -1
+        :type frame: :obj:`int`
+        :param load: read the frame from the file if it is not cached
+        :type load: :obj:`bool`
+        :returns: get the image
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self.__condition:
+            shape = self.__shape
+            if not shape:
+                return None
+            if len(shape) < 3 or frame is None:
+                if not load or self.__node is None:
+                    return None
+                return NexusFieldHandler.getImage(
+                    self.__node, frame, self.__growing, refresh=False)
+            if len(shape) > 4 or self.__growing >= len(shape) or \
+               self.__growing < 0:
+                return None
+            nframes = shape[self.__growing]
+            if frame < 0:
+                frame += nframes
+            if frame < 0 or frame >= nframes:
+                return None
+            if self.__memmap is not None and \
+               self.__memmap.shape == shape:
+                return np.array(self.__memmap[self.__index(frame)])
+            image = self.__cachedframe(frame)
+            if image is None:
+                if not load or self.__node is None:
+                    return None
+                self.__readblock(frame // self.__blocklen)
+                image = self.__cachedframe(frame)
+            self.__schedule(frame)
+            return image
+
+    def __index(self, start, stop=None):
+        """ provides a selection index along the growing dimension
+
+        :param start: start frame
+        :type start: :obj:`int`
+        :param stop: stop frame or None for a single frame
+        :type stop: :obj:`int`
+        :returns: selection index
+        :rtype: :obj:`tuple`
+        """
+        index = [slice(None)] * len(self.__shape)
+        index[self.__growing] = start if stop is None else slice(start, stop)
+        return tuple(index)
+
+    def __clear(self):
+        """ clears the block cache
+        """
+        self.__blocks.clear()
+        self.__cached = 0
+        self.__wanted = []
+        self.__lastframe = None
+
+    def __iscached(self, frame):
+        """ checks if the frame is in the block cache
+
+        :param frame: frame number
+        :type frame: :obj:`int`
+        :returns: True if the frame is cached
+        :rtype: :obj:`bool`
+        """
+        bid = frame // self.__blocklen
+        block = self.__blocks.get(bid)
+        return block is not None and \
+            frame - bid * self.__blocklen < block.shape[self.__growing]
+
+    def __cachedframe(self, frame):
+        """ provides the frame from the block cache
+
+        :param frame: frame number
+        :type frame: :obj:`int`
+        :returns: read-only view of the image or None
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not self.__iscached(frame):
+            return None
+        bid = frame // self.__blocklen
+        self.__blocks.move_to_end(bid)
+        return self.__blocks[bid][self.__index(frame - bid * self.__blocklen)]
+
+    def __readblock(self, bid):
+        """ reads the frame block into the cache
+
+        :param bid: block number
+        :type bid: :obj:`int`
+        """
+        block = self._read(self.__node, self.__shape, self.__growing,
+                           self.__blocklen, bid)
+        if block is not None:
+            self.__store(bid, block)
+
+    @classmethod
+    def _read(cls, node, shape, growing, blocklen, bid):
+        """ reads the frame block from the field
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :param shape: field shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param growing: growing dimension
+        :type growing: :obj:`int`
+        :param blocklen: number of frames in a block
+        :type blocklen: :obj:`int`
+        :param bid: block number
+        :type bid: :obj:`int`
+        :returns: read-only frame block or None
+        :rtype: :class:`numpy.ndarray`
+        """
+        start = bid * blocklen
+        stop = min(start + blocklen, shape[growing])
+        index = [slice(None)] * len(shape)
+        index[growing] = slice(start, stop)
+        block = np.asarray(node[tuple(index)])
+        if len(block.shape) != len(shape):
+            return None
+        # frames are handed out as read-only views of the cached blocks
+        block.setflags(write=False)
+        return block
+
+    def __store(self, bid, block):
+        """ stores the frame block in the cache
+
+        :param bid: block number
+        :type bid: :obj:`int`
+        :param block: frame block
+        :type block: :class:`numpy.ndarray`
+        """
+        if bid in self.__blocks:
+            self.__cached -= self.__blocks.pop(bid).nbytes
+        self.__blocks[bid] = block
+        self.__cached += block.nbytes
+        while self.__cached > self.__cachesize and len(self.__blocks) > 1:
+            self.__cached -= self.__blocks.popitem(last=False)[1].nbytes
+
+    def __schedule(self, frame):
+        """ schedules prefetching of frames in the stepping direction
+
+        :param frame: the current frame
+        :type frame: :obj:`int`
+        """
+        if self.__lastframe is not None and frame != self.__lastframe:
+            self.__direction = 1 if frame > self.__lastframe else -1
+        self.__lastframe = frame
+        if self.__node is None or self.__prefetch < 1:
+            return
+        nframes = self.__shape[self.__growing]
+        count = min(self.__prefetch,
+                    self.__cachesize // (2 * max(self.__framesize, 1)))
+        wanted = []
+        for i in range(1, count + 1):
+            fr = frame + self.__direction * i
+            if fr < 0 or fr >= nframes:
+                break
+            bid = fr // self.__blocklen
+            if bid not in wanted and not self.__iscached(fr):
+                wanted.append(bid)
+        self.__wanted = wanted
+        if wanted:
+            self.__wake()
+
+    def __wake(self):
+        """ starts or wakes up the prefetch thread
+        """
+        if self.__thread is None:
+            self.__running = True
+            self.__thread = threading.Thread(target=self.__run)
+            self.__thread.daemon = True
+            self.__thread.start()
+        self.__condition.notify_all()
+
+    def __run(self):
+        """ prefetch thread loop
+        """
+        while True:
+            with self.__condition:
+                while self.__running and \
+                        (not self.__wanted or self.__node is None):
+                    self.__condition.wait()
+                if not self.__running:
+                    return
+                bid = self.__wanted.pop(0)
+                start = bid * self.__blocklen
+                if self.__iscached(min(
+                        start + self.__blocklen,
+                        self.__shape[self.__growing]) - 1):
+                    continue
+                node = self.__node
+                shape = self.__shape
+                layout = self.__layout
+                fingerprint = self.__fingerprint
+                growing = self.__growing
+                blocklen = self.__blocklen
+            # getFrame is not blocked while the block is read
+            try:
+                block = self._read(node, shape, growing, blocklen, bid)
+            except Exception as e:
+                logger.debug(str(e))
+                with self.__condition:
+                    if self.__node is node:
+                        self.__wanted = []
+                continue
+            if block is None:
+                continue
+            with self.__condition:
+                # the node may be replaced or the file rewritten meanwhile
+                if self.__running and self.__node is node and \
+                   self.__layout == layout and \
+                   self.__fingerprint == fingerprint and \
+                   self.__shape and \
+                   self.__shape[growing] >= shape[growing] and \
+                   not self.__iscached(
+                       start + block.shape[growing] - 1):
+                    self.__store(bid, block)
+
+
 class ImageFileHandler(object):
 
     """Simple file handler class.
@@ -503,12 +1033,11 @@ class CBFLoader(object):
         headerend = b'_array_data.data'
         mdata = {}
         try:
-            if hasattr(flbuffer, "tostring"):
-                hspos = flbuffer.tostring().index(headerstart) // \
-                    flbuffer.itemsize
-                hepos = flbuffer.tostring().index(headerend) // \
-                    flbuffer.itemsize
-                flbuffer = flbuffer[hspos:hepos + 1].tostring()
+            if hasattr(flbuffer, "tobytes"):
+                sbuffer = flbuffer.tobytes()
+                hspos = sbuffer.index(headerstart) // flbuffer.itemsize
+                hepos = sbuffer.index(headerend) // flbuffer.itemsize
+                flbuffer = flbuffer[hspos:hepos + 1].tobytes()
         except Exception as e:
             # print(str(e))
             logger.warning(str(e))
@@ -597,6 +1126,22 @@ class CBFLoader(object):
         else:
             return json.dumps(premeta) if premeta else ""
 
+    @classmethod
+    def _headervalue(cls, header, key):
+        """ provides an integer value of the binary section header
+
+        :param header: cbf header
+        :type header: :obj:`bytes`
+        :param key: header key, e.g. b'X-Binary-Size:'
+        :type key: :obj:`bytes`
+        :returns: header value or None
+        :rtype: :obj:`int`
+        """
+        pos = header.rfind(key)
+        if pos < 0:
+            return None
+        return int(header[pos + len(key):].split(b"\r\n", 1)[0].strip())
+
     @classmethod
     def load(cls, flbuffer):
         """ loads CBF file image data into numpy array
@@ -606,105 +1151,54 @@ class CBFLoader(object):
         :returns: image data
         :rtype: :class:`numpy.ndarray`
         """
-        image = np.array([0])
-        inpoint = np.array([26, 4, 213], dtype='uint8')
-
-        # array with '--CIF-BINARY-FORMAT-SECTION---'
-        outpoint = np.array(
-            [45, 45, 67, 73, 70, 45, 66, 73, 78, 65, 82, 89, 45, 70,
-             79, 82, 77, 65, 84, 45, 83, 69, 67, 84, 73, 79, 78, 45, 45, 45],
-            dtype='uint8')
-        flag = 0
-
-        # check if byte offset compress ('x-CBF_BYTE_OFFSET')
-        boc = np.array(
-            [120, 45, 67, 66, 70, 95, 66, 89, 84,
-             69, 95, 79, 70, 70, 83, 69, 84],
-            dtype='uint8')
+        if flbuffer.dtype != np.uint8:
+            flbuffer = flbuffer.view(np.uint8)
+        # binary section start
+        inpoint = b'\x1a\x04\xd5'
+        # end of the binary section
+        outpoint = b'--CIF-BINARY-FORMAT-SECTION----'
+
+        # the header is parsed once from a growing chunk of the buffer
+        # without copying the binary data
+        hsize = 1 << 14
+        while True:
+            header = flbuffer[:hsize].tobytes()
+            idstart = header.find(inpoint)
+            if idstart >= 0 or hsize >= flbuffer.size:
+                break
+            hsize *= 4
+        if idstart < 0 or b'x-CBF_BYTE_OFFSET' not in header:
+            return np.transpose(np.array([0]))
+        idstart += len(inpoint)
+        header = header[:idstart]
 
         try:
-            # iscbf
-            flbuffer.tostring().index(boc.tostring()) // flbuffer.itemsize
+            # by A.R., Apr 24, 2017
+            vals = np.array([
+                cls._headervalue(header, b'X-Binary-Number-of-Elements:'),
+                cls._headervalue(header, b'X-Binary-Size-Fastest-Dimension:'),
+                cls._headervalue(header, b'X-Binary-Size-Second-Dimension:'),
+                cls._headervalue(header, b'X-Binary-Size-Padding:')
+            ], dtype='int')
+            size = cls._headervalue(header, b'X-Binary-Size:')
         except Exception:
-            flag = 1
-
-        # additional parms for cross check if decompress worked out
-        # ('X-Binary-Number-of-Elements:')
-        dset_num_ele = np.array(
-            [88, 45, 66, 105, 110, 97, 114, 121, 45, 78, 117, 109, 98,
-             101, 114, 45, 111, 102, 45, 69, 108, 101, 109, 101, 110,
-             116, 115, 58],
-            dtype='uint8')
-        # array with 'X-Binary-Size-Fastest-Dimension:'
-        dset_fast_dim = np.array(
-            [88, 45, 66, 105, 110, 97, 114, 121, 45, 83, 105, 122, 101, 45, 70,
-             97, 115, 116, 101, 115, 116, 45, 68, 105, 109, 101, 110, 115, 105,
-             111, 110, 58], dtype='uint8')
-        # array with 'X-Binary-Size-Second-Dimension:'
-        dset_sec_dim = np.array(
-            [88, 45, 66, 105, 110, 97, 114, 121, 45, 83, 105, 122, 101, 45, 83,
-             101, 99, 111, 110, 100, 45, 68, 105, 109, 101, 110, 115, 105, 111,
-             110, 58], dtype='uint8')
-        # array with 'X-Binary-Size-Padding:'
-        dset_pad = np.array(
-            [88, 45, 66, 105, 110, 97, 114, 121, 45, 83, 105, 122, 101, 45, 80,
-             97, 100, 100, 105, 110, 103, 58], dtype='uint8')
-
-        # search for data stream start
-        if flag == 0:
-            try:
-                idstart = flbuffer.tostring().index(
-                    inpoint.tostring()) // flbuffer.itemsize
-                idstart += inpoint.size
-            except Exception:
-                flag = 1
-
-            try:
-                idstop = flbuffer.tostring().index(
-                    outpoint.tostring()) // flbuffer.itemsize
-                idstop -= 3  # cr / extra -1 due to '10B' -- linefeed
-            except Exception:
-                flag = 1
-
-            vals = np.zeros(4, dtype='int')
-            spos = np.zeros(5, dtype='int')
-            spos[4] = idstart
-            try:
-                spos[0] = flbuffer.tostring().index(
-                    dset_num_ele.tostring()) // flbuffer.itemsize
-                spos[1] = flbuffer.tostring().index(
-                    dset_fast_dim.tostring()) // flbuffer.itemsize
-                spos[2] = flbuffer.tostring().index(
-                    dset_sec_dim.tostring()) // flbuffer.itemsize
-                spos[3] = flbuffer.tostring().index(
-                    dset_pad.tostring()) // flbuffer.itemsize
-# by A.R., Apr 24, 2017
-                vals[0] = int(
-                    flbuffer[
-                        spos[0] + dset_num_ele.size:spos[1] - 2].tostring())
-                vals[1] = int(
-                    flbuffer[
-                        spos[1] + dset_fast_dim.size:spos[2] - 2].tostring())
-                vals[2] = int(
-                    flbuffer[
-                        spos[2] + dset_sec_dim.size:spos[3] - 2].tostring())
-                vals[3] = int(
-                    flbuffer[
-                        spos[3] + dset_pad.size:spos[4] - 8].tostring())
-            except Exception:
-                flag = 1
-
-            if flag == 0:
-                image = 0
-                image = cls._decompress_cbf_c(
-                    flbuffer[idstart:idstop + 1], vals)
-            else:
-                image = np.array([0])
+            return np.transpose(np.array([0]))
+        if size is not None:
+            idstop = idstart + size
+            vals[3] = 0
+        else:
+            # cr / extra -1 due to '10B' -- linefeed
+            tail = flbuffer[-(1 << 14):].tobytes()
+            pos = tail.rfind(outpoint[:-1])
+            if pos < 0:
+                return np.transpose(np.array([0]))
+            idstop = flbuffer.size - len(tail) + pos - 2
+        image = cls._decompress_cbf_c(flbuffer[idstart:idstop], vals)
         return np.transpose(image)
 
     @classmethod
     def _decompress_cbf_c(cls, stream, vals):
-        """ decompresses CBF
+        """ decompresses CBF with the byte offset algorithm
 
         :param stream: a part of cbf data
         :type stream: :class:`numpy.ndarray`
@@ -725,75 +1219,96 @@ class CBFLoader(object):
             padding = vals[3]
             n_out = vals[0]
 
-        flbuffer = np.zeros(stream.size, dtype='int32') + stream
-        mymap = np.zeros(stream.size, dtype='uint8') + 1
-        isvalid = np.zeros(stream.size, dtype='uint8') + 1
-
-        id_relevant = np.where(stream == 128)
-
-        # overcome issue if 128 exists in padding (seems so that
-        # either this does not happened before or padding was 0 in any case)
-        try:
-            idd = np.where(id_relevant < (flbuffer.size - padding))
-            id_relevant = id_relevant[idd]
-        except Exception:
-            pass
-
-        for dummy, dummy2 in enumerate(id_relevant):
-            for j, i in enumerate(dummy2):
-                if mymap[i] != 0:
-                    if stream[i + 1] != 0 or stream[i + 2] != 128:
-                        mymap[i:i + 3] = 0
-                        isvalid[i + 1:i + 3] = 0
-                        delta = flbuffer[i + 1] + flbuffer[i + 2] * 256
-                        if delta > 32768:
-                            delta -= 65536
-                        flbuffer[i] = delta
-                    else:
-                        mymap[i:i + 7] = 0
-                        isvalid[i + 1:i + 7] = 0
-                        # delta=sum(np.multiply(flbuffer[i+3:i+7],
-                        #   np.array([1,256,65536,16777216],dtype='int64')))
-                        delta = (
-                            np.multiply(
-                                flbuffer[i + 3:i + 7],
-                                np.array([1, 256, 65536, 16777216],
-                                         dtype='int64'))).sum()
-                        if delta > 2147483648:
-                            delta -= 4294967296
-                        flbuffer[i] = delta
-
-        try:
-            id8sign = np.where((stream > 128) & (mymap != 0))
-            flbuffer[id8sign] -= 256
-            # print ("adjusting 8Bit vals")
-            # for i, j in enumerate(stream):
-            #     if j > 128 and mymap[i] !=0:
-            #         flbuffer[i]=flbuffer[i]-256
-            # print stream[0:11]
-            # print flbuffer[0:11]
-
-        except Exception:
-            pass
-
-        try:
-            # print sum(isvalid)    #should be 305548
-            idd = np.where(isvalid != 0)
-            flbuffer = flbuffer[idd]
-        except Exception:
-            pass
-
-        # print stream[0:11]
-        # print flbuffer[0:11]
-
-        res = np.cumsum(flbuffer, dtype='int32')
-        # print max(res)
-
-        if res.size - padding != n_out:
+        stream = np.ascontiguousarray(stream, dtype=np.uint8)
+        size = stream.size
+        # candidates for escape bytes
+        marker = stream == 0x80
+        cand = np.flatnonzero(marker)
+        itype = np.int32 if size < 2 ** 31 - 16 else np.int64
+        cand = cand.astype(itype)
+        padded = stream
+        if cand.size and cand[-1] + 16 > size:
+            padded = np.zeros(size + 16, dtype=np.uint8)
+            padded[:size] = stream
+
+        def _int(offset, nbytes):
+            """ little endian signed integers at candidate offsets """
+            view = np.ndarray(
+                shape=(padded.size - 15,), dtype="<i%s" % nbytes,
+                buffer=padded, offset=offset, strides=(1,))
+            return view[cand]
+
+        # value and length of each escape if the candidate is an escape
+        v16 = _int(1, 2)
+        is32 = v16 == -0x8000
+        v32 = _int(3, 4)
+        is64 = is32 & (v32 == -0x80000000)
+        ext = np.where(is64, 15, np.where(is32, 7, 3)).astype(itype)
+
+        # a candidate is an escape if it is not covered by a payload
+        # of a preceding escape, i.e. the escapes form the chain
+        # 0 -> nxt[0] -> nxt[nxt[0]] ... where nxt points to the first
+        # candidate after the payload. The chain is resolved in blocks of
+        # candidates: the exit of every block start is found by pointer
+        # doubling, the visited blocks are walked and their escapes
+        # are marked block-parallel, i.e. in O(n log(block)) operations
+        ncand = cand.size
+        if not (cand[1:] < cand[:-1] + ext[:-1]).any():
+            # no candidate inside a payload
+            isesc = np.ones(ncand, dtype=bool)
+        else:
+            # number of candidates before each stream position
+            before = np.zeros(size + 16, dtype=itype)
+            np.cumsum(marker, out=before[1:size + 1])
+            before[size + 1:] = ncand
+            nxt = np.append(before[cand + ext], itype(ncand))
+            block = max(64, int(np.sqrt(ncand)))
+            index = np.arange(ncand, dtype=itype)
+            # the last chain node inside the block
+            inblock = (nxt[:ncand] < ncand) & \
+                (nxt[:ncand] // block == index // block)
+            last = np.where(inblock, nxt[:ncand], index)
+            for _ in range(int(np.ceil(np.log2(block)))):
+                last = last[last]
+            entries = []
+            i = 0
+            while i < ncand:
+                entries.append(i)
+                i = int(nxt[last[i]])
+            isesc = np.zeros(ncand + 1, dtype=bool)
+            node = np.array(entries, dtype=itype)
+            while node.size:
+                isesc[node] = True
+                following = nxt[node]
+                node = following[
+                    (following < ncand)
+                    & (following // block == node // block)]
+            isesc = isesc[:ncand]
+
+        esc = cand[isesc]
+        eext = ext[isesc]
+        dtype = 'int32'
+        values = np.where(eext == 3, v16[isesc], v32[isesc])
+        if is64[isesc].any():
+            dtype = 'int64'
+            values = np.where(eext == 15, _int(7, 8)[isesc], values)
+        deltas = stream.view(np.int8).astype(dtype)
+        deltas[esc] = values
+
+        # drop escape payloads
+        keep = np.ones(size + 16, dtype=bool)
+        for length in np.unique(eext):
+            start = esc[eext == length]
+            for k in range(1, int(length)):
+                keep[start + k] = False
+        deltas = deltas[keep[:size]]
+
+        if deltas.size - padding < n_out:
             return np.array([0])
+        res = np.cumsum(deltas[:n_out], dtype=dtype)
         # by A.R., Apr 24, 2017
         # return res[0:n_out].reshape(xdim, ydim)
-        return res[0:n_out].reshape(xdim, ydim, order='F')
+        return res.reshape(xdim, ydim, order='F')
 
 
 class TIFLoader(object):
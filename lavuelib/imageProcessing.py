@@ -0,0 +1,682 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" image processing stages which do not touch any widget """
+
+import collections
+import math
+import threading
+import traceback
+import weakref
+
+import numpy as np
+
+from . import stageTimer
+
+
+#: ( :obj:`dict` < :obj:`str` , :obj:`str` >) unsigned/signed int map
+UNSIGNEDMAP = {
+    "uint8": "int16",
+    "uint16": "int32",
+    "uint32": "int64",
+    "uint64": "int64"
+    # "uint64": "float64"
+}
+
+#: (:obj:`int`) number of released output buffers of the correction kernel
+#:     kept for reuse per shape and type
+CORRECTIONBUFFERS = 2
+
+#: (:obj:`int`) number of pixels reduced at once by the statistics kernel
+STATSBLOCKSIZE = 1 << 16
+
+#: (:obj:`float`) probability that a sampled range exceeds its error bound
+SAMPLINGFAILURE = 1e-3
+
+
+def subtractBackground(image, background):
+    """ subtracts the background image
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param background: background image
+    :type background: :class:`numpy.ndarray`
+    :returns: image without background
+    :rtype: :class:`numpy.ndarray`
+    """
+    if (hasattr(image, "dtype") and
+            image.dtype.name in UNSIGNEDMAP.keys()) \
+       and (hasattr(background, "dtype") and
+            background.dtype.name in UNSIGNEDMAP.keys()):
+        return np.subtract(
+            image, background, dtype=UNSIGNEDMAP[image.dtype.name])
+    return image - background
+
+
+def multiplyBrightField(image, bfmdf):
+    """ multiplies the image by the inverted
+    bright field minus dark field image
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param bfmdf: inverted bright field minus dark field image
+    :type bfmdf: :class:`numpy.ndarray`
+    :returns: corrected image
+    :rtype: :class:`numpy.ndarray`
+    """
+    return image * bfmdf
+
+
+def applyMask(image, maskindices, nanmask, floattype):
+    """ sets masked pixels to zero or nan
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param maskindices: mask indices
+    :type maskindices: :class:`numpy.ndarray`
+    :param nanmask: mask with nan values
+    :type nanmask: :obj:`bool`
+    :param floattype: float type used for nan values
+    :type floattype: :obj:`str`
+    :returns: masked copy of the image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if not nanmask:
+        image = np.array(image)
+        image[maskindices] = 0
+    else:
+        image = np.array(image, dtype=floattype)
+        image[maskindices] = np.nan
+    return image
+
+
+def applyHighValueMask(image, maskvalue, nanmask, floattype):
+    """ sets pixels above the mask value to zero or nan
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param maskvalue: mask value
+    :type maskvalue: :obj:`float`
+    :param nanmask: mask with nan values
+    :type nanmask: :obj:`bool`
+    :param floattype: float type used for nan values
+    :type floattype: :obj:`str`
+    :returns: masked copy of the image and mask value indices
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    if nanmask:
+        image = np.array(image, dtype=floattype)
+        with np.errstate(invalid='ignore'):
+            indices = image > maskvalue
+        image[indices] = np.nan
+    else:
+        image = np.array(image)
+        indices = image > maskvalue
+        image[indices] = 0
+    return image, indices
+
+
+class CorrectionKernel(object):
+
+    """ fused background subtraction, bright field correction and masking
+    which writes into reusable output buffers. The buffers of a result
+    are owned by its consumer until they are given back by :meth:`release`
+    """
+
+    def __init__(self, nbuffers=None):
+        """ constructor
+
+        :param nbuffers: number of released buffers kept per shape and type
+        :type nbuffers: :obj:`int`
+        """
+        #: (:obj:`int`) number of released buffers kept per shape and type
+        self.__nbuffers = max(int(
+            CORRECTIONBUFFERS if nbuffers is None else nbuffers), 0)
+        #: (:obj:`dict` <(:obj:`tuple`, :obj:`str`),
+        #:     :obj:`list` <:class:`numpy.ndarray`>>) released buffers
+        self.__free = {}
+        #: (:class:`weakref.WeakValueDictionary` <:obj:`int`,
+        #:     :class:`numpy.ndarray`>) buffers handed out by the kernel
+        self.__owned = weakref.WeakValueDictionary()
+        #: (:class:`numpy.ndarray`) mask of the precomputed mask indices
+        self.__mask = None
+        #: (:class:`numpy.ndarray`) precomputed flat mask indices
+        self.__maskflat = None
+        #: (:class:`threading.Lock`) guards buffers and the mask indices
+        self.__lock = threading.Lock()
+
+    def clear(self):
+        """ releases the free buffers and the precomputed mask
+        """
+        with self.__lock:
+            self.__free = {}
+            self.__owned = weakref.WeakValueDictionary()
+            self.__mask = None
+            self.__maskflat = None
+
+    def release(self, buffers):
+        """ gives back output buffers which are not used anymore,
+        i.e. the frame is neither displayed nor kept by any tool
+
+        :param buffers: output buffers of a processing result
+        :type buffers: :obj:`tuple` <:class:`numpy.ndarray`>
+        """
+        with self.__lock:
+            for buf in buffers or ():
+                # buffers of other kernels or cleared ones are dropped
+                if self.__owned.get(id(buf)) is not buf:
+                    continue
+                self.__owned.pop(id(buf))
+                free = self.__free.setdefault(
+                    (buf.shape, buf.dtype.str), [])
+                if len(free) < self.__nbuffers:
+                    free.append(buf)
+
+    def __acquire(self, shape, dtype):
+        """ provides a released output buffer or a new one
+
+        :param shape: buffer shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param dtype: buffer type
+        :type dtype: :class:`numpy.dtype`
+        :returns: output buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        dtype = np.dtype(dtype)
+        with self.__lock:
+            free = self.__free.get((shape, dtype.str))
+            buf = free.pop() if free else np.empty(shape=shape, dtype=dtype)
+            self.__owned[id(buf)] = buf
+        return buf
+
+    def __maskIndices(self, mask):
+        """ provides flat indices of a sparse mask computed once per mask
+
+        :param mask: mask
+        :type mask: :class:`numpy.ndarray`
+        :returns: flat indices of masked pixels or None for a dense mask
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self.__lock:
+            if mask is not self.__mask:
+                self.__mask = mask
+                self.__maskflat = np.flatnonzero(mask)
+                # scattered writes are faster only for sparse masks
+                if self.__maskflat.size * 4 > mask.size:
+                    self.__maskflat = None
+            return self.__maskflat
+
+    def correct(self, job):
+        """ applies background subtraction, bright field correction, mask
+        and high value mask in one pass without temporary images
+
+        :param job: processing job
+        :type job: :class:`ProcessingJob`
+        :returns: corrected image and mask value indices in buffers
+                  owned by the caller or None if the job cannot be fused
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        image = job.rawgreyimage
+        bkg = job.backgroundimage
+        bfmdf = job.bfmdfimage
+        mask = job.maskindices
+        if not isinstance(image, np.ndarray) or image.size == 0:
+            return None
+        shape = image.shape
+        for arr in (bkg, bfmdf, mask):
+            if arr is not None and (
+                    not isinstance(arr, np.ndarray) or arr.shape != shape):
+                return None
+        if mask is not None and mask.dtype != bool:
+            return None
+        dtype = image.dtype
+        bdtype = None
+        if bkg is not None:
+            if dtype.name in UNSIGNEDMAP.keys() and \
+               bkg.dtype.name in UNSIGNEDMAP.keys():
+                bdtype = np.dtype(UNSIGNEDMAP[dtype.name])
+            else:
+                bdtype = np.result_type(dtype, bkg.dtype)
+            dtype = bdtype
+        if bfmdf is not None:
+            dtype = np.result_type(dtype, bfmdf.dtype)
+        masked = mask is not None or job.maskvalue is not None
+        if masked and job.nanmask:
+            dtype = np.dtype(job.floattype)
+        # the bright field correction is computed in the output type
+        # so the corrected values have to be exact in it
+        exact = np.can_cast(bdtype or image.dtype, dtype) or (
+            bkg is not None and np.can_cast(image.dtype, dtype)
+            and np.can_cast(bkg.dtype, dtype))
+        if bfmdf is not None and not exact:
+            return None
+
+        out = self.__acquire(shape, dtype)
+        if bkg is not None:
+            np.subtract(image, bkg, out=out, dtype=bdtype, casting="unsafe")
+        else:
+            np.copyto(out, image, casting="unsafe")
+        if bfmdf is not None:
+            mdtype = np.result_type(bdtype or image.dtype, bfmdf.dtype)
+            if mdtype == dtype or (
+                    np.can_cast(bfmdf.dtype, dtype)
+                    and np.can_cast(dtype, mdtype)
+                    and mdtype.itemsize >= 2 * dtype.itemsize):
+                # the product of exact operands fits into the mantissa
+                # of the wider type, i.e. it is rounded only once
+                np.multiply(out, bfmdf, out=out, dtype=dtype)
+            else:
+                np.multiply(out, bfmdf, out=out, casting="unsafe",
+                            dtype=mdtype)
+        fill = np.nan if job.nanmask else 0
+        if mask is not None:
+            maskflat = self.__maskIndices(mask)
+            if maskflat is not None:
+                out.reshape(-1)[maskflat] = fill
+            else:
+                np.copyto(out, fill, casting="unsafe", where=mask)
+        indices = None
+        if job.maskvalue is not None:
+            indices = self.__acquire(shape, bool)
+            with np.errstate(invalid='ignore'):
+                np.greater(out, job.maskvalue, out=indices)
+            np.copyto(out, fill, casting="unsafe", where=indices)
+        return out, indices
+
+
+def transform(image, trafoname, keepcoords):
+    """ does the image transformation on the given numpy array.
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param trafoname: transformation name
+    :type trafoname: :obj:`str`
+    :param keepcoords: keep original coordinates
+    :type keepcoords: :obj:`bool`
+    :returns: transformed image and crdtranspose, crdleftrightflip,
+         crdupdownflip, orgtranspose, orgleftrightflip, orgupdownflip flags
+    :rtype: (:class:`numpy.ndarray`,
+             (:obj:`bool`, :obj:`bool`, :obj:`bool`,:obj:`bool`,
+              :obj:`bool`, :obj:`bool`))
+    """
+    crdupdownflip = False
+    crdleftrightflip = False
+    crdtranspose = False
+    orgupdownflip = False
+    orgleftrightflip = False
+    orgtranspose = False
+    if trafoname == "none":
+        pass
+    elif trafoname == "flip (up-down)":
+        orgupdownflip = True
+        if keepcoords:
+            crdupdownflip = True
+        elif image is not None:
+            image = np.fliplr(image)
+    elif trafoname == "flip (left-right)":
+        orgleftrightflip = True
+        if keepcoords:
+            crdleftrightflip = True
+        elif image is not None:
+            image = np.flipud(image)
+    elif trafoname == "transpose":
+        orgtranspose = True
+        if image is not None:
+            image = np.swapaxes(image, 0, 1)
+        if keepcoords:
+            crdtranspose = True
+    elif trafoname == "rot90 (clockwise)":
+        orgtranspose = True
+        orgupdownflip = True
+        if keepcoords:
+            crdtranspose = True
+            crdupdownflip = True
+            if image is not None:
+                image = np.swapaxes(image, 0, 1)
+        elif image is not None:
+            image = np.swapaxes(np.flipud(image), 0, 1)
+    elif trafoname == "rot180":
+        orgupdownflip = True
+        orgleftrightflip = True
+        if keepcoords:
+            crdupdownflip = True
+            crdleftrightflip = True
+        elif image is not None:
+            image = np.flipud(np.fliplr(image))
+    elif trafoname == "rot270 (clockwise)":
+        orgtranspose = True
+        orgleftrightflip = True
+        if keepcoords:
+            crdtranspose = True
+            crdleftrightflip = True
+            if image is not None:
+                image = np.swapaxes(image, 0, 1)
+        elif image is not None:
+            image = np.swapaxes(np.fliplr(image), 0, 1)
+    elif trafoname == "rot180 + transpose":
+        orgtranspose = True
+        orgupdownflip = True
+        orgleftrightflip = True
+        if keepcoords:
+            crdtranspose = True
+            crdupdownflip = True
+            crdleftrightflip = True
+            if image is not None:
+                image = np.swapaxes(image, 0, 1)
+        elif image is not None:
+            image = np.swapaxes(np.fliplr(np.flipud(image)), 0, 1)
+    return image, (crdtranspose, crdleftrightflip, crdupdownflip,
+                   orgtranspose, orgleftrightflip, orgupdownflip)
+
+
+def scale(image, scalingtype, floattype=None):
+    """ scales the image intensity
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param scalingtype: scaling type, i.e. linear, sqrt or log
+    :type scalingtype: :obj:`str`
+    :param floattype: float type of linear scaling or None to keep
+                      the image type
+    :type floattype: :obj:`str`
+    :returns: scaled image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if image is None:
+        return None
+    elif scalingtype == "sqrt":
+        return np.sqrt(np.clip(image, 0, np.inf))
+    elif scalingtype == "log":
+        return np.log10(np.clip(image, 10e-3, np.inf))
+    elif floattype:
+        return image.astype(floattype)
+    return image
+
+
+def imageStats(image, variance=True):
+    """ calculates nan-aware minimum, maximum, mean and variance
+    in a single pass over the image memory
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param variance: calculate variance
+    :type variance: :obj:`bool`
+    :returns: min value, max value, mean value, variance value
+    :rtype: (:obj:`float`, :obj:`float`, :obj:`float`, :obj:`float`)
+    """
+    image = np.asarray(image)
+    if image.ndim == 0:
+        image = image.reshape(1)
+    # statistics do not depend on the pixel order so blocks are taken
+    # along the axis with the largest stride
+    image = np.moveaxis(image, int(np.argmax(np.abs(image.strides))), 0)
+    rows = max(1, STATSBLOCKSIZE // max(1, image[0].size))
+    isfloat = image.dtype.kind in "fc"
+    counts = []
+    means = []
+    m2s = []
+    mins = []
+    maxs = []
+    for i in range(0, image.shape[0], rows):
+        block = image[i:i + rows]
+        total = np.add.reduce(block, axis=None, dtype=np.float64)
+        nans = None
+        count = block.size
+        if isfloat and np.isnan(total):
+            nans = np.isnan(block)
+            count -= np.count_nonzero(nans)
+            if not count:
+                continue
+            total = np.nansum(block, dtype=np.float64)
+            mins.append(np.nanmin(block))
+            maxs.append(np.nanmax(block))
+        else:
+            mins.append(np.min(block))
+            maxs.append(np.max(block))
+        mean = total / count
+        if variance:
+            diff = np.subtract(block, mean, dtype=np.float64).reshape(-1)
+            if nans is not None:
+                diff[nans.reshape(-1)] = 0
+            m2s.append(np.dot(diff, diff))
+        counts.append(count)
+        means.append(mean)
+    if not counts:
+        return np.nan, np.nan, np.nan, np.nan
+    counts = np.array(counts, dtype=np.float64)
+    means = np.array(means)
+    size = counts.sum()
+    mean = np.dot(counts, means) / size
+    var = 0.0
+    if variance:
+        # parallel combination of the block moments
+        var = (np.sum(m2s) + np.dot(counts, (means - mean) ** 2)) / size
+    return min(mins), max(maxs), mean, var
+
+
+def sampledRange(image, samplingerror):
+    """ estimates the range of values on strided samples of a large image.
+    A fraction of pixels above the estimated maximum (or below the minimum)
+    is expected to be at most the sampling error
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param samplingerror: fraction of pixels allowed outside the range
+    :type samplingerror: :obj:`float`
+    :returns: min value and max value or None if the image is too small
+    :rtype: (:obj:`float`, :obj:`float`)
+    """
+    if not samplingerror or samplingerror <= 0 or samplingerror >= 1 \
+       or image.ndim < 2:
+        return None
+    nsamples = math.log(SAMPLINGFAILURE) / math.log1p(-samplingerror)
+    step = int(math.sqrt(image.size / nsamples))
+    if step < 2 or min(image.shape[:2]) < 2 * step:
+        return None
+    sample = image[::step, ::step]
+    with np.errstate(invalid='ignore'):
+        if sample.dtype.kind in "fc":
+            minval = np.fmin.reduce(sample, axis=None)
+            maxval = np.fmax.reduce(sample, axis=None)
+        else:
+            minval = np.min(sample)
+            maxval = np.max(sample)
+    if np.isnan(minval) or np.isnan(maxval):
+        return None
+    return minval, maxval
+
+
+def calcStats(flag, displayimage, scaledimage, rawgreyimage,
+              statswoscaling, samplingerror=0.0):
+    """ calcualtes scaled limits for intesity levels
+
+    :param flag: (max value, mean value, variance value,
+              min scaled value, max raw value, max scaled value)
+              to calculate
+    :type flag: [:obj:`bool`, :obj:`bool`, :obj:`bool`,
+                   :obj:`bool`, :obj:`bool`, :obj:`bool`]
+    :param displayimage: display image
+    :type displayimage: :class:`numpy.ndarray`
+    :param scaledimage: scaled image
+    :type scaledimage: :class:`numpy.ndarray`
+    :param rawgreyimage: raw grey image
+    :type rawgreyimage: :class:`numpy.ndarray`
+    :param statswoscaling: statistics without intensity scaling
+    :type statswoscaling: :obj:`bool`
+    :param samplingerror: fraction of pixels allowed outside
+                          of sampled min and max scaled values
+                          which are not needed otherwise,
+                          0 for exact values
+    :type samplingerror: :obj:`float`
+    :returns: max value, mean value, variance value,
+              min scaled value, max raw value, max scaled value
+    :rtype: [:obj:`float`, :obj:`float`, :obj:`float`, :obj:`float`,
+                :obj:`float`, :obj:`float`]
+    """
+    if statswoscaling and displayimage is not None \
+       and displayimage.size > 0:
+        image = displayimage
+    elif (not statswoscaling
+          and scaledimage is not None
+          and displayimage.size > 0):
+        image = scaledimage
+    else:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    # full statistics of the images shared by the requested values
+    stats = {}
+    if flag[1] or flag[2]:
+        stats[id(image)] = imageStats(image, flag[2])
+
+    def imin(img):
+        if id(img) in stats:
+            return stats[id(img)][0]
+        return np.nanmin(img)
+
+    def imax(img):
+        if id(img) in stats:
+            return stats[id(img)][1]
+        return np.nanmax(img)
+
+    srange = None
+    if samplingerror and scaledimage is not None \
+       and id(scaledimage) not in stats \
+       and (flag[3] or flag[5]) and not (flag[0] and not statswoscaling):
+        srange = sampledRange(scaledimage, samplingerror)
+
+    meanval = stats[id(image)][2] if flag[1] else 0.0
+    varval = stats[id(image)][3] if flag[2] else 0.0
+    if statswoscaling:
+        maxval = imax(displayimage) if flag[0] else 0.0
+        if flag[5]:
+            maxsval = srange[1] if srange else imax(scaledimage)
+        else:
+            maxsval = 0.0
+    else:
+        if flag[0]:
+            maxval = imax(scaledimage)
+        elif flag[5]:
+            maxval = srange[1] if srange else imax(scaledimage)
+        else:
+            maxval = 0.0
+        maxsval = maxval
+    maxrawval = imax(rawgreyimage) if flag[4] else 0.0
+    if flag[3]:
+        minval = srange[0] if srange else imin(scaledimage)
+    else:
+        minval = 0.0
+    return (maxval, meanval, varval, minval, maxrawval,  maxsval)
+
+
+#: (:class:`collections.namedtuple`) immutable snapshot of the image
+#:      and of all settings needed to process it
+ProcessingJob = collections.namedtuple(
+    "ProcessingJob", [
+        "jobid", "imagename", "rawgreyimage",
+        "backgroundimage", "bfmdfimage",
+        "maskindices", "maskvalue", "nanmask", "floattype",
+        "trafoname", "keepcoords",
+        "scalingtype", "scalefloattype",
+        "statsflag", "statswoscaling", "samplingerror", "secstream"])
+
+#: (:class:`collections.namedtuple`) result of image processing
+ProcessingResult = collections.namedtuple(
+    "ProcessingResult", [
+        "jobid", "imagename", "rawgreyimage", "displayimage", "scaledimage",
+        "maskvalueindices", "transformations", "scalingtype",
+        "stats", "secstream", "errors", "buffers"])
+
+
+def processImage(job, kernel=None):
+    """ applies background subtraction, bright field correction, masks,
+    the transformation, the intensity scaling and calculates statistics.
+    Input arrays of the job are never modified. Output buffers of
+    the kernel are listed in the result and should be released
+    when the result is not displayed anymore.
+
+    :param job: processing job
+    :type job: :class:`ProcessingJob`
+    :param kernel: fused correction kernel
+    :type kernel: :class:`CorrectionKernel`
+    :returns: processing result
+    :rtype: :class:`ProcessingResult`
+    """
+    timer = stageTimer.TIMER
+    errors = []
+    maskvalueindices = None
+    displayimage = job.rawgreyimage
+    corrected = None
+    buffers = ()
+    with timer.measure("corrections"):
+        if kernel is not None and (
+                job.backgroundimage is not None
+                or job.bfmdfimage is not None
+                or job.maskindices is not None
+                or job.maskvalue is not None):
+            corrected = kernel.correct(job)
+        if corrected is not None:
+            displayimage, maskvalueindices = corrected
+            buffers = tuple(
+                buf for buf in corrected if buf is not None)
+        elif displayimage is not None:
+            if job.backgroundimage is not None:
+                try:
+                    displayimage = subtractBackground(
+                        displayimage, job.backgroundimage)
+                except Exception:
+                    errors.append(("background", traceback.format_exc()))
+            if job.bfmdfimage is not None:
+                try:
+                    displayimage = multiplyBrightField(
+                        displayimage, job.bfmdfimage)
+                except Exception:
+                    errors.append(("brightfield", traceback.format_exc()))
+            if job.maskindices is not None:
+                try:
+                    displayimage = applyMask(
+                        displayimage, job.maskindices, job.nanmask,
+                        job.floattype)
+                except IndexError:
+                    errors.append(("mask", traceback.format_exc()))
+            if job.maskvalue is not None:
+                try:
+                    displayimage, maskvalueindices = applyHighValueMask(
+                        displayimage, job.maskvalue, job.nanmask,
+                        job.floattype)
+                except IndexError:
+                    errors.append(("highvaluemask", traceback.format_exc()))
+    with timer.measure("transform"):
+        displayimage, transformations = transform(
+            displayimage, job.trafoname, job.keepcoords)
+    with timer.measure("scale"):
+        scaledimage = scale(
+            displayimage, job.scalingtype, job.scalefloattype)
+    with timer.measure("stats"):
+        stats = calcStats(
+            job.statsflag, displayimage, scaledimage, job.rawgreyimage,
+            job.statswoscaling, job.samplingerror)
+    return ProcessingResult(
+        job.jobid, job.imagename, job.rawgreyimage, displayimage,
+        scaledimage, maskvalueindices, transformations, job.scalingtype,
+        stats, job.secstream, errors, buffers)
@@ -43,6 +43,14 @@ except ImportError:
     #: (:obj:`bool`) requests imported
     REQUESTS = False
 
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = True
+except ImportError:
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = False
+
 try:
     import hidra
     #: (:obj:`bool`) hidra imported
@@ -111,6 +119,30 @@ except ImportError:
     #: (:obj:`bool`) pyepics imported
     PYEPICS = False
 
+try:
+    import zstandard
+    #: (:obj:`bool`) zstandard imported
+    ZSTD = True
+except ImportError:
+    #: (:obj:`bool`) zstandard imported
+    ZSTD = False
+
+try:
+    import blosc
+    #: (:obj:`bool`) blosc imported
+    BLOSC = True
+except ImportError:
+    #: (:obj:`bool`) blosc imported
+    BLOSC = False
+
+try:
+    import bitshuffle
+    #: (:obj:`bool`) bitshuffle imported
+    BITSHUFFLE = True
+except ImportError:
+    #: (:obj:`bool`) bitshuffle imported
+    BITSHUFFLE = False
+
 try:
     import PyTine
     #: (:obj:`bool`) PyTine imported
@@ -125,6 +157,8 @@ except AttributeError:
 
 
 import socket
+import collections
+import zlib
 import numpy as np
 import random
 import time
@@ -136,6 +170,11 @@ import sys
 
 from io import BytesIO
 from . import imageFileHandler
+from . import dirWatcher
+from . import frameRecorder
+
+#: (:obj:`bool`) inotify available
+INOTIFY = dirWatcher.INOTIFY
 
 if sys.version_info > (3,):
     buffer = memoryview
@@ -146,6 +185,36 @@ else:
 
 logger = logging.getLogger("lavue")
 
+#: (:obj:`bool`) overlap the next HTTP request with decoding
+#:               of the current response
+HTTPPIPELINING = False
+
+#: (:obj:`int`) number of decode workers of HiDRA, ASAPO and directory
+#:              sources and of decompression threads of ZMQSource,
+#:              0 for decoding in the fetch thread
+DECODEWORKERS = 0
+
+#: (:obj:`list` <:obj:`str`>) metadata keys with the frame number
+#:              of detector module images
+FRAMEKEYS = ["frame", "frameid", "frame_number", "framenumber"]
+
+#: (:obj:`int`) maximal number of frames ASAPOSource follows the stream
+#:              behind its end, 0 for fetching only the last frame
+ASAPOMAXLAG = 0
+
+#: (:obj:`bool`) EpicsPVSource receives arrays from PV monitors
+EPICSMONITOR = False
+
+#: (:obj:`str`) events of TangoEventsSource, i.e. change or user events
+#:              with image payload, ready events followed by a read for
+#:              each event or batch of events, or auto for change events
+#:              if possible and batched ready events otherwise
+TANGOEVENTSMODE = "auto"
+
+#: (:obj:`bool`) NXSFileSource keeps the file open and follows frames
+#:               appended by a SWMR writer
+NXSFOLLOW = False
+
 
 def tobytes(x):
     """ decode str to bytes
@@ -179,6 +248,285 @@ def tostr(x):
         return str(x)
 
 
+def tobuffer(data):
+    """ provides an uint8 view of received payload
+
+    :param data: payload
+    :type data: :obj:`bytes` or :class:`numpy.ndarray`
+    :returns:  uint8 array sharing memory with the payload if possible
+    :rtype: :class:`numpy.ndarray`
+    """
+    if isinstance(data, np.ndarray):
+        return np.ascontiguousarray(data).view(np.uint8).reshape(-1)
+    try:
+        return np.frombuffer(data, dtype=np.uint8)
+    except Exception:
+        return np.frombuffer(bytes(data), dtype=np.uint8)
+
+
+class DecodePool(object):
+
+    """ pool of decode workers which deliver frames in the receive order
+    """
+
+    def __init__(self, workers):
+        """ constructor
+
+        :param workers: number of decode workers
+        :type workers: :obj:`int`
+        """
+        if not FUTURES:
+            raise Exception(
+                "DecodePool: concurrent.futures is not installed")
+        #: (:obj:`int`) number of decode workers
+        self.__workers = max(int(workers), 1)
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`) decode executor
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            self.__workers)
+        #: (:class:`collections.deque` <:class:`concurrent.futures.Future`>)
+        #:     decode jobs in the receive order
+        self.__futures = collections.deque()
+        #: (:obj:`int`) a number of dropped stale frames
+        self.__dropped = 0
+
+    def dropped(self):
+        """ provides a number of dropped stale frames
+
+        :returns: a number of dropped frames
+        :rtype: :obj:`int`
+        """
+        return self.__dropped
+
+    def pending(self):
+        """ provides a number of frames which are not delivered yet
+
+        :returns: a number of pending frames
+        :rtype: :obj:`int`
+        """
+        return len(self.__futures)
+
+    def submit(self, decode, *args):
+        """ submits a decode job. When all workers are busy the oldest
+        waiting job is dropped, i.e. at most one frame per worker waits
+
+        :param decode: decode function returning
+                       (image, image name, metadata)
+        :type decode: :obj:`function`
+        :param args: decode function arguments
+        :type args: :obj:`list` <:obj:`any`>
+        """
+        if len(self.__futures) >= 2 * self.__workers:
+            for future in self.__futures:
+                if future.cancel():
+                    self.__futures.remove(future)
+                    self.__dropped += 1
+                    break
+            else:
+                concurrent.futures.wait([self.__futures[0]])
+        self.__futures.append(self.__executor.submit(decode, *args))
+
+    def result(self, wait=False):
+        """ provides the latest decoded frame whose predecessors
+        are already decoded. Older decoded frames are dropped
+
+        :param wait: wait for the oldest job if nothing is decoded
+        :type wait: :obj:`bool`
+        :returns:  image, image name, metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`str`, :obj:`str`)
+        """
+        future = None
+        while self.__futures and (self.__futures[0].done() or (
+                wait and future is None)):
+            if future is not None:
+                self.__dropped += 1
+            future = self.__futures.popleft()
+        if future is None:
+            return None, None, None
+        return future.result()
+
+    def clear(self):
+        """ drops all jobs
+        """
+        while self.__futures:
+            self.__futures.popleft().cancel()
+
+    def shutdown(self):
+        """ drops all jobs and stops the workers
+        """
+        self.clear()
+        self.__executor.shutdown(wait=False)
+
+
+class PayloadDecompressor(object):
+
+    """ decompresses image payloads directly into new output images.
+    Payloads split into independent blocks are decompressed in parallel
+    """
+
+    #: (:obj:`dict` <:obj:`str`, :obj:`str`>) compression name aliases
+    aliases = {
+        "bitshuffle-lz4": "bslz4", "bitshuffle_lz4": "bslz4",
+        "bs32-lz4<": "bslz4", "zstandard": "zstd"}
+
+    def __init__(self, threads=0):
+        """ constructor
+
+        :param threads: number of decompression threads,
+                        0 for decompression in the calling thread
+        :type threads: :obj:`int`
+        """
+        #: (:obj:`int`) number of decompression threads
+        self.__threads = max(int(threads), 0) if FUTURES else 0
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`) block executor
+        self.__executor = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`function`>) block decompressors
+        self.__decompressors = {"zlib": self.__zlib}
+        if ZSTD:
+            self.__decompressors["zstd"] = self.__zstd
+        if BLOSC:
+            self.__decompressors["blosc"] = self.__blosc
+            if self.__threads:
+                blosc.set_nthreads(self.__threads)
+
+    @classmethod
+    def compressions(cls):
+        """ provides supported compressions
+
+        :returns: compression names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        cmps = ["zlib"]
+        if ZSTD:
+            cmps.append("zstd")
+        if BLOSC:
+            cmps.append("blosc")
+        if BITSHUFFLE:
+            cmps.append("bslz4")
+        return cmps
+
+    @classmethod
+    def __zlib(cls, data, target):
+        """ decompresses a zlib block
+
+        :param data: compressed block
+        :type data: :class:`numpy.ndarray`
+        :param target: uint8 output view
+        :type target: :class:`numpy.ndarray`
+        :returns: number of decompressed bytes
+        :rtype: :obj:`int`
+        """
+        block = zlib.decompress(data)
+        target[:len(block)] = np.frombuffer(block, dtype=np.uint8)
+        return len(block)
+
+    @classmethod
+    def __zstd(cls, data, target):
+        """ decompresses a zstd block
+
+        :param data: compressed block
+        :type data: :class:`numpy.ndarray`
+        :param target: uint8 output view
+        :type target: :class:`numpy.ndarray`
+        :returns: number of decompressed bytes
+        :rtype: :obj:`int`
+        """
+        block = zstandard.ZstdDecompressor().decompress(
+            data, max_output_size=target.size)
+        target[:len(block)] = np.frombuffer(block, dtype=np.uint8)
+        return len(block)
+
+    @classmethod
+    def __blosc(cls, data, target):
+        """ decompresses a blosc block directly into the output view
+
+        :param data: compressed block
+        :type data: :class:`numpy.ndarray`
+        :param target: uint8 output view
+        :type target: :class:`numpy.ndarray`
+        :returns: number of decompressed bytes
+        :rtype: :obj:`int`
+        """
+        # uncompressed size from the blosc header
+        nbytes = struct.unpack("<I", data[4:8].tobytes())[0]
+        if nbytes > target.size:
+            raise Exception(
+                "PayloadDecompressor: blosc block exceeds the image size")
+        return blosc.decompress_ptr(data.tobytes(), target.ctypes.data)
+
+    def decompress(self, payload, shape, dtype, compression,
+                   blocks=None, blocksize=None):
+        """ decompresses the payload
+
+        :param payload: compressed payload
+        :type payload: :obj:`bytes` or :obj:`memoryview`
+        :param shape: image shape
+        :type shape: :obj:`list` <:obj:`int`>
+        :param dtype: image data type
+        :type dtype: :obj:`str`
+        :param compression: compression name, i.e. zlib, zstd,
+                            blosc or bslz4
+        :type compression: :obj:`str`
+        :param blocks: compressed sizes of independent blocks
+        :type blocks: :obj:`list` <:obj:`int`>
+        :param blocksize: uncompressed size of blocks in bytes
+        :type blocksize: :obj:`int`
+        :returns: image
+        :rtype: :class:`numpy.ndarray`
+        """
+        compression = str(compression).lower()
+        compression = self.aliases.get(compression, compression)
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        payload = np.frombuffer(payload, dtype=np.uint8)
+        if compression == "bslz4":
+            if not BITSHUFFLE:
+                raise Exception(
+                    "PayloadDecompressor: bitshuffle is not installed")
+            # bitshuffle header: uncompressed and block size in bytes
+            _, bsize = struct.unpack(">QI", payload[:12].tobytes())
+            return bitshuffle.decompress_lz4(
+                payload[12:], shape, dtype, bsize // dtype.itemsize)
+        if compression not in self.__decompressors:
+            raise Exception(
+                "PayloadDecompressor: %s compression is not supported"
+                % compression)
+        decompress = self.__decompressors[compression]
+        # the image is passed to the viewer which may keep it
+        # so the blocks are decompressed into a new array
+        out = np.empty(shape=shape, dtype=dtype)
+        view = out.reshape(-1).view(np.uint8)
+        if not blocks:
+            blocks = [len(payload)]
+            blocksize = view.size
+        jobs = []
+        offset = 0
+        for i, csize in enumerate(blocks):
+            jobs.append(
+                (payload[offset:offset + int(csize)],
+                 view[i * int(blocksize):(i + 1) * int(blocksize)]))
+            offset += int(csize)
+        if self.__threads and len(jobs) > 1:
+            if self.__executor is None:
+                self.__executor = concurrent.futures.ThreadPoolExecutor(
+                    self.__threads)
+            sizes = list(self.__executor.map(
+                lambda job: decompress(*job), jobs))
+        else:
+            sizes = [decompress(*job) for job in jobs]
+        if sum(sizes) != view.size:
+            raise Exception(
+                "PayloadDecompressor: %s bytes decompressed "
+                "instead of %s" % (sum(sizes), view.size))
+        return out
+
+    def shutdown(self):
+        """ stops the decompression threads
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+
 class BaseSource(object):
 
     """ source base class"""
@@ -246,6 +594,18 @@ class BaseSource(object):
             ]),
             '__random_%s__' % self.__counter, "")
 
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until new data can be fetched. Polling sources return
+        at once while push sources block until data arrives or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        return True
+
     @debugmethod
     def connect(self):
         """ connects the source
@@ -292,12 +652,8 @@ class FixTestSource(BaseSource):
         # self.__shape = [256, 512]
         # self.__shape = [1024, 2048]
 
-        #: (:class:`numpy,ndarray`) index object
-        self.__image = np.transpose(
-            [
-                [random.randint(0, 1000) for _ in range(self.__shape[0])]
-                for _ in range(self.__shape[1])
-            ])
+        #: (:class:`numpy,ndarray`) index object created on demand
+        self.__image = None
 
     @debugmethod
     def getData(self):
@@ -306,6 +662,8 @@ class FixTestSource(BaseSource):
         :returns:  image name, image data, json dictionary with metadata
         :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
         """
+        if self.__image is None:
+            self.__image = np.random.randint(0, 1001, size=self.__shape)
         self.__counter += 1
         return (self.__image,
                 '__random_%s__' % self.__counter, "")
@@ -328,6 +686,463 @@ class FixTestSource(BaseSource):
             pass
 
 
+class GeneratorSource(FixTestSource):
+
+    """ configurable synthetic image source generating frames
+    at a given rate, e.g. for load tests of the pipeline
+    """
+
+    #: (:obj:`list` <:obj:`str`>) image patterns
+    patterns = ["flat", "noise", "peaks", "rings", "ramp"]
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        FixTestSource.__init__(self, timeout)
+        #: (:obj:`dict` <:obj:`str`, :obj:`any`>) generator parameters
+        self.__params = {}
+        #: (:obj:`list` <:class:`numpy.ndarray`>) pool of generated frames
+        self.__frames = []
+        #: (:obj:`dict` <:obj:`str`, :obj:`any`>) constant metadata
+        self.__metadata = {}
+        #: (:class:`numpy.ndarray`) ring profile of the rings pattern
+        self.__rings = None
+        #: (:obj:`float`) generation start time
+        self.__start = None
+        #: (:obj:`int`) id of the last delivered frame
+        self.__last = 0
+        #: (:obj:`int`) a number of produced frames
+        self.produced = 0
+        #: (:obj:`int`) a number of frames fetched by lavue
+        self.consumed = 0
+
+    @classmethod
+    def parseConfiguration(cls, configuration):
+        """ parses generator configuration, i.e. comma separated
+        key=value items: shape=<ny>x<nx>, dtype, rate (frames per second,
+        0 on every request), channels, pattern, peaks, nan (fraction
+        of NaN pixels), frames (size of the frame pool), seed and
+        frameids, geometry, labels metadata flags
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        :returns: generator parameters
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        params = {
+            "shape": [2048, 4096], "dtype": "int32", "rate": 0.0,
+            "channels": 1, "pattern": "noise", "peaks": 10, "nan": 0.0,
+            "frames": 4, "seed": 0,
+            "frameids": True, "geometry": False, "labels": False}
+        for item in str(configuration or "").split(","):
+            if not item.strip():
+                continue
+            if "=" not in item:
+                raise ValueError(
+                    "GeneratorSource: wrong configuration item '%s'" % item)
+            key, value = [it.strip() for it in item.split("=", 1)]
+            key = key.lower()
+            if key == "shape":
+                params[key] = [int(dm) for dm in value.lower().split("x")]
+                if len(params[key]) != 2 or min(params[key]) < 1:
+                    raise ValueError(
+                        "GeneratorSource: wrong shape '%s'" % value)
+            elif key == "dtype":
+                params[key] = np.dtype(value).name
+            elif key in ["rate", "nan"]:
+                params[key] = max(float(value), 0.0)
+            elif key in ["channels", "peaks", "frames", "seed"]:
+                params[key] = max(int(value), 1 if key != "seed" else 0)
+            elif key == "pattern":
+                if value.lower() not in cls.patterns:
+                    raise ValueError(
+                        "GeneratorSource: unknown pattern '%s'" % value)
+                params[key] = value.lower()
+            elif key in ["frameids", "geometry", "labels"]:
+                params[key] = value.lower() in ["true", "1", "yes", "on"]
+            else:
+                raise ValueError(
+                    "GeneratorSource: unknown parameter '%s'" % key)
+        if params["nan"] and np.dtype(params["dtype"]).kind != "f":
+            logger.warning(
+                "GeneratorSource: NaN pixels require a float type, "
+                "%s is replaced by float32" % params["dtype"])
+            params["dtype"] = "float32"
+        return params
+
+    def __generate(self, rng, frame):
+        """ generates one frame of the pool
+
+        :param rng: random state
+        :type rng: :class:`numpy.random.RandomState`
+        :param frame: frame index in the pool
+        :type frame: :obj:`int`
+        :returns: generated image
+        :rtype: :class:`numpy.ndarray`
+        """
+        prm = self.__params
+        ny, nx = prm["shape"]
+        dtype = np.dtype(prm["dtype"])
+        images = []
+        for ch in range(prm["channels"]):
+            pattern = prm["pattern"]
+            scale = 100.0 * (ch + 1)
+            if pattern == "flat":
+                image = np.full((ny, nx), scale, dtype="float32")
+            elif pattern == "ramp":
+                image = np.add.outer(
+                    np.arange(ny, dtype="float32"),
+                    np.arange(nx, dtype="float32"))
+                image += frame * max(nx, ny) / float(prm["frames"])
+                image %= max(nx, ny)
+                image *= scale / max(nx, ny)
+            else:
+                image = rng.randint(
+                    0, int(scale), size=(ny, nx)).astype("float32")
+            if pattern == "rings":
+                if self.__rings is None:
+                    # radial profile looked up by the pixel radius
+                    yy, xx = np.ogrid[:ny, :nx]
+                    radius = np.hypot(yy - ny / 2., xx - nx / 2.).astype(
+                        "int32")
+                    rr = np.arange(radius.max() + 1, dtype="float32")
+                    profile = sum(
+                        np.exp(-(rr - rn * min(ny, nx) / 12.) ** 2 / 8.)
+                        for rn in range(1, 6))
+                    self.__rings = profile[radius]
+                image += 50 * scale * self.__rings
+            elif pattern == "peaks":
+                for _ in range(prm["peaks"]):
+                    py, px = rng.randint(0, ny), rng.randint(0, nx)
+                    y0, y1 = max(py - 10, 0), min(py + 11, ny)
+                    x0, x1 = max(px - 10, 0), min(px + 11, nx)
+                    yy, xx = np.ogrid[y0:y1, x0:x1]
+                    image[y0:y1, x0:x1] += 100 * scale * np.exp(
+                        -((yy - py) ** 2 + (xx - px) ** 2) / 18.)
+            images.append(image)
+        image = images[0] if len(images) == 1 else np.stack(images)
+        if dtype.kind in "iub":
+            info = np.iinfo(dtype)
+            np.clip(image, info.min, info.max, out=image)
+        image = image.astype(dtype)
+        if prm["nan"]:
+            image[rng.random_sample(image.shape) < prm["nan"]] = np.nan
+        return image
+
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until the next frame is produced or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        rate = self.__params.get("rate")
+        if not rate or self.__start is None:
+            return True
+        delay = self.__start + self.__last / rate - time.time()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+        return delay <= timeout
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        if not self.__frames:
+            return "Generator is not connected", "__ERROR__", None
+        now = time.time()
+        if self.__start is None:
+            self.__start = now
+        rate = self.__params["rate"]
+        if rate:
+            # the newest frame produced so far, older ones are missed
+            frameid = int((now - self.__start) * rate) + 1
+            if frameid <= self.__last:
+                return None, None, None
+        else:
+            frameid = self.__last + 1
+        self.__last = frameid
+        self.produced = frameid
+        self.consumed += 1
+        metadata = dict(self.__metadata)
+        if self.__params["frameids"]:
+            metadata["frame"] = frameid
+        return (self.__frames[frameid % len(self.__frames)],
+                "generator_%s" % frameid,
+                json.dumps(metadata) if metadata else "")
+
+    def getThroughput(self):
+        """ provides the produced and consumed frame statistics
+
+        :returns: frames produced by the generator, frames consumed
+                  by lavue, dropped frames, elapsed time in s,
+                  consumed frames per second and MB per second
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        elapsed = (time.time() - self.__start) if self.__start else 0.0
+        nbytes = self.__frames[0].nbytes if self.__frames else 0
+        return {
+            "produced": self.produced,
+            "consumed": self.consumed,
+            "dropped": self.produced - self.consumed,
+            "elapsed": elapsed,
+            "fps": (self.consumed / elapsed) if elapsed else 0.0,
+            "mbps": (self.consumed * nbytes / elapsed / 1e6)
+            if elapsed else 0.0
+        }
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            self.disconnect()
+            self.__params = self.parseConfiguration(self._configuration)
+            rng = np.random.RandomState(self.__params["seed"])
+            self.__frames = [self.__generate(rng, fr)
+                             for fr in range(self.__params["frames"])]
+            self.__rings = None
+            self.__metadata = {}
+            ny, nx = self.__params["shape"]
+            if self.__params["geometry"]:
+                self.__metadata.update({
+                    "beam_center_x": nx / 2., "beam_center_y": ny / 2.,
+                    "detector_distance": 0.2, "wavelength": 1.0,
+                    "x_pixel_size": 75e-6, "y_pixel_size": 75e-6})
+            if self.__params["labels"] and self.__params["channels"] > 1:
+                self.__metadata["channellabels"] = dict(
+                    (str(ch), "channel %s" % ch)
+                    for ch in range(self.__params["channels"]))
+            self.__start = None
+            self.__last = 0
+            self.produced = 0
+            self.consumed = 0
+            self._initiated = True
+            return True
+        except Exception as e:
+            self.__frames = []
+            logger.warning(str(e))
+            # print(str(e))
+            self._updaterror()
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        if self.__frames:
+            logger.info(
+                "GeneratorSource: %(produced)s frames produced, "
+                "%(consumed)s consumed, %(dropped)s dropped, "
+                "%(fps).1f fps, %(mbps).1f MB/s" % self.getThroughput())
+        self.__frames = []
+
+
+class ReplaySource(BaseSource):
+
+    """ image source replaying frames of a lavue record file
+    at their original timing, at a fixed rate or as fast as possible
+    """
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+        #: (:class:`lavuelib.frameRecorder.FrameReader`) record reader
+        self.__reader = None
+        #: (:obj:`float`) replay rate in frames per second,
+        #:    None for the original timing and 0 as fast as possible
+        self.__rate = None
+        #: (:obj:`bool`) replay the record in a loop
+        self.__loop = True
+        #: (:obj:`tuple`) the next frame, i.e. timestamp, image, name
+        #:    and metadata
+        self.__next = None
+        #: (:obj:`float`) time of the first frame in the current loop
+        self.__start = None
+        #: (:obj:`float`) timestamp of the first recorded frame
+        self.__first = None
+        #: (:obj:`int`) frame index in the current loop
+        self.__index = 0
+        #: (:obj:`float`) replay start time
+        self.__begin = None
+        #: (:obj:`int`) a number of replayed frames
+        self.frames = 0
+        #: (:obj:`int`) a number of replayed bytes
+        self.bytes = 0
+        #: (:obj:`int`) a number of completed loops
+        self.loops = 0
+        #: (:obj:`int`) a number of frames fetched after their due time
+        self.late = 0
+
+    def __due(self):
+        """ reads the next frame if needed and provides its due time
+
+        :returns: due time of the next frame or None at the end
+        :rtype: :obj:`float`
+        """
+        if self.__next is None:
+            self.__next = self.__reader.read()
+            if self.__next is None and self.__loop and self.__index:
+                self.__reader.rewind()
+                self.loops += 1
+                self.__index = 0
+                self.__next = self.__reader.read()
+            if self.__next is None:
+                return None
+            if self.__index == 0:
+                self.__start = None
+                self.__first = self.__next[0]
+        if self.__start is None or self.__rate == 0:
+            return 0
+        if self.__rate is None:
+            return self.__start + self.__next[0] - self.__first
+        return self.__start + self.__index / self.__rate
+
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until the next frame is due or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        if self.__reader is None:
+            return True
+        try:
+            due = self.__due()
+        except Exception as e:
+            logger.warning(str(e))
+            return True
+        if due is None:
+            time.sleep(timeout)
+            return False
+        delay = due - time.time()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+        return delay <= timeout
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        if self.__reader is None:
+            return "No record file opened", "__ERROR__", None
+        try:
+            due = self.__due()
+            now = time.time()
+            if due is None or due > now:
+                return None, None, None
+            if due and now - due > 0.1:
+                self.late += 1
+            if self.__start is None:
+                self.__start = now
+            if self.__begin is None:
+                self.__begin = now
+            _, image, name, metadata = self.__next
+            self.__next = None
+            self.__index += 1
+            self.frames += 1
+            self.bytes += image.nbytes
+            if self.loops:
+                # consecutive frames with the same name are not shown
+                name = "%s #%s" % (name, self.loops)
+            return image, name, metadata
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+
+    def getThroughput(self):
+        """ provides the achieved replay throughput
+
+        :returns: replay statistics, i.e. frames, loops, late frames,
+                  elapsed time in s, frames per second and MB per second
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        elapsed = (time.time() - self.__begin) if self.__begin else 0.0
+        return {
+            "frames": self.frames,
+            "loops": self.loops,
+            "late": self.late,
+            "elapsed": elapsed,
+            "fps": (self.frames / elapsed) if elapsed else 0.0,
+            "mbps": (self.bytes / elapsed / 1e6) if elapsed else 0.0
+        }
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            self.disconnect()
+            cnflst = str(self._configuration).split(",")
+            self.__loop = True
+            if len(cnflst) > 1 and \
+               cnflst[-1].strip().lower() in ["true", "false"]:
+                self.__loop = cnflst.pop().strip().lower() == "true"
+            self.__rate = None
+            if len(cnflst) > 1:
+                rate = cnflst[-1].strip().lower()
+                if rate in ["", "original"]:
+                    cnflst.pop()
+                elif rate in ["max", "fast"]:
+                    cnflst.pop()
+                    self.__rate = 0
+                else:
+                    try:
+                        self.__rate = max(float(rate), 0)
+                        cnflst.pop()
+                    except ValueError:
+                        pass
+            self.__reader = frameRecorder.FrameReader(
+                ",".join(cnflst).strip())
+            self.__next = None
+            self.__index = 0
+            self.__begin = None
+            self.frames = 0
+            self.bytes = 0
+            self.loops = 0
+            self.late = 0
+            return True
+        except Exception as e:
+            self.__reader = None
+            logger.warning(str(e))
+            # print(str(e))
+            self._updaterror()
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        if self.__reader is not None:
+            logger.info(
+                "ReplaySource: %(frames)s frames in %(loops)s loops, "
+                "%(late)s late, %(fps).1f fps, %(mbps).1f MB/s"
+                % self.getThroughput())
+            self.__reader.close()
+            self.__reader = None
+        self.__next = None
+
+
 class NXSFileSource(BaseSource):
 
     """ image source as Tango attributes describing
@@ -361,6 +1176,24 @@ class NXSFileSource(BaseSource):
         self.__nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.__nxslast = False
+        #: (:class:`lavuelib.imageFileHandler.NexusFrameReader`)
+        #: chunk-aware frame reader
+        self.__reader = imageFileHandler.NexusFrameReader()
+        #: (:obj:`str`) json dictionary with metadata of the last file opening
+        self.__metadata = ""
+        #: (:obj:`bool`) nexus file source follows the growing SWMR file
+        self.__nxsfollow = False
+        #: (:obj:`int`) number of frames of the followed field
+        self.__nframes = 0
+        #: (:obj:`int`) the last delivered frame of the followed field
+        self.__shown = None
+        #: (:obj:`tuple` <:obj:`int`>) file fingerprint at the last refresh
+        self.__followprint = None
+        #: (:obj:`float`) time of the last field refresh
+        self.__refreshtime = 0
+        #: (:obj:`float`) maximal time between field refreshes in s
+        #:     for file systems which do not update the file fingerprint
+        self.__refreshperiod = 1.0
 
     @debugmethod
     def setConfiguration(self, configuration):
@@ -380,6 +1213,38 @@ class NXSFileSource(BaseSource):
                 logger.warning(str(e))
                 self.__lastframe = -1
 
+    def __fingerprint(self):
+        """ provides fingerprint of the nexus file content
+
+        :returns: modification time and size of the file or None
+        :rtype: :obj:`tuple` <:obj:`int`>
+        """
+        try:
+            stat = os.stat(str(self.__nxsfile))
+            return (stat.st_mtime_ns, stat.st_size)
+        except Exception:
+            return None
+
+    def __selectFrame(self, fid):
+        """ updates the current frame for the given number of frames
+
+        :param fid: number of frames
+        :type fid: :obj:`int`
+        """
+        if self.__lastframe < 0:
+            if fid > - self.__lastframe:
+                fid -= - self.__lastframe - 1
+            else:
+                fid = min(1, fid)
+        elif fid > self.__lastframe + 1:
+            fid = self.__lastframe + 1
+        if self.__nxslast:
+            if fid - 1 != self.__frame:
+                self.__frame = fid - 1
+        else:
+            if fid - 1 < self.__frame:
+                self.__frame = fid - 1
+
     @debugmethod
     def getData(self):
         """ provides image name, image data and metadata
@@ -390,42 +1255,48 @@ class NXSFileSource(BaseSource):
 
         if self.__nxsfile is None:
             return "No file name defined", "__ERROR__", ""
+        if self.__nxsfollow:
+            return self.__getFollowedData()
         try:
             image = None
             metadata = ""
+            fingerprint = None
             try:
-                if self.__handler is None:
-                    self.__handler = imageFileHandler.NexusFieldHandler(
-                        str(self.__nxsfile))
-                if self.__node is None:
-                    self.__node = self.__handler.getNode(self.__nxsfield)
-                    try:
-                        metadata = self.__handler.getMetaData(self.__node)
-                    except Exception as e:
-                        logger.warning(str(e))
-                        metadata = ""
-                    # if metadata:
-                    #     print("IMAGE Metadata = %s" % str(metadata))
-                fid = self.__handler.getFrameCount(self.__node, self.__gdim)
-                if self.__lastframe < 0:
-                    if fid > - self.__lastframe:
-                        fid -= - self.__lastframe - 1
-                    else:
-                        fid = min(1, fid)
-                elif fid > self.__lastframe + 1:
-                    fid = self.__lastframe + 1
-                if self.__nxslast:
-                    if fid - 1 != self.__frame:
-                        self.__frame = fid - 1
-                else:
-                    if fid - 1 < self.__frame:
-                        self.__frame = fid - 1
-
-                image = self.__handler.getImage(
-                    self.__node, self.__frame, self.__gdim)
+                if not self.__nxsopen:
+                    fingerprint = self.__fingerprint()
+                    if self.__handler is None and \
+                       self.__reader.matches(fingerprint):
+                        # the file has not changed since the last opening
+                        self.__selectFrame(
+                            self.__reader.frameCount(refresh=False))
+                        image = self.__reader.getFrame(
+                            self.__frame, load=False)
+                        metadata = self.__metadata
+                if image is None:
+                    if self.__handler is None:
+                        self.__handler = \
+                            imageFileHandler.NexusFieldHandler(
+                                str(self.__nxsfile))
+                    if self.__node is None:
+                        self.__node = self.__handler.getNode(
+                            self.__nxsfield)
+                        try:
+                            metadata = self.__handler.getMetaData(
+                                self.__node)
+                        except Exception as e:
+                            logger.warning(str(e))
+                            metadata = ""
+                        # if metadata:
+                        #     print("IMAGE Metadata = %s" % str(metadata))
+                        self.__metadata = metadata
+                        self.__reader.setNode(
+                            self.__node, self.__gdim, fingerprint)
+                    self.__selectFrame(self.__reader.frameCount())
+                    image = self.__reader.getFrame(self.__frame)
             except Exception as e:
                 logger.warning(str(e))
             if not self.__nxsopen:
+                self.__reader.detach()
                 self.__handler = None
                 if hasattr(self.__node, "close"):
                     self.__node.close()
@@ -439,6 +1310,7 @@ class NXSFileSource(BaseSource):
                 self.__frame += 1
                 return (np.transpose(image), '%s' % (filename), metadata)
         except Exception as e:
+            self.__reader.detach()
             self.__handler = None
             if hasattr(self.__node, "close"):
                 self.__node.close()
@@ -449,13 +1321,80 @@ class NXSFileSource(BaseSource):
             pass  # this needs a bit more care
         return None, None, None
 
+    def __getFollowedData(self):
+        """ provides the next frame of the followed file. The field is
+            refreshed only if the file has changed and frames appended
+            since the last refresh are read in one hyperslab
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        try:
+            metadata = ""
+            if self.__node is None:
+                self.__followprint = self.__fingerprint()
+                self.__refreshtime = time.time()
+                self.__handler = imageFileHandler.NexusFieldHandler(
+                    str(self.__nxsfile))
+                self.__node = self.__handler.getNode(self.__nxsfield)
+                try:
+                    metadata = self.__handler.getMetaData(self.__node)
+                except Exception as e:
+                    logger.warning(str(e))
+                    metadata = ""
+                self.__metadata = metadata
+                self.__reader.setNode(self.__node, self.__gdim)
+                self.__nframes = self.__reader.frameCount(refresh=False)
+                self.__shown = None
+            else:
+                fingerprint = self.__fingerprint()
+                now = time.time()
+                if fingerprint != self.__followprint or \
+                   now - self.__refreshtime >= self.__refreshperiod:
+                    self.__followprint = fingerprint
+                    self.__refreshtime = now
+                    nframes = self.__reader.frameCount()
+                    if nframes > self.__nframes:
+                        self.__reader.readFrames(
+                            nframes - 1 if self.__nxslast
+                            else self.__nframes, nframes)
+                    self.__nframes = nframes
+            if self.__nframes < 1:
+                return None, None, None
+            self.__selectFrame(self.__nframes)
+            if self.__frame == self.__shown:
+                # no new frame, the next one is expected
+                self.__frame += 1
+                return None, None, None
+            image = self.__reader.getFrame(self.__frame)
+            if image is None or (hasattr(image, "size") and image.size == 0):
+                return None, None, None
+            filename = "%s/%s:%s" % (
+                self.__nxsfile, self.__nxsfield, self.__frame)
+            self.__shown = self.__frame
+            self.__frame += 1
+            return (np.transpose(image), '%s' % (filename), metadata)
+        except Exception as e:
+            self.__reader.detach()
+            self.__handler = None
+            if hasattr(self.__node, "close"):
+                self.__node.close()
+            self.__node = None
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+
     @debugmethod
     def connect(self):
         """ connects the source
         """
         try:
+            self.__reader.close()
             self.__handler = None
             self.__node = None
+            self.__nxsfollow = NXSFOLLOW
+            self.__shown = None
+            self.__nframes = 0
             self.__nxsfile, self.__nxsfield, frame, growdim, \
                 nxsopen, nxslast = str(
                     self._configuration).strip().split(",", 6)
@@ -488,6 +1427,7 @@ class NXSFileSource(BaseSource):
     def disconnect(self):
         """ disconnects the source
         """
+        self.__reader.close()
         self.__handler = None
         self.__node = None
 
@@ -572,6 +1512,155 @@ class TangoFileSource(BaseSource):
             return False
 
 
+class DirectorySource(BaseSource):
+
+    """ image source of detector files written into a directory tree """
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+        #: (:class:`lavuelib.dirWatcher.DirWatcher`) directory watcher
+        self.__watcher = None
+        #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock for the watcher
+        self.__mutex = QtCore.QMutex()
+        #: (:class:`DecodePool`) pool of decode workers
+        self.__pool = None
+        #: (:obj:`int`) a number of new files
+        self.files = 0
+        #: (:obj:`int`) a number of new files skipped without decoding
+        self.skipped = 0
+
+    def wait(self, timeout):
+        """ waits until a new file appears or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__watcher is None or \
+               (self.__pool is not None and self.__pool.pending()):
+                return True
+            try:
+                return self.__watcher.wait(timeout)
+            except Exception as e:
+                logger.warning(str(e))
+                return True
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__watcher is None:
+                return "No directory defined", "__ERROR__", ""
+            try:
+                files = self.__watcher.read()
+            except Exception as e:
+                logger.warning(str(e))
+                return str(e), "__ERROR__", ""
+        filename = None
+        if files:
+            # only the newest file is decoded
+            self.files += len(files)
+            self.skipped += len(files) - 1
+            filename = files[-1]
+        if self.__pool is None:
+            if filename:
+                return self.__decode(filename)
+            return None, None, None
+        if filename:
+            self.__pool.submit(self.__decode, filename)
+        return self.__pool.result(wait=not filename)
+
+    def __decode(self, filename):
+        """ decodes the image file
+
+        :param filename: image file name
+        :type filename: :obj:`str`
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        try:
+            if os.path.splitext(filename)[1].lower() in [
+                    ".nxs", ".h5", ".nx", ".ndf", ".hdf"]:
+                handler = imageFileHandler.NexusFieldHandler(str(filename))
+                fields = handler.findImageFields()
+                if not fields:
+                    return None, None, None
+                field = sorted(fields.keys())[0]
+                node = fields[field]["node"]
+                image = handler.getImage(node)
+                mdata = handler.getMetaData(node)
+                filename = "%s:/%s" % (filename, field)
+            else:
+                fh = imageFileHandler.ImageFileHandler(str(filename))
+                image = fh.getImage()
+                mdata = fh.getMetaData()
+            if image is None or \
+               (hasattr(image, "size") and image.size == 0):
+                return None, None, None
+            return (np.transpose(image), '%s' % (filename), mdata)
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            self.disconnect()
+            cnf = str(self._configuration).strip().split(",")
+            recursive = False
+            if len(cnf) > 1 and cnf[-1].strip().lower() in ["true", "false"]:
+                recursive = cnf.pop().strip().lower() == "true"
+            dirname = cnf[0].strip()
+            patterns = " ".join(cnf[1:]).split()
+            if not os.path.isdir(dirname):
+                raise Exception(
+                    "DirectorySource: %s is not a directory" % dirname)
+            with QtCore.QMutexLocker(self.__mutex):
+                self.__watcher = dirWatcher.DirWatcher(
+                    dirname, patterns, recursive)
+            if DECODEWORKERS and FUTURES:
+                self.__pool = DecodePool(DECODEWORKERS)
+            self.files = 0
+            self.skipped = 0
+            return True
+        except Exception as e:
+            self._updaterror()
+            logger.warning(str(e))
+            # print(str(e))
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__watcher is not None:
+                logger.info(
+                    "DirectorySource: %s new files, %s skipped, "
+                    "%s inotify queue overflows" % (
+                        self.files, self.skipped, self.__watcher.overflows))
+                self.__watcher.close()
+                self.__watcher = None
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+
 class VDEOdecoder(object):
 
     """ VIDEO IMAGE LIMA decoder
@@ -596,12 +1685,26 @@ class VDEOdecoder(object):
         self.__data = None
         #: (:obj:`str`) struct header format
         self.__headerFormat = '!IHHqiiHHHH'
+        #: (:obj:`int`) struct header size
+        self.__headerSize = struct.calcsize(self.__headerFormat)
         #: (:obj:`dict` <:obj:`str`, :obj:`any` > ) header data
         self.__header = {}
-        #: (:obj:`dict` <:obj:`int`, :obj:`str` > ) format modes
-        self.__formatID = {0: 'B', 1: 'H', 2: 'I', 3: 'Q'}
-        #: (:obj:`dict` <:obj:`int`, :obj:`str` > ) dtype modes
-        self.__dtypeID = {0: 'uint8', 1: 'uint16', 2: 'uint32', 3: 'uint64'}
+        #: (:obj:`dict` <:obj:`int`, :obj:`str` > ) dtype of pixel data
+        #:     for LIMA video modes, i.e.
+        #:     Y8, Y16, Y32, Y64, RGB555, RGB565, RGB24, RGB32, BGR24, BGR32,
+        #:     BAYER_RG8, BAYER_RG16, BAYER_BG8, BAYER_BG16,
+        #:     I420, YUV411, YUV422, YUV444,
+        #:     YUV411PACKED, YUV422PACKED, YUV444PACKED
+        self.__modeDtype = {
+            0: 'uint8', 1: 'uint16', 2: 'uint32', 3: 'uint64',
+            4: 'uint16', 5: 'uint16', 6: 'uint8', 7: 'uint8',
+            8: 'uint8', 9: 'uint8', 10: 'uint8', 11: 'uint16',
+            12: 'uint8', 13: 'uint16', 14: 'uint8', 15: 'uint8',
+            16: 'uint8', 17: 'uint8', 18: 'uint8', 19: 'uint8',
+            20: 'uint8'}
+        #: (:obj:`dict` <:obj:`int`, :obj:`str` > ) dtype of decoded image
+        self.__dtypeID = dict(self.__modeDtype)
+        self.__dtypeID.update({4: 'uint8', 5: 'uint8'})
 
     # @debugmethod
     def load(self, data):
@@ -614,7 +1717,7 @@ class VDEOdecoder(object):
             "lavuelib.imageSource.VDEOdecoder.load:  %s" % str(data[0]))
         self.__data = data
         self.format = data[0]
-        self._loadHeader(data[1][:struct.calcsize(self.__headerFormat)])
+        self._loadHeader(data[1][:self.__headerSize])
         self.__value = None
 
     @debugmethod
@@ -658,6 +1761,83 @@ class VDEOdecoder(object):
         if 'frameNumber' in self.__header.keys():
             return self.__header['frameNumber']
 
+    def __pixels(self, count, dtype=None):
+        """ provides a view on pixel data of the encoded buffer
+
+        :param count: number of items
+        :type count: :obj:`int`
+        :param dtype: item type, default: the image mode type
+        :type dtype: :obj:`str`
+        :returns: one dimensional view on the buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        dtype = np.dtype(dtype or self.__modeDtype[self.__header['imageMode']])
+        # endianness 0: little endian, 1: big endian
+        dtype = dtype.newbyteorder(
+            '>' if self.__header['endianness'] else '<')
+        offset = max(self.__header['headerSize'], self.__headerSize)
+        return np.frombuffer(
+            self.__data[1], dtype=dtype, count=count, offset=offset)
+
+    @classmethod
+    def _yuv2rgb(cls, planes, u, v, shape):
+        """ converts YUV (BT.601) to RGB channels
+
+        :param planes: (output slices, luma) pairs of luma samples
+                       with the chroma resolution
+        :type planes: :obj:`list` < (:obj:`tuple`, :class:`numpy.ndarray`) >
+        :param u: blue-difference chroma
+        :type u: :class:`numpy.ndarray`
+        :param v: red-difference chroma
+        :type v: :class:`numpy.ndarray`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: rgb image with channels in the first axis
+        :rtype: :class:`numpy.ndarray`
+        """
+        uf = u.astype(np.float32) - 128
+        vf = v.astype(np.float32) - 128
+        rgb = np.empty((3,) + tuple(shape), dtype=np.uint8)
+        for i, (cu, cv) in enumerate(
+                [(0, 1.402), (-0.344136, -0.714136), (1.772, 0)]):
+            # luma is integer so rounding of chroma terms is exact
+            term = np.floor(cu * uf + cv * vf + 0.5).astype(np.int16)
+            for sl, y in planes:
+                chn = np.add(y, term, dtype=np.int16)
+                np.clip(chn, 0, 255, out=chn)
+                rgb[(i,) + sl] = chn
+        return rgb
+
+    @classmethod
+    def _debayer(cls, raw, pattern):
+        """ converts a bayer mosaic to RGB channels replicating
+        2x2 superpixels
+
+        :param raw: bayer mosaic
+        :type raw: :class:`numpy.ndarray`
+        :param pattern: first row of the pattern, i.e. RG or BG
+        :type pattern: :obj:`str`
+        :returns: rgb image with channels in the first axis
+        :rtype: :class:`numpy.ndarray`
+        """
+        height, width = raw.shape[0] // 2 * 2, raw.shape[1] // 2 * 2
+        raw = raw[:height, :width]
+        first = raw[0::2, 0::2]
+        green = raw[0::2, 1::2] // 2 + raw[1::2, 0::2] // 2 + (
+            raw[0::2, 1::2] & raw[1::2, 0::2] & 1)
+        last = raw[1::2, 1::2]
+        if pattern == "RG":
+            channels = (first, green, last)
+        else:
+            channels = (last, green, first)
+        rgb = np.empty((3, height, width), dtype=raw.dtype)
+        for i, chn in enumerate(channels):
+            rgb[i, 0::2, 0::2] = chn
+            rgb[i, 0::2, 1::2] = chn
+            rgb[i, 1::2, 0::2] = chn
+            rgb[i, 1::2, 1::2] = chn
+        return rgb
+
     @debugmethod
     def decode(self):
         """ provides the decoded data
@@ -667,28 +1847,82 @@ class VDEOdecoder(object):
         """
         if not self.__header or not self.__data:
             return
-        if not self.__value:
-            image = self.__data[1][struct.calcsize(self.__headerFormat):]
-            dformat = self.__formatID[self.__header['imageMode']]
-            fSize = struct.calcsize(dformat)
-            self.__value = np.array(
-                struct.unpack(dformat * (len(image) // fSize), image),
-                dtype=self.dtype).reshape(self.__header['height'],
-                                          self.__header['width']).T
-            fendian = self.__header['endianness']
-            lendian = ord(struct.pack('=H', 1).decode()[-1])
-            if fendian != lendian:
-                try:
-                    self.__value.byteswap(inplace=False)
-                except TypeError:
-                    self.__value = self.__value.byteswap()
+        if self.__value is None:
+            mode = self.__header['imageMode']
+            height = self.__header['height']
+            width = self.__header['width']
+            size = height * width
+            if mode < 4:
+                # zero-copy view on the encoded buffer
+                self.__value = self.__pixels(size).reshape(height, width).T
+                return self.__value
+            if mode in [4, 5]:
+                pix = self.__pixels(size).reshape(height, width)
+                gbits = 5 if mode == 4 else 6
+                rgb = np.empty((3, height, width), dtype=np.uint8)
+                for i, (shift, bits) in enumerate(
+                        [(5 + gbits, 5), (5, gbits), (0, 5)]):
+                    chn = (pix >> shift) & ((1 << bits) - 1)
+                    # expand to 8 bits
+                    rgb[i] = (chn << (8 - bits)) | (chn >> (2 * bits - 8))
+            elif mode in [6, 7, 8, 9]:
+                depth = 3 if mode in [6, 8] else 4
+                pix = self.__pixels(size * depth).reshape(
+                    height, width, depth)
+                # zero-copy view with channels in the first axis
+                if mode in [6, 7]:
+                    rgb = np.moveaxis(pix, -1, 0)[:3]
+                else:
+                    rgb = np.moveaxis(pix, -1, 0)[2::-1]
+            elif mode in [10, 11, 12, 13]:
+                raw = self.__pixels(size).reshape(height, width)
+                rgb = self._debayer(raw, "RG" if mode in [10, 11] else "BG")
+            elif mode == 14:
+                hh, hw = height // 2, width // 2
+                pix = self.__pixels(size + 2 * hh * hw)
+                y = pix[:size].reshape(height, width)
+                rgb = self._yuv2rgb(
+                    [((slice(i, None, 2), slice(j, None, 2)),
+                      y[i::2, j::2]) for i in range(2) for j in range(2)],
+                    pix[size:size + hh * hw].reshape(hh, hw),
+                    pix[size + hh * hw:].reshape(hh, hw),
+                    (height, width))
+            elif mode in [15, 18]:
+                # U Y Y V Y Y
+                pix = self.__pixels(size * 3 // 2).reshape(
+                    height, width // 4, 6)
+                rgb = self._yuv2rgb(
+                    [((slice(None), slice(i, None, 4)), pix[:, :, k])
+                     for i, k in enumerate([1, 2, 4, 5])],
+                    pix[:, :, 0], pix[:, :, 3], (height, width))
+            elif mode in [16, 19]:
+                # U Y V Y
+                pix = self.__pixels(size * 2).reshape(height, width // 2, 4)
+                rgb = self._yuv2rgb(
+                    [((slice(None), slice(i, None, 2)), pix[:, :, k])
+                     for i, k in enumerate([1, 3])],
+                    pix[:, :, 0], pix[:, :, 2], (height, width))
+            elif mode in [17, 20]:
+                # U Y V
+                pix = self.__pixels(size * 3).reshape(height, width, 3)
+                rgb = self._yuv2rgb(
+                    [((slice(None), slice(None)), pix[:, :, 1])],
+                    pix[:, :, 0], pix[:, :, 2], (height, width))
+            self.__value = np.swapaxes(rgb, 1, 2)
 
         return self.__value
 
 
 class TangoAttrSource(BaseSource):
 
-    """ image source as IMAGE Tango attribute
+    """ image source as IMAGE Tango attribute.
+
+    The configuration string ``<device>/<image>[,<attr>...]`` may list
+    further attributes of the image device which are read together with
+    the image in one ``read_attributes`` call and passed as metadata.
+    An attribute given with the ``@`` prefix, e.g. an image counter,
+    is read before the image and the image is transferred only
+    when the attribute value has changed.
     """
 
     @debugmethod
@@ -702,6 +1936,19 @@ class TangoAttrSource(BaseSource):
         #: (:class`tango.AttributeProxy`:)
         #:      device proxy for the image attribute
         self.__aproxy = None
+        #: (:class`tango.DeviceProxy`:)
+        #:      device proxy for grouped attribute reads
+        self.__dproxy = None
+        #: (:obj:`str`) image attribute name
+        self.__attrname = None
+        #: (:obj:`list` <:obj:`str`>) names of metadata attributes
+        self.__mattrs = []
+        #: (:obj:`str`) name of the change counter attribute
+        self.__counter = None
+        #: (:obj:`any`) counter value of the last image
+        self.__lastcounter = None
+        #: ((:obj:`str`, :obj:`str`)) time and quality of the last image
+        self.__laststamp = None
         #: (:dict: <:obj:`str`, :obj:`any`>)
         #:      dictionary of external decorders
         self.__decoders = {"LIMA_VIDEO_IMAGE": VDEOdecoder(),
@@ -718,6 +1965,64 @@ class TangoAttrSource(BaseSource):
         #: (:obj:`bool`) bytearray flag
         self.__bytearray = False
 
+    def __read(self, names=None):
+        """ reads the image attribute or the given device attributes
+
+        :param names: device attribute names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: attribute value or a list of attribute values
+        :rtype: :class:`tango.DeviceAttribute` or
+                :obj:`list` <:class:`tango.DeviceAttribute`>
+        """
+        if names is None:
+            read = self.__aproxy.read
+        else:
+            def read(**kwargs):
+                return self.__dproxy.read_attributes(names, **kwargs)
+        try:
+            if not self.__bytearray:
+                return read()
+            else:
+                return read(extract_as=tango.ExtractAs.ByteArray)
+        except Exception:
+            if sys.version_info > (3,):
+                attrs = read(extract_as=tango.ExtractAs.ByteArray)
+                self.__bytearray = True
+                return attrs
+            else:
+                return read()
+
+    def __changed(self):
+        """ reads the change counter attribute
+
+        :returns: False if the counter has not changed
+                  since the last image
+        :rtype: :obj:`bool`
+        """
+        counter = self.__dproxy.read_attribute(self.__counter)
+        if self.__lastcounter is not None and \
+           str(counter.value) == str(self.__lastcounter[0]) and \
+           str(counter.quality) == str(self.__lastcounter[1]):
+            return False
+        return True
+
+    @classmethod
+    def __metadata(cls, attrs):
+        """ provides json metadata of the attribute values
+
+        :param attrs: attribute values
+        :type attrs: :obj:`list` <:class:`tango.DeviceAttribute`>
+        :returns: json dictionary with metadata
+        :rtype: :obj:`str`
+        """
+        mdata = {}
+        for attr in attrs:
+            value = attr.value
+            if hasattr(value, "tolist"):
+                value = value.tolist()
+            mdata[attr.name] = value
+        return json.dumps(mdata) if mdata else ""
+
     @debugmethod
     def getData(self):
         """ provides image name, image data and metadata
@@ -725,22 +2030,27 @@ class TangoAttrSource(BaseSource):
         :returns:  image name, image data, json dictionary with metadata
         :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
         """
-        if self.__aproxy is None:
+        if self.__aproxy is None and self.__dproxy is None:
             return "No attribute name defined", "__ERROR__", None
         try:
-            try:
-                if not self.__bytearray:
-                    attr = self.__aproxy.read()
-                else:
-                    attr = self.__aproxy.read(
-                        extract_as=tango.ExtractAs.ByteArray)
-            except Exception:
-                if sys.version_info > (3,):
-                    attr = self.__aproxy.read(
-                        extract_as=tango.ExtractAs.ByteArray)
-                    self.__bytearray = True
-                else:
-                    attr = self.__aproxy.read()
+            mdata = ""
+            if self.__dproxy is None:
+                attr = self.__read()
+            else:
+                if self.__counter and not self.__changed():
+                    return None, None, None
+                attrs = self.__read([self.__attrname] + self.__mattrs)
+                attr = attrs[0]
+                mdata = self.__metadata(attrs[1:])
+                if self.__counter:
+                    counter = attrs[self.__mattrs.index(self.__counter) + 1]
+                    self.__lastcounter = (counter.value, counter.quality)
+            # servers which set the image date do not change its time
+            # and quality until a new image is taken
+            stamp = (str(attr.time), str(attr.quality))
+            if stamp == self.__laststamp:
+                return None, None, None
+            self.__laststamp = stamp
             if str(attr.type) == "DevEncoded":
                 avalue = attr.value
                 if avalue[0] in ["RGB24", "JPEG_RGB"]:
@@ -752,15 +2062,20 @@ class TangoAttrSource(BaseSource):
                         (height, width, 4))
                     return (np.transpose(data),
                             '%s  (%s)' % (
-                                self._configuration, str(attr.time)), "")
+                                self._configuration, str(attr.time)), mdata)
                 elif avalue[0] in self.__tangodecoders:
-                    da = self.__aproxy.read(
-                        extract_as=tango.ExtractAs.Nothing)
+                    if self.__dproxy is None:
+                        da = self.__aproxy.read(
+                            extract_as=tango.ExtractAs.Nothing)
+                    else:
+                        da = self.__dproxy.read_attribute(
+                            self.__attrname,
+                            extract_as=tango.ExtractAs.Nothing)
                     enc = tango.EncodedAttribute()
                     data = getattr(enc, self.__tangodecoders[avalue[0]])(da)
                     return (np.transpose(data),
                             '%s  (%s)' % (
-                                self._configuration, str(attr.time)), "")
+                                self._configuration, str(attr.time)), mdata)
                 else:
                     dec = self.__decoders[avalue[0]]
                     dec.load(avalue)
@@ -773,7 +2088,7 @@ class TangoAttrSource(BaseSource):
                             '%s %s (%s)' % (
                                 self._configuration,
                                 fnumber,
-                                str(attr.time)), "")
+                                str(attr.time)), mdata)
             else:
                 if attr.value is not None:
                     if hasattr(attr.value, "size"):
@@ -781,7 +2096,7 @@ class TangoAttrSource(BaseSource):
                             return None, None, None
                     return (np.transpose(attr.value),
                             '%s  (%s)' % (
-                                self._configuration, str(attr.time)), "")
+                                self._configuration, str(attr.time)), mdata)
         except Exception as e:
             logger.warning(str(e))
             # print(str(e))
@@ -793,10 +2108,27 @@ class TangoAttrSource(BaseSource):
         """ connects the source
         """
         self.__bytearray = False
+        self.__lastcounter = None
+        self.__laststamp = None
         try:
             if not self._initiated:
-                self.__aproxy = tango.AttributeProxy(
-                    str(self._configuration))
+                attrs = [at.strip()
+                         for at in str(self._configuration).split(",")]
+                self.__mattrs = []
+                self.__counter = None
+                for at in attrs[1:]:
+                    if at.startswith("@"):
+                        at = at[1:].strip()
+                        self.__counter = at
+                    if at and at not in self.__mattrs:
+                        self.__mattrs.append(at)
+                if self.__mattrs:
+                    dvname, self.__attrname = attrs[0].rsplit('/', 1)
+                    self.__dproxy = tango.DeviceProxy(dvname)
+                    self.__aproxy = None
+                else:
+                    self.__aproxy = tango.AttributeProxy(attrs[0])
+                    self.__dproxy = None
             return True
         except Exception as e:
             logger.warning(str(e))
@@ -810,7 +2142,7 @@ class TangoEventsCB(object):
     """ tango attribute callback class"""
 
     @debugmethod
-    def __init__(self, client, name, mutex):
+    def __init__(self, client, name, mutex, condition=None):
         """ constructor
 
         :param client: tango controller client
@@ -819,16 +2151,19 @@ class TangoEventsCB(object):
         :type name: :obj:`str`
         :param mutex: mutex lock for CB
         :type type: :class:`pyqtgraph.QtCore.QMutex`
+        :param condition: wait condition woken on new data
+        :type condition: :class:`pyqtgraph.QtCore.QWaitCondition`
         """
         self.__client = client
         self.__name = name
         self.__mutex = mutex
+        self.__condition = condition
 
     # @debugmethod
     def push_event(self, event_data):
         """callback method receiving the event
         """
-
+        eventtime = time.time()
         if logger.getEffectiveLevel() >= 10:
             trunk = str(event_data)
             if len(trunk) > 1300:
@@ -846,7 +2181,11 @@ class TangoEventsCB(object):
                     try:
                         self.__client.reading = True
                         self.__client.attr = event_data.attr_value
+                        self.__client.events += 1
+                        self.__client.eventtime = eventtime
                         self.__client.fresh = True
+                        if self.__condition is not None:
+                            self.__condition.wakeAll()
                     finally:
                         self.__client.reading = False
 
@@ -856,7 +2195,7 @@ class TangoReadyEventsCB(object):
     """ tango attribute callback class"""
 
     @debugmethod
-    def __init__(self, client, name, mutex):
+    def __init__(self, client, name, mutex, condition=None, batch=False):
         """ constructor
 
         :param client: tango controller client
@@ -865,16 +2204,23 @@ class TangoReadyEventsCB(object):
         :type name: :obj:`str`
         :param mutex: mutex lock for CB
         :type type: :class:`pyqtgraph.QtCore.QMutex`
+        :param condition: wait condition woken on new data
+        :type condition: :class:`pyqtgraph.QtCore.QWaitCondition`
+        :param batch: leave reading of the attribute to the client
+                      which reads once for all pending events
+        :type batch: :obj:`bool`
         """
         self.__client = client
         self.__name = name
         self.__mutex = mutex
+        self.__condition = condition
+        self.__batch = batch
 
     # @debugmethod
     def push_event(self, event_data):
         """callback method receiving the event
         """
-
+        eventtime = time.time()
         if logger.getEffectiveLevel() >= 10:
             trunk = str(event_data)
             if len(trunk) > 1300:
@@ -886,6 +2232,15 @@ class TangoReadyEventsCB(object):
             result = event_data.errors
             logger.warning(str(result))
             # print(str(result))
+        elif self.__batch:
+            with QtCore.QMutexLocker(self.__mutex):
+                self.__client.events += 1
+                if not self.__client.fresh:
+                    # latency is measured from the oldest pending event
+                    self.__client.eventtime = eventtime
+                self.__client.fresh = True
+                if self.__condition is not None:
+                    self.__condition.wakeAll()
         else:
             if not self.__client.reading:
                 with QtCore.QMutexLocker(self.__mutex):
@@ -894,7 +2249,12 @@ class TangoReadyEventsCB(object):
                         _, attrnm = str(event_data.attr_name).rsplit("/", 1)
                         self.__client.attr = event_data.device.read_attribute(
                             attrnm)
+                        self.__client.events += 1
+                        self.__client.reads += 1
+                        self.__client.eventtime = eventtime
                         self.__client.fresh = True
+                        if self.__condition is not None:
+                            self.__condition.wakeAll()
                     finally:
                         self.__client.reading = False
 
@@ -916,14 +2276,33 @@ class TangoEventsSource(BaseSource):
         self.reading = False
         #: (:obj:`bool`) fresh attribute flag
         self.fresh = False
+        #: (:obj:`int`) number of received events
+        self.events = 0
+        #: (:obj:`int`) number of attribute reads
+        self.reads = 0
+        #: (:obj:`float`) reception time of the oldest undelivered event
+        self.eventtime = None
         #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock for CB
         self.__mutex = QtCore.QMutex()
+        #: (:class:`pyqtgraph.QtCore.QWaitCondition`) new event condition
+        self.__condition = QtCore.QWaitCondition()
         #: (:class`tango.DeviceProxy`:)
         #:      device proxy for the image attribute
         self.__proxy = None
         self.__attrid = None
         self.__rattrid = None
         self.attr = None
+        #: (:obj:`str`) image attribute name
+        self.__attrname = None
+        #: (:obj:`str`) subscribed event mode,
+        #:     i.e. change, user, ready or batch
+        self.__mode = None
+        #: (:obj:`int`) number of delivered frames
+        self.__frames = 0
+        #: (:obj:`float`) sum of event latencies in s
+        self.__latency = 0.0
+        #: (:obj:`float`) maximal event latency in s
+        self.__maxlatency = 0.0
         #: (:dict: <:obj:`str`, :obj:`any`>)
         #:      dictionary of external decorders
         self.__decoders = {"LIMA_VIDEO_IMAGE": VDEOdecoder(),
@@ -938,6 +2317,51 @@ class TangoEventsSource(BaseSource):
             "RGB24": "decode_rgb32"
         }
 
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until an attribute event arrives or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__proxy is None or self.fresh:
+                return True
+            self.__condition.wait(self.__mutex, int(timeout * 1000))
+            return self.fresh
+
+    def getLatency(self):
+        """ provides event statistics of the subscribed event mode
+
+        :returns: dictionary with the event mode, numbers of events,
+                  attribute reads and frames, mean and maximal latency
+                  between the event reception and the frame delivery in ms
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            return {
+                "mode": self.__mode,
+                "events": self.events,
+                "reads": self.reads,
+                "frames": self.__frames,
+                "latency": (1000. * self.__latency / self.__frames
+                            if self.__frames else 0.0),
+                "maxlatency": 1000. * self.__maxlatency
+            }
+
+    def __resetLatency(self):
+        """ resets event statistics
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.events = 0
+            self.reads = 0
+            self.eventtime = None
+            self.__frames = 0
+            self.__latency = 0.0
+            self.__maxlatency = 0.0
+
     @debugmethod
     def getData(self):
         """ provides image name, image data and metadata
@@ -949,59 +2373,111 @@ class TangoEventsSource(BaseSource):
             return "No attribute name defined", "__ERROR__", None
         try:
             with QtCore.QMutexLocker(self.__mutex):
-                if self.attr is None or not self.fresh:
+                if not self.fresh or \
+                   (self.attr is None and self.__mode != "batch"):
                     return None, None, None
                 self.fresh = False
-                if str(self.attr.type) == "DevEncoded":
-                    avalue = self.attr.value
-                    if avalue[0] in ["RGB24", "JPEG_RGB"]:
-                        image = QtGui.QImage.fromData(avalue[1])
-                        width = image.width()
-                        height = image.height()
-                        st = image.bits().asstring(width * height * 4)
-                        data = np.fromstring(st, dtype=np.uint8).reshape(
-                            (height, width, 4))
-                        return (np.transpose(data),
-                                '%s  (%s)' % (
-                                    self._configuration, str(self.attr.time)),
-                                "")
-                    elif avalue[0] in self.__tangodecoders:
-                        # da = self.__aproxy.read(
-                        #     extract_as=tango.ExtractAs.Nothing)
-                        enc = tango.EncodedAttribute()
-                        data = getattr(
-                            enc, self.__tangodecoders[avalue[0]])(self.attr)
-                        return (np.transpose(data),
-                                '%s  (%s)' % (
-                                    self._configuration,
-                                    str(self.attr.time)),
-                                "")
-                    else:
-                        dec = self.__decoders[avalue[0]]
-                        dec.load(avalue)
-                        # no need to transpose
-                        shape = dec.shape()
-                        if shape is None or shape[0] <= 0 or shape[1] <= 0:
-                            return None, None, None
-                        return (dec.decode(),
-                                '%s  (%s)' % (
-                                    self._configuration, str(self.attr.time)),
-                                "")
-                else:
-                    if self.attr.value is not None:
-                        if hasattr(self.attr.value, "size"):
-                            if self.attr.value.size == 0:
-                                return None, None, None
-                        return (np.transpose(self.attr.value),
-                                '%s  (%s)' % (
-                                    self._configuration, str(self.attr.time)),
-                                "")
+                eventtime = self.eventtime
+                self.eventtime = None
+                attr = self.attr
+            if self.__mode == "batch":
+                # one read for all ready events received since the last one
+                attr = self.__proxy.read_attribute(self.__attrname)
+                with QtCore.QMutexLocker(self.__mutex):
+                    self.reads += 1
+            result = self.__decode(attr)
+            if result[0] is not None and eventtime is not None:
+                latency = time.time() - eventtime
+                with QtCore.QMutexLocker(self.__mutex):
+                    self.__frames += 1
+                    self.__latency += latency
+                    self.__maxlatency = max(self.__maxlatency, latency)
+            return result
         except Exception as e:
             logger.warning(str(e))
             # print(str(e))
             return str(e), "__ERROR__", ""
         return None, None, None
 
+    def __decode(self, attr):
+        """ decodes the attribute value
+
+        :param attr: attribute value
+        :type attr: :class:`tango.DeviceAttribute`
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        if str(attr.type) == "DevEncoded":
+            avalue = attr.value
+            if avalue[0] in ["RGB24", "JPEG_RGB"]:
+                image = QtGui.QImage.fromData(avalue[1])
+                width = image.width()
+                height = image.height()
+                st = image.bits().asstring(width * height * 4)
+                data = np.fromstring(st, dtype=np.uint8).reshape(
+                    (height, width, 4))
+                return (np.transpose(data),
+                        '%s  (%s)' % (
+                            self._configuration, str(attr.time)),
+                        "")
+            elif avalue[0] in self.__tangodecoders:
+                # da = self.__aproxy.read(
+                #     extract_as=tango.ExtractAs.Nothing)
+                enc = tango.EncodedAttribute()
+                data = getattr(
+                    enc, self.__tangodecoders[avalue[0]])(attr)
+                return (np.transpose(data),
+                        '%s  (%s)' % (
+                            self._configuration,
+                            str(attr.time)),
+                        "")
+            else:
+                dec = self.__decoders[avalue[0]]
+                dec.load(avalue)
+                # no need to transpose
+                shape = dec.shape()
+                if shape is None or shape[0] <= 0 or shape[1] <= 0:
+                    return None, None, None
+                return (dec.decode(),
+                        '%s  (%s)' % (
+                            self._configuration, str(attr.time)),
+                        "")
+        else:
+            if attr.value is not None:
+                if hasattr(attr.value, "size"):
+                    if attr.value.size == 0:
+                        return None, None, None
+                return (np.transpose(attr.value),
+                        '%s  (%s)' % (
+                            self._configuration, str(attr.time)),
+                        "")
+        return None, None, None
+
+    def __subscribe(self, atname, mode):
+        """ subscribes events of the given mode
+
+        :param atname: attribute name
+        :type atname: :obj:`str`
+        :param mode: event mode, i.e. change, user, ready or batch
+        :type mode: :obj:`str`
+        """
+        if mode in ["change", "user"]:
+            attr_cb = TangoEventsCB(
+                self, atname, self.__mutex, self.__condition)
+            evtype = tango.EventType.CHANGE_EVENT if mode == "change" \
+                else tango.EventType.USER_EVENT
+            self.__attrid = self.__proxy.subscribe_event(
+                atname, evtype, attr_cb)
+        else:
+            rattr_cb = TangoReadyEventsCB(
+                self, atname, self.__mutex, self.__condition,
+                batch=(mode == "batch"))
+            self.__rattrid = self.__proxy.subscribe_event(
+                atname,
+                tango.EventType.DATA_READY_EVENT,
+                rattr_cb)
+        self.__mode = mode
+
     @debugmethod
     def connect(self):
         """ connects the source
@@ -1009,29 +2485,29 @@ class TangoEventsSource(BaseSource):
         try:
             if not self._initiated:
                 self.disconnect()
+                self.__resetLatency()
                 # with QtCore.QMutexLocker(self.__mutex):
                 dvname, atname = str(self._configuration).rsplit('/', 1)
-                attr_cb = TangoEventsCB(self, atname, self.__mutex)
-                rattr_cb = TangoReadyEventsCB(self, atname, self.__mutex)
+                self.__attrname = atname
                 self.__proxy = tango.DeviceProxy(dvname)
-                exc = ""
-                try:
-                    self.__attrid = self.__proxy.subscribe_event(
-                        atname,
-                        tango.EventType.CHANGE_EVENT,
-                        attr_cb)
-                except Exception as e:
-                    self.__attrid = None
-                    exc += str(e)
+                if TANGOEVENTSMODE in ["change", "user", "ready", "batch"]:
+                    self.__subscribe(atname, TANGOEVENTSMODE)
+                else:
+                    exc = ""
                     try:
-                        self.__rattrid = self.__proxy.subscribe_event(
-                            atname,
-                            tango.EventType.DATA_READY_EVENT,
-                            rattr_cb)
+                        self.__subscribe(atname, "change")
                     except Exception as e:
-                        self.__rattrid = None
+                        self.__attrid = None
                         exc += str(e)
-                        raise Exception(exc)
+                        try:
+                            self.__subscribe(atname, "batch")
+                        except Exception as e:
+                            self.__rattrid = None
+                            exc += str(e)
+                            raise Exception(exc)
+                logger.info(
+                    "TangoEventsSource.connect: %s events of %s"
+                    % (self.__mode, self._configuration))
                 self._initiated = True
             return True
         except Exception as e:
@@ -1056,6 +2532,16 @@ class TangoEventsSource(BaseSource):
                     if self.__rattrid is not None:
                         self.__proxy.unsubscribe_event(self.__rattrid)
                         self.__rattrid = None
+                stats = self.getLatency()
+                logger.info(
+                    "TangoEventsSource.disconnect: %s events: %s events, "
+                    "%s reads, %s frames, latency %.2f ms (max %.2f ms)"
+                    % (stats["mode"], stats["events"], stats["reads"],
+                       stats["frames"], stats["latency"],
+                       stats["maxlatency"]))
+                with QtCore.QMutexLocker(self.__mutex):
+                    self.fresh = False
+                    self.attr = None
         except Exception:
             self._updaterror()
 
@@ -1077,6 +2563,16 @@ class HTTPSource(BaseSource):
         self.__tiffloader = True
         #: (:obj:`dict` <:obj:`str`, :obj:`any` > ) HTTP header data
         self.__header = {}
+        #: (:class:`requests.Session`) keep-alive session
+        self.__session = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`str` > ) conditional request
+        #:      headers built from the last image response
+        self.__validators = {}
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`)
+        #:      executor of the pipelined requests
+        self.__executor = None
+        #: (:class:`concurrent.futures.Future`) pipelined request
+        self.__pending = None
 
     @debugmethod
     def getData(self):
@@ -1087,16 +2583,15 @@ class HTTPSource(BaseSource):
         """
         if self._configuration:
             try:
-                response = self.__get()
+                response = self.__next()
+                if response.status_code == 304:
+                    return None, None, None
                 if response.ok:
                     name = self._configuration
                     data = response.content
+                    nimg = tobuffer(data)
                     if data[:10] == b"###CBF: VE":
                         # print("[cbf source module]::metadata", name)
-                        try:
-                            nimg = np.frombuffer(data[:], dtype=np.uint8)
-                        except Exception:
-                            nimg = np.fromstring(data[:], dtype=np.uint8)
                         img = imageFileHandler.CBFLoader().load(nimg)
                         if img is None:
                             return None, None, None
@@ -1109,10 +2604,9 @@ class HTTPSource(BaseSource):
                         if PILLOW and not self.__tiffloader:
                             try:
                                 img = np.array(
-                                    PIL.Image.open(BytesIO(str(data))))
+                                    PIL.Image.open(BytesIO(data)))
                             except Exception:
-                                img = imageFileHandler.TIFLoader().load(
-                                    np.fromstring(data[:], dtype=np.uint8))
+                                img = imageFileHandler.TIFLoader().load(nimg)
                                 self.__tiffloader = True
                             if img is None:
                                 return None, None, None
@@ -1121,8 +2615,7 @@ class HTTPSource(BaseSource):
                             return (np.transpose(img),
                                     "%s (%s)" % (name, time.ctime()), "")
                         else:
-                            img = imageFileHandler.TIFLoader().load(
-                                np.fromstring(data[:], dtype=np.uint8))
+                            img = imageFileHandler.TIFLoader().load(nimg)
                             if img is None:
                                 return None, None, None
                             if hasattr(img, "size") and img.size == 0:
@@ -1146,6 +2639,22 @@ class HTTPSource(BaseSource):
                     return str(response.text), "__ERROR__", None
         return "No url defined", "__ERROR__", None
 
+    # @debugmethod
+    def __next(self):
+        """ get the current response and in the pipelined mode
+        send the following request
+
+        :returns: response object
+        :rtype: :class:`requests.Response`
+        """
+        if self.__executor is None:
+            return self.__get()
+        pending = self.__pending
+        self.__pending = None
+        response = pending.result() if pending is not None else self.__get()
+        self.__pending = self.__executor.submit(self.__get)
+        return response
+
     # @debugmethod
     def __get(self):
         """ get response
@@ -1153,21 +2662,32 @@ class HTTPSource(BaseSource):
         :returns: response object
         :rtype: :class:`requests.Response`
         """
-        if self.__header:
-            try:
-                return requests.get(
-                    self._configuration, headers=self.__header,
-                    timeout=(self._timeout/1000. if self._timeout else None))
-            except AttributeError:
-                return requests.get(
-                    self._configuration, headers=self.__header)
-        else:
-            try:
-                return requests.get(
-                    self._configuration,
-                    timeout=(self._timeout/1000. if self._timeout else None))
-            except AttributeError:
-                return requests.get(self._configuration)
+        session = self.__session if self.__session is not None else requests
+        headers = dict(self.__header)
+        headers.update(self.__validators)
+        response = session.get(
+            self._configuration, headers=(headers or None),
+            timeout=(self._timeout/1000. if self._timeout else None))
+        if response.status_code == 200:
+            validators = {}
+            etag = response.headers.get("ETag")
+            if etag:
+                validators["If-None-Match"] = etag
+            modified = response.headers.get("Last-Modified")
+            if modified:
+                validators["If-Modified-Since"] = modified
+            self.__validators = validators
+        return response
+
+    def __stopPipeline(self):
+        """ drops the pipelined request and stops its executor
+        """
+        if self.__pending is not None:
+            self.__pending.cancel()
+            self.__pending = None
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
 
     @debugmethod
     def connect(self):
@@ -1187,7 +2707,16 @@ class HTTPSource(BaseSource):
                             x * (100 ** i) for i, x in enumerate(lst))
                         if lversion >= 10800:
                             self.__header = {'Accept': 'application/tiff'}
+                self.__stopPipeline()
+                if self.__session is None:
+                    self.__session = requests.Session()
+                self.__validators = {}
                 self.__get()
+                # the first frame is always fetched in full
+                self.__validators = {}
+                if HTTPPIPELINING and FUTURES:
+                    self.__executor = \
+                        concurrent.futures.ThreadPoolExecutor(1)
             return True
         except Exception as e:
             logger.warning(str(e))
@@ -1195,6 +2724,19 @@ class HTTPSource(BaseSource):
             self._updaterror()
             return False
 
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        try:
+            self.__stopPipeline()
+            if self.__session is not None:
+                self.__session.close()
+        except Exception:
+            pass
+        self.__session = None
+        self.__validators = {}
+
 
 class ZMQSource(BaseSource):
 
@@ -1221,6 +2763,32 @@ class ZMQSource(BaseSource):
         self.__bindaddress = None
         #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock for zmq source
         self.__mutex = QtCore.QMutex()
+        #: (:class:`zmq.Poller`) zmq poller
+        self.__poller = zmq.Poller()
+        #: (:obj:`dict` <:obj:`bytes`, (:obj:`tuple` <:obj:`bytes`>,
+        #:    :obj:`any`) >) the last raw header parts and their decoded
+        #:    content for each topic
+        self.__headers = {}
+        #: (:class:`PayloadDecompressor`) decompressor of image payloads
+        self.__decompressor = None
+
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until a message arrives or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__socket is None:
+                return True
+            try:
+                return bool(self.__poller.poll(int(timeout * 1000)))
+            except zmq.ZMQError as e:
+                logger.warning(str(e))
+                return True
 
     @debugmethod
     def setConfiguration(self, configuration):
@@ -1271,6 +2839,30 @@ class ZMQSource(BaseSource):
                 metadata = json.loads(smessage)
         return metadata
 
+    # @debugmethod
+    def __cachedloads(self, topic, messages, encoding=None):
+        """ loads json or pickle header parts reusing the decoded content
+        if the raw parts have not changed since the last frame of the topic
+
+        :param topic: zmq topic
+        :type topic: :obj:`bytes`
+        :param messages: raw header parts
+        :type messages: :obj:`list` <:obj:`bytes`>
+        :param encoding: JSON or PICKLE
+        :type encoding: :obj:`str`
+        :returns: list of decoded header parts
+        :rtype: :obj:`list` <:obj:`any`>
+        """
+        key = (tuple(messages), encoding)
+        cached = self.__headers.get(topic)
+        if cached is not None and cached[0] == key:
+            values = cached[1]
+        else:
+            values = [self.__loads(msg, encoding) for msg in messages]
+            self.__headers[topic] = (key, values)
+        return [dict(val) if isinstance(val, dict) else val
+                for val in values]
+
     @debugmethod
     def getData(self):
         """ provides image name, image data and metadata
@@ -1283,7 +2875,11 @@ class ZMQSource(BaseSource):
             return "No socket defined", "__ERROR__", None
         try:
             with QtCore.QMutexLocker(self.__mutex):
-                message = self.__socket.recv_multipart(flags=zmq.NOBLOCK)
+                frames = self.__socket.recv_multipart(
+                    flags=zmq.NOBLOCK, copy=False)
+            # only the image part stays as a zero-copy zmq.Frame
+            message = [fr.bytes if idx != 1 else fr
+                       for idx, fr in enumerate(frames)]
             topic = None
             _array = None
             shape = None
@@ -1303,6 +2899,8 @@ class ZMQSource(BaseSource):
                 encoding = "PICKLE"
                 lmsg -= 1
                 message.pop()
+            if lmsg == 2:
+                message[1] = frames[1].bytes
 
             # print("topic %s %s" % (topic, self.__topic))
             if topic == b"datasources" and lmsg == 2:
@@ -1330,7 +2928,8 @@ class ZMQSource(BaseSource):
             elif self.__topic == b"" or tobytes(topic) == self.__topic:
                 if lmsg == 3:
                     (topic, _array, _metadata) = message
-                    metadata = self.__loads(_metadata, encoding)
+                    metadata, = self.__cachedloads(
+                        topic, [_metadata], encoding)
                     shape = metadata["shape"]
                     dtype = metadata["dtype"]
                     if "name" in metadata:
@@ -1347,13 +2946,28 @@ class ZMQSource(BaseSource):
                         (topic, _array, _shape, _dtype, name) = message
                         if not isinstance(name, str):
                             name = tostr(name)
-                    dtype = self.__loads(_dtype, encoding)
-                    shape = self.__loads(_shape, encoding)
+                    dtype, shape = self.__cachedloads(
+                        topic, [_dtype, _shape], encoding)
 
             if _array is not None:
-                array = np.frombuffer(buffer(_array), dtype=dtype)
-                array = array.reshape(shape)
-                array = np.transpose(array)
+                # the array keeps the zmq.Frame buffer alive
+                if hasattr(_array, "buffer"):
+                    _array = _array.buffer
+                compression = None
+                if metadata:
+                    compression = metadata.pop("compression", None)
+                    blocks = metadata.pop("blocks", None)
+                    blocksize = metadata.pop("blocksize", None)
+                if compression:
+                    if self.__decompressor is None:
+                        self.__decompressor = PayloadDecompressor(
+                            DECODEWORKERS)
+                    array = self.__decompressor.decompress(
+                        _array, shape, dtype, compression,
+                        blocks, blocksize)
+                else:
+                    array = np.frombuffer(_array, dtype=dtype)
+                    array = array.reshape(shape)
                 self.__counter += 1
                 jmetadata = ""
                 if metadata:
@@ -1365,7 +2979,7 @@ class ZMQSource(BaseSource):
                         pass
                 if hasattr(array, "size") and array.size == 0:
                     return ("", "", jmetadata)
-                return (np.transpose(array), name, jmetadata)
+                return (array, name, jmetadata)
 
         except zmq.Again:
             pass
@@ -1401,6 +3015,7 @@ class ZMQSource(BaseSource):
                     self.__socket.setsockopt(zmq.SUBSCRIBE, b"datasources")
                     # self.__socket.setsockopt(zmq.SUBSCRIBE, "")
                     self.__socket.connect(self.__bindaddress)
+                    self.__poller.register(self.__socket, zmq.POLLIN)
                 time.sleep(0.2)
             return True
         except Exception as e:
@@ -1417,6 +3032,10 @@ class ZMQSource(BaseSource):
         try:
             with QtCore.QMutexLocker(self.__mutex):
                 if self.__socket:
+                    try:
+                        self.__poller.unregister(self.__socket)
+                    except KeyError:
+                        pass
                     if self.__bindaddress:
                         self.__socket.unbind(self.__bindaddress)
                     self.__socket.close(linger=0)
@@ -1427,6 +3046,320 @@ class ZMQSource(BaseSource):
             pass
         with QtCore.QMutexLocker(self.__mutex):
             self.__bindaddress = None
+        if self.__decompressor is not None:
+            self.__decompressor.shutdown()
+            self.__decompressor = None
+
+    def __del__(self):
+        """ destructor
+        """
+        self.disconnect()
+        self.__context.destroy()
+
+
+class ZMQFanInSource(BaseSource):
+
+    """ image source assembling detector modules from several ZMQ streams
+    """
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+
+        #: (:class:`zmq.Context`) zmq context
+        self.__context = zmq.Context()
+        #: (:obj:`list` <:class:`zmq.Socket`>) zmq sockets of modules
+        self.__sockets = []
+        #: (:obj:`list` <:obj:`str`>) zmq addresses of modules
+        self.__addresses = []
+        #: (:obj:`bytes`) zmq topic
+        self.__topic = b""
+        #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock for zmq sockets
+        self.__mutex = QtCore.QMutex()
+        #: (:class:`zmq.Poller`) zmq poller of all module sockets
+        self.__poller = zmq.Poller()
+        #: (:obj:`float`) waiting time for missing modules in s
+        self.__waittime = 1.0
+        #: (:obj:`bool`) emit frames with missing modules after waiting time
+        self.__fill = False
+        #: (:obj:`dict` <:obj:`any`, :obj:`dict` <:obj:`str`, :obj:`any`>>)
+        #:    pending frames with the first arrival time and module parts
+        self.__pending = {}
+        #: (:obj:`list` <:obj:`tuple` >) the last module shapes, types
+        #:    and origins
+        self.__modules = []
+        #: (:obj:`list` <:obj:`int`>) message counters of modules
+        self.__counters = []
+        #: (:class:`PayloadDecompressor`) decompressor of image payloads
+        self.__decompressor = None
+        #: (:obj:`int`) a number of assembled frames
+        self.frames = 0
+        #: (:obj:`int`) a number of frames emitted with missing modules
+        self.filled = 0
+        #: (:obj:`int`) a number of dropped frames
+        self.dropped = 0
+
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until a message arrives or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if not self.__sockets:
+                return True
+            if self.__pending:
+                # pending frames can time out
+                timeout = min(timeout, self.__waittime)
+            try:
+                return bool(self.__poller.poll(int(timeout * 1000))) \
+                    or bool(self.__pending)
+            except zmq.ZMQError as e:
+                logger.warning(str(e))
+                return True
+
+    def __loads(self, message, encoding=None):
+        """ loads json or pickle string
+
+        :param message: message to encode
+        :type message: :obj:`str`
+        :param encoding: JSON or PICKLE
+        :type encoding: :obj:`str`
+        :returns: encoded message object
+        :rtype: :obj:`any`
+        """
+        if encoding == "JSON":
+            return json.loads(tostr(message))
+        try:
+            return cPickle.loads(message)
+        except Exception:
+            return json.loads(tostr(message))
+
+    def __receive(self, module, frames):
+        """ stores a received module image in its pending frame
+
+        :param module: module index
+        :type module: :obj:`int`
+        :param frames: zmq message frames
+        :type frames: :obj:`list` <:class:`zmq.Frame`>
+        """
+        encoding = None
+        if frames[-1].bytes in [b"JSON", b"PICKLE"]:
+            encoding = tostr(frames[-1].bytes)
+            frames = frames[:-1]
+        if len(frames) != 3 or frames[0].bytes == b"datasources":
+            return
+        metadata = self.__loads(frames[2].bytes, encoding)
+        shape = metadata.pop("shape")
+        dtype = metadata.pop("dtype")
+        compression = metadata.pop("compression", None)
+        blocks = metadata.pop("blocks", None)
+        blocksize = metadata.pop("blocksize", None)
+        if compression:
+            if self.__decompressor is None:
+                self.__decompressor = PayloadDecompressor(DECODEWORKERS)
+            array = self.__decompressor.decompress(
+                frames[1].buffer, shape, dtype, compression,
+                blocks, blocksize)
+        else:
+            # the array keeps the zmq.Frame buffer alive
+            array = np.frombuffer(
+                frames[1].buffer, dtype=dtype).reshape(shape)
+        self.__counters[module] += 1
+        frameid = self.__counters[module]
+        for key in FRAMEKEYS:
+            if key in metadata:
+                frameid = metadata.pop(key)
+                break
+        origin = metadata.pop("origin", None)
+        self.__modules[module] = (
+            array.shape, array.dtype,
+            tuple(origin) if origin is not None else None)
+        pending = self.__pending.setdefault(
+            frameid, {"time": time.time(), "parts": {}})
+        pending["parts"][module] = (array, metadata)
+
+    def __assemble(self, frameid, parts):
+        """ assembles module images of the frame. Modules are placed at
+        their origin metadata or stacked along the first axis
+
+        :param frameid: frame id
+        :type frameid: :obj:`any`
+        :param parts: module images with their metadata
+        :type parts: :obj:`dict` <:obj:`int`, (:class:`numpy.ndarray`,
+                     :obj:`dict` <:obj:`str`, :obj:`any`>)>
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        origins = []
+        position = 0
+        dtypes = []
+        for module, (shape, dtype, origin) in enumerate(self.__modules):
+            if origin is None:
+                origin = (position, 0)
+            origins.append(origin)
+            position = origin[0] + shape[0]
+            if module in parts:
+                dtypes.append(dtype)
+        dtype = np.result_type(*dtypes)
+        missing = [module for module in range(len(self.__modules))
+                   if module not in parts]
+        if missing and dtype.kind in "iub":
+            # missing modules of integer images are masked with NaN
+            dtype = np.result_type(dtype, np.float32)
+        fullshape = [max(org[0] + module[0][0] for org, module
+                         in zip(origins, self.__modules)),
+                     max(org[1] + module[0][1] for org, module
+                         in zip(origins, self.__modules))]
+        fullshape += list(self.__modules[0][0][2:])
+        image = np.zeros(fullshape, dtype=dtype)
+        if missing:
+            image.fill(np.nan)
+        metadata = {}
+        for module, (array, mdata) in sorted(parts.items()):
+            org = origins[module]
+            image[org[0]:org[0] + array.shape[0],
+                  org[1]:org[1] + array.shape[1]] = array
+            metadata.update(mdata)
+        if missing:
+            metadata["missingmodules"] = missing
+        name = metadata.pop(
+            "name", "%s/%s (%s)" % (
+                ",".join(self.__addresses), tostr(self.__topic), frameid))
+        jmetadata = ""
+        if metadata:
+            try:
+                jmetadata = json.dumps(metadata)
+            except Exception:
+                pass
+        return image, name, jmetadata
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        if not self.__sockets:
+            return "No socket defined", "__ERROR__", None
+        try:
+            with QtCore.QMutexLocker(self.__mutex):
+                ready = dict(self.__poller.poll(0))
+                while ready:
+                    for module, sock in enumerate(self.__sockets):
+                        if sock in ready:
+                            try:
+                                self.__receive(
+                                    module, sock.recv_multipart(
+                                        flags=zmq.NOBLOCK, copy=False))
+                            except zmq.Again:
+                                pass
+                    ready = dict(self.__poller.poll(0))
+            nmodules = len(self.__sockets)
+            now = time.time()
+            complete = [fid for fid, pending in self.__pending.items()
+                        if len(pending["parts"]) == nmodules]
+            expired = [fid for fid, pending in self.__pending.items()
+                       if now - pending["time"] >= self.__waittime]
+            frameid = None
+            if complete:
+                frameid = max(complete, key=lambda fid: (
+                    self.__pending[fid]["time"], fid))
+            elif expired and self.__fill and None not in self.__modules:
+                frameid = max(expired, key=lambda fid: (
+                    self.__pending[fid]["time"], fid))
+            if frameid is not None:
+                ftime = self.__pending[frameid]["time"]
+                # older frames cannot be shown anymore
+                for fid in list(self.__pending.keys()):
+                    if fid != frameid and self.__pending[fid]["time"] <= ftime:
+                        self.__pending.pop(fid)
+                        self.dropped += 1
+                parts = self.__pending.pop(frameid)["parts"]
+                if len(parts) < nmodules:
+                    self.filled += 1
+                self.frames += 1
+                return self.__assemble(frameid, parts)
+            for fid in expired:
+                self.__pending.pop(fid)
+                self.dropped += 1
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+        return None, None, None
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            self.disconnect()
+            cnf = str(self._configuration).split("/")
+            endpoints = [ep.strip() for ep in cnf[0].split(",")
+                         if ep.strip()]
+            self.__topic = tobytes(cnf[1] if len(cnf) > 1 else "")
+            hwm = int(cnf[2]) if (len(cnf) > 2 and cnf[2]) else 2
+            if len(cnf) > 3 and cnf[3]:
+                self.__waittime = float(cnf[3]) / 1000.
+            self.__fill = len(cnf) > 4 and cnf[4].lower() == "fill"
+            if not endpoints:
+                raise Exception("ZMQFanInSource: no endpoints defined")
+            with QtCore.QMutexLocker(self.__mutex):
+                for endpoint in endpoints:
+                    host, port = endpoint.split(":")
+                    address = 'tcp://%s:%s' % (
+                        socket.gethostbyname(host), int(port))
+                    sock = self.__context.socket(zmq.SUB)
+                    sock.set_hwm(hwm)
+                    sock.setsockopt(zmq.SUBSCRIBE, self.__topic)
+                    sock.connect(address)
+                    self.__poller.register(sock, zmq.POLLIN)
+                    self.__sockets.append(sock)
+                    self.__addresses.append(address)
+                self.__modules = [None] * len(self.__sockets)
+                self.__counters = [0] * len(self.__sockets)
+            self.frames = 0
+            self.filled = 0
+            self.dropped = 0
+            return True
+        except Exception as e:
+            self.disconnect()
+            logger.warning(str(e))
+            # print(str(e))
+            self._updaterror()
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__sockets:
+                logger.info(
+                    "ZMQFanInSource: %s frames, %s with missing modules, "
+                    "%s dropped" % (self.frames, self.filled, self.dropped))
+            for sock in self.__sockets:
+                try:
+                    self.__poller.unregister(sock)
+                except KeyError:
+                    pass
+                sock.close(linger=0)
+            self.__sockets = []
+            self.__addresses = []
+            self.__pending = {}
+        if self.__decompressor is not None:
+            self.__decompressor.shutdown()
+            self.__decompressor = None
 
     def __del__(self):
         """ destructor
@@ -1474,12 +3407,22 @@ class ASAPOSource(BaseSource):
         self.__mutex = QtCore.QMutex()
         #: (:obj:`bool`) use tiff loader
         self.__tiffloader = False
-        #: (:obj:`int`) counter
-        self.__subcounter = 0
-        #: (:obj:`int`) counter max
-        self.__subcntmax = 10
-        #: (:obj:`str`) counter max
+        #: (:obj:`float`) time of the last substream list update
+        self.__metatime = 0
+        #: (:obj:`float`) substream list update period in s
+        self.__metaperiod = 1.0
+        #: (:obj:`str`) the last json substream metadata
         self.__lastjsubmeta = None
+        #: (:class:`DecodePool`) pool of decode workers
+        self.__pool = None
+        #: (:obj:`bool`) the last frame was unchanged at the last call
+        self.__unchanged = False
+        #: (:obj:`str`) substream followed with get_next
+        self.__nextsubstream = None
+        #: (:obj:`int`) frames fetched since the last stream size check
+        self.__lagcounter = 0
+        #: (:obj:`int`) number of frames between stream size checks
+        self.__lagperiod = 10
 
     @debugmethod
     def setConfiguration(self, configuration):
@@ -1495,8 +3438,9 @@ class ASAPOSource(BaseSource):
                  self.__token) = str(configuration).split(",", 5)
                 self.__lastname = ""
                 self.__lastid = ""
-                self.__subcounter = 0
+                self.__metatime = 0
                 self.__lastjsubmeta = None
+                self.__nextsubstream = None
                 self._configuration = configuration
             except Exception as e:
                 logger.warning(str(e))
@@ -1542,6 +3486,7 @@ class ASAPOSource(BaseSource):
         """ connects the source
         """
         self.__tiffloader = False
+        self.__setPool()
         try:
 
             with QtCore.QMutexLocker(self.__mutex):
@@ -1555,7 +3500,9 @@ class ASAPOSource(BaseSource):
                     self.__lastname = ""
                     self.__lastid = ""
                     self.__lastjsubmeta = None
-                    self.__subcounter = 0
+                    self.__metatime = 0
+                    self.__unchanged = False
+                    self.__nextsubstream = None
 
             # print("BORKER %s" % self.__broker)
             logger.info(
@@ -1582,6 +3529,100 @@ class ASAPOSource(BaseSource):
             self._initiated = False
         except Exception:
             self._updaterror()
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def __setPool(self):
+        """ creates a pool of decode workers if they are required
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+        if DECODEWORKERS and FUTURES:
+            self.__pool = DecodePool(DECODEWORKERS)
+
+    def __isLast(self, metadata):
+        """ checks if metadata describe the last fetched frame
+
+        :param metadata: asapo metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: True if the frame was already fetched
+        :rtype: :obj:`bool`
+        """
+        return bool(self.__lastid and self.__lastname) and \
+            metadata["_id"] == self.__lastid and \
+            metadata["name"] == self.__lastname
+
+    def __getLast(self, substream):
+        """ fetches the last frame of the substream if it is new.
+        The payload comes with the first request unless the frame
+        was unchanged at the previous call
+
+        :param substream: substream name
+        :type substream: :obj:`str`
+        :returns: data and metadata or (None, None) if no new frame
+        :rtype: (:class:`numpy.ndarray`, :obj:`dict` <:obj:`str`, :obj:`any`>)
+        """
+        if self.__unchanged:
+            _, metadata = self.__broker.get_last(
+                self.__group_id, substream=substream, meta_only=True)
+            if self.__isLast(metadata):
+                return None, None
+        data, metadata = self.__broker.get_last(
+            self.__group_id, substream=substream, meta_only=False)
+        self.__unchanged = self.__isLast(metadata)
+        if self.__unchanged:
+            return None, None
+        return data, metadata
+
+    def __skipAhead(self, substream):
+        """ fetches the last frame and continues the stream after it
+
+        :param substream: substream name
+        :type substream: :obj:`str`
+        :returns: data and metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`dict` <:obj:`str`, :obj:`any`>)
+        """
+        self.__lagcounter = 0
+        data, metadata = self.__broker.get_last(
+            self.__group_id, substream=substream, meta_only=False)
+        self.__broker.set_lastread_marker(
+            metadata["_id"], self.__group_id, substream=substream)
+        self.__nextsubstream = substream
+        if self.__isLast(metadata):
+            return None, None
+        return data, metadata
+
+    def __getNext(self, substream):
+        """ fetches the next frame of the substream. It skips to the last
+        frame when the source is more than ASAPOMAXLAG frames behind
+
+        :param substream: substream name
+        :type substream: :obj:`str`
+        :returns: data and metadata or (None, None) if no new frame
+        :rtype: (:class:`numpy.ndarray`, :obj:`dict` <:obj:`str`, :obj:`any`>)
+        """
+        if self.__nextsubstream != substream:
+            return self.__skipAhead(substream)
+        try:
+            data, metadata = self.__broker.get_next(
+                self.__group_id, substream=substream, meta_only=False)
+        except Exception as e:
+            if type(e).__name__ not in [
+                    "AsapoEndOfStreamError", "AsapoNoDataError"]:
+                raise
+            if getattr(e, "next_substream", None):
+                # the substream is finished, update the substream list
+                self.__metatime = 0
+            return None, None
+        self.__lagcounter += 1
+        if self.__lagcounter >= self.__lagperiod:
+            self.__lagcounter = 0
+            size = self.__broker.get_current_size(substream=substream)
+            if size - metadata["_id"] > ASAPOMAXLAG:
+                return self.__skipAhead(substream)
+        return data, metadata
 
     @debugmethod
     def getData(self):
@@ -1603,8 +3644,8 @@ class ASAPOSource(BaseSource):
         jsubmeta = None
         try:
             with QtCore.QMutexLocker(self.__mutex):
-                check = True
-                if self.__subcounter == 0:
+                if time.time() - self.__metatime >= self.__metaperiod:
+                    self.__metatime = time.time()
                     submeta = self.getMetaData()
                     if submeta:
                         jsubmeta = json.dumps(submeta)
@@ -1612,29 +3653,23 @@ class ASAPOSource(BaseSource):
                             jsubmeta = None
                         else:
                             self.__lastjsubmeta = jsubmeta
-                self.__subcounter += 1
-                if self.__subcntmax == self.__subcounter:
-                    self.__subcounter = 0
 
                 substream = self.__substream or "default"
                 if self.__substream == "**ALL**" and self.__substreams:
                     substream = self.__substreams[-1]
 
-                if self.__lastid and self.__lastname:
-                    _, metadata = self.__broker.get_last(
-                        self.__group_id, substream=substream, meta_only=True)
-                    curname, curid = metadata["name"], metadata["_id"]
-                    if curname == self.__lastname and curid == self.__lastid:
-                        check = False
-                if not check:
+                if ASAPOMAXLAG > 0:
+                    data, metadata = self.__getNext(substream)
+                else:
+                    self.__nextsubstream = None
+                    data, metadata = self.__getLast(substream)
+                if metadata is None:
                     if jsubmeta:
                         return "", "", jsubmeta
+                    if self.__pool is not None:
+                        return self.__pool.result(wait=True)
                     return None, None, None
 
-                data, metadata = self.__broker.get_last(
-                    self.__group_id,
-                    substream=substream,
-                    meta_only=False)
                 self.__lastname = str(metadata["name"] or "")
                 self.__lastid = metadata["_id"]
                 imagename = "%s (%s)" % (self.__lastname, self.__lastid)
@@ -1644,109 +3679,133 @@ class ASAPOSource(BaseSource):
         except Exception as e:
             logger.warning(str(e))
 
-        if metadata is not None and data is not None:
-            # print("data", str(data)[:10])
-            nameext = ""
-            if self.__lastname:
-                _, nameext = os.path.splitext(self.__lastname)
-            if nameext in [".nxs", ".h5", "nx", "ndf", "hdf"]:
-                try:
-                    handler = imageFileHandler.NexusFieldHandler()
-                    handler.frombuffer(data[:], self.__lastname)
-                    nexus_path = None
-                    if "meta" in metadata.keys() and \
-                       "nexus_path" in metadata["meta"].keys():
-                        nexus_path = metadata["meta"]["nexus_path"]
-                    frame = None
-                    if "meta" in metadata.keys() and \
-                       "nexus_image_frame" in metadata["meta"].keys():
-                        try:
-                            frame = int(
-                                metadata["meta"]["nexus_image_frame"])
-                        except Exception as e:
-                            logger.warning(str(e))
-                    node = handler.getNode(nexus_path)
+        received = metadata is not None and data is not None
+        if self.__pool is None:
+            if received:
+                return self.__decode(
+                    data, metadata, self.__lastname, imagename,
+                    submeta, jsubmeta)
+        elif received:
+            self.__pool.submit(
+                self.__decode, data, metadata, self.__lastname, imagename,
+                submeta, jsubmeta)
+            return self.__pool.result()
+        elif not jsubmeta:
+            return self.__pool.result(wait=True)
+        if jsubmeta:
+            return "", "", jsubmeta
+        return None, None, None
+
+    def __decode(self, data, metadata, name, imagename, submeta, jsubmeta):
+        """ decodes received image
+
+        :param data: image file content
+        :type data: :class:`numpy.ndarray` or :obj:`bytes`
+        :param metadata: asapo metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param name: file name
+        :type name: :obj:`str`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param submeta: substream metadata
+        :type submeta: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param jsubmeta: changed substream metadata json string
+        :type jsubmeta: :obj:`str`
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        # print("data", str(data)[:10])
+        nameext = ""
+        if name:
+            _, nameext = os.path.splitext(name)
+        if nameext in [".nxs", ".h5", "nx", "ndf", "hdf"]:
+            image = None
+            mdata = ""
+            frame = None
+            try:
+                handler = imageFileHandler.NexusFieldHandler()
+                handler.frombuffer(data[:], name)
+                nexus_path = None
+                if "meta" in metadata.keys() and \
+                   "nexus_path" in metadata["meta"].keys():
+                    nexus_path = metadata["meta"]["nexus_path"]
+                if "meta" in metadata.keys() and \
+                   "nexus_image_frame" in metadata["meta"].keys():
                     try:
-                        mdata = handler.getMetaData(node, submeta)
+                        frame = int(
+                            metadata["meta"]["nexus_image_frame"])
                     except Exception as e:
                         logger.warning(str(e))
-                    image = handler.getImage(
-                        node, frame)
+                node = handler.getNode(nexus_path)
+                try:
+                    mdata = handler.getMetaData(node, submeta)
                 except Exception as e:
                     logger.warning(str(e))
-                if image is not None:
-                    if hasattr(image, "size") and image.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if hasattr(image, "shape") and \
-                       len(image.shape) == 3 and image.shape[0] == 1:
-                        return (np.transpose(image[0, :, :]), imagename, mdata)
-                    elif (frame is None and hasattr(image, "shape") and
-                          len(image.shape) > 2):
-                        return (np.swapaxes(image, 1, 2), imagename, mdata)
-                    else:
-                        return (np.transpose(image), imagename, mdata)
-                return None, None, None
-            elif (((type(data).__name__ == "ndarray") and
-                   np.all(data[:10] == np.fromstring(
-                       "###CBF: VE", dtype=np.int8))) or
-                  data[:10] == b"###CBF: VE"):
-                # print("[cbf source module]::metadata", metadata["filename"])
-                logger.info(
-                    "ASAPOSource.getData: "
-                    "[cbf source module]::metadata %s" % metadata["name"])
-                if type(data).__name__ == "ndarray":
-                    npdata = np.array(data[:], dtype="uint8")
+                image = handler.getImage(
+                    node, frame)
+            except Exception as e:
+                logger.warning(str(e))
+            if image is not None:
+                if hasattr(image, "size") and image.size == 0:
+                    if jsubmeta:
+                        return "", "", jsubmeta
+                    return None, None, None
+                if hasattr(image, "shape") and \
+                   len(image.shape) == 3 and image.shape[0] == 1:
+                    return (np.transpose(image[0, :, :]), imagename, mdata)
+                elif (frame is None and hasattr(image, "shape") and
+                      len(image.shape) > 2):
+                    return (np.swapaxes(image, 1, 2), imagename, mdata)
                 else:
-                    try:
-                        npdata = np.frombuffer(data[:], dtype=np.uint8)
-                    except Exception:
-                        npdata = np.fromstring(data[:], dtype=np.uint8)
-                img = imageFileHandler.CBFLoader().load(npdata)
+                    return (np.transpose(image), imagename, mdata)
+            return None, None, None
+        npdata = tobuffer(data)
+        if npdata[:10].tobytes() == b"###CBF: VE":
+            # print("[cbf source module]::metadata", metadata["filename"])
+            logger.info(
+                "ASAPOSource.getData: "
+                "[cbf source module]::metadata %s" % metadata["name"])
+            img = imageFileHandler.CBFLoader().load(npdata)
 
-                mdata = imageFileHandler.CBFLoader().metadata(npdata, submeta)
+            mdata = imageFileHandler.CBFLoader().metadata(npdata, submeta)
 
+            if hasattr(img, "size") and img.size == 0:
+                if jsubmeta:
+                    return "", "", jsubmeta
+                return None, None, None
+            return np.transpose(img), imagename, mdata
+        else:
+            # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
+            # print("[tif source module]::metadata", metadata["name"])
+            logger.info(
+                "ASAPOSource.getData:"
+                "[tif source module]::metadata %s" % metadata["name"])
+            if PILLOW and not self.__tiffloader:
+                try:
+                    img = np.array(PIL.Image.open(BytesIO(npdata)))
+                except Exception:
+                    img = imageFileHandler.TIFLoader().load(npdata)
+                    self.__tiffloader = True
                 if hasattr(img, "size") and img.size == 0:
                     if jsubmeta:
                         return "", "", jsubmeta
                     return None, None, None
-                return np.transpose(img), imagename, mdata
+                if img is not None:
+                    return np.transpose(img), imagename, jsubmeta
             else:
-                # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
-                # print("[tif source module]::metadata", metadata["name"])
-                logger.info(
-                    "ASAPOSource.getData:"
-                    "[tif source module]::metadata %s" % metadata["name"])
-                if PILLOW and not self.__tiffloader:
-                    try:
-                        img = np.array(PIL.Image.open(BytesIO(str(data))))
-                    except Exception:
-                        img = imageFileHandler.TIFLoader().load(
-                            np.fromstring(data[:], dtype=np.uint8))
-                        self.__tiffloader = True
-                    if hasattr(img, "size") and img.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), imagename, jsubmeta
-                else:
-                    img = imageFileHandler.TIFLoader().load(
-                        np.fromstring(data[:], dtype=np.uint8))
-                    if hasattr(img, "size") and img.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), imagename, jsubmeta
+                img = imageFileHandler.TIFLoader().load(npdata)
+                if hasattr(img, "size") and img.size == 0:
+                    if jsubmeta:
+                        return "", "", jsubmeta
+                    return None, None, None
+                if img is not None:
+                    return np.transpose(img), imagename, jsubmeta
 
-            #     print(
-            #       "[unknown source module]::metadata", metadata["name"])
-        else:
-            if jsubmeta:
-                return "", "", jsubmeta
-            return None, None, None
+        #     print(
+        #       "[unknown source module]::metadata", metadata["name"])
+        if jsubmeta:
+            return "", "", jsubmeta
+        return None, None, None
 
 
 class HiDRASource(BaseSource):
@@ -1779,6 +3838,8 @@ class HiDRASource(BaseSource):
         self.__mutex = QtCore.QMutex()
         #: (:obj:`bool`) use tiff loader
         self.__tiffloader = False
+        #: (:class:`DecodePool`) pool of decode workers
+        self.__pool = None
 
     # @debugmethod
     def setConfiguration(self, configuration):
@@ -1813,6 +3874,7 @@ class HiDRASource(BaseSource):
         """ connects the source
         """
         self.__tiffloader = False
+        self.__setPool()
         try:
             if self.__query is None:
                 raise Exception(
@@ -1848,6 +3910,18 @@ class HiDRASource(BaseSource):
             self._initiated = False
         except Exception:
             self._updaterror()
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def __setPool(self):
+        """ creates a pool of decode workers if they are required
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+        if DECODEWORKERS and FUTURES:
+            self.__pool = DecodePool(DECODEWORKERS)
 
     @debugmethod
     def getData(self):
@@ -1882,51 +3956,65 @@ class HiDRASource(BaseSource):
             # print(str(e))
             pass  # this needs a bit more care
 
-        if metadata is not None and data is not None:
-            # print("data", str(data)[:10])
+        received = metadata is not None and data is not None
+        if self.__pool is None:
+            if received:
+                return self.__decode(metadata, data)
+            return None, None, None
+        if received:
+            self.__pool.submit(self.__decode, metadata, data)
+        return self.__pool.result(wait=not received)
 
-            if data[:10] == b"###CBF: VE":
-                # print("[cbf source module]::metadata", metadata["filename"])
-                logger.info(
-                    "HiDRASource.getData: "
-                    "[cbf source module]::metadata %s" % metadata["filename"])
-                npdata = np.fromstring(data[:], dtype=np.uint8)
-                img = imageFileHandler.CBFLoader().load(npdata)
+    def __decode(self, metadata, data):
+        """ decodes received image
+
+        :param metadata: hidra metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param data: image file content
+        :type data: :obj:`bytes`
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        # print("data", str(data)[:10])
+        npdata = tobuffer(data)
+        if data[:10] == b"###CBF: VE":
+            # print("[cbf source module]::metadata", metadata["filename"])
+            logger.info(
+                "HiDRASource.getData: "
+                "[cbf source module]::metadata %s" % metadata["filename"])
+            img = imageFileHandler.CBFLoader().load(npdata)
 
-                mdata = imageFileHandler.CBFLoader().metadata(npdata)
+            mdata = imageFileHandler.CBFLoader().metadata(npdata)
 
+            if hasattr(img, "size") and img.size == 0:
+                return None, None, None
+            return np.transpose(img), metadata["filename"], mdata
+        else:
+            # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
+            logger.info(
+                "HiDRASource.getData:"
+                "[tif source module]::metadata %s" % metadata["filename"])
+            # print("[tif source module]::metadata", metadata["filename"])
+            if PILLOW and not self.__tiffloader:
+                try:
+                    img = np.array(PIL.Image.open(BytesIO(npdata)))
+                except Exception:
+                    img = imageFileHandler.TIFLoader().load(npdata)
+                    self.__tiffloader = True
                 if hasattr(img, "size") and img.size == 0:
                     return None, None, None
-                return np.transpose(img), metadata["filename"], mdata
+                if img is not None:
+                    return np.transpose(img), metadata["filename"], ""
             else:
-                # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
-                logger.info(
-                    "HiDRASource.getData:"
-                    "[tif source module]::metadata %s" % metadata["filename"])
-                # print("[tif source module]::metadata", metadata["filename"])
-                if PILLOW and not self.__tiffloader:
-                    try:
-                        img = np.array(PIL.Image.open(BytesIO(str(data))))
-                    except Exception:
-                        img = imageFileHandler.TIFLoader().load(
-                            np.fromstring(data[:], dtype=np.uint8))
-                        self.__tiffloader = True
-                    if hasattr(img, "size") and img.size == 0:
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), metadata["filename"], ""
-                else:
-                    img = imageFileHandler.TIFLoader().load(
-                        np.fromstring(data[:], dtype=np.uint8))
-                    if hasattr(img, "size") and img.size == 0:
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), metadata["filename"], ""
-            # else:
-            #     print(
-            #       "[unknown source module]::metadata", metadata["filename"])
-        else:
-            return None, None, None
+                img = imageFileHandler.TIFLoader().load(npdata)
+                if hasattr(img, "size") and img.size == 0:
+                    return None, None, None
+                if img is not None:
+                    return np.transpose(img), metadata["filename"], ""
+        # else:
+        #     print(
+        #       "[unknown source module]::metadata", metadata["filename"])
+        return None, None, None
 
 
 class DOOCSPropSource(BaseSource):
@@ -1994,6 +4082,71 @@ class EpicsPVSource(BaseSource):
         #: (:obj:`list` < :obj:`int` >)
         #:      process variable size
         self.__size = 0
+        #: (:obj:`bool`) arrays are received from the PV monitor
+        self.__monitor = False
+        #: (:class:`numpy.ndarray`) the last array received from the monitor
+        self.__image = None
+        #: (:obj:`float`) timestamp of the last monitor array
+        self.__timestamp = None
+        #: (:obj:`bool`) a monitor array has not been fetched yet
+        self.__fresh = False
+        #: (:class:`pyqtgraph.QtCore.QMutex`) mutex lock for the monitor
+        self.__mutex = QtCore.QMutex()
+        #: (:class:`pyqtgraph.QtCore.QWaitCondition`) new array condition
+        self.__condition = QtCore.QWaitCondition()
+
+    def __reshape(self, rawdata):
+        """ reshapes the PV array with the configured shape
+
+        :param rawdata: PV array
+        :type rawdata: :class:`numpy.ndarray`
+        :returns: transposed image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__shape and rawdata.size >= self.__size:
+            image = rawdata[:self.__size].reshape(self.__shape)
+        else:
+            image = rawdata
+        return np.transpose(image)
+
+    # @debugmethod
+    def __monitorCB(self, value=None, timestamp=None, **kwargs):
+        """ PV monitor callback receiving a new array
+
+        :param value: PV array
+        :type value: :class:`numpy.ndarray`
+        :param timestamp: timestamp of the PV change
+        :type timestamp: :obj:`float`
+        """
+        if not hasattr(value, "size") or value.size == 0:
+            return
+        try:
+            image = self.__reshape(value)
+        except Exception as e:
+            logger.warning(str(e))
+            return
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__image = image
+            self.__timestamp = timestamp
+            self.__fresh = True
+            self.__condition.wakeAll()
+
+    # @debugmethod
+    def wait(self, timeout):
+        """ waits until a new PV array arrives or timeout
+
+        :param timeout: timeout in s
+        :type timeout: :obj:`float`
+        :returns: True if data can be fetched
+        :rtype: :obj:`bool`
+        """
+        if not self.__monitor:
+            return True
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__pv is None or self.__fresh:
+                return True
+            self.__condition.wait(self.__mutex, int(timeout * 1000))
+            return self.__fresh
 
     @debugmethod
     def getData(self):
@@ -2005,17 +4158,21 @@ class EpicsPVSource(BaseSource):
 
         if self.__pv is None:
             return "No PV defined", "__ERROR__", None
+        if self.__monitor:
+            with QtCore.QMutexLocker(self.__mutex):
+                if not self.__fresh:
+                    return None, None, None
+                self.__fresh = False
+                return (self.__image,
+                        '%s (%s)' % (self._configuration, self.__timestamp),
+                        None)
         try:
             rawdata = self.__pv.get(as_numpy=True,
                                     timeout=float(self._timeout/1000.))
             if not hasattr(rawdata, "size"):
                 return None, None, None
             else:
-                if self.__shape and rawdata.size >= self.__size:
-                    image = rawdata[:self.__size].reshape(self.__shape)
-                else:
-                    image = rawdata
-                return (np.transpose(image),
+                return (self.__reshape(rawdata),
                         '%s (%s)' % (self._configuration, time.time()), None)
         except Exception as e:
             logger.warning(str(e))
@@ -2032,7 +4189,8 @@ class EpicsPVSource(BaseSource):
             pvnm, pvsh = str(
                 self._configuration).strip().split(",", 1)
             if not self._initiated:
-                self.__pv = epics.PV(pvnm)
+                self.__clearMonitor()
+                self.__monitor = EPICSMONITOR
                 try:
                     shape = json.loads(pvsh)
                     self.__shape = list(reversed([int(s) for s in shape]))
@@ -2040,6 +4198,11 @@ class EpicsPVSource(BaseSource):
                 except Exception:
                     self.__size = 0
                     self.__shape = None
+                if self.__monitor:
+                    self.__pv = epics.PV(pvnm, auto_monitor=True)
+                    self.__pv.add_callback(self.__monitorCB)
+                else:
+                    self.__pv = epics.PV(pvnm)
             return True
         except Exception as e:
             self._updaterror()
@@ -2047,6 +4210,32 @@ class EpicsPVSource(BaseSource):
             # print(str(e))
             return False
 
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        self.__clearMonitor()
+        BaseSource.disconnect(self)
+
+    def __clearMonitor(self):
+        """ releases the PV with its channel access subscription
+        and the last monitor array
+        """
+        if self.__pv is not None:
+            try:
+                if self.__monitor:
+                    self.__pv.clear_callbacks()
+                    # stops the transfer of arrays by the subscription
+                    self.__pv.clear_auto_monitor()
+                self.__pv.disconnect()
+            except Exception as e:
+                logger.warning(str(e))
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__pv = None
+            self.__image = None
+            self.__timestamp = None
+            self.__fresh = False
+
 
 class TinePropSource(BaseSource):
 
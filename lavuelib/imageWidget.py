@@ -43,6 +43,7 @@ from . import imageSource as isr
 from . import toolWidget
 from . import memoExportDialog
 from . import sardanaUtils
+from . import stageTimer
 from .sardanaUtils import debugmethod
 
 # _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".") \
@@ -204,6 +205,9 @@ class ImageWidget(QtGui.QWidget):
             ]
         )
 
+        #: (:class:`pyqtgraph.QtGui.QLabel`) text overlay of the image
+        self.__overlay = None
+
         #: (:class:`pyqtgraph.PlotWidget`) bottom 1D plot widget
         self.__bottomplot = memoExportDialog.MemoPlotWidget(self)
         self.__bottomplot.addLegend()
@@ -412,6 +416,29 @@ class ImageWidget(QtGui.QWidget):
             self.__tangoclient.writeAttribute(
                 "DetectorROIsValues", json.dumps(rois))
 
+    def setOverlayText(self, text):
+        """ sets text shown in the top left corner over the 2D image
+
+        :param text: overlay text, an empty text hides the overlay
+        :type text: :obj:`str`
+        """
+        if not text:
+            if self.__overlay is not None:
+                self.__overlay.hide()
+            return
+        if self.__overlay is None:
+            self.__overlay = QtGui.QLabel(self.__displaywidget)
+            self.__overlay.setAttribute(
+                QtCore.Qt.WA_TransparentForMouseEvents)
+            self.__overlay.setStyleSheet(
+                "QLabel {background-color: rgba(0, 0, 0, 160); "
+                "color: white; font-family: monospace; padding: 2px;}")
+            self.__overlay.move(4, 4)
+        self.__overlay.setText(text)
+        self.__overlay.adjustSize()
+        self.__overlay.show()
+        self.__overlay.raise_()
+
     def setTangoClient(self, tangoclient):
         """ sets tango client
 
@@ -884,13 +911,17 @@ class ImageWidget(QtGui.QWidget):
         self.__data = array
         self.__rawdata = rawarray
         self.__imagename = imagename
+        timer = stageTimer.TIMER
         if self.__currenttool:
-            barrays = self.__currenttool.beforeplot(array, rawarray)
-        self.__displaywidget.updateImage(
-            barrays[0] if barrays is not None else self.__data,
-            barrays[1] if barrays is not None else self.__rawdata)
+            with timer.measure("beforeplot"):
+                barrays = self.__currenttool.beforeplot(array, rawarray)
+        with timer.measure("updateimage"):
+            self.__displaywidget.updateImage(
+                barrays[0] if barrays is not None else self.__data,
+                barrays[1] if barrays is not None else self.__rawdata)
         if self.__currenttool:
-            self.__currenttool.afterplot()
+            with timer.measure("afterplot"):
+                self.__currenttool.afterplot()
 
     def updateImage(self, array=None, rawarray=None):
         """ update the image
@@ -79,10 +79,22 @@ except Exception:
 from . import imageFileHandler
 from . import sardanaUtils
 from . import dataFetchThread
+from . import frameRecorder
+from . import stageTimer
+from . import processingThread
+from . import imageProcessing
 from . import settings
 
 from .hidraServerList import HIDRASERVERLIST
 
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = True
+except ImportError:
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = False
+
 
 logger = logging.getLogger("lavue")
 
@@ -104,6 +116,26 @@ _formclass, _baseclass = uic.loadUiType(
 
 _logginglevel = 'info'
 
+#: (:obj:`int`) polling interval of the browsed file frame reader in ms
+FILEREADERINTERVAL = 20
+#: (:obj:`float`) idle time in s after which the browsed file is closed
+FILEIDLETIME = 5.0
+#: (:obj:`int`) number of image assembly buffers used alternately
+ASSEMBLYBUFFERS = 2
+#: (:obj:`int`) minimal image size in pixels to assemble tiles in parallel
+PARALLELASSEMBLYSIZE = 1 << 18
+#: (:obj:`float`) update interval of pipeline metrics in s
+METRICSINTERVAL = 1.0
+
+
+def _copytile(target):
+    """ copies data into the target
+
+    :param target: target view and data
+    :type target: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    np.copyto(target[0], target[1], casting="unsafe")
+
 
 def setLoggerLevel(logger, level):
     global _logginglevel
@@ -381,6 +413,11 @@ class LiveViewer(QtGui.QDialog):
         self.__allowedmdata = ["datasources", "asaposubstreams"]
         #: (:obj:`list` < :obj:`str` > ) allowed widget metadata
         self.__allowedwgdata = ["axisscales", "axislabels"]
+        #: (:obj:`str`) file name of recorded source frames
+        self.__recordfile = None
+        #: (:obj:`list` < :class:`lavuelib.frameRecorder.FrameRecorder` >)
+        #:    frame recorders of image sources
+        self.__recorders = []
 
         #: (:class:`lavuelib.sardanaUtils.SardanaUtils`)
         #:  sardana utils
@@ -435,10 +472,73 @@ class LiveViewer(QtGui.QDialog):
         self.__frame = None
         #: (:obj:`str`) nexus field path
         self.__fieldpath = None
+        #: (:class:`lavuelib.imageFileHandler.NexusFrameReader`)
+        #:     frame reader of the browsed nexus field
+        self.__filereader = imageFileHandler.NexusFrameReader()
+        #: (:obj:`tuple` <:obj:`str`, :obj:`str`, :obj:`int`>)
+        #:     file name, field path and growing dimension of the frame reader
+        self.__filereaderkey = None
+        #: (:class:`lavuelib.imageFileHandler.NexusFieldHandler`)
+        #:     handler of the browsed nexus file
+        self.__filehandler = None
+        #: (:class:`lavuelib.filewriter.FTField`) browsed nexus field
+        self.__filenode = None
+        #: (:obj:`str`) json dictionary with metadata of the browsed field
+        self.__filemetadata = ""
+        #: (:obj:`float`) time of the last access to the browsed file
+        self.__fileaccess = 0
+        #: (:obj:`int`) frame requested from the prefetch thread
+        self.__pendingframe = None
+        #: (:class:`pyqtgraph.QtCore.QTimer`) browsed file reader timer
+        self.__filetimer = QtCore.QTimer(self)
+        self.__filetimer.setInterval(FILEREADERINTERVAL)
+        self.__filetimer.timeout.connect(self._checkFileReader)
+        #: (:obj:`tuple`) layout of the assembled image
+        self.__assemblykey = None
+        #: (:obj:`list` <:class:`numpy.ndarray`>) image assembly buffers
+        self.__assemblybuffers = []
+        #: (:obj:`list` <:obj:`int`>) ids of the last processing jobs
+        #:     of the assembly buffers
+        self.__assemblyjobs = []
+        #: (:obj:`int`) index of the last used assembly buffer
+        self.__assemblyindex = -1
+        #: (:obj:`bool`) tiles of the assembled image overlap
+        self.__assemblyoverlap = False
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`)
+        #:     image assembly thread pool
+        self.__assemblypool = None
+        #: (:obj:`float`) time of the first fetched partial data
+        self.__firstfetch = None
+        #: (:class:`pyqtgraph.QtCore.QTimer`) partial data assembly timer
+        self.__assemblytimer = QtCore.QTimer(self)
+        self.__assemblytimer.setSingleShot(True)
+        self.__assemblytimer.timeout.connect(self._assembleNewData)
+        #: (:class:`lavuelib.stageTimer.PipelineMetrics`)
+        #:     rolling pipeline metrics
+        self.__metrics = stageTimer.PipelineMetrics()
+        #: (:class:`pyqtgraph.QtCore.QTimer`) pipeline metrics timer
+        self.__metricstimer = QtCore.QTimer(self)
+        self.__metricstimer.timeout.connect(self._publishMetrics)
         #: (:obj:`bool`) closing flag
         self.__closing = False
         #: (:obj:`bool`) ploting flag
         self.__ploting = False
+        #: (:obj:`int`) id of the last submitted processing job
+        self.__jobid = 0
+        #: (:obj:`int`) id of the last shown processing job
+        self.__shownjobid = 0
+        #: (:obj:`tuple` <:class:`numpy.ndarray`>) kernel buffers
+        #:     of the shown processing result
+        self.__shownbuffers = ()
+        #: (:class:`lavuelib.imageProcessing.CorrectionKernel`)
+        #:     correction kernel with reusable buffers
+        self.__correctionkernel = imageProcessing.CorrectionKernel()
+        #: (:class:`lavuelib.processingThread.ProcessingThread`)
+        #:     image processing thread
+        self.__processingthread = processingThread.ProcessingThread(
+            kernel=self.__correctionkernel)
+        self.__processingthread.imageProcessed.connect(
+            self._showProcessedImage)
 
         #: (:class:`filters.FilterList` ) user filters
         self.__filters = filters.FilterList()
@@ -605,14 +705,6 @@ class LiveViewer(QtGui.QDialog):
         #: (:obj:`bool`) lazy image slider
         self.__lazyimageslider = False
 
-        #: (:obj: dict < :obj:`str` , :obj:`str` >) unsigned/signed int map
-        self.__unsignedmap = {
-            "uint8": "int16",
-            "uint16": "int32",
-            "uint32": "int64",
-            "uint64": "int64"
-            # "uint64": "float64"
-        }
         #: (:class:`Ui_LevelsGroupBox') ui_groupbox object from qtdesigner
         self.__ui = _formclass()
         self.__ui.setupUi(self)
@@ -696,7 +788,10 @@ class LiveViewer(QtGui.QDialog):
         #:    exchange list
         self.__exchangelists = []
         for ds in self.__datasources:
-            self.__exchangelists.append(dataFetchThread.ExchangeList())
+            self.__exchangelists.append(
+                dataFetchThread.ExchangeList(
+                    self.__settings.exchangebuffersize,
+                    self.__settings.exchangepolicy))
 
         #: (:class:`lavuelib.dataFetchTread.DataFetchThread`)
         #:    data fetch thread
@@ -772,6 +867,7 @@ class LiveViewer(QtGui.QDialog):
         self.__updateframeratetip(self.__settings.refreshrate)
         self.__imagewg.setExtensionsRefreshTime(
             self.__settings.toolrefreshtime)
+        self.__updateMetrics()
 
         start = self.__applyoptions(options)
         self._plot()
@@ -1296,6 +1392,10 @@ class LiveViewer(QtGui.QDialog):
             self.setLavueState(
                 {"analysisdevice": self.__settings.analysisdevice})
 
+        if hasattr(options, "recordfile") and options.recordfile is not None:
+            self.__recordfile = str(options.recordfile) or None
+            self.setLavueState({"recordfile": self.__recordfile or ""})
+
         # load image file
         if hasattr(options, "imagefile") and options.imagefile is not None:
             oldname = self.__settings.imagename
@@ -1591,6 +1691,12 @@ class LiveViewer(QtGui.QDialog):
         for i, ds in enumerate(self.__datasources):
             ds.setTimeOut(self.__settings.timeout)
         dataFetchThread.GLOBALREFRESHRATE = self.__settings.refreshrate
+        isr.HTTPPIPELINING = self.__settings.httppipelining
+        isr.DECODEWORKERS = self.__settings.decodeworkers
+        isr.ASAPOMAXLAG = self.__settings.asapomaxlag
+        isr.EPICSMONITOR = self.__settings.epicsmonitor
+        isr.TANGOEVENTSMODE = self.__settings.tangoeventsmode
+        isr.NXSFOLLOW = self.__settings.nxsfollow
         self.__imagewg.setStatsWOScaling(self.__settings.statswoscaling)
         self.__imagewg.setColors(self.__settings.roiscolors)
 
@@ -1697,6 +1803,16 @@ class LiveViewer(QtGui.QDialog):
             for df in self.__dataFetchers:
                 df.stop()
                 df.wait()
+            self.__closeFileReader()
+            self.__filereader.close()
+            self.__assemblytimer.stop()
+            self.__metricstimer.stop()
+            if self.__processingthread.isRunning():
+                self.__processingthread.stop()
+                self.__processingthread.wait()
+            if self.__assemblypool is not None:
+                self.__assemblypool.shutdown()
+                self.__assemblypool = None
             self.__settings.seccontext.destroy()
             self.__closing = True
             QtGui.QApplication.closeAllWindows()
@@ -1739,7 +1855,6 @@ class LiveViewer(QtGui.QDialog):
                     self._reloadfile(fid, showmessage)
                 except Exception:
                     pass
-                time.sleep(0.1)
         finally:
             self.__reloadflag = False
 
@@ -1919,39 +2034,59 @@ class LiveViewer(QtGui.QDialog):
                or imagename.endswith(".nx") \
                or imagename.endswith(".ndf") \
                or imagename.endswith(".hdf"):
-                try:
-                    handler = imageFileHandler.NexusFieldHandler(
-                        str(imagename))
-                    fields = handler.findImageFields()
-                    self.__settings.imagename = imagename
-                except Exception as e:
-                    logger.warning(str(e))
-                    # print(str(e))
-                    fields = None
-                self.setLavueState(
-                    {"imagefile": (self.__settings.imagename or "")})
                 currentfield = None
-                if fields:
-                    if fid is None or self.__fieldpath is None:
-                        imgfield = imageField.ImageField(self)
-                        imgfield.fields = fields
-                        imgfield.createGUI()
-                        if imgfield.exec_():
-                            self.__fieldpath = imgfield.field
-                            self.__growing = imgfield.growing
-                            self.__frame = imgfield.frame
-                        else:
+                if fid is not None and self.__fieldpath is not None and \
+                   self.__filereaderkey == (
+                       str(imagename), self.__fieldpath, self.__growing):
+                    currentfield = self.__attachFileReader()
+                if currentfield is None:
+                    self.__closeFileReader()
+                    self.__filereaderkey = None
+                    try:
+                        handler = imageFileHandler.NexusFieldHandler(
+                            str(imagename))
+                        fields = handler.findImageFields()
+                        self.__settings.imagename = imagename
+                    except Exception as e:
+                        logger.warning(str(e))
+                        # print(str(e))
+                        fields = None
+                    self.setLavueState(
+                        {"imagefile": (self.__settings.imagename or "")})
+                    if fields:
+                        if fid is None or self.__fieldpath is None:
+                            imgfield = imageField.ImageField(self)
+                            imgfield.fields = fields
+                            imgfield.createGUI()
+                            if imgfield.exec_():
+                                self.__fieldpath = imgfield.field
+                                self.__growing = imgfield.growing
+                                self.__frame = imgfield.frame
+                            else:
+                                return
+                        currentfield = fields[self.__fieldpath]
+                        self.__openFileReader(
+                            str(imagename), handler, currentfield["node"])
+                if currentfield:
+                    if self.__ui.frameHorizontalSlider.isSliderDown():
+                        # do not block the event loop while scrubbing
+                        newimage = self.__filereader.getFrame(
+                            self.__frame, load=False)
+                        if newimage is None and \
+                           len(currentfield["shape"]) > 2:
+                            self.__pendingframe = self.__frame
+                            self.__filereader.request(self.__frame)
                             return
-                    currentfield = fields[self.__fieldpath]
+                    self.__pendingframe = None
                     try:
-                        newimage = handler.getImage(
-                            currentfield["node"],
-                            self.__frame, self.__growing, refresh=False)
+                        if newimage is None:
+                            newimage = self.__filereader.getFrame(
+                                self.__frame)
                     except Exception as e:
                         logger.warning(str(e))
                         # print(str(e))
 
-                    metadata = handler.getMetaData(currentfield["node"])
+                    metadata = self.__filemetadata
                     # if metadata:
                     #     print("Metadata = %s" % str(metadata))
                     self.__ui.frameLineEdit.textChanged.disconnect(
@@ -1977,11 +2112,15 @@ class LiveViewer(QtGui.QDialog):
                                 "current frame")
                     except Exception:
                         self.__ui.frameLineEdit.setToolTip("current frame")
+                    if newimage is None and self.__frame > 0 and \
+                       len(currentfield["shape"]) > 2:
+                        self.__frame = min(
+                            self.__frame,
+                            currentfield["shape"][self.__growing] - 1)
+                        newimage = self.__filereader.getFrame(self.__frame)
                     while newimage is None and self.__frame > 0:
                         self.__frame -= 1
-                        newimage = handler.getImage(
-                            currentfield["node"],
-                            self.__frame, self.__growing, refresh=False)
+                        newimage = self.__filereader.getFrame(self.__frame)
                     if currentfield and len(currentfield["shape"]) > 2:
                         self.__updateframeview(True, True)
                     else:
@@ -2012,6 +2151,8 @@ class LiveViewer(QtGui.QDialog):
                     else:
                         self.__updateframeview()
             else:
+                self.__closeFileReader()
+                self.__filereaderkey = None
                 try:
                     fh = imageFileHandler.ImageFileHandler(
                         str(imagename))
@@ -2082,6 +2223,78 @@ class LiveViewer(QtGui.QDialog):
                     str("lavue: File %s cannot be loaded"
                         % self.__settings.imagename))
 
+    def __openFileReader(self, imagename, handler, node):
+        """ attaches the browsed nexus field to the frame reader
+
+        :param imagename: nexus file name
+        :type imagename: :obj:`str`
+        :param handler: nexus file handler
+        :type handler: :class:`lavuelib.imageFileHandler.NexusFieldHandler`
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        """
+        try:
+            self.__filemetadata = handler.getMetaData(node)
+        except Exception as e:
+            logger.warning(str(e))
+            self.__filemetadata = ""
+        self.__filereader.close()
+        self.__filereader.setCacheSize(
+            self.__settings.filecachesize * 1024 * 1024)
+        self.__filereader.setNode(node, self.__growing)
+        self.__filehandler = handler
+        self.__filenode = node
+        self.__filereaderkey = (imagename, self.__fieldpath, self.__growing)
+        self.__fileaccess = time.time()
+        self.__filetimer.start()
+
+    def __attachFileReader(self):
+        """ reopens the browsed nexus field if needed and refreshes its shape
+
+        :returns: field description with its nexus path and shape or None
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        imagename, fieldpath, growing = self.__filereaderkey
+        try:
+            if self.__filehandler is None:
+                handler = imageFileHandler.NexusFieldHandler(imagename)
+                node = handler.getNode(fieldpath)
+                self.__filereader.setNode(node, growing)
+                self.__filehandler = handler
+                self.__filenode = node
+            self.__filereader.frameCount()
+            self.__fileaccess = time.time()
+            if not self.__filetimer.isActive():
+                self.__filetimer.start()
+            return {"nexus_path": fieldpath,
+                    "shape": list(self.__filenode.shape or [])}
+        except Exception as e:
+            logger.warning(str(e))
+            return None
+
+    def __closeFileReader(self):
+        """ closes the browsed nexus file and keeps the cached frames
+        """
+        self.__filetimer.stop()
+        self.__pendingframe = None
+        self.__filereader.detach()
+        if hasattr(self.__filenode, "close"):
+            self.__filenode.close()
+        self.__filenode = None
+        self.__filehandler = None
+
+    @QtCore.pyqtSlot()
+    def _checkFileReader(self):
+        """ shows the prefetched pending frame and closes the idle file
+        """
+        if self.__pendingframe is not None:
+            if self.__filereader.getFrame(
+                    self.__pendingframe, load=False) is not None:
+                self._sliderreloadfile(self.__pendingframe)
+            return
+        if time.time() - self.__fileaccess > FILEIDLETIME:
+            self.__closeFileReader()
+
     @debugmethod
     @QtCore.pyqtSlot()
     def _configuration(self):
@@ -2101,6 +2314,7 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.showscale = self.__settings.showscale
         cnfdlg.showlevels = self.__settings.showlevels
         cnfdlg.showframerate = self.__settings.showframerate
+        cnfdlg.showmetrics = self.__settings.showmetrics
         cnfdlg.showhisto = self.__settings.showhisto
         cnfdlg.showaddhisto = self.__settings.showaddhisto
         cnfdlg.showmask = self.__settings.showmask
@@ -2125,11 +2339,18 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.toolpollinginterval = self.__settings.toolpollinginterval
         cnfdlg.timeout = self.__settings.timeout
         cnfdlg.nrsources = self.__settings.nrsources
+        cnfdlg.exchangebuffersize = self.__settings.exchangebuffersize
+        cnfdlg.exchangepolicy = self.__settings.exchangepolicy
         cnfdlg.aspectlocked = self.__settings.aspectlocked
         cnfdlg.autodownsample = self.__settings.autodownsample
         cnfdlg.keepcoords = self.__settings.keepcoords
         cnfdlg.accelbuffersum = self.__settings.accelbuffersum
         cnfdlg.lazyimageslider = self.__settings.lazyimageslider
+        cnfdlg.filecachesize = self.__settings.filecachesize
+        cnfdlg.backgroundprocessing = self.__settings.backgroundprocessing
+        cnfdlg.levelssampling = self.__settings.levelssampling
+        cnfdlg.httppipelining = self.__settings.httppipelining
+        cnfdlg.decodeworkers = self.__settings.decodeworkers
         cnfdlg.statswoscaling = self.__settings.statswoscaling
         cnfdlg.zmqtopics = self.__settings.zmqtopics
         cnfdlg.autozmqtopics = self.__settings.autozmqtopics
@@ -2139,16 +2360,20 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.tineprops = self.__settings.tineprops
         cnfdlg.epicspvnames = self.__settings.epicspvnames
         cnfdlg.epicspvshapes = self.__settings.epicspvshapes
+        cnfdlg.epicsmonitor = self.__settings.epicsmonitor
         cnfdlg.doocsprops = self.__settings.doocsprops
         cnfdlg.tangoevattrs = self.__settings.tangoevattrs
+        cnfdlg.tangoeventsmode = self.__settings.tangoeventsmode
         cnfdlg.tangofileattrs = self.__settings.tangofileattrs
         cnfdlg.tangodirattrs = self.__settings.tangodirattrs
         cnfdlg.httpurls = self.__settings.httpurls
         cnfdlg.zmqservers = self.__settings.zmqservers
         cnfdlg.nxslast = self.__settings.nxslast
         cnfdlg.nxsopen = self.__settings.nxsopen
+        cnfdlg.nxsfollow = self.__settings.nxsfollow
         cnfdlg.sendrois = self.__settings.sendrois
         cnfdlg.sendresults = self.__settings.sendresults
+        cnfdlg.sendmetrics = self.__settings.sendmetrics
         cnfdlg.singlerois = self.__settings.singlerois
         cnfdlg.showallrois = self.__settings.showallrois
         cnfdlg.storegeometry = self.__settings.storegeometry
@@ -2168,6 +2393,7 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.asapotoken = self.__settings.asapotoken
         cnfdlg.asapobeamtime = self.__settings.asapobeamtime
         cnfdlg.asapostreams = self.__settings.asapostreams
+        cnfdlg.asapomaxlag = self.__settings.asapomaxlag
         cnfdlg.detservers = json.dumps(self.__mergeDetServers(
             HIDRASERVERLIST if cnfdlg.defdetservers else {"pool": []},
             json.loads(self.__settings.detservers)))
@@ -2232,6 +2458,11 @@ class LiveViewer(QtGui.QDialog):
             self.__settings.showframerate = dialog.showframerate
             self.__viewFrameRate(self.__settings.showframerate
                                  and self.__sourcewg.isConnected())
+        if self.__settings.showmetrics != dialog.showmetrics or \
+           self.__settings.sendmetrics != dialog.sendmetrics:
+            self.__settings.showmetrics = dialog.showmetrics
+            self.__settings.sendmetrics = dialog.sendmetrics
+            self.__updateMetrics()
         if self.__settings.showhisto != dialog.showhisto:
             self.__levelswg.changeView(dialog.showhisto)
             self.__settings.showhisto = dialog.showhisto
@@ -2309,6 +2540,11 @@ class LiveViewer(QtGui.QDialog):
         self.__settings.timeout = dialog.timeout
         for i, ds in enumerate(self.__datasources):
             ds.setTimeOut(self.__settings.timeout)
+        self.__settings.exchangebuffersize = dialog.exchangebuffersize
+        self.__settings.exchangepolicy = dialog.exchangepolicy
+        for el in self.__exchangelists:
+            el.setSize(self.__settings.exchangebuffersize)
+            el.setPolicy(self.__settings.exchangepolicy)
         self.__settings.aspectlocked = dialog.aspectlocked
         self.__imagewg.setAspectLocked(self.__settings.aspectlocked)
         self.__settings.autodownsample = dialog.autodownsample
@@ -2325,6 +2561,23 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.lazyimageslider != dialog.lazyimageslider:
             self.__settings.lazyimageslider = dialog.lazyimageslider
             self.__switchlazysignals(self.__settings.lazyimageslider)
+        if self.__settings.filecachesize != dialog.filecachesize:
+            self.__settings.filecachesize = dialog.filecachesize
+            self.__filereader.setCacheSize(
+                self.__settings.filecachesize * 1024 * 1024)
+        if self.__settings.backgroundprocessing != \
+           dialog.backgroundprocessing:
+            self.__settings.backgroundprocessing = \
+                dialog.backgroundprocessing
+        if self.__settings.levelssampling != dialog.levelssampling:
+            self.__settings.levelssampling = dialog.levelssampling
+            replot = True
+        if self.__settings.decodeworkers != dialog.decodeworkers:
+            self.__settings.decodeworkers = dialog.decodeworkers
+            isr.DECODEWORKERS = self.__settings.decodeworkers
+        if self.__settings.asapomaxlag != dialog.asapomaxlag:
+            self.__settings.asapomaxlag = dialog.asapomaxlag
+            isr.ASAPOMAXLAG = self.__settings.asapomaxlag
 
         setsrc = False
         if self.__settings.nrsources != dialog.nrsources:
@@ -2363,12 +2616,20 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.epicspvshapes != dialog.epicspvshapes:
             self.__settings.epicspvshapes = dialog.epicspvshapes
             setsrc = True
+        if self.__settings.epicsmonitor != dialog.epicsmonitor:
+            self.__settings.epicsmonitor = dialog.epicsmonitor
+            isr.EPICSMONITOR = self.__settings.epicsmonitor
+            setsrc = True
         if self.__settings.doocsprops != dialog.doocsprops:
             self.__settings.doocsprops = dialog.doocsprops
             setsrc = True
         if self.__settings.tangoevattrs != dialog.tangoevattrs:
             self.__settings.tangoevattrs = dialog.tangoevattrs
             setsrc = True
+        if self.__settings.tangoeventsmode != dialog.tangoeventsmode:
+            self.__settings.tangoeventsmode = dialog.tangoeventsmode
+            isr.TANGOEVENTSMODE = self.__settings.tangoeventsmode
+            setsrc = True
         if self.__settings.tangofileattrs != dialog.tangofileattrs:
             self.__settings.tangofileattrs = dialog.tangofileattrs
             setsrc = True
@@ -2378,6 +2639,9 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.httpurls != dialog.httpurls:
             self.__settings.httpurls = dialog.httpurls
             setsrc = True
+        if self.__settings.httppipelining != dialog.httppipelining:
+            self.__settings.httppipelining = dialog.httppipelining
+            isr.HTTPPIPELINING = self.__settings.httppipelining
         if self.__settings.zmqservers != dialog.zmqservers:
             self.__settings.zmqservers = dialog.zmqservers
             setsrc = True
@@ -2414,6 +2678,10 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.nxslast != dialog.nxslast:
             self.__settings.nxslast = dialog.nxslast
             setsrc = True
+        if self.__settings.nxsfollow != dialog.nxsfollow:
+            self.__settings.nxsfollow = dialog.nxsfollow
+            isr.NXSFOLLOW = self.__settings.nxsfollow
+            setsrc = True
         if self.__settings.sendrois != dialog.sendrois:
             self.__settings.sendrois = dialog.sendrois
         if self.__settings.sendresults != dialog.sendresults:
@@ -2480,7 +2748,10 @@ class LiveViewer(QtGui.QDialog):
         elif len(self.__dataFetchers) < nrsources:
             for i in reversed(range(len(self.__dataFetchers), nrsources)):
                 self.__datasources.append(isr.BaseSource())
-                self.__exchangelists.append(dataFetchThread.ExchangeList())
+                self.__exchangelists.append(
+                    dataFetchThread.ExchangeList(
+                        self.__settings.exchangebuffersize,
+                        self.__settings.exchangepolicy))
                 dft = dataFetchThread.DataFetchThread(
                     self.__datasources[-1], self.__exchangelists[-1])
                 self.__dataFetchers.append(dft)
@@ -2695,54 +2966,199 @@ class LiveViewer(QtGui.QDialog):
         """ The main command of the live viewer class:
         draw a numpy array with the given name.
         """
+        self.__plot()
+
+    def __plot(self, background=False):
+        """ prepares the image and processes it in the current thread
+        or in the background processing thread
+
+        :param background: process the image in the background thread
+        :type background: :obj:`bool`
+        """
         if self.__ploting:
             return
         self.__ploting = True
+        timer = stageTimer.TIMER
         try:
-            self.__filteredimage = self.__rawimage
-            # apply user range
-            self.__applyRange()
-            # apply user filters
-            self.__applyFilters()
-            if self.__settings.showmbuffer and self.__mbufferwg.isOn():
-                result = self.__mbufferwg.process(
-                    self.__filteredimage, self.__imagename)
-                if isinstance(result, tuple) and len(result) == 2:
-                    self.__filteredimage, mdata = result
-                    self.__mdata.update(mdata)
-            if "channellabels" in self.__mdata:
-                self.__channelwg.updateChannelLabels(
-                    self.__mdata["channellabels"])
-
-            # prepare or preprocess the raw image if present:
-            self.__prepareImage()
-
-            # perform transformation
-            # (crdtranspose, crdleftrightflip, crdupdownflip,
-            # orgtranspose, orgleftrightflip, orgupdownflip)
-            allcrds = self.__transform()
-            self.__imagewg.setTransformations(*allcrds)
-            # use the internal raw image to create a display image with chosen
-            # scaling
-            self.__scale(self.__scalingwg.currentScaling())
-            # calculate and update the stats for this
-            self.__calcUpdateStats()
-            # calls internally the plot function of the plot widget
-            if self.__imagename is not None and self.__scaledimage is not None:
-                self.__ui.fileNameLineEdit.setText(
-                    self.__imagename.replace("\n", " "))
-                self.__ui.fileNameLineEdit.setToolTip(self.__imagename)
+            with timer.measure("plot"):
+                self.__filteredimage = self.__rawimage
+                # apply user range
+                with timer.measure("applyrange"):
+                    self.__applyRange()
+                # apply user filters
+                with timer.measure("applyfilters"):
+                    self.__applyFilters()
+                if self.__settings.showmbuffer and self.__mbufferwg.isOn():
+                    with timer.measure("mbuffer"):
+                        result = self.__mbufferwg.process(
+                            self.__filteredimage, self.__imagename)
+                    if isinstance(result, tuple) and len(result) == 2:
+                        self.__filteredimage, mdata = result
+                        self.__mdata.update(mdata)
+                if "channellabels" in self.__mdata:
+                    self.__channelwg.updateChannelLabels(
+                        self.__mdata["channellabels"])
+
+                # select color channels of the raw image if present:
+                with timer.measure("prepareimage"):
+                    job = self.__processingJob(self.__prepareImage())
+                self.__useAssemblyBuffer(job.jobid)
+                if background:
+                    if not self.__processingthread.isRunning():
+                        self.__processingthread.start()
+                    self.__processingthread.submit(job)
+                else:
+                    with timer.measure("processimage"):
+                        result = imageProcessing.processImage(
+                            job, self.__correctionkernel)
+                    self.__showProcessed(result)
+            timer.increment("plots")
+        finally:
+            self.__ploting = False
+
+    def __processingJob(self, rawgreyimage):
+        """ creates an immutable processing job with the current settings
+
+        :param rawgreyimage: raw grey image
+        :type rawgreyimage: :class:`numpy.ndarray`
+        :returns: processing job
+        :rtype: :class:`lavuelib.imageProcessing.ProcessingJob`
+        """
+        self.__jobid += 1
+        flag = self.__statsFlag()
+        maskindices = None
+        if self.__settings.showmask and self.__imagewg.applyMask():
+            maskindices = self.__imagewg.maskIndices()
+        maskvalue = None
+        if self.__settings.showhighvaluemask:
+            maskvalue = self.__imagewg.maskValue()
+        scalefloattype = None
+        if _VMAJOR == '0' and _VMINOR == '9' and int(_VPATCH) > 7:
+            # (for 0.9.8 <= version < 0.10.0 i.e. ubuntu 16.04)
+            scalefloattype = self.__settings.floattype
+        return imageProcessing.ProcessingJob(
+            self.__jobid, self.__imagename, rawgreyimage,
+            self.__backgroundimage if self.__dobkgsubtraction else None,
+            self.__bfmdfimage if self.__dobfsubtraction else None,
+            maskindices, maskvalue,
+            self.__settings.nanmask, self.__settings.floattype,
+            self.__trafoname, self.__settings.keepcoords,
+            self.__scalingwg.currentScaling(), scalefloattype,
+            flag, self.__settings.statswoscaling,
+            self.__samplingError(flag), True)
+
+    @QtCore.pyqtSlot(object)
+    def _showProcessedImage(self, result):
+        """ shows the image processed in the background thread
+
+        :param result: processing result
+        :type result: :class:`lavuelib.imageProcessing.ProcessingResult`
+        """
+        # results of older jobs than the displayed one are out of date
+        if result.jobid <= self.__shownjobid or self.__closing:
+            self.__correctionkernel.release(result.buffers)
+            return
+        if self.__ploting:
+            QtCore.QTimer.singleShot(
+                0, lambda: self._showProcessedImage(result))
+            return
+        self.__ploting = True
+        try:
+            self.__showProcessed(result)
+        finally:
+            self.__ploting = False
+
+    def __showProcessed(self, result):
+        """ updates the widgets with the processed image
+
+        :param result: processing result
+        :type result: :class:`lavuelib.imageProcessing.ProcessingResult`
+        """
+        self.__shownjobid = result.jobid
+        with stageTimer.TIMER.measure("showprocessed"):
+            self.__showProcessedImage(result)
+        if result.scaledimage is not None:
+            # the replaced frame is neither displayed nor kept by the tools
+            # so its buffers can be overwritten by the next frames
+            self.__correctionkernel.release(self.__shownbuffers)
+            self.__shownbuffers = result.buffers
+        else:
+            # the previous frame is still plotted
+            self.__shownbuffers += result.buffers
+        stageTimer.TIMER.increment("frames")
+
+    def __showProcessedImage(self, result):
+        """ updates the widgets with the processed image
+
+        :param result: processing result
+        :type result: :class:`lavuelib.imageProcessing.ProcessingResult`
+        """
+        timer = stageTimer.TIMER
+        self.__rawgreyimage = result.rawgreyimage
+        self.__displayimage = result.displayimage
+        self.__scaledimage = result.scaledimage
+        if result.errors:
+            self.__showProcessingErrors(result.errors)
+        # indices of the previous frame are not kept
+        self.__imagewg.setMaskValueIndices(result.maskvalueindices)
+        # (crdtranspose, crdleftrightflip, crdupdownflip,
+        # orgtranspose, orgleftrightflip, orgupdownflip)
+        self.__imagewg.setTransformations(*result.transformations)
+        self.__imagewg.setScalingType(result.scalingtype)
+        # update the stats for this
+        with timer.measure("updatestats"):
+            self.__updateStats(result.stats, result.secstream)
+        # calls internally the plot function of the plot widget
+        if result.imagename is not None and self.__scaledimage is not None:
+            self.__ui.fileNameLineEdit.setText(
+                result.imagename.replace("\n", " "))
+            self.__ui.fileNameLineEdit.setToolTip(result.imagename)
+        with timer.measure("imageplot"):
             self.__imagewg.plot(
                 self.__scaledimage,
                 self.__displayimage
                 if self.__settings.statswoscaling else self.__scaledimage,
-                self.__imagename
+                result.imagename
             )
-            if self.__settings.showhisto and self.__updatehisto:
+        if self.__settings.showhisto and self.__updatehisto:
+            with timer.measure("histogram"):
                 self.__levelswg.updateHistoImage()
-                self.__updatehisto = False
-        finally:
-            self.__ploting = False
+            self.__updatehisto = False
+
+    def __showProcessingErrors(self, errors):
+        """ resets corrections which do not match to the image
+        and shows warnings
+
+        :param errors: (stage, traceback) list of processing errors
+        :type errors: :obj:`list` < (:obj:`str`, :obj:`str`) >
+        """
+        for stage, value in errors:
+            if stage == "background":
+                self._checkBkgSubtraction(0)
+                self.__backgroundimage = None
+                self.__dobkgsubtraction = False
+                title = "lavue: Background image does not match " \
+                    "to the current image"
+            elif stage == "brightfield":
+                self._checkBFSubtraction(0)
+                self.__bfmdfimage = None
+                self.__brightfieldimage = None
+                self.__dobfsubtraction = False
+                title = "lavue: Bright field image does not match " \
+                    "to the current image"
+            elif stage == "mask":
+                self.__maskwg.noImage()
+                self.__imagewg.setApplyMask(False)
+                title = "lavue: Mask image does not match " \
+                    "to the current image"
+            elif stage == "highvaluemask":
+                # self.__highvaluemaskwg.noValue()
+                title = "lavue: Cannot apply high value mask" \
+                    " to the current image"
+            else:
+                title = "lavue: problems in processing the image"
+            text = messageBox.MessageBox.getText(title)
+            messageBox.MessageBox.warning(self, title, text, str(value))
 
     @debugmethod
     @QtCore.pyqtSlot()
@@ -2759,21 +3175,44 @@ class LiveViewer(QtGui.QDialog):
         :type secstream: :obj:`bool`
         """
         # calculate the stats for this
+        self.__updateStats(
+            self.__calcStats(self.__statsFlag(secstream)), secstream)
+
+    def __statsFlag(self, secstream=True):
+        """ provides flags of statistics to calculate
 
+        :param secstream: send security stream flag
+        :type secstream: :obj:`bool`
+        :returns: (max value, mean value, variance value,
+                  min scaled value, max raw value, max scaled value) flags
+        :rtype: (:obj:`bool`, :obj:`bool`, :obj:`bool`,
+                   :obj:`bool`, :obj:`bool`, :obj:`bool`)
+        """
         auto = self.__levelswg.isAutoLevel()
-        stream = secstream and self.__settings.secstream and \
-            self.__scaledimage is not None
+        stream = secstream and self.__settings.secstream
         display = self.__settings.showstats
         calcvariance = self.__settings.calcvariance
-        maxval, meanval, varval, minval, maxrawval, maxsval = \
-            self.__calcStats(
-                (stream or display,
-                 stream or display,
-                 display and calcvariance,
-                 stream or auto,
-                 stream,
-                 auto)
-            )
+        return (stream or display,
+                stream or display,
+                display and calcvariance,
+                stream or auto,
+                stream,
+                auto)
+
+    def __updateStats(self, stats, secstream=True):
+        """ updates statistics
+
+        :param stats: max value, mean value, variance value,
+                  min scaled value, max raw value, max scaled value
+        :type stats: (:obj:`float`, :obj:`float`, :obj:`float`,
+                  :obj:`float`, :obj:`float`, :obj:`float`)
+        :param secstream: send security stream flag
+        :type secstream: :obj:`bool`
+        """
+        auto = self.__levelswg.isAutoLevel()
+        stream = secstream and self.__settings.secstream and \
+            self.__scaledimage is not None
+        maxval, meanval, varval, minval, maxrawval, maxsval = stats
         smaxval = "%.4f" % maxval
         smeanval = "%.4f" % meanval
         svarval = "%.4f" % varval
@@ -2870,6 +3309,8 @@ class LiveViewer(QtGui.QDialog):
             # print(str(messagedata))
             self.__settings.secsocket.send_string("%d %s" % (
                 topic, str(json.dumps(messagedata)).encode("ascii")))
+        if consuccess:
+            self.__startRecording()
         self.__updatehisto = True
         self.__setSourceLabel()
         self.setLavueState({"connected": self.__sourcewg.isConnected()})
@@ -2890,6 +3331,7 @@ class LiveViewer(QtGui.QDialog):
         """ calls the disconnect function of the source interface
         """
         self._stopPlotting()
+        self.__stopRecording()
         for ds in self.__datasources:
             ds.disconnect()
         self.__viewFrameRate(False)
@@ -2904,6 +3346,38 @@ class LiveViewer(QtGui.QDialog):
             self.__settings.secsocket.send_string("%d %s" % (
                 topic, str(json.dumps(messagedata)).encode("ascii")))
 
+    def __startRecording(self):
+        """ starts recording of fetched frames into the record file.
+        Frames of the i-th additional source are written into
+        the <base>.<i><ext> file
+        """
+        self.__stopRecording()
+        if not self.__recordfile:
+            return
+        base, ext = os.path.splitext(self.__recordfile)
+        for i, dft in enumerate(self.__dataFetchers):
+            fname = self.__recordfile if not i else "%s.%s%s" % (
+                base, i, ext)
+            try:
+                recorder = frameRecorder.FrameRecorder(fname)
+            except Exception as e:
+                logger.warning(str(e))
+                continue
+            self.__recorders.append(recorder)
+            dft.setRecorder(recorder)
+
+    def __stopRecording(self):
+        """ stops recording of fetched frames
+        """
+        for dft in self.__dataFetchers:
+            dft.setRecorder(None)
+        for recorder in self.__recorders:
+            try:
+                recorder.close()
+            except Exception as e:
+                logger.warning(str(e))
+        self.__recorders = []
+
     # @debugmethod
     def __mergeData(self, fulldata, oldname, channels=False):
         """ merge data parts to (name, rawdata, metadata)
@@ -2939,7 +3413,7 @@ class LiveViewer(QtGui.QDialog):
         if mdata:
             dmdata = {}
             for md in mdata:
-                dmdata.update(json.loads(mdata))
+                dmdata.update(json.loads(md))
             metadata = str(json.dumps(dmdata))
         if name:
             ldata = [pdata for pdata in fulldata if pdata.name]
@@ -2983,40 +3457,110 @@ class LiveViewer(QtGui.QDialog):
 
                 if self.__settings.nanmask:
                     dtype = self.__settings.floattype
-                rawimage = np.zeros(shape=nshape, dtype=dtype)
-                if self.__settings.nanmask:
-                    rawimage.fill(np.nan)
+                targets = []
                 for i, pd in enumerate(ldata):
                     lsh = len(pd.data().shape)
+                    xs = slice(pd.x - nx, pd.sx + pd.x - nx)
+                    ys = slice(pd.y - ny, pd.sy + pd.y - ny)
                     if lsh == 2:
                         if scc == 1:
-                            rawimage[
-                                pd.x - nx: pd.sx + pd.x - nx,
-                                pd.y - ny: pd.sy + pd.y - ny] = \
-                                    pd.data()
+                            targets.append((xs, ys))
                         else:
-                            rawimage[
-                                i,
-                                pd.x - nx: pd.sx + pd.x - nx,
-                                pd.y - ny: pd.sy + pd.y - ny] = \
-                                    pd.data()
+                            targets.append((i, xs, ys))
                     else:
                         if pd.scc == 1:
-                            rawimage[
-                                i: i+1,
-                                pd.x - nx: pd.sx + pd.x - nx,
-                                pd.y - ny: pd.sy + pd.y - ny
-                                ] = \
-                                    pd.data()
+                            targets.append((slice(i, i + 1), xs, ys))
                         else:
-                            rawimage[
-                                0: pd.scc,
-                                pd.x - nx: pd.sx + pd.x - nx,
-                                pd.y - ny: pd.sy + pd.y - ny] = \
-                                    pd.data()
+                            targets.append((slice(0, pd.scc), xs, ys))
+                rawimage = self.__assemblyBuffer(nshape, dtype, targets)
+                tiles = [(rawimage[tg], pd.data())
+                         for tg, pd in zip(targets, ldata)]
+                if self.__assemblyoverlap or not FUTURES or \
+                   rawimage.size < PARALLELASSEMBLYSIZE:
+                    for tile in tiles:
+                        _copytile(tile)
+                else:
+                    if self.__assemblypool is None:
+                        self.__assemblypool = \
+                            concurrent.futures.ThreadPoolExecutor(
+                                max_workers=max(2, os.cpu_count() or 1))
+                    list(self.__assemblypool.map(_copytile, tiles))
 
         return name, rawimage, metadata
 
+    def __assemblyBuffer(self, shape, dtype, targets):
+        """ provides a buffer for the assembled image alternating
+        between buffers which are neither displayed nor processed
+
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param dtype: image data type
+        :type dtype: :obj:`str` or :class:`numpy.dtype`
+        :param targets: tile positions in the image
+        :type targets: :obj:`list` <:obj:`tuple`>
+        :returns: image buffer with zero or nan gaps between tiles
+        :rtype: :class:`numpy.ndarray`
+        """
+        key = (tuple(shape), str(np.dtype(dtype)),
+               bool(self.__settings.nanmask), str(targets))
+        if key != self.__assemblykey:
+            self.__assemblykey = key
+            self.__assemblybuffers = []
+            self.__assemblyjobs = []
+            self.__assemblyoverlap = False
+            for i, tg in enumerate(targets):
+                region = np.zeros(shape=shape, dtype=bool)
+                region[tg] = True
+                for tg2 in targets[i + 1:]:
+                    if region[tg2].any():
+                        self.__assemblyoverlap = True
+        index = self.__assemblyindex
+        for _ in range(ASSEMBLYBUFFERS):
+            index = (index + 1) % ASSEMBLYBUFFERS
+            if index >= len(self.__assemblybuffers):
+                break
+            jobid = self.__assemblyjobs[index]
+            # tiles of the same layout overwrite the previous frame
+            # and leave the filled gaps untouched
+            if jobid is None or jobid < self.__shownjobid:
+                self.__assemblyindex = index
+                self.__assemblyjobs[index] = None
+                return self.__assemblybuffers[index]
+        else:
+            # the displayed frame and the frame in processing keep
+            # their buffers which are replaced by a new one
+            index = (self.__assemblyindex + 1) % ASSEMBLYBUFFERS
+        if self.__settings.nanmask:
+            buf = np.full(shape, np.nan, dtype=dtype)
+        else:
+            buf = np.zeros(shape=shape, dtype=dtype)
+        if index < len(self.__assemblybuffers):
+            self.__assemblybuffers[index] = buf
+            self.__assemblyjobs[index] = None
+        else:
+            self.__assemblybuffers.append(buf)
+            self.__assemblyjobs.append(None)
+        self.__assemblyindex = index
+        return buf
+
+    def __useAssemblyBuffer(self, jobid):
+        """ marks the assembly buffer of the raw image as used by the job
+
+        :param jobid: processing job id
+        :type jobid: :obj:`int`
+        """
+        for i, buf in enumerate(self.__assemblybuffers):
+            if buf is self.__rawimage:
+                self.__assemblyjobs[i] = jobid
+
+    @QtCore.pyqtSlot()
+    def _assembleNewData(self):
+        """ assembles partial data after the waiting time for
+        all image sources
+        """
+        if self.__firstfetch is not None:
+            self._getNewData("")
+
     @debugmethod
     @QtCore.pyqtSlot(str, str)
     def _getNewData(self, name, metadata=None):
@@ -3029,44 +3573,60 @@ class LiveViewer(QtGui.QDialog):
         """
         fulldata = []
         states = self.__sourcewg.tabCheckBoxStates()
-        for i, df in enumerate(self.__dataFetchers):
-            if states[i]:
-                cnt = 0
-                name = None
-                while (not df.fetching() and self.__sourcewg.isConnected()
-                       and cnt < 100 and not name):
-                    time.sleep(self.__settings.refreshrate/100.)
-                    cnt += 1
-                if cnt < 100:
-                    name, rawimage, metadata = \
-                        self.__exchangelists[i].readData()
-                else:
-                    name, rawimage, metadata = None, None, None
-                if i < len(self.__translations):
-                    x, y = self.__translations[i]
-                else:
-                    x, y = None, None
-                if i < len(self.__transformations):
-                    tr = self.__transformations[i]
+        active = [df for i, df in enumerate(self.__dataFetchers)
+                  if states[i]]
+        if len(active) > 1 and self.__sourcewg.isConnected():
+            # wait until all image sources have fetched their data
+            fetching = [df for df in active if df.fetching()]
+            if not fetching:
+                self.__firstfetch = None
+                return
+            if len(fetching) < len(active):
+                now = time.time()
+                if self.__firstfetch is None:
+                    self.__firstfetch = now
+                wait = self.__firstfetch + self.__settings.refreshrate - now
+                if wait > 0:
+                    if not self.__assemblytimer.isActive():
+                        self.__assemblytimer.start(int(1000 * wait) + 1)
+                    return
+        self.__firstfetch = None
+        self.__assemblytimer.stop()
+        connected = self.__sourcewg.isConnected()
+        with stageTimer.TIMER.measure("getnewdata"):
+            for i, df in enumerate(self.__dataFetchers):
+                if states[i]:
+                    if df.fetching() or len(active) == 1:
+                        name, rawimage, metadata = \
+                            self.__exchangelists[i].readData()
+                    else:
+                        name, rawimage, metadata = None, None, None
+                    if i < len(self.__translations):
+                        x, y = self.__translations[i]
+                    else:
+                        x, y = None, None
+                    if i < len(self.__transformations):
+                        tr = self.__transformations[i]
+                    else:
+                        tr = ''
+                    logger.debug(
+                        "lavuelib.liveViewer.LiveViewer.__getNewData "
+                        "%s: %s %s %s, [%s, %s]" %
+                        (i, name, metadata,
+                         rawimage.shape if hasattr(rawimage, "shape") else "",
+                         x or "", y or "")
+                    )
+                    fulldata.append(
+                        PartialData(name, rawimage, metadata, x, y, tr))
+            if connected:
+                if len(fulldata) == 1:
+                    name, rawimage, metadata = fulldata[0].tolist()[:3]
                 else:
-                    tr = ''
-                logger.debug(
-                    "lavuelib.liveViewer.LiveViewer.__getNewData "
-                    "%s: %s %s %s, [%s, %s]" %
-                    (i, name, metadata,
-                     rawimage.shape if hasattr(rawimage, "shape") else "",
-                     x or "", y or "")
-                )
-                fulldata.append(
-                    PartialData(name, rawimage, metadata, x, y, tr))
-        if not self.__sourcewg.isConnected():
+                    name, rawimage, metadata = self.__mergeData(
+                        fulldata, str(self.__imagename).strip(),
+                        self.__settings.imagechannels)
+        if not connected:
             return
-        if len(fulldata) == 1:
-            name, rawimage, metadata = fulldata[0].tolist()[:3]
-        else:
-            name, rawimage, metadata = self.__mergeData(
-                fulldata, str(self.__imagename).strip(),
-                self.__settings.imagechannels)
 
         if str(self.__imagename).strip() == str(name).strip() and not metadata:
             for dft in self.__dataFetchers:
@@ -3138,7 +3698,7 @@ class LiveViewer(QtGui.QDialog):
             self.__updateframerate(self.__currenttime - self.__lasttime)
         self.__lasttime = self.__currenttime
 
-        self._plot()
+        self.__plot(self.__settings.backgroundprocessing)
         QtCore.QCoreApplication.processEvents()
         for dft in self.__dataFetchers:
             dft.ready()
@@ -3172,6 +3732,50 @@ class LiveViewer(QtGui.QDialog):
             self.__ui.frameHorizontalSlider.hide()
 
     # @debugmethod
+    def __updateMetrics(self):
+        """ starts or stops collecting of pipeline metrics
+        """
+        if self.__settings.showmetrics or self.__settings.sendmetrics:
+            if not self.__metricstimer.isActive():
+                stageTimer.TIMER.enabled = True
+                self.__metrics.reset()
+                self.__metricstimer.start(int(1000 * METRICSINTERVAL))
+        elif self.__metricstimer.isActive():
+            self.__metricstimer.stop()
+            stageTimer.TIMER.enabled = False
+        if not self.__settings.showmetrics:
+            self.__imagewg.setOverlayText("")
+
+    @QtCore.pyqtSlot()
+    def _publishMetrics(self):
+        """ shows pipeline metrics over the image and sends them
+        to LavueController and the security stream
+        """
+        metrics = self.__metrics.update()
+        if not self.__sourcewg.isConnected():
+            self.__imagewg.setOverlayText("")
+            return
+        metrics["pid"] = self.__apppid
+        metrics["tool"] = self.__imagewg.currentTool()
+        metrics["dropped"] = sum(
+            dft.droppedFrames() for dft in self.__dataFetchers)
+        if self.__settings.showmetrics:
+            self.__imagewg.setOverlayText(
+                stageTimer.PipelineMetrics.text(metrics))
+        if self.__settings.sendmetrics:
+            try:
+                self.__imagewg.writeAttribute(
+                    "PipelineMetrics", json.dumps(metrics))
+            except Exception as e:
+                logger.warning(str(e))
+            if self.__settings.secstream:
+                messagedata = {
+                    'command': 'metrics', 'calctime': time.time(),
+                    'pid': self.__apppid, 'metrics': metrics}
+                topic = 10001
+                self.__settings.secsocket.send_string("%d %s" % (
+                    topic, str(json.dumps(messagedata)).encode("ascii")))
+
     def __updateframerate(self, ratetime):
         if ratetime:
             fr = 1.0/float(ratetime)
@@ -3181,27 +3785,34 @@ class LiveViewer(QtGui.QDialog):
                 self.__ui.framerateLineEdit.setText("%.1f Hz" % fr)
         else:
             self.__ui.framerateLineEdit.setText("")
+        self.__updateframeratetip(self.__settings.refreshrate)
 
     # @debugmethod
     def __updateframeratetip(self, ratetime):
+        dropped = sum(dft.droppedFrames() for dft in self.__dataFetchers)
+        droptip = "\nDropped frames: %s" % dropped if dropped else ""
         if ratetime:
             fr = 1.0/float(ratetime)
             if fr >= 9.9:
                 self.__ui.framerateLineEdit.setToolTip(
-                    "Set frame rate: %.0f Hz" % fr)
+                    "Set frame rate: %.0f Hz%s" % (fr, droptip))
             else:
                 self.__ui.framerateLineEdit.setToolTip(
-                    "Set frame rate: %.1f Hz" % fr)
+                    "Set frame rate: %.1f Hz%s" % (fr, droptip))
         else:
-            self.__ui.framerateLineEdit.setToolTip("Frame rate in Hz")
+            self.__ui.framerateLineEdit.setToolTip(
+                "Frame rate in Hz%s" % droptip)
 
     # @debugmethod
     def __prepareImage(self):
-        """applies: make image gray, substracke the background image and
-           apply the mask
+        """ makes image gray or selects color channels
+
+        :returns: raw grey image
+        :rtype: :class:`numpy.ndarray`
         """
+        rawgreyimage = self.__rawgreyimage
         if self.__filteredimage is None:
-            return
+            return rawgreyimage
         ics = 0
         if "suminthelast" in self.__mdata.keys():
             ics = int(self.__mdata["suminthelast"])
@@ -3210,20 +3821,20 @@ class LiveViewer(QtGui.QDialog):
                 self.__filteredimage.shape[0] - ics)
             if not self.__channelwg.colorChannel():
                 if ics:
-                    self.__rawgreyimage = self.__filteredimage[-1, :, :]
+                    rawgreyimage = self.__filteredimage[-1, :, :]
                 elif ("skipfirst" in self.__mdata.keys() and
                       self.__mdata["skipfirst"]):
-                    self.__rawgreyimage = np.nansum(
+                    rawgreyimage = np.nansum(
                         self.__filteredimage[1:, :, :], 0)
                 else:
-                    self.__rawgreyimage = np.nansum(self.__filteredimage, 0)
+                    rawgreyimage = np.nansum(self.__filteredimage, 0)
                 if self.rgb():
                     self.setrgb(False)
             else:
                 try:
                     if len(self.__filteredimage) - ics >= \
                        self.__channelwg.colorChannel():
-                        self.__rawgreyimage = self.__filteredimage[
+                        rawgreyimage = self.__filteredimage[
                             self.__channelwg.colorChannel() - 1]
                         if self.rgb():
                             self.setrgb(False)
@@ -3235,51 +3846,51 @@ class LiveViewer(QtGui.QDialog):
                             self.__levelswg.showGradient(True)
                         if "skipfirst" in self.__mdata.keys() and \
                            self.__mdata["skipfirst"]:
-                            self.__rawgreyimage = np.nanmean(
+                            rawgreyimage = np.nanmean(
                                 self.__filteredimage[1:, :, :], 0)
                         else:
-                            self.__rawgreyimage = np.nanmean(
+                            rawgreyimage = np.nanmean(
                                 self.__filteredimage, 0)
                     elif self.__filteredimage.shape[0] - ics > 1:
                         if not self.rgb():
                             self.setrgb(True)
                             self.__levelswg.showGradient(False)
-                        self.__rawgreyimage = np.moveaxis(
+                        rawgreyimage = np.moveaxis(
                             self.__filteredimage, 0, -1)
                         rgbs = self.__channelwg.rgbchannels()
                         if rgbs == (0, 1, 2):
-                            if self.__rawgreyimage.shape[-1] > 3:
-                                self.__rawgreyimage = \
-                                    self.__rawgreyimage[:, :, :3]
+                            if rawgreyimage.shape[-1] > 3:
+                                rawgreyimage = \
+                                    rawgreyimage[:, :, :3]
                             elif self.__filteredimage.shape[-1] == 2:
-                                nshape = list(self.__rawgreyimage.shape)
+                                nshape = list(rawgreyimage.shape)
                                 nshape[-1] = 1
-                                self.__rawgreyimage = np.concatenate(
-                                    (self.__rawgreyimage,
+                                rawgreyimage = np.concatenate(
+                                    (rawgreyimage,
                                      np.zeros(
                                          shape=nshape.
                                          shape[:, :, -1],
-                                         dtype=self.__rawgreyimage.dtype)),
+                                         dtype=rawgreyimage.dtype)),
                                     axis=2)
                         else:
                             zeros = None
-                            nshape = list(self.__rawgreyimage.shape)
+                            nshape = list(rawgreyimage.shape)
                             nshape[-1] = 1
                             if -1 in rgbs:
                                 zeros = np.zeros(
                                     shape=nshape,
-                                    dtype=self.__rawgreyimage.dtype)
+                                    dtype=rawgreyimage.dtype)
                                 if self.__settings.nanmask and \
-                                   self.__rawgreyimage.dtype.kind == 'f':
+                                   rawgreyimage.dtype.kind == 'f':
                                     zeros[:] = np.nan
-                            self.__rawgreyimage = np.concatenate(
-                                (self.__rawgreyimage[:, :, rgbs[0]].
+                            rawgreyimage = np.concatenate(
+                                (rawgreyimage[:, :, rgbs[0]].
                                  reshape(nshape)
                                  if rgbs[0] != -1 else zeros,
-                                 self.__rawgreyimage[:, :, rgbs[1]].
+                                 rawgreyimage[:, :, rgbs[1]].
                                  reshape(nshape)
                                  if rgbs[1] != -1 else zeros,
-                                 self.__rawgreyimage[:, :, rgbs[2]].
+                                 rawgreyimage[:, :, rgbs[2]].
                                  reshape(nshape)
                                  if rgbs[2] != -1 else zeros),
                                 axis=2)
@@ -3289,7 +3900,7 @@ class LiveViewer(QtGui.QDialog):
                             self.setrgb(False)
                             self.__channelwg.showGradient(True)
                             self.__levelswg.showGradient(True)
-                        self.__rawgreyimage = self.__filteredimage[:, :, 0]
+                        rawgreyimage = self.__filteredimage[:, :, 0]
 
                 except Exception:
                     import traceback
@@ -3311,9 +3922,9 @@ class LiveViewer(QtGui.QDialog):
                 self.__channelwg.showGradient(True)
                 self.__levelswg.showGradient(True)
             if self.__imagewg.applyMask():
-                self.__rawgreyimage = np.array(self.__filteredimage)
+                rawgreyimage = np.array(self.__filteredimage)
             else:
-                self.__rawgreyimage = self.__filteredimage
+                rawgreyimage = self.__filteredimage
             self.__channelwg.setNumberOfChannels(0)
 
         elif len(self.__filteredimage.shape) == 1:
@@ -3321,211 +3932,11 @@ class LiveViewer(QtGui.QDialog):
                 self.setrgb(False)
                 self.__channelwg.showGradient(True)
                 self.__levelswg.showGradient(True)
-            self.__rawgreyimage = np.array(
+            rawgreyimage = np.array(
                 self.__filteredimage).reshape(
                     (self.__filteredimage.shape[0], 1))
             self.__channelwg.setNumberOfChannels(0)
-
-        self.__displayimage = self.__rawgreyimage
-
-        if self.__dobkgsubtraction and self.__backgroundimage is not None:
-            try:
-                if (hasattr(self.__rawgreyimage, "dtype") and
-                   self.__rawgreyimage.dtype.name in
-                    self.__unsignedmap.keys()) \
-                   and (hasattr(self.__backgroundimage, "dtype") and
-                   self.__backgroundimage.dtype.name in
-                        self.__unsignedmap.keys()):
-                    self.__displayimage = np.subtract(
-                        self.__rawgreyimage, self.__backgroundimage,
-                        dtype=self.__unsignedmap[
-                            self.__rawgreyimage.dtype.name])
-                else:
-                    self.__displayimage = \
-                        self.__rawgreyimage - self.__backgroundimage
-            except Exception:
-                self._checkBkgSubtraction(0)
-                self.__backgroundimage = None
-                self.__dobkgsubtraction = False
-                import traceback
-                value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Background image does not match "
-                    "to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Background image does not match "
-                    "to the current image",
-                    text, str(value))
-
-        if self.__dobfsubtraction and self.__bfmdfimage is not None:
-            try:
-                self.__displayimage = self.__displayimage * self.__bfmdfimage
-            except Exception:
-                self._checkBFSubtraction(0)
-                self.__bfmdfimage = None
-                self.__brightfieldimage = None
-                self.__dobfsubtraction = False
-                import traceback
-                value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Bright field image does not match "
-                    "to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Bright field image does not match "
-                    "to the current image",
-                    text, str(value))
-
-        if self.__settings.showmask and self.__imagewg.applyMask() and \
-           self.__imagewg.maskIndices() is not None:
-            # set all masked (non-zero values) to zero by index
-            try:
-                if not self.__settings.nanmask:
-                    self.__displayimage = np.array(self.__displayimage)
-                    self.__displayimage[self.__imagewg.maskIndices()] = 0
-                else:
-                    self.__displayimage = np.array(
-                        self.__displayimage,
-                        dtype=self.__settings.floattype)
-                    self.__displayimage[self.__imagewg.maskIndices()] = np.nan
-            except IndexError:
-                self.__maskwg.noImage()
-                self.__imagewg.setApplyMask(False)
-                import traceback
-                value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Mask image does not match "
-                    "to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Mask image does not match "
-                    "to the current image",
-                    text, str(value))
-
-        if self.__settings.showhighvaluemask and \
-           self.__imagewg.maskValue() is not None:
-            try:
-                if self.__settings.nanmask:
-                    self.__displayimage = np.array(
-                        self.__displayimage,
-                        dtype=self.__settings.floattype)
-                    with np.warnings.catch_warnings():
-                        np.warnings.filterwarnings(
-                            'ignore', r'invalid value encountered in greater')
-                        self.__imagewg.setMaskValueIndices(
-                            self.__displayimage > self.__imagewg.maskValue())
-                        self.__displayimage[
-                            self.__imagewg.maskValueIndices()] = np.nan
-                else:
-                    self.__displayimage = np.array(self.__displayimage)
-                    self.__imagewg.setMaskValueIndices(
-                        self.__displayimage > self.__imagewg.maskValue())
-                    self.__displayimage[
-                            self.__imagewg.maskValueIndices()] = 0
-            except IndexError:
-                # self.__highvaluemaskwg.noValue()
-                import traceback
-                value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Cannot apply high value mask to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Cannot apply high value mask"
-                    " to the current image",
-                    text, str(value))
-
-    # @debugmethod
-    def __transform(self):
-        """ does the image transformation on the given numpy array.
-
-        :returns: crdtranspose, crdleftrightflip, crdupdownflip,
-         orgtranspose, orgleftrightflip, orgupdownflip flags
-        :rtype: (:obj:`bool`, :obj:`bool`, :obj:`bool`,:obj:`bool`,
-                 :obj:`bool`, :obj:`bool`)
-        """
-        crdupdownflip = False
-        crdleftrightflip = False
-        crdtranspose = False
-        orgupdownflip = False
-        orgleftrightflip = False
-        orgtranspose = False
-        if self.__trafoname == "none":
-            pass
-        elif self.__trafoname == "flip (up-down)":
-            orgupdownflip = True
-            if self.__settings.keepcoords:
-                crdupdownflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.fliplr(self.__displayimage)
-        elif self.__trafoname == "flip (left-right)":
-            orgleftrightflip = True
-            if self.__settings.keepcoords:
-                crdleftrightflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.flipud(self.__displayimage)
-        elif self.__trafoname == "transpose":
-            orgtranspose = True
-            if self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    self.__displayimage, 0, 1)
-                # self.__displayimage = np.transpose(self.__displayimage)
-            if self.__settings.keepcoords:
-                crdtranspose = True
-        elif self.__trafoname == "rot90 (clockwise)":
-            orgtranspose = True
-            orgupdownflip = True
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdupdownflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-                    # self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                # self.__displayimage = np.transpose(
-                #     np.flipud(self.__displayimage))
-                self.__displayimage = np.swapaxes(
-                    np.flipud(self.__displayimage), 0, 1)
-        elif self.__trafoname == "rot180":
-            orgupdownflip = True
-            orgleftrightflip = True
-            if self.__settings.keepcoords:
-                crdupdownflip = True
-                crdleftrightflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.flipud(
-                    np.fliplr(self.__displayimage))
-        elif self.__trafoname == "rot270 (clockwise)":
-            orgtranspose = True
-            orgleftrightflip = True
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdleftrightflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-                    # self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    np.fliplr(self.__displayimage), 0, 1)
-                # self.__displayimage = np.transpose(
-                #     np.fliplr(self.__displayimage))
-        elif self.__trafoname == "rot180 + transpose":
-            orgtranspose = True
-            orgupdownflip = True
-            orgleftrightflip = True
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdupdownflip = True
-                crdleftrightflip = True
-                if self.__displayimage is not None:
-                    # self.__displayimage = np.transpose(self.__displayimage)
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    np.fliplr(np.flipud(self.__displayimage)), 0, 1)
-                # self.__displayimage = np.transpose(
-                #     np.fliplr(np.flipud(self.__displayimage)))
-        return (crdtranspose, crdleftrightflip, crdupdownflip,
-                orgtranspose, orgleftrightflip, orgupdownflip)
+        return rawgreyimage
 
     # @debugmethod
     def __applyRange(self):
@@ -3681,29 +4092,6 @@ class LiveViewer(QtGui.QDialog):
                         "%s" % value)
                     # print(str(e))
 
-    # @debugmethod
-    def __scale(self, scalingtype):
-        """ sets scaletype on the image
-
-        :param scalingtype: scaling type
-        :type scalingtype: :obj:`str`
-        """
-        self.__imagewg.setScalingType(scalingtype)
-        if self.__displayimage is None:
-            self.__scaledimage = None
-        elif scalingtype == "sqrt":
-            self.__scaledimage = np.clip(self.__displayimage, 0, np.inf)
-            self.__scaledimage = np.sqrt(self.__scaledimage)
-        elif scalingtype == "log":
-            self.__scaledimage = np.clip(self.__displayimage, 10e-3, np.inf)
-            self.__scaledimage = np.log10(self.__scaledimage)
-        elif _VMAJOR == '0' and _VMINOR == '9' and int(_VPATCH) > 7:
-            # (for 0.9.8 <= version < 0.10.0 i.e. ubuntu 16.04)
-            self.__scaledimage = self.__displayimage.astype(
-                self.__settings.floattype)
-        else:
-            self.__scaledimage = self.__displayimage
-
     # @debugmethod
     def __calcStats(self, flag):
         """ calcualtes scaled limits for intesity levels
@@ -3715,28 +4103,29 @@ class LiveViewer(QtGui.QDialog):
                        :obj:`bool`, :obj:`bool`, :obj:`bool`]
         :returns: max value, mean value, variance value,
                   min scaled value, max raw value, max scaled value
-        :rtype: [:obj:`str`, :obj:`str`, :obj:`str`, :obj:`str`,
-                    :obj:`str`, :obj:`str`]
+        :rtype: [:obj:`float`, :obj:`float`, :obj:`float`, :obj:`float`,
+                    :obj:`float`, :obj:`float`]
         """
-        if self.__settings.statswoscaling and self.__displayimage is not None \
-           and self.__displayimage.size > 0:
-            maxval = np.nanmax(self.__displayimage) if flag[0] else 0.0
-            meanval = np.nanmean(self.__displayimage) if flag[1] else 0.0
-            varval = np.nanvar(self.__displayimage) if flag[2] else 0.0
-            maxsval = np.nanmax(self.__scaledimage) if flag[5] else 0.0
-        elif (not self.__settings.statswoscaling
-              and self.__scaledimage is not None
-              and self.__displayimage.size > 0):
-            maxval = np.nanmax(self.__scaledimage) \
-                     if flag[0] or flag[5] else 0.0
-            meanval = np.nanmean(self.__scaledimage) if flag[1] else 0.0
-            varval = np.nanvar(self.__scaledimage) if flag[2] else 0.0
-            maxsval = maxval
-        else:
-            return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        maxrawval = np.nanmax(self.__rawgreyimage) if flag[4] else 0.0
-        minval = np.nanmin(self.__scaledimage) if flag[3] else 0.0
-        return (maxval, meanval, varval, minval, maxrawval,  maxsval)
+        return imageProcessing.calcStats(
+            flag, self.__displayimage, self.__scaledimage,
+            self.__rawgreyimage, self.__settings.statswoscaling,
+            self.__samplingError(flag))
+
+    def __samplingError(self, flag):
+        """ provides sampling error of auto-levels
+
+        :param flag: (max value, mean value, variance value,
+                  min scaled value, max raw value, max scaled value)
+                  to calculate
+        :type flag: [:obj:`bool`, :obj:`bool`, :obj:`bool`,
+                       :obj:`bool`, :obj:`bool`, :obj:`bool`]
+        :returns: fraction of pixels allowed outside of auto-levels
+        :rtype: :obj:`float`
+        """
+        # the security stream needs exact values
+        if flag[4]:
+            return 0.0
+        return self.__settings.levelssampling / 100.
 
     @debugmethod
     @QtCore.pyqtSlot(str)
@@ -3962,7 +4351,8 @@ class LiveViewer(QtGui.QDialog):
         """ sets the chrrent image as the background image
         """
         if self.__rawgreyimage is not None:
-            self.__backgroundimage = self.__rawgreyimage
+            # the raw image buffer may be reused for later frames
+            self.__backgroundimage = np.array(self.__rawgreyimage)
             self.__updatebfmdf()
             self.__bkgsubwg.setDisplayedName(str(self.__imagename))
         else:
@@ -3974,7 +4364,7 @@ class LiveViewer(QtGui.QDialog):
         """ sets the chrrent image as the brightfield image
         """
         if self.__rawgreyimage is not None:
-            self.__brightfieldimage = self.__rawgreyimage
+            self.__brightfieldimage = np.array(self.__rawgreyimage)
             self.__updatebfmdf()
             self.__bkgsubwg.setDisplayedBFName(str(self.__imagename))
         else:
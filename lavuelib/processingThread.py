@@ -0,0 +1,121 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" image processing thread """
+
+from pyqtgraph import QtCore
+import traceback
+
+from .omniQThread import OmniQThread
+from . import imageProcessing
+from . import stageTimer
+
+
+class ProcessingThread(OmniQThread):
+
+    """ thread processing the latest submitted image job
+    """
+
+    #: (:class:`pyqtgraph.QtCore.pyqtSignal`) image processed signal
+    imageProcessed = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None, kernel=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        :param kernel: correction kernel which owns the output buffers
+        :type kernel: :class:`lavuelib.imageProcessing.CorrectionKernel`
+        """
+        OmniQThread.__init__(self, parent)
+        #: (:class:`lavuelib.imageProcessing.ProcessingJob`) pending job
+        self.__job = None
+        #: (:obj:`bool`) execute loop flag
+        self.__loop = False
+        #: (:class:`lavuelib.imageProcessing.CorrectionKernel`)
+        #:     correction kernel with reusable buffers
+        self.__kernel = kernel if kernel is not None \
+            else imageProcessing.CorrectionKernel()
+        #: (:obj:`int`) number of skipped jobs
+        self.__skipped = 0
+        #: (:class:`pyqtgraph.QtCore.QMutex`) thread mutex
+        self.__mutex = QtCore.QMutex()
+        #: (:class:`pyqtgraph.QtCore.QWaitCondition`) new job condition
+        self.__condition = QtCore.QWaitCondition()
+
+    def _run(self):
+        """ run function of the processing thread
+        """
+        self.__loop = True
+        while self.__loop:
+            with QtCore.QMutexLocker(self.__mutex):
+                while self.__loop and self.__job is None:
+                    self.__condition.wait(self.__mutex)
+                job = self.__job
+                self.__job = None
+            if job is None:
+                continue
+            try:
+                with stageTimer.TIMER.measure("processimage"):
+                    result = imageProcessing.processImage(
+                        job, self.__kernel)
+            except Exception:
+                result = imageProcessing.ProcessingResult(
+                    job.jobid, job.imagename, job.rawgreyimage,
+                    None, None, None, (False,) * 6, job.scalingtype,
+                    (0.0,) * 6, False,
+                    [("processing", traceback.format_exc())], ())
+            # the finished result is always shown, only the queued
+            # not started jobs are replaced by newer ones in submit
+            self.imageProcessed.emit(result)
+
+    def submit(self, job):
+        """ submits a new job replacing the pending one
+
+        :param job: processing job
+        :type job: :class:`lavuelib.imageProcessing.ProcessingJob`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__job is not None:
+                self.__skipped += 1
+            self.__job = job
+            self.__condition.wakeAll()
+
+    def skipped(self):
+        """ provides number of skipped jobs
+
+        :returns: number of jobs replaced by newer ones
+        :rtype: :obj:`int`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            return self.__skipped
+
+    def stop(self):
+        """ stops the loop of the thread
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__loop = False
+            self.__job = None
+            self.__condition.wakeAll()
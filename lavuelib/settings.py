@@ -91,6 +91,8 @@ class Settings(object):
         self.showlevels = True
         #: (:obj:`bool`) show frame rate widget
         self.showframerate = True
+        #: (:obj:`bool`) show pipeline stage latencies over the image
+        self.showmetrics = False
         #: (:obj:`bool`) image aspect ratio locked
         self.aspectlocked = False
         #: (:obj:`bool`) auto down sample
@@ -101,6 +103,17 @@ class Settings(object):
         self.accelbuffersum = False
         #: (:obj:`bool`) lazy image slider
         self.lazyimageslider = True
+        #: (:obj:`int`) memory budget of the file frame cache in MB
+        self.filecachesize = 512
+        #: (:obj:`bool`) process images in a background thread
+        self.backgroundprocessing = False
+        #: (:obj:`float`) maximal percentage of pixels outside
+        #:     auto-levels estimated on sampled pixels, 0 for exact levels
+        self.levelssampling = 0.0
+        #: (:obj:`bool`) overlap HTTP requests with image decoding
+        self.httppipelining = False
+        #: (:obj:`int`) number of image decode workers
+        self.decodeworkers = 0
         #: (:obj:`str`) security stream port
         self.secport = "5657"
         #: (:obj:`str`) hidra data port
@@ -111,6 +124,11 @@ class Settings(object):
         self.nrsources = 1
         #: (:obj:`int`) image source timeout for connection
         self.timeout = 3000
+        #: (:obj:`int`) maximal number of frames in the exchange buffer
+        self.exchangebuffersize = 1
+        #: (:obj:`str`) exchange buffer overflow policy, i.e.
+        #:     coalesce, dropoldest, dropnewest
+        self.exchangepolicy = "coalesce"
         #: (:class:`zmq.Context`) zmq context
         self.seccontext = zmq.Context()
         #: (:class:`zmq.Socket`) zmq security stream socket
@@ -164,12 +182,17 @@ class Settings(object):
         #: (:obj:`str`) JSON dictionary with {label: epics PV shape}
         #  for Epics PV source
         self.epicspvshapes = '{}'
+        #: (:obj:`bool`) subscribe to Epics PV monitors instead of polling
+        self.epicsmonitor = False
         #: (:obj:`str`) JSON dictionary with {label: doocs property}
         #  for DOOCS Property source
         self.doocsprops = '{}'
         #: (:obj:`str`) JSON dictionary with {label: tango attribute}
         #  for Tango Attribute Events source
         self.tangoevattrs = '{}'
+        #: (:obj:`str`) Tango events mode, i.e. auto, change, user,
+        #:     ready or batch
+        self.tangoeventsmode = "auto"
         #: (:obj:`str`) JSON dictionary with {label: file tango attribute}
         #  for Tango Attribute source
         self.tangofileattrs = '{}'
@@ -190,6 +213,9 @@ class Settings(object):
         self.nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.nxslast = False
+        #: (:obj:`bool`) nexus file source follows frames appended
+        #:     to the open SWMR file
+        self.nxsfollow = False
         #: (:obj:`list` < :obj:`str`>) hidra detector server list
         self.detservers = "[]"
 
@@ -201,6 +227,9 @@ class Settings(object):
         self.asapobeamtime = ""
         #: (:obj:`list` < :obj:`str` > ) asapo substreams
         self.asapostreams = []
+        #: (:obj:`int`) maximal number of asapo frames to fall behind
+        #:              in the stream mode, 0 for the latest frame mode
+        self.asapomaxlag = 0
 
         #: (:obj:`bool`) use default detector servers
         self.defdetservers = True
@@ -270,6 +299,9 @@ class Settings(object):
         self.sendrois = False
         #: (:obj:`bool`) send results to LavueController flag
         self.sendresults = False
+        #: (:obj:`bool`) send pipeline metrics to LavueController
+        #:    and the security stream flag
+        self.sendmetrics = False
         #: (:obj:`dict` < :obj:`str`, :obj:`dict` < :obj:`str`,`any`> >
         #                custom gradients
         self.__customgradients = {}
@@ -401,6 +433,10 @@ class Settings(object):
             "Configuration/ShowFrameRate", type=str))
         if qstval.lower() == "false":
             self.showframerate = False
+        qstval = str(settings.value(
+            "Configuration/ShowPipelineMetrics", type=str))
+        if qstval.lower() == "true":
+            self.showmetrics = True
         qstval = str(settings.value("Configuration/ShowHistogram", type=str))
         if qstval.lower() == "false":
             self.showhisto = False
@@ -458,12 +494,41 @@ class Settings(object):
             "Configuration/LazyImageSlider", type=str))
         if qstval.lower() == "false":
             self.lazyimageslider = False
+        qstval = str(settings.value(
+            "Configuration/FileCacheSize", type=str))
+        try:
+            self.filecachesize = max(int(qstval), 0)
+        except Exception:
+            pass
+        qstval = str(settings.value(
+            "Configuration/BackgroundProcessing", type=str))
+        if qstval.lower() == "true":
+            self.backgroundprocessing = True
+        qstval = str(settings.value(
+            "Configuration/AutoLevelsSampling", type=str))
+        try:
+            self.levelssampling = min(max(float(qstval), 0.0), 10.0)
+        except Exception:
+            pass
+        qstval = str(settings.value(
+            "Configuration/HTTPPipelining", type=str))
+        if qstval.lower() == "true":
+            self.httppipelining = True
+        qstval = str(settings.value(
+            "Configuration/DecodeWorkers", type=str))
+        try:
+            self.decodeworkers = min(max(int(qstval), 0), 64)
+        except Exception:
+            pass
         qstval = str(settings.value("Configuration/NXSFileOpen", type=str))
         if qstval.lower() == "true":
             self.nxsopen = True
         qstval = str(settings.value("Configuration/NXSLastImage", type=str))
         if qstval.lower() == "true":
             self.nxslast = True
+        qstval = str(settings.value("Configuration/NXSFollow", type=str))
+        if qstval.lower() == "true":
+            self.nxsfollow = True
         qstval = str(settings.value(
             "Configuration/SingleROIAliases", type=str))
         if qstval.lower() == "true":
@@ -474,6 +539,10 @@ class Settings(object):
         qstval = str(settings.value("Configuration/SendToolResults", type=str))
         if qstval.lower() == "true":
             self.sendresults = True
+        qstval = str(settings.value(
+            "Configuration/SendPipelineMetrics", type=str))
+        if qstval.lower() == "true":
+            self.sendmetrics = True
         qstval = str(settings.value("Configuration/ShowAllROIs", type=str))
         if qstval.lower() == "true":
             self.showallrois = True
@@ -508,6 +577,16 @@ class Settings(object):
             self.nrsources = int(qstval)
         except Exception:
             pass
+        qstval = str(settings.value(
+            "Configuration/ExchangeBufferSize", type=str))
+        try:
+            self.exchangebuffersize = max(int(qstval), 1)
+        except Exception:
+            pass
+        qstval = str(settings.value(
+            "Configuration/ExchangeBufferPolicy", type=str))
+        if qstval.lower() in ["coalesce", "dropoldest", "dropnewest"]:
+            self.exchangepolicy = qstval.lower()
         qstval = str(settings.value(
             "Configuration/MaskingWithZeros", type=str))
         if qstval.lower() == "true":
@@ -631,6 +710,12 @@ class Settings(object):
                 "Configuration/ASAPOBeamtime", type=str)
         if qstval:
             self.asapobeamtime = str(qstval)
+        qstval = str(settings.value(
+            "Configuration/ASAPOMaxLag", type=str))
+        try:
+            self.asapomaxlag = max(int(qstval), 0)
+        except Exception:
+            pass
 
         qstval = \
             settings.value(
@@ -681,6 +766,10 @@ class Settings(object):
             settings.value("Configuration/EpicsPVShapes", type=str))
         if qstval:
             self.epicspvshapes = qstval
+        qstval = str(
+            settings.value("Configuration/EpicsMonitor", type=str))
+        if qstval.lower() == "true":
+            self.epicsmonitor = True
 
         qstval = str(
             settings.value("Configuration/DOOCSProperties", type=str))
@@ -691,6 +780,10 @@ class Settings(object):
             settings.value("Configuration/TangoEventsAttributes", type=str))
         if qstval:
             self.tangoevattrs = qstval
+        qstval = str(
+            settings.value("Configuration/TangoEventsMode", type=str))
+        if qstval.lower() in ["auto", "change", "user", "ready", "batch"]:
+            self.tangoeventsmode = qstval.lower()
 
         qstval = str(
             settings.value("Configuration/TangoFileAttributes", type=str))
@@ -883,6 +976,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/ShowFrameRate",
             self.showframerate)
+        settings.setValue(
+            "Configuration/ShowPipelineMetrics",
+            self.showmetrics)
         settings.setValue(
             "Configuration/ShowHistogram",
             self.showhisto)
@@ -961,6 +1057,12 @@ class Settings(object):
         settings.setValue(
             "Configuration/NumberOfImageSources",
             self.nrsources)
+        settings.setValue(
+            "Configuration/ExchangeBufferSize",
+            self.exchangebuffersize)
+        settings.setValue(
+            "Configuration/ExchangeBufferPolicy",
+            self.exchangepolicy)
         settings.setValue(
             "Configuration/AspectLocked",
             self.aspectlocked)
@@ -976,6 +1078,21 @@ class Settings(object):
         settings.setValue(
             "Configuration/LazyImageSlider",
             self.lazyimageslider)
+        settings.setValue(
+            "Configuration/FileCacheSize",
+            self.filecachesize)
+        settings.setValue(
+            "Configuration/BackgroundProcessing",
+            self.backgroundprocessing)
+        settings.setValue(
+            "Configuration/AutoLevelsSampling",
+            self.levelssampling)
+        settings.setValue(
+            "Configuration/HTTPPipelining",
+            self.httppipelining)
+        settings.setValue(
+            "Configuration/DecodeWorkers",
+            self.decodeworkers)
         settings.setValue(
             "Configuration/LastImageFileName",
             self.imagename)
@@ -1015,6 +1132,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/ASAPOBeamtime",
             self.asapobeamtime)
+        settings.setValue(
+            "Configuration/ASAPOMaxLag",
+            self.asapomaxlag)
         settings.setValue(
             "Configuration/HidraDetectorServers",
             self.detservers)
@@ -1042,12 +1162,18 @@ class Settings(object):
         settings.setValue(
             "Configuration/EpicsPVShapes",
             self.epicspvshapes)
+        settings.setValue(
+            "Configuration/EpicsMonitor",
+            self.epicsmonitor)
         settings.setValue(
             "Configuration/DOOCSProperties",
             self.doocsprops)
         settings.setValue(
             "Configuration/TangoEventsAttributes",
             self.tangoevattrs)
+        settings.setValue(
+            "Configuration/TangoEventsMode",
+            self.tangoeventsmode)
         settings.setValue(
             "Configuration/TangoFileAttributes",
             self.tangofileattrs)
@@ -1066,6 +1192,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/NXSFileOpen",
             self.nxsopen)
+        settings.setValue(
+            "Configuration/NXSFollow",
+            self.nxsfollow)
         settings.setValue(
             "Configuration/StoreGeometry",
             self.storegeometry)
@@ -1087,6 +1216,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/SendToolResults",
             self.sendresults)
+        settings.setValue(
+            "Configuration/SendPipelineMetrics",
+            self.sendmetrics)
         settings.setValue(
             "Configuration/SingleROIAliases",
             self.singlerois)
@@ -40,6 +40,10 @@ _testformclass, _testbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "TestSourceWidget.ui"))
 
+_generatorformclass, _generatorbaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "GeneratorSourceWidget.ui"))
+
 _httpformclass, _httpbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "HTTPSourceWidget.ui"))
@@ -68,10 +72,22 @@ _nxsfileformclass, _nxsfilebaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "NXSFileSourceWidget.ui"))
 
+_directoryformclass, _directorybaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "DirectorySourceWidget.ui"))
+
+_replayformclass, _replaybaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "ReplaySourceWidget.ui"))
+
 _zmqformclass, _zmqbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "ZMQSourceWidget.ui"))
 
+_zmqfaninformclass, _zmqfaninbaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "ZMQFanInSourceWidget.ui"))
+
 _doocspropformclass, _doocspropbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "DOOCSPropSourceWidget.ui"))
@@ -93,12 +109,16 @@ __all__ = [
     'TangoFileSourceWidget',
     'DOOCSPropSourceWidget',
     'ZMQSourceWidget',
+    'ZMQFanInSourceWidget',
     'NXSFileSourceWidget',
+    'DirectorySourceWidget',
+    'ReplaySourceWidget',
     'TinePropSourceWidget',
     'EpicsPVSourceWidget',
     'ASAPOSourceWidget',
     # 'FixTestSourceWidget',
     'TestSourceWidget',
+    'GeneratorSourceWidget',
     'swproperties'
 ]
 
@@ -368,6 +388,193 @@ class FixTestSourceWidget(SourceBaseWidget):
         self._detachWidgets()
 
 
+class GeneratorSourceWidget(SourceBaseWidget):
+
+    """ generator source widget """
+
+    #: (:obj:`str`) source name
+    name = "Generator"
+    #: (:obj:`str`) datasource class name
+    datasource = "GeneratorSource"
+    #: (:obj:`str`) source alias
+    alias = "generator"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _generatorformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` < (:obj:`str`, :obj:`str`) >) configured
+        #:     (key, value) parameters without a widget field
+        self.__extra = []
+        #: (:obj:`str`) configured geometry and labels flags
+        self.__metadata = ""
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "generatorShapeLabel", "generatorShapeLineEdit",
+            "generatorTypeLabel", "generatorTypeComboBox",
+            "generatorRateLabel", "generatorRateDoubleSpinBox",
+            "generatorChannelsLabel", "generatorChannelsSpinBox",
+            "generatorPatternLabel", "generatorPatternComboBox",
+            "generatorNaNLabel", "generatorNaNDoubleSpinBox",
+            "generatorMetadataLabel", "generatorMetadataCheckBox"
+        ]
+
+        self._detachWidgets()
+
+        self._ui.generatorShapeLineEdit.textEdited.connect(self.updateButton)
+        self._ui.generatorTypeComboBox.currentIndexChanged.connect(
+            self.updateButton)
+        self._ui.generatorRateDoubleSpinBox.valueChanged.connect(
+            self.updateButton)
+        self._ui.generatorChannelsSpinBox.valueChanged.connect(
+            self.updateButton)
+        self._ui.generatorPatternComboBox.currentIndexChanged.connect(
+            self.updateButton)
+        self._ui.generatorNaNDoubleSpinBox.valueChanged.connect(
+            self.updateButton)
+        self._ui.generatorMetadataCheckBox.toggled.connect(self.updateButton)
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for generator source
+        """
+        if not self.active:
+            return
+        if not self.__shape():
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def __shape(self):
+        """ provides a valid image shape
+
+        :returns: image shape, i.e. <rows>x<columns> or an empty string
+        :rtype: :obj:`str`
+        """
+        shape = str(self._ui.generatorShapeLineEdit.text()).strip().lower()
+        try:
+            dims = [int(dm) for dm in shape.split("x")]
+            if len(dims) == 2 and min(dims) > 0:
+                return "%sx%s" % tuple(dims)
+        except ValueError:
+            pass
+        return ""
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        if not self._ui.generatorMetadataCheckBox.isChecked():
+            metadata = "geometry=False,labels=False"
+        else:
+            metadata = self.__metadata or "geometry=True,labels=True"
+        configuration = "shape=%s,dtype=%s,rate=%s,channels=%s," \
+            "pattern=%s,nan=%s,%s" % (
+                self.__shape() or "2048x4096",
+                str(self._ui.generatorTypeComboBox.currentText()),
+                self._ui.generatorRateDoubleSpinBox.value(),
+                self._ui.generatorChannelsSpinBox.value(),
+                str(self._ui.generatorPatternComboBox.currentText()),
+                self._ui.generatorNaNDoubleSpinBox.value(),
+                metadata)
+        # parameters without a widget field are passed unchanged
+        for key, value in self.__extra:
+            configuration += ",%s=%s" % (key, value)
+        return configuration
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.generatorShapeLineEdit.setReadOnly(True)
+        for wg in [self._ui.generatorTypeComboBox,
+                   self._ui.generatorRateDoubleSpinBox,
+                   self._ui.generatorChannelsSpinBox,
+                   self._ui.generatorPatternComboBox,
+                   self._ui.generatorNaNDoubleSpinBox,
+                   self._ui.generatorMetadataCheckBox]:
+            wg.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.generatorShapeLineEdit.setReadOnly(False)
+        for wg in [self._ui.generatorTypeComboBox,
+                   self._ui.generatorRateDoubleSpinBox,
+                   self._ui.generatorChannelsSpinBox,
+                   self._ui.generatorPatternComboBox,
+                   self._ui.generatorNaNDoubleSpinBox,
+                   self._ui.generatorMetadataCheckBox]:
+            wg.setEnabled(True)
+
+    def configure(self, configuration):
+        """ set configuration for the current image source
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        params = {}
+        self.__extra = []
+        for item in configuration.split(","):
+            if "=" in item:
+                key, value = item.split("=", 1)
+                key = key.strip().lower()
+                params[key] = value.strip()
+                if key not in ["shape", "dtype", "rate", "channels",
+                               "pattern", "nan", "geometry", "labels"]:
+                    self.__extra.append((key, value.strip()))
+        geometry, labels = [
+            params.get(key, "").lower() in ["true", "1", "yes", "on"]
+            for key in ["geometry", "labels"]]
+        self.__metadata = ""
+        if geometry or labels:
+            self.__metadata = "geometry=%s,labels=%s" % (geometry, labels)
+        try:
+            if "shape" in params:
+                self._ui.generatorShapeLineEdit.setText(params["shape"])
+            for key, combobox in [
+                    ("dtype", self._ui.generatorTypeComboBox),
+                    ("pattern", self._ui.generatorPatternComboBox)]:
+                if key in params:
+                    cid = combobox.findText(params[key].lower())
+                    if cid > -1:
+                        combobox.setCurrentIndex(cid)
+            if "rate" in params:
+                self._ui.generatorRateDoubleSpinBox.setValue(
+                    float(params["rate"]))
+            if "channels" in params:
+                self._ui.generatorChannelsSpinBox.setValue(
+                    int(params["channels"]))
+            if "nan" in params:
+                self._ui.generatorNaNDoubleSpinBox.setValue(
+                    float(params["nan"]))
+            self._ui.generatorMetadataCheckBox.setChecked(
+                geometry or labels)
+        except ValueError as e:
+            logger.warning(str(e))
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        return "generator_%s" % (self.__shape() or "2048x4096")
+
+
 class HTTPSourceWidget(SourceBaseWidget):
 
     """ test source widget """
@@ -2066,6 +2273,308 @@ class NXSFileSourceWidget(SourceBaseWidget):
         return re.sub("[^a-zA-Z0-9_]+", "_", label)
 
 
+class DirectorySourceWidget(SourceBaseWidget):
+
+    """ directory source widget """
+
+    #: (:obj:`str`) source name
+    name = "Directory"
+    #: (:obj:`str`) source alias
+    alias = "directory"
+    #: (:obj:`tuple` <:obj:`str`>) capitalized required packages
+    requires = ("INOTIFY",)
+    #: (:obj:`str`) datasource class name
+    datasource = "DirectorySource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _directoryformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "dirPathLabel", "dirPathLineEdit",
+            "dirPatternLabel", "dirPatternLineEdit",
+            "dirRecursiveLabel", "dirRecursiveCheckBox"
+        ]
+        #: (:obj:`str`) the last directory
+        self.__lastdir = "."
+
+        self._detachWidgets()
+
+        self._ui.dirPathLineEdit.textEdited.connect(self.updateButton)
+        self._ui.dirPatternLineEdit.textEdited.connect(self.updateButton)
+        self._ui.dirRecursiveCheckBox.toggled.connect(self.updateButton)
+        self._ui.dirPathLineEdit.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """ event filter
+
+        :param obj: qt object
+        :type obj: :class: `pyqtgraph.QtCore.QObject`
+        :param event: qt event
+        :type event: :class: `pyqtgraph.QtCore.QEvent`
+        :returns: status flag
+        :rtype: :obj:`bool`
+        """
+        if obj is not self._ui.dirPathLineEdit or self._connected:
+            return False
+        if event.type() in [QtCore.QEvent.MouseButtonDblClick]:
+            fileDialog = QtGui.QFileDialog()
+            dirname = str(fileDialog.getExistingDirectory(
+                self._ui.dirPathLineEdit, 'Watch directory',
+                self.__lastdir))
+            if dirname:
+                self._ui.dirPathLineEdit.setText(dirname)
+                self.__lastdir = dirname
+                self.updateButton()
+            return True
+        return False
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for directory source
+        """
+        if not self.active:
+            return
+        dirname, patterns, _ = self.__configuration()
+        if not dirname or not patterns:
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def __configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration tuple
+        :rtype configuration: :obj:`tuple`
+        """
+        dirname = str(self._ui.dirPathLineEdit.text()).strip()
+        patterns = " ".join(
+            str(self._ui.dirPatternLineEdit.text()).replace(",", " ").split())
+        recursive = self._ui.dirRecursiveCheckBox.isChecked()
+        return (dirname, patterns, recursive)
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        return "%s,%s,%s" % self.__configuration()
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.dirPathLineEdit.setReadOnly(True)
+        self._ui.dirPatternLineEdit.setReadOnly(True)
+        self._ui.dirRecursiveCheckBox.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.dirPathLineEdit.setReadOnly(False)
+        self._ui.dirPatternLineEdit.setReadOnly(False)
+        self._ui.dirRecursiveCheckBox.setEnabled(True)
+
+    def configure(self, configuration):
+        """ set configuration for the current image source
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        cnflst = configuration.split(",")
+        recursive = False
+        if len(cnflst) > 1 and \
+           cnflst[-1].strip().lower() in ["true", "false"]:
+            recursive = cnflst.pop().strip().lower() == "true"
+        self._ui.dirPathLineEdit.setText(cnflst[0].strip())
+        patterns = " ".join(" ".join(cnflst[1:]).split())
+        if patterns:
+            self._ui.dirPatternLineEdit.setText(patterns)
+        self._ui.dirRecursiveCheckBox.setChecked(recursive)
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = str(self._ui.dirPathLineEdit.text()).strip()
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
+class ReplaySourceWidget(SourceBaseWidget):
+
+    """ replay source widget """
+
+    #: (:obj:`str`) source name
+    name = "Replay"
+    #: (:obj:`str`) source alias
+    alias = "replay"
+    #: (:obj:`str`) datasource class name
+    datasource = "ReplaySource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _replayformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "replayFileLabel", "replayFileLineEdit",
+            "replayRateLabel", "replayRateComboBox",
+            "replayLoopLabel", "replayLoopCheckBox"
+        ]
+        #: (:obj:`str`) the last record file
+        self.__lastfile = "."
+
+        self._detachWidgets()
+
+        self._ui.replayFileLineEdit.textEdited.connect(self.updateButton)
+        self._ui.replayRateComboBox.editTextChanged.connect(
+            self.updateButton)
+        self._ui.replayLoopCheckBox.toggled.connect(self.updateButton)
+        self._ui.replayFileLineEdit.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """ event filter
+
+        :param obj: qt object
+        :type obj: :class: `pyqtgraph.QtCore.QObject`
+        :param event: qt event
+        :type event: :class: `pyqtgraph.QtCore.QEvent`
+        :returns: status flag
+        :rtype: :obj:`bool`
+        """
+        if obj is not self._ui.replayFileLineEdit or self._connected:
+            return False
+        if event.type() in [QtCore.QEvent.MouseButtonDblClick]:
+            fileDialog = QtGui.QFileDialog()
+            fileout = fileDialog.getOpenFileName(
+                self._ui.replayFileLineEdit, 'Load record file',
+                self.__lastfile)
+            if isinstance(fileout, tuple):
+                filename = str(fileout[0])
+            else:
+                filename = str(fileout)
+            if filename:
+                self._ui.replayFileLineEdit.setText(filename)
+                self.__lastfile = filename
+                self.updateButton()
+            return True
+        return False
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for replay source
+        """
+        if not self.active:
+            return
+        if not str(self._ui.replayFileLineEdit.text()).strip() \
+           or self.__rate() is None:
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def __rate(self):
+        """ provides the replay rate
+
+        :returns: original, max, frames per second or None if invalid
+        :rtype: :obj:`str`
+        """
+        rate = str(self._ui.replayRateComboBox.currentText()).strip().lower()
+        if rate in ["", "original"]:
+            return "original"
+        if rate in ["max", "fast"]:
+            return "max"
+        try:
+            if float(rate) > 0:
+                return rate
+        except ValueError:
+            pass
+        return None
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        return "%s,%s,%s" % (
+            str(self._ui.replayFileLineEdit.text()).strip(),
+            self.__rate() or "original",
+            self._ui.replayLoopCheckBox.isChecked())
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.replayFileLineEdit.setReadOnly(True)
+        self._ui.replayRateComboBox.setEnabled(False)
+        self._ui.replayLoopCheckBox.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.replayFileLineEdit.setReadOnly(False)
+        self._ui.replayRateComboBox.setEnabled(True)
+        self._ui.replayLoopCheckBox.setEnabled(True)
+
+    def configure(self, configuration):
+        """ set configuration for the current image source
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        cnflst = configuration.split(",")
+        loop = True
+        if len(cnflst) > 1 and \
+           cnflst[-1].strip().lower() in ["true", "false"]:
+            loop = cnflst.pop().strip().lower() == "true"
+        if len(cnflst) > 1:
+            rate = cnflst[-1].strip()
+            try:
+                float(rate)
+                israte = True
+            except ValueError:
+                israte = rate.lower() in ["", "original", "max", "fast"]
+            if israte:
+                cnflst.pop()
+                self._ui.replayRateComboBox.setEditText(rate or "original")
+        self._ui.replayFileLineEdit.setText(",".join(cnflst).strip())
+        self._ui.replayLoopCheckBox.setChecked(loop)
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = os.path.basename(
+            str(self._ui.replayFileLineEdit.text()).strip())
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
 class ZMQSourceWidget(SourceBaseWidget):
 
     """ test source widget """
@@ -2343,6 +2852,135 @@ class ZMQSourceWidget(SourceBaseWidget):
         return re.sub("[^a-zA-Z0-9_]+", "_", label)
 
 
+class ZMQFanInSourceWidget(SourceBaseWidget):
+
+    """ zmq fan-in source widget """
+
+    #: (:obj:`str`) source name
+    name = "ZMQ Fan-in"
+    #: (:obj:`str`) source alias
+    alias = "zmqfanin"
+    #: (:obj:`str`) datasource class name
+    datasource = "ZMQFanInSource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _zmqfaninformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "fanInEndpointsLabel", "fanInEndpointsLineEdit",
+            "fanInTopicLabel", "fanInTopicLineEdit",
+            "fanInTimeoutLabel", "fanInTimeoutSpinBox",
+            "fanInFillLabel", "fanInFillCheckBox"
+        ]
+
+        self._detachWidgets()
+
+        self._ui.fanInEndpointsLineEdit.textEdited.connect(self.updateButton)
+        self._ui.fanInTopicLineEdit.textEdited.connect(self.updateButton)
+        self._ui.fanInTimeoutSpinBox.valueChanged.connect(self.updateButton)
+        self._ui.fanInFillCheckBox.toggled.connect(self.updateButton)
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for zmq fan-in source
+        """
+        if not self.active:
+            return
+        if not self.__endpoints():
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def __endpoints(self):
+        """ provides valid module endpoints
+
+        :returns: host:port endpoints or an empty list if any is invalid
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        endpoints = [
+            ep.strip() for ep in
+            str(self._ui.fanInEndpointsLineEdit.text()).split(",")
+            if ep.strip()]
+        try:
+            for ep in endpoints:
+                port = int(ep.split(":")[1])
+                if port > 65535 or port < 0:
+                    raise Exception("Wrong port")
+        except Exception:
+            return []
+        return endpoints
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        endpoints = self.__endpoints()
+        if not endpoints:
+            return ""
+        return "%s/%s//%s/%s" % (
+            ",".join(endpoints),
+            str(self._ui.fanInTopicLineEdit.text()).strip(),
+            int(self._ui.fanInTimeoutSpinBox.value()),
+            "fill" if self._ui.fanInFillCheckBox.isChecked() else "drop")
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.fanInEndpointsLineEdit.setReadOnly(True)
+        self._ui.fanInTopicLineEdit.setReadOnly(True)
+        self._ui.fanInTimeoutSpinBox.setEnabled(False)
+        self._ui.fanInFillCheckBox.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.fanInEndpointsLineEdit.setReadOnly(False)
+        self._ui.fanInTopicLineEdit.setReadOnly(False)
+        self._ui.fanInTimeoutSpinBox.setEnabled(True)
+        self._ui.fanInFillCheckBox.setEnabled(True)
+
+    def configure(self, configuration):
+        """ set configuration for the current image source
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        cnflst = configuration.split("/")
+        self._ui.fanInEndpointsLineEdit.setText(cnflst[0].strip())
+        self._ui.fanInTopicLineEdit.setText(
+            cnflst[1].strip() if len(cnflst) > 1 else "")
+        try:
+            self._ui.fanInTimeoutSpinBox.setValue(int(cnflst[3]))
+        except Exception:
+            pass
+        self._ui.fanInFillCheckBox.setChecked(
+            len(cnflst) > 4 and cnflst[4].strip().lower() == "fill")
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = str(self._ui.fanInEndpointsLineEdit.text()).strip()
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
 class DOOCSPropSourceWidget(SourceBaseWidget):
 
     """ test source widget """
@@ -0,0 +1,425 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" timing of image pipeline stages """
+
+import threading
+import time
+
+import numpy as np
+
+#: (:obj:`function`) monotonic clock with the highest resolution
+clock = getattr(time, "perf_counter", time.time)
+
+#: (:obj:`list` <:obj:`str`>) pipeline stages in the processing order
+STAGES = [
+    "getdata", "getnewdata", "plot", "applyrange", "applyfilters",
+    "mbuffer", "prepareimage", "processimage", "corrections", "transform",
+    "scale", "stats", "showprocessed", "updatestats", "imageplot",
+    "beforeplot", "updateimage", "afterplot", "histogram"]
+
+#: (:obj:`int`) maximal number of kept samples of a stage for live metrics
+MAXSAMPLES = 4096
+
+#: (:obj:`int`) maximal number of kept samples of a stage for benchmarks
+BENCHMARKSAMPLES = 100000
+
+#: (:obj:`list` <:obj:`float`>) upper edges of latency histogram bins in ms
+HISTOGRAMEDGES = [
+    0.1, 0.2, 0.5, 1., 2., 5., 10., 20., 50., 100., 200., 500., 1000.]
+
+
+class _Measurement(object):
+
+    """ context manager adding its duration to a stage
+    """
+
+    __slots__ = ("__timer", "__stage", "__start")
+
+    def __init__(self, timer, stage):
+        """ constructor
+
+        :param timer: stage timer
+        :type timer: :class:`StageTimer`
+        :param stage: stage name
+        :type stage: :obj:`str`
+        """
+        #: (:class:`StageTimer`) stage timer
+        self.__timer = timer
+        #: (:obj:`str`) stage name
+        self.__stage = stage
+        #: (:obj:`float`) start time
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = clock()
+        return self
+
+    def __exit__(self, *args):
+        self.__timer.add(self.__stage, clock() - self.__start)
+        return False
+
+
+class _NoMeasurement(object):
+
+    """ context manager of a disabled timer
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+#: (:class:`_NoMeasurement`) shared context of a disabled timer
+_NOMEASUREMENT = _NoMeasurement()
+
+
+class StageTimer(object):
+
+    """ collects durations of pipeline stages and event counters.
+    Measurements are skipped while the timer is disabled
+    """
+
+    def __init__(self, maxsamples=None):
+        """ constructor
+
+        :param maxsamples: maximal number of kept samples of a stage
+        :type maxsamples: :obj:`int`
+        """
+        #: (:obj:`bool`) timer enabled
+        self.enabled = False
+        #: (:obj:`int`) maximal number of kept samples of a stage
+        self.__maxsamples = max(int(
+            MAXSAMPLES if maxsamples is None else maxsamples), 1)
+        #: (:obj:`dict` <:obj:`str`, :class:`numpy.ndarray`>)
+        #:    preallocated rings of stage durations in s
+        self.__samples = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) numbers of measured
+        #:    stage durations
+        self.__totals = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) event counters
+        self.__counters = {}
+        #: (:obj:`float`) start time of the measurement
+        self.__start = time.time()
+        #: (:class:`threading.Lock`) samples lock
+        self.__lock = threading.Lock()
+
+    def setMaxSamples(self, maxsamples):
+        """ sets maximal number of kept samples of a stage
+        and removes all samples
+
+        :param maxsamples: maximal number of kept samples of a stage
+        :type maxsamples: :obj:`int`
+        """
+        with self.__lock:
+            self.__maxsamples = max(int(maxsamples), 1)
+            self.__samples = {}
+            self.__totals = {}
+
+    def measure(self, stage):
+        """ provides a context manager measuring the stage
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :returns: context manager
+        :rtype: :class:`_Measurement`
+        """
+        if not self.enabled:
+            return _NOMEASUREMENT
+        return _Measurement(self, stage)
+
+    def add(self, stage, duration):
+        """ adds a stage duration
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param duration: duration in s
+        :type duration: :obj:`float`
+        """
+        with self.__lock:
+            smp = self.__samples.get(stage)
+            if smp is None:
+                smp = self.__samples[stage] = np.empty(
+                    self.__maxsamples, dtype="float64")
+            total = self.__totals.get(stage, 0)
+            smp[total % smp.size] = duration
+            self.__totals[stage] = total + 1
+
+    def increment(self, counter, number=1):
+        """ increments the event counter
+
+        :param counter: counter name
+        :type counter: :obj:`str`
+        :param number: increment
+        :type number: :obj:`int`
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__counters[counter] = \
+                self.__counters.get(counter, 0) + number
+
+    def reset(self):
+        """ removes all samples and counters and restarts the measurement
+        """
+        with self.__lock:
+            self.__samples = {}
+            self.__totals = {}
+            self.__counters = {}
+            self.__start = time.time()
+
+    def stages(self):
+        """ provides names of the measured stages
+
+        :returns: stage names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        with self.__lock:
+            return sorted(self.__samples.keys())
+
+    def samples(self, stage, last=None):
+        """ provides durations of the stage
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param last: number of the newest durations, None for all kept
+        :type last: :obj:`int`
+        :returns: durations in s
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self.__lock:
+            return self.__kept(stage, last)
+
+    def __kept(self, stage, last=None):
+        """ copies the newest kept durations of the stage in order
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param last: number of the newest durations, None for all kept
+        :type last: :obj:`int`
+        :returns: durations in s
+        :rtype: :class:`numpy.ndarray`
+        """
+        smp = self.__samples.get(stage)
+        if smp is None:
+            return np.array([], dtype="float64")
+        total = self.__totals[stage]
+        size = min(total, smp.size)
+        if last is not None:
+            size = min(max(int(last), 0), size)
+        end = total % smp.size
+        start = end - size
+        if start >= 0:
+            return smp[start:end].copy()
+        return np.concatenate([smp[start:], smp[:end]])
+
+    def totals(self):
+        """ provides numbers of measured durations since the last reset
+
+        :returns: (stage, number) dictionary
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`int`>
+        """
+        with self.__lock:
+            return dict(self.__totals)
+
+    def counters(self):
+        """ provides event counters since the last reset
+
+        :returns: (counter, number) dictionary
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`int`>
+        """
+        with self.__lock:
+            return dict(self.__counters)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """ provides latency percentiles of the stages in ms
+        and throughput of the counters in events per second
+
+        :param percentiles: latency percentiles
+        :type percentiles: :obj:`tuple` <:obj:`float`>
+        :returns: summary dictionary
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        with self.__lock:
+            samples = dict((stage, self.__kept(stage))
+                           for stage in self.__samples.keys())
+            counters = dict(self.__counters)
+            elapsed = time.time() - self.__start
+        stages = {}
+        for stage, smp in samples.items():
+            if not smp.size:
+                continue
+            stat = {
+                "count": int(smp.size),
+                "mean": float(smp.mean() * 1000),
+                "min": float(smp.min() * 1000),
+                "max": float(smp.max() * 1000),
+                "total": float(smp.sum() * 1000),
+            }
+            for pct, value in zip(
+                    percentiles, np.percentile(smp, percentiles)):
+                stat["p%g" % pct] = float(value * 1000)
+            stages[stage] = stat
+        return {
+            "elapsed": elapsed,
+            "stages": stages,
+            "counters": counters,
+            "throughput": dict(
+                (name, (value / elapsed) if elapsed > 0 else 0.0)
+                for name, value in counters.items())
+        }
+
+
+class PipelineMetrics(object):
+
+    """ rolling latency histograms and event rates of a stage timer.
+    Each update covers only durations and events measured since
+    the previous update
+    """
+
+    def __init__(self, timer=None, maxsamples=MAXSAMPLES,
+                 percentiles=(50, 90, 99), edges=None):
+        """ constructor
+
+        :param timer: stage timer, the pipeline timer for None
+        :type timer: :class:`StageTimer`
+        :param maxsamples: maximal number of durations of a stage
+                           used in one update
+        :type maxsamples: :obj:`int`
+        :param percentiles: latency percentiles
+        :type percentiles: :obj:`tuple` <:obj:`float`>
+        :param edges: upper edges of histogram bins in ms
+        :type edges: :obj:`list` <:obj:`float`>
+        """
+        #: (:class:`StageTimer`) stage timer
+        self.__timer = timer if timer is not None else TIMER
+        #: (:obj:`int`) maximal number of durations of a stage in an update
+        self.__maxsamples = max(int(maxsamples), 1)
+        #: (:obj:`tuple` <:obj:`float`>) latency percentiles
+        self.__percentiles = tuple(percentiles)
+        #: (:obj:`list` <:obj:`float`>) upper edges of histogram bins in ms
+        self.__edges = list(edges or HISTOGRAMEDGES)
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) stage totals
+        #:    of the previous update
+        self.__totals = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) counters
+        #:    of the previous update
+        self.__counters = {}
+        #: (:obj:`float`) time of the previous update
+        self.__last = time.time()
+
+    def reset(self):
+        """ starts a new rolling interval
+        """
+        self.__totals = self.__timer.totals()
+        self.__counters = self.__timer.counters()
+        self.__last = time.time()
+
+    def update(self):
+        """ provides latency percentiles and histograms in ms of stages
+        and rates of counters in Hz measured since the previous update
+
+        :returns: metrics dictionary
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        now = time.time()
+        interval = now - self.__last
+        totals = self.__timer.totals()
+        counters = self.__timer.counters()
+        stages = {}
+        for stage, total in totals.items():
+            # the timer could be reset in the meantime
+            new = total - self.__totals.get(stage, 0)
+            if new < 0:
+                new = total
+            if not new:
+                continue
+            smp = self.__timer.samples(
+                stage, min(new, self.__maxsamples)) * 1000
+            if not smp.size:
+                continue
+            stat = {
+                "count": new,
+                "mean": float(smp.mean()),
+                "max": float(smp.max()),
+                "histogram": [int(cnt) for cnt in np.bincount(
+                    np.searchsorted(self.__edges, smp, side="right"),
+                    minlength=len(self.__edges) + 1)],
+            }
+            for pct, value in zip(
+                    self.__percentiles,
+                    np.percentile(smp, self.__percentiles)):
+                stat["p%g" % pct] = float(value)
+            stages[stage] = stat
+        rates = {}
+        for name, value in counters.items():
+            new = value - self.__counters.get(name, 0)
+            if new < 0:
+                new = value
+            rates[name] = (new / interval) if interval > 0 else 0.0
+        self.__totals = totals
+        self.__counters = counters
+        self.__last = now
+        return {
+            "timestamp": now,
+            "interval": interval,
+            "edges": list(self.__edges),
+            "stages": stages,
+            "counters": counters,
+            "rates": rates,
+        }
+
+    @classmethod
+    def text(cls, metrics):
+        """ formats metrics as a table of stage latencies
+
+        :param metrics: metrics dictionary
+        :type metrics: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: table text
+        :rtype: :obj:`str`
+        """
+        stages = metrics.get("stages", {})
+        names = [st for st in STAGES if st in stages]
+        names.extend(sorted(st for st in stages if st not in STAGES))
+        lines = ["%-13s %7s %7s %7s" % ("stage [ms]", "p50", "p99", "max")]
+        for name in names:
+            stat = stages[name]
+            lines.append("%-13s %7.2f %7.2f %7.2f" % (
+                name, stat.get("p50", stat["mean"]),
+                stat.get("p99", stat["max"]), stat["max"]))
+        rates = metrics.get("rates", {})
+        if rates:
+            lines.append("  ".join(
+                "%s %.1f Hz" % (name, rates[name])
+                for name in sorted(rates)))
+        return "\n".join(lines)
+
+
+#: (:class:`StageTimer`) timer of the image pipeline stages
+TIMER = StageTimer()
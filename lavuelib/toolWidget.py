@@ -255,7 +255,8 @@ class ToolBaseWidget(QtGui.QWidget):
         """
 
     def beforeplot(self, array, rawarray):
-        """ command  before plot
+        """ command  before plot. The arrays are reused for later frames
+        after the next plot so the tool has to copy the data it keeps
 
         :param array: 2d image array
         :type array: :class:`numpy.ndarray`
@@ -0,0 +1,160 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+
+try:
+    from .asapofake import asapo_consumer
+except Exception:
+    from asapofake import asapo_consumer
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class ASAPOSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__maxlag = imageSource.ASAPOMAXLAG
+        self.__fname = os.path.join(
+            os.path.dirname(__file__), "images", "00001.tif")
+
+    def setUp(self):
+        asapo_consumer.filename = self.__fname
+        asapo_consumer.usermeta = None
+        asapo_consumer.stream_size = 0
+
+    def tearDown(self):
+        imageSource.ASAPOMAXLAG = self.__maxlag
+        asapo_consumer.filename = ""
+        asapo_consumer.stream_size = 0
+
+    def __source(self):
+        source = imageSource.ASAPOSource(100)
+        source.setConfiguration("haso:8500,detector,default,123456,token")
+        self.assertTrue(source.connect())
+        broker = source._ASAPOSource__broker
+        return source, broker
+
+    def __frameid(self, name):
+        return int(name.split("(")[1][:-1])
+
+    def test_latest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if getattr(imageSource, "asapo_consumer", None) is not asapo_consumer:
+            return
+        asapo_consumer.stream_size = 5
+        source, broker = self.__source()
+        _, name, _ = source.getData()
+        self.assertEqual(self.__frameid(name), 5)
+        # one round trip per new frame
+        self.assertEqual(broker.requests, ["get_last"])
+
+        del broker.requests[:]
+        # the unchanged frame is downloaded once,
+        # afterwards only its metadata are checked
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(broker.metaonly, True)
+        self.assertEqual(broker.requests, ["get_last"] * 3)
+
+        del broker.requests[:]
+        asapo_consumer.stream_size = 6
+        _, name, _ = source.getData()
+        self.assertEqual(self.__frameid(name), 6)
+        self.assertEqual(broker.requests, ["get_last"] * 2)
+        del broker.requests[:]
+        asapo_consumer.stream_size = 7
+        _, name, _ = source.getData()
+        self.assertEqual(self.__frameid(name), 7)
+        self.assertEqual(broker.requests, ["get_last"])
+        source.disconnect()
+
+    def test_stream(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if getattr(imageSource, "asapo_consumer", None) is not asapo_consumer:
+            return
+        imageSource.ASAPOMAXLAG = 100
+        asapo_consumer.stream_size = 3
+        source, broker = self.__source()
+        # the stream is followed from its last frame
+        _, name, _ = source.getData()
+        self.assertEqual(self.__frameid(name), 3)
+        self.assertEqual(broker.markers["default"], 3)
+        self.assertEqual(source.getData(), (None, None, None))
+
+        del broker.requests[:]
+        asapo_consumer.stream_size = 8
+        ids = []
+        for _ in range(10):
+            _, name, _ = source.getData()
+            if name is not None:
+                ids.append(self.__frameid(name))
+        self.assertEqual(ids, [4, 5, 6, 7, 8])
+        # one round trip per frame
+        self.assertEqual(broker.requests, ["get_next"] * 10)
+        source.disconnect()
+
+    def test_skipahead(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if getattr(imageSource, "asapo_consumer", None) is not asapo_consumer:
+            return
+        imageSource.ASAPOMAXLAG = 5
+        asapo_consumer.stream_size = 1
+        source, broker = self.__source()
+        _, name, _ = source.getData()
+        self.assertEqual(self.__frameid(name), 1)
+
+        asapo_consumer.stream_size = 1000
+        ids = []
+        for _ in range(10):
+            _, name, _ = source.getData()
+            ids.append(self.__frameid(name))
+        # the stream size is checked every 10 frames
+        self.assertEqual(ids, list(range(2, 11)) + [1000])
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(broker.markers["default"], 1000)
+        self.assertEqual(
+            [rq for rq in broker.requests if rq != "get_next"],
+            ["get_last", "set_lastread_marker",
+             "get_current_size", "get_last", "set_lastread_marker"])
+        source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
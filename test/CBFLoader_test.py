@@ -0,0 +1,283 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import struct
+import time
+import numpy as np
+
+from lavuelib import imageFileHandler
+
+try:
+    import fabio
+    #: (:obj:`bool`) fabio imported
+    FABIO = True
+except ImportError:
+    #: (:obj:`bool`) fabio imported
+    FABIO = False
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+#: (:obj:`bool`) run benchmarks
+BENCHMARK = bool(os.environ.get("LAVUE_BENCHMARK"))
+
+
+def byteoffset(values):
+    """ byte offset compression of integer values
+
+    :param values: integer values
+    :type values: :obj:`list` <:obj:`int`>
+    :returns: compressed stream
+    :rtype: :obj:`bytes`
+    """
+    res = []
+    last = 0
+    for val in values:
+        delta = val - last
+        last = val
+        if -127 <= delta <= 127:
+            res.append(struct.pack("<b", delta))
+        elif -32767 <= delta <= 32767:
+            res.append(b"\x80" + struct.pack("<h", delta))
+        elif -2147483647 <= delta <= 2147483647:
+            res.append(b"\x80\x00\x80" + struct.pack("<i", delta))
+        else:
+            res.append(
+                b"\x80\x00\x80\x00\x00\x00\x80" + struct.pack("<q", delta))
+    return b"".join(res)
+
+
+def byteoffsetref(stream, n_out):
+    """ sequential byte offset decompression
+
+    :param stream: compressed stream
+    :type stream: :obj:`bytes`
+    :param n_out: number of values
+    :type n_out: :obj:`int`
+    :returns: decompressed values
+    :rtype: :obj:`list` <:obj:`int`>
+    """
+    res = []
+    last = 0
+    i = 0
+    while len(res) < n_out:
+        delta = struct.unpack_from("<b", stream, i)[0]
+        i += 1
+        if delta == -128:
+            delta = struct.unpack_from("<h", stream, i)[0]
+            i += 2
+            if delta == -32768:
+                delta = struct.unpack_from("<i", stream, i)[0]
+                i += 4
+                if delta == -2147483648:
+                    delta = struct.unpack_from("<q", stream, i)[0]
+                    i += 8
+        last += delta
+        res.append(last)
+    return res
+
+
+def decompressold(stream, vals):
+    """ byte offset decompression of lavue 2.54 used as the benchmark
+    reference
+
+    :param stream: a part of cbf data
+    :type stream: :class:`numpy.ndarray`
+    :param val: decompress parameters, i.e. n_out, xdim, ydum padding
+    :type val: :class:`numpy.ndarray`
+    :returns: image data
+    :rtype: :class:`numpy.ndarray`
+    """
+    n_out, xdim, ydim, padding = vals
+    flbuffer = np.zeros(stream.size, dtype='int32') + stream
+    mymap = np.zeros(stream.size, dtype='uint8') + 1
+    isvalid = np.zeros(stream.size, dtype='uint8') + 1
+    for i in np.where(stream == 128)[0]:
+        if mymap[i] != 0:
+            if stream[i + 1] != 0 or stream[i + 2] != 128:
+                mymap[i:i + 3] = 0
+                isvalid[i + 1:i + 3] = 0
+                delta = flbuffer[i + 1] + flbuffer[i + 2] * 256
+                if delta > 32768:
+                    delta -= 65536
+                flbuffer[i] = delta
+            else:
+                mymap[i:i + 7] = 0
+                isvalid[i + 1:i + 7] = 0
+                delta = (np.multiply(
+                    flbuffer[i + 3:i + 7],
+                    np.array([1, 256, 65536, 16777216], dtype='int64'))
+                ).sum()
+                if delta > 2147483648:
+                    delta -= 4294967296
+                flbuffer[i] = delta
+    flbuffer[np.where((stream > 128) & (mymap != 0))] -= 256
+    flbuffer = flbuffer[np.where(isvalid != 0)]
+    res = np.cumsum(flbuffer, dtype='int32')
+    if res.size - padding != n_out:
+        return np.array([0])
+    return res[0:n_out].reshape(xdim, ydim, order='F')
+
+
+# test fixture
+class CBFLoaderTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__image = os.path.join(
+            os.path.dirname(__file__), "images", "tst_05717_00000.cbf")
+
+    def test_decompress(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        values = [0, 1, -5, 127, 128, -128, 32767, -32768, 40000,
+                  -40000, 0, 2 ** 31 - 2, 3, 128, 128 + 128, 0]
+        stream = np.frombuffer(byteoffset(values), dtype=np.uint8)
+        image = imageFileHandler.CBFLoader._decompress_cbf_c(
+            stream, np.array([len(values), 4, 4, 0]))
+        self.assertEqual(image.dtype, np.int32)
+        self.assertTrue(np.array_equal(
+            image, np.array(values).reshape(4, 4, order='F')))
+
+        values = [1, 2 ** 40, -2 ** 35, 7]
+        stream = np.frombuffer(byteoffset(values), dtype=np.uint8)
+        image = imageFileHandler.CBFLoader._decompress_cbf_c(
+            stream, np.array([len(values), 2, 2, 0]))
+        self.assertEqual(image.dtype, np.int64)
+        self.assertTrue(np.array_equal(
+            image, np.array(values).reshape(2, 2, order='F')))
+
+        image = imageFileHandler.CBFLoader._decompress_cbf_c(
+            stream, np.array([len(values) + 1, 5, 1, 0]))
+        self.assertTrue(np.array_equal(image, np.array([0])))
+
+    def test_decompress_escape_runs(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        # +128 ramp: every delta is the 0x80 0x80 0x00 escape
+        values = [128 * (i + 1) for i in range(16384)]
+        stream = np.frombuffer(byteoffset(values), dtype=np.uint8)
+        self.assertEqual(int((stream == 0x80).sum()), 2 * len(values))
+        start = time.time()
+        image = imageFileHandler.CBFLoader._decompress_cbf_c(
+            stream, np.array([len(values), 128, 128, 0]))
+        self.assertTrue(time.time() - start < 2)
+        self.assertTrue(np.array_equal(
+            image, np.array(values).reshape(128, 128, order='F')))
+
+        # escapes with 0x80 payload bytes mixed with plain deltas
+        rng = np.random.RandomState(17)
+        for _ in range(20):
+            deltas = rng.choice(
+                [-128, 128, 127, 0x8080 - 65536, 0x80, -0x7f80, 1,
+                 2 ** 31 - 128, -2 ** 31 + 128, 2 ** 33, -2 ** 33],
+                size=400)
+            values = np.cumsum(deltas).tolist()
+            bstream = byteoffset(values)
+            stream = np.frombuffer(bstream, dtype=np.uint8)
+            image = imageFileHandler.CBFLoader._decompress_cbf_c(
+                stream, np.array([len(values), 20, 20, 0]))
+            self.assertEqual(
+                image.reshape(-1, order='F').tolist(),
+                byteoffsetref(bstream, len(values)))
+
+    @unittest.skipUnless(BENCHMARK, "set LAVUE_BENCHMARK=1 to run")
+    def test_benchmark(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        rng = np.random.RandomState(5)
+        data = np.fromfile(self.__image, dtype=np.uint8)
+        images = [
+            ("tst_05717_00000.cbf 487x195",
+             imageFileHandler.CBFLoader.load(data)),
+            ("poisson(50) 1679x1475",
+             rng.poisson(50, size=(1475, 1679)).astype(np.int32)),
+            ("int32 escapes 1000x1000",
+             rng.randint(-2 ** 20, 2 ** 20, size=(1000, 1000)).astype(
+                 np.int32)),
+        ]
+        for name, ref in images:
+            flat = ref.reshape(-1, order='F')
+            stream = np.frombuffer(
+                byteoffset(flat.tolist()), dtype=np.uint8)
+            vals = np.array([flat.size, ref.shape[0], ref.shape[1], 0])
+            times = []
+            for decompress in [
+                    decompressold,
+                    imageFileHandler.CBFLoader._decompress_cbf_c]:
+                best = None
+                for _ in range(3):
+                    start = time.time()
+                    image = decompress(stream, vals)
+                    dt = time.time() - start
+                    best = dt if best is None else min(best, dt)
+                self.assertTrue(np.array_equal(image, ref))
+                times.append(best)
+            print("%s: %.1f ms -> %.1f ms" % (
+                name, times[0] * 1000, times[1] * 1000))
+
+    def test_load(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        data = np.fromfile(self.__image, dtype=np.uint8)
+        image = imageFileHandler.CBFLoader.load(data)
+        self.assertEqual(image.shape, (195, 487))
+        self.assertEqual(image.dtype, np.int32)
+        if FABIO:
+            self.assertTrue(
+                np.array_equal(image, fabio.open(self.__image).data))
+
+        image = imageFileHandler.CBFLoader.load(data[:1000])
+        self.assertTrue(np.array_equal(image, np.array([0])))
+
+    def test_load_random(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if not FABIO:
+            return
+        fname = "%s_%s.cbf" % (self.__class__.__name__, fun)
+        try:
+            for scale in [10, 300, 100000]:
+                ref = np.random.poisson(
+                    scale, size=(173, 211)).astype(np.int32)
+                ref[::7, ::5] = -1
+                fabio.cbfimage.CbfImage(data=ref).write(fname)
+                data = np.fromfile(fname, dtype=np.uint8)
+                image = imageFileHandler.CBFLoader.load(data)
+                self.assertTrue(np.array_equal(image, ref))
+        finally:
+            if os.path.exists(fname):
+                os.remove(fname)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import threading
+import time
+
+from pyqtgraph import QtCore
+
+from lavuelib import dataFetchThread
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class ExchangeListTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_default(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        el = dataFetchThread.ExchangeList()
+        self.assertEqual(el.size(), 1)
+        self.assertEqual(el.policy(), "coalesce")
+        self.assertEqual(el.pending(), 0)
+        self.assertEqual(el.dropped(), 0)
+        self.assertEqual(el.readData(), (None, None, None))
+
+        self.assertTrue(el.addData("img1", 1, "{}"))
+        self.assertEqual(el.pending(), 1)
+        self.assertEqual(el.readData(), ("img1", 1, "{}"))
+        self.assertEqual(el.pending(), 0)
+        # the last frame is kept for the consumer
+        self.assertEqual(el.readData(), ("img1", 1, "{}"))
+        self.assertEqual(el.dropped(), 0)
+
+    def test_coalesce(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        el = dataFetchThread.ExchangeList(3, "coalesce")
+        for i in range(5):
+            self.assertTrue(el.addData("img%s" % i, i, ""))
+        self.assertEqual(el.pending(), 3)
+        self.assertEqual(el.dropped(), 2)
+        self.assertEqual(el.readData(), ("img4", 4, ""))
+        self.assertEqual(el.pending(), 0)
+        self.assertEqual(el.dropped(), 4)
+
+    def test_dropoldest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        el = dataFetchThread.ExchangeList(3, "dropoldest")
+        for i in range(5):
+            self.assertTrue(el.addData("img%s" % i, i, ""))
+        self.assertEqual(el.dropped(), 2)
+        for i in range(2, 5):
+            self.assertEqual(el.readData(), ("img%s" % i, i, ""))
+        self.assertEqual(el.pending(), 0)
+        self.assertEqual(el.readData(), ("img4", 4, ""))
+        self.assertEqual(el.dropped(), 2)
+
+    def test_dropnewest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        el = dataFetchThread.ExchangeList(3, "dropnewest")
+        for i in range(3):
+            self.assertTrue(el.addData("img%s" % i, i, ""))
+        for i in range(3, 5):
+            self.assertTrue(not el.addData("img%s" % i, i, ""))
+        self.assertEqual(el.dropped(), 2)
+        for i in range(3):
+            self.assertEqual(el.readData(), ("img%s" % i, i, ""))
+        self.assertEqual(el.pending(), 0)
+
+    def test_resize_clear(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        el = dataFetchThread.ExchangeList(5, "dropoldest")
+        for i in range(5):
+            el.addData("img%s" % i, i, "")
+        el.setSize(2)
+        self.assertEqual(el.size(), 2)
+        self.assertEqual(el.pending(), 2)
+        self.assertEqual(el.dropped(), 3)
+        self.assertEqual(el.readData(), ("img3", 3, ""))
+        el.setPolicy("dropnewest")
+        self.assertEqual(el.policy(), "dropnewest")
+        self.assertRaises(ValueError, el.setPolicy, "unknown")
+        el.clear()
+        self.assertEqual(el.pending(), 0)
+        self.assertEqual(el.dropped(), 0)
+        self.assertEqual(el.readData(), (None, None, None))
+
+
+class SilentSource(object):
+
+    """ push source without new data """
+
+    def __init__(self):
+        self.waits = []
+
+    def wait(self, timeout):
+        self.waits.append(timeout)
+        time.sleep(timeout)
+        return False
+
+    def getData(self):
+        return None, None, None
+
+
+class DataFetchThreadTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__refreshrate = dataFetchThread.GLOBALREFRESHRATE
+
+    def tearDown(self):
+        dataFetchThread.GLOBALREFRESHRATE = self.__refreshrate
+
+    def test_backlog(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        dataFetchThread.GLOBALREFRESHRATE = 0.5
+        el = dataFetchThread.ExchangeList(4, "dropoldest")
+        source = SilentSource()
+        dft = dataFetchThread.DataFetchThread(source, el)
+        frames = []
+        deferred = []
+
+        def consume(name, metadata):
+            frames.append(el.readData()[0])
+            if deferred:
+                threading.Timer(0.02, dft.ready).start()
+            else:
+                dft.ready()
+
+        dft.newDataNameFetched.connect(
+            consume, QtCore.Qt.DirectConnection)
+        dft.changeStatus(True)
+        for i in range(3):
+            el.addData("img%s" % i, i, "")
+        start = time.time()
+        dft.start()
+        try:
+            end = start + 5
+            while len(frames) < 3 and time.time() < end:
+                time.sleep(0.01)
+            # the buffered frames do not wait for the refresh time
+            self.assertEqual(frames, ["img0", "img1", "img2"])
+            self.assertTrue(time.time() - start < 0.4)
+
+            # the consumer becomes ready later in its own thread
+            deferred.append(True)
+            for i in range(3, 6):
+                el.addData("img%s" % i, i, "")
+            end = time.time() + 5
+            # the first frame waits for the blocked source check
+            while len(frames) < 4 and time.time() < end:
+                time.sleep(0.001)
+            start = time.time()
+            while len(frames) < 6 and time.time() < end:
+                time.sleep(0.01)
+            self.assertEqual(
+                frames, ["img0", "img1", "img2", "img3", "img4", "img5"])
+            self.assertTrue(time.time() - start < 0.4)
+        finally:
+            dft.stop()
+            dft.wait()
+        self.assertFalse(dft.isRunning())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    from .hidrafake import hidra
+    from .asapofake import asapo_consumer
+except Exception:
+    from hidrafake import hidra
+    from asapofake import asapo_consumer
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+class Gate(object):
+
+    """ decode function which waits for its release """
+
+    def __init__(self):
+        self.events = {}
+
+    def release(self, key):
+        self.events.setdefault(key, threading.Event()).set()
+
+    def __call__(self, key):
+        self.events.setdefault(key, threading.Event()).wait(5)
+        return key, "img%s" % key, ""
+
+
+# test fixture
+class DecodePoolTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__workers = imageSource.DECODEWORKERS
+        tdir = os.path.join(os.path.dirname(__file__), "images")
+        self.__cbf = os.path.join(tdir, "tst_05717_00000.cbf")
+        self.__tif = os.path.join(tdir, "00001.tif")
+
+    def tearDown(self):
+        imageSource.DECODEWORKERS = self.__workers
+        hidra.filename = ""
+        asapo_consumer.filename = ""
+
+    def test_order(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.FUTURES:
+            return
+        gate = Gate()
+        pool = imageSource.DecodePool(2)
+        pool.submit(gate, 1)
+        pool.submit(gate, 2)
+        self.assertEqual(pool.pending(), 2)
+        # the second frame is not delivered before the first one
+        gate.release(2)
+        self.assertEqual(pool.result(), (None, None, None))
+        gate.release(1)
+        self.assertEqual(pool.result(wait=True), (1, "img1", ""))
+        self.assertEqual(pool.result(wait=True), (2, "img2", ""))
+        self.assertEqual(pool.pending(), 0)
+        self.assertEqual(pool.dropped(), 0)
+        self.assertEqual(pool.result(wait=True), (None, None, None))
+        pool.shutdown()
+
+    def test_stale(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.FUTURES:
+            return
+        gate = Gate()
+        pool = imageSource.DecodePool(1)
+        pool.submit(gate, 1)
+        pool.submit(gate, 2)
+        # the queued frame 2 is replaced by frame 3
+        pool.submit(gate, 3)
+        self.assertEqual(pool.pending(), 2)
+        self.assertEqual(pool.dropped(), 1)
+        for key in [1, 2, 3]:
+            gate.release(key)
+        self.assertEqual(pool.result(wait=True), (1, "img1", ""))
+        pool.submit(gate, 4)
+        gate.release(4)
+        pool.submit(lambda: (5, "img5", ""))
+        # frames 3 and 4 are decoded, only the newest is delivered
+        result = (None, None, None)
+        while pool.pending():
+            result = pool.result(wait=True)
+        self.assertEqual(result, (5, "img5", ""))
+        self.assertTrue(pool.dropped() >= 2)
+        pool.shutdown()
+
+    def test_nofutures(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        futures = imageSource.FUTURES
+        imageSource.FUTURES = False
+        try:
+            self.assertRaises(Exception, imageSource.DecodePool, 2)
+        finally:
+            imageSource.FUTURES = futures
+
+    def test_tobuffer(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        data = b"\x01\x02\x03\x04"
+        buf = imageSource.tobuffer(data)
+        self.assertEqual(buf.dtype, np.uint8)
+        self.assertEqual(buf.tolist(), [1, 2, 3, 4])
+        image = np.array([[1, 2], [3, 4]], dtype="uint16")
+        buf = imageSource.tobuffer(image.T)
+        self.assertEqual(buf.size, 8)
+        self.assertTrue(np.array_equal(
+            buf.view("uint16"), image.T.reshape(-1)))
+        if sys.version_info > (3,):
+            # payloads without the buffer interface are copied
+            buf = imageSource.tobuffer([1, 2, 3, 4])
+            self.assertEqual(buf.dtype, np.uint8)
+            self.assertEqual(buf.tolist(), [1, 2, 3, 4])
+
+    def __frames(self, source, count):
+        frames = []
+        for _ in range(count * 100):
+            img, name, meta = source.getData()
+            if name is not None:
+                frames.append((img, name, meta))
+            if len(frames) == count:
+                break
+            # refresh time of the fetch thread
+            time.sleep(0.01)
+        return frames
+
+    def test_hidra(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if getattr(imageSource, "hidra", None) is not hidra:
+            return
+        for fname in [self.__cbf, self.__tif]:
+            hidra.filename = fname
+            results = []
+            for workers in [0, 2]:
+                if workers and not imageSource.FUTURES:
+                    continue
+                imageSource.DECODEWORKERS = workers
+                source = imageSource.HiDRASource(100)
+                source.setConfiguration("localhost,localhost,50001")
+                self.assertTrue(source.connect())
+                results.append(self.__frames(source, 3))
+                source.disconnect()
+            for frames in results:
+                self.assertEqual(len(frames), 3)
+                for img, name, _ in frames:
+                    self.assertEqual(name, os.path.basename(fname))
+                    self.assertTrue(
+                        np.array_equal(img, results[0][0][0]))
+
+    def test_asapo(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if getattr(imageSource, "asapo_consumer", None) \
+           is not asapo_consumer:
+            return
+        for fname in [self.__cbf, self.__tif]:
+            asapo_consumer.filename = fname
+            results = []
+            for workers in [0, 2]:
+                if workers and not imageSource.FUTURES:
+                    continue
+                imageSource.DECODEWORKERS = workers
+                source = imageSource.ASAPOSource(100)
+                source.setConfiguration(
+                    "haso:8500,detector,default,123456,token")
+                self.assertTrue(source.connect())
+                results.append(
+                    [frame for frame in self.__frames(source, 3)
+                     if frame[1]])
+                source.disconnect()
+            for frames in results:
+                self.assertTrue(frames)
+                for img, name, _ in frames:
+                    self.assertTrue(
+                        name.startswith(os.path.basename(fname)))
+                    self.assertTrue(
+                        np.array_equal(img, results[0][0][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
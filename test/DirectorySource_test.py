@@ -0,0 +1,214 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+
+from lavuelib import imageSource
+from lavuelib import imageFileHandler
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class DirectorySourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__workers = imageSource.DECODEWORKERS
+        self.__images = os.path.join(os.path.dirname(__file__), "images")
+        self.__dir = None
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        imageSource.DECODEWORKERS = self.__workers
+        shutil.rmtree(self.__dir)
+
+    def __source(self, patterns="*.tif *.cbf", recursive=False):
+        source = imageSource.DirectorySource(100)
+        source.setConfiguration(
+            "%s,%s,%s" % (self.__dir, patterns, recursive))
+        self.assertTrue(source.connect())
+        return source
+
+    def __copy(self, name, target, dirname=None):
+        target = os.path.join(dirname or self.__dir, target)
+        shutil.copy(os.path.join(self.__images, name), target)
+        return target
+
+    def __image(self, name):
+        return imageFileHandler.ImageFileHandler(
+            os.path.join(self.__images, name)).getImage()
+
+    def __frames(self, source):
+        frames = []
+        # the pool waits for pending frames
+        while source.wait(0.2):
+            img, name, meta = source.getData()
+            if name is not None:
+                frames.append((img, name, meta))
+        return frames
+
+    def test_newest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.INOTIFY:
+            return
+        self.__copy("00001.tif", "old_00001.tif")
+        for workers in [0, 2]:
+            if workers and not imageSource.FUTURES:
+                continue
+            imageSource.DECODEWORKERS = workers
+            source = self.__source()
+            # existing files are not shown
+            self.assertTrue(not source.wait(0.01))
+            self.assertEqual(source.getData(), (None, None, None))
+
+            cbf = self.__copy("tst_05717_00000.cbf", "scan_%s.cbf" % workers)
+            frames = self.__frames(source)
+            self.assertEqual(len(frames), 1)
+            img, name, meta = frames[0]
+            self.assertEqual(name, cbf)
+            self.assertTrue(np.array_equal(
+                img, np.transpose(self.__image("tst_05717_00000.cbf"))))
+            self.assertTrue(meta)
+
+            # only the newest of the files is decoded
+            for i in range(1, 5):
+                tif = self.__copy(
+                    "%05d.tif" % i, "scan_%s_%05d.tif" % (workers, i))
+            self.__copy("00001.tif", "scan_%s.txt" % workers)
+            frames = self.__frames(source)
+            self.assertEqual(len(frames), 1)
+            self.assertEqual(frames[0][1], tif)
+            self.assertTrue(np.array_equal(
+                frames[0][0], np.transpose(self.__image("00004.tif"))))
+            self.assertEqual(source.files, 5)
+            self.assertEqual(source.skipped, 3)
+            source.disconnect()
+
+    def test_norescan(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.INOTIFY:
+            return
+        imageSource.DECODEWORKERS = 0
+        for i in range(200):
+            open(os.path.join(self.__dir, "old_%05d.tif" % i), "w").close()
+        source = self.__source()
+        listing = []
+        walk, listdir, scandir = os.walk, os.listdir, os.scandir
+        os.walk = lambda *args, **kargs: listing.append(args) or walk(
+            *args, **kargs)
+        os.listdir = lambda *args: listing.append(args) or listdir(*args)
+        os.scandir = lambda *args: listing.append(args) or scandir(*args)
+        try:
+            for i in range(3):
+                tif = self.__copy("00002.tif", "new_%05d.tif" % i)
+                _, name, _ = source.getData()
+                self.assertEqual(name, tif)
+                self.assertEqual(source.getData(), (None, None, None))
+        finally:
+            os.walk, os.listdir, os.scandir = walk, listdir, scandir
+        self.assertEqual(listing, [])
+        source.disconnect()
+
+    def test_recursive(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.INOTIFY:
+            return
+        imageSource.DECODEWORKERS = 0
+        os.mkdir(os.path.join(self.__dir, "scan1"))
+        source = self.__source("*.tif", True)
+        tif = self.__copy(
+            "00001.tif", "00001.tif", os.path.join(self.__dir, "scan1"))
+        self.assertEqual(source.getData()[1], tif)
+
+        # a new directory is watched
+        scan2 = os.path.join(self.__dir, "scan2")
+        os.mkdir(scan2)
+        self.assertTrue(source.wait(0.5))
+        self.assertEqual(source.getData(), (None, None, None))
+        tif = self.__copy("00003.tif", "00003.tif", scan2)
+        self.assertEqual(source.getData()[1], tif)
+
+        # a file moved into the tree
+        tmp = self.__copy("00004.tif", "00004.tmp", scan2)
+        tif = os.path.join(scan2, "00004.tif")
+        os.rename(tmp, tif)
+        self.assertEqual(source.getData()[1], tif)
+        source.disconnect()
+
+        source = self.__source("*.tif", False)
+        self.__copy("00001.tif", "00002.tif", scan2)
+        self.assertEqual(source.getData(), (None, None, None))
+        source.disconnect()
+
+    def test_nexus(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.INOTIFY:
+            return
+        try:
+            import h5py
+        except ImportError:
+            return
+        imageSource.DECODEWORKERS = 0
+        source = self.__source("*.h5")
+        images = np.arange(24, dtype="int32").reshape(2, 4, 3)
+        fname = os.path.join(self.__dir, "scan.h5")
+        with h5py.File(fname, "w") as fl:
+            fl.create_dataset("entry/data/data", data=images)
+        img, name, _ = source.getData()
+        self.assertEqual(name, "%s://entry/data/data" % fname)
+        self.assertTrue(np.array_equal(img, np.transpose(images[-1])))
+        source.disconnect()
+
+    def test_error(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = imageSource.DirectorySource(100)
+        source.setConfiguration(
+            "%s,*.tif,False" % os.path.join(self.__dir, "missing"))
+        self.assertTrue(not source.connect())
+        self.assertEqual(source.getData()[1], "__ERROR__")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    from . import epics
+except Exception:
+    import epics
+try:
+    from . import epicsfake
+except Exception:
+    import epicsfake
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class EpicsPVSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__monitor = imageSource.EPICSMONITOR
+        self.__fname = os.path.join(
+            os.path.dirname(__file__), "images", "00001.tif")
+        print("Epics faked: %s" % epicsfake.faked)
+
+    def tearDown(self):
+        imageSource.EPICSMONITOR = self.__monitor
+        epics.filename = ""
+
+    def __faked(self):
+        return getattr(imageSource, "epics", None) is epics
+
+    def __source(self, configuration):
+        source = imageSource.EpicsPVSource(100)
+        source.setConfiguration(configuration)
+        self.assertTrue(source.connect())
+        return source, source._EpicsPVSource__pv
+
+    def test_polling(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not self.__faked():
+            return
+        imageSource.EPICSMONITOR = False
+        epics.filename = self.__fname
+        source, pv = self.__source("13SIM1:image1:ArrayData,[]")
+        self.assertEqual(pv.callbacks, {})
+        self.assertTrue(source.wait(0.01))
+        for i in range(3):
+            img, name, _ = source.getData()
+            self.assertTrue(name.startswith("13SIM1:image1:ArrayData,[]"))
+            self.assertEqual(pv.gets, i + 1)
+        source.disconnect()
+
+    def test_monitor(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not self.__faked():
+            return
+        imageSource.EPICSMONITOR = True
+        source, pv = self.__source("13SIM1:image1:ArrayData,[4, 3]")
+        self.assertEqual(pv.auto_monitor, True)
+        self.assertEqual(len(pv.callbacks), 1)
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertTrue(not source.wait(0.01))
+
+        value = np.arange(15, dtype="uint16")
+        pv.post(value, 1234.5)
+        self.assertTrue(source.wait(0.01))
+        img, name, meta = source.getData()
+        self.assertTrue(
+            np.array_equal(img, np.transpose(value[:12].reshape(3, 4))))
+        self.assertEqual(name, "13SIM1:image1:ArrayData,[4, 3] (1234.5)")
+        self.assertEqual(meta, None)
+        # the array is delivered only once
+        self.assertTrue(not source.wait(0.01))
+        self.assertEqual(source.getData(), (None, None, None))
+        # no channel access get is performed
+        self.assertEqual(pv.gets, 0)
+
+        # only the newest of two arrays is delivered
+        pv.post(value + 1, 1235.5)
+        pv.post(value + 2, 1236.5)
+        img, name, _ = source.getData()
+        self.assertTrue(
+            np.array_equal(img, np.transpose(value[:12].reshape(3, 4)) + 2))
+        self.assertEqual(name, "13SIM1:image1:ArrayData,[4, 3] (1236.5)")
+        self.assertEqual(source.getData(), (None, None, None))
+
+        source.disconnect()
+        self.assertEqual(pv.callbacks, {})
+
+    def test_wakeup(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not self.__faked():
+            return
+        imageSource.EPICSMONITOR = True
+        source, pv = self.__source("13SIM1:image1:ArrayData,[]")
+        value = np.arange(10, dtype="int32")
+        timer = threading.Timer(0.1, pv.post, (value, 17.0))
+        timer.start()
+        start = time.time()
+        # the waiting fetch thread wakes up on the monitor callback
+        self.assertTrue(source.wait(5))
+        self.assertTrue(time.time() - start < 4)
+        timer.join()
+        img, name, _ = source.getData()
+        self.assertTrue(np.array_equal(img, value))
+        self.assertEqual(name, "13SIM1:image1:ArrayData,[] (17.0)")
+        source.disconnect()
+
+    def test_reconnect(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not self.__faked():
+            return
+        imageSource.EPICSMONITOR = True
+        source, pv = self.__source("13SIM1:image1:ArrayData,[]")
+        source.disconnect()
+        # the subscription of the first PV is released
+        self.assertEqual(pv.callbacks, {})
+        self.assertEqual(pv.auto_monitor, False)
+        self.assertEqual(pv.connected, False)
+        self.assertEqual(source.getData()[1], "__ERROR__")
+
+        self.assertTrue(source.connect())
+        pv2 = source._EpicsPVSource__pv
+        self.assertTrue(pv2 is not pv)
+        self.assertEqual(pv2.auto_monitor, True)
+        self.assertEqual(len(pv2.callbacks), 1)
+        value = np.arange(10, dtype="int32")
+        pv.post(value, 1.0)
+        self.assertEqual(source.getData(), (None, None, None))
+        pv2.post(value, 2.0)
+        img, name, _ = source.getData()
+        self.assertTrue(np.array_equal(img, value))
+        self.assertEqual(name, "13SIM1:image1:ArrayData,[] (2.0)")
+
+        # a reconnection without disconnect releases the previous PV
+        self.assertTrue(source.connect())
+        self.assertEqual(pv2.connected, False)
+        self.assertEqual(pv2.callbacks, {})
+        source.disconnect()
+
+        imageSource.EPICSMONITOR = False
+        source, pv = self.__source("13SIM1:image1:ArrayData,[]")
+        source.disconnect()
+        self.assertEqual(pv.connected, False)
+
+
+if __name__ == '__main__':
+    unittest.main()
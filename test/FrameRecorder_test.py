@@ -0,0 +1,203 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+import threading
+
+import numpy as np
+
+from lavuelib import frameRecorder
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+class SlowImage(object):
+
+    """ image which is converted after its release """
+
+    def __init__(self, image):
+        self.image = image
+        self.nbytes = image.nbytes
+        self.event = threading.Event()
+
+    def __array__(self, dtype=None, copy=None):
+        self.event.wait(5)
+        return self.image
+
+
+# test fixture
+class FrameRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__fname = os.path.join(self.__dir, "frames.lrec")
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir)
+
+    def __frames(self):
+        return [
+            (np.arange(12, dtype="uint16").reshape(3, 4), "frame1",
+             json.dumps({"exposure": 0.1})),
+            (np.ones((5, 2), dtype=">f4"), "frame2", ""),
+            (np.zeros((2, 3, 3), dtype="uint8"), "frame3", None),
+        ]
+
+    def __read(self, reader):
+        frames = []
+        frame = reader.read()
+        while frame is not None:
+            frames.append(frame)
+            frame = reader.read()
+        return frames
+
+    def test_roundtrip(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for level in [0, 1]:
+            recorder = frameRecorder.FrameRecorder(
+                self.__fname, chunkframes=2, level=level)
+            for i, (image, name, meta) in enumerate(self.__frames()):
+                self.assertTrue(recorder.write(image, name, meta, 10. + i))
+            # error frames are not recorded
+            self.assertTrue(not recorder.write("Error", "__ERROR__", ""))
+            recorder.close()
+            self.assertEqual(recorder.frames, 3)
+            self.assertTrue(not recorder.write(*self.__frames()[0]))
+
+            reader = frameRecorder.FrameReader(self.__fname)
+            frames = self.__read(reader)
+            self.assertEqual(len(frames), 3)
+            for i, (timestamp, image, name, meta) in enumerate(frames):
+                eimage, ename, emeta = self.__frames()[i]
+                self.assertEqual(timestamp, 10. + i)
+                self.assertTrue(np.array_equal(image, eimage))
+                self.assertEqual(image.dtype, eimage.dtype)
+                self.assertEqual(name, ename)
+                self.assertEqual(meta, emeta or "")
+            reader.rewind()
+            self.assertEqual(reader.read()[2], "frame1")
+            reader.close()
+            os.remove(self.__fname)
+
+    def test_compact(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        recorder = frameRecorder.FrameRecorder(self.__fname)
+        image = np.zeros((256, 256), dtype="int32")
+        image[100:110, 100:110] = 1000
+        for i in range(20):
+            recorder.write(image, "frame%s" % i)
+        recorder.close()
+        self.assertTrue(recorder.rawbytes >= 20 * image.nbytes)
+        self.assertTrue(os.path.getsize(self.__fname) < image.nbytes)
+
+    def test_append(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for image, name, meta in self.__frames():
+            recorder = frameRecorder.FrameRecorder(self.__fname)
+            recorder.write(image, name, meta)
+            recorder.close()
+        reader = frameRecorder.FrameReader(self.__fname)
+        self.assertEqual(
+            [frame[2] for frame in self.__read(reader)],
+            ["frame1", "frame2", "frame3"])
+        reader.close()
+
+    def test_truncated(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        recorder = frameRecorder.FrameRecorder(self.__fname, chunkframes=1)
+        for image, name, meta in self.__frames():
+            recorder.write(image, name, meta)
+        recorder.close()
+        with open(self.__fname, "r+b") as fl:
+            fl.truncate(os.path.getsize(self.__fname) - 5)
+        reader = frameRecorder.FrameReader(self.__fname)
+        self.assertEqual(len(self.__read(reader)), 2)
+        reader.close()
+
+        with open(self.__fname, "wb") as fl:
+            fl.write(b"no record file")
+        self.assertRaises(
+            Exception, frameRecorder.FrameReader, self.__fname)
+        self.assertRaises(
+            Exception, frameRecorder.FrameRecorder, self.__fname)
+
+    def test_dropped(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        recorder = frameRecorder.FrameRecorder(
+            self.__fname, queueframes=2)
+        image = np.arange(12, dtype="uint16").reshape(3, 4)
+        slow = SlowImage(image)
+        # the writer is busy with the first frame
+        self.assertTrue(recorder.write(slow, "frame0"))
+        results = [recorder.write(image, "frame%s" % i)
+                   for i in range(1, 6)]
+        self.assertTrue(results.count(False) >= 3)
+        self.assertEqual(recorder.dropped, results.count(False))
+        slow.event.set()
+        recorder.flush()
+        self.assertEqual(recorder.frames, 1 + results.count(True))
+        self.assertTrue(recorder.write(image, "frame6"))
+        recorder.close()
+        self.assertEqual(recorder.frames, 2 + results.count(True))
+
+        reader = frameRecorder.FrameReader(self.__fname)
+        frames = self.__read(reader)
+        reader.close()
+        self.assertEqual(frames[0][2], "frame0")
+        self.assertEqual(frames[-1][2], "frame6")
+        self.assertEqual(len(frames), recorder.frames)
+        for frame in frames:
+            self.assertTrue(np.array_equal(frame[1], image))
+
+        # the size of the waiting frames is bounded
+        recorder = frameRecorder.FrameRecorder(
+            self.__fname, queuebytes=image.nbytes)
+        slow = SlowImage(image)
+        self.assertTrue(recorder.write(slow, "frame7"))
+        self.assertTrue(not recorder.write(image, "frame8"))
+        self.assertEqual(recorder.dropped, 1)
+        slow.event.set()
+        recorder.close()
+        self.assertEqual(recorder.frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
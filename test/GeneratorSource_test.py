@@ -0,0 +1,197 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import time
+
+import numpy as np
+from pyqtgraph import QtGui
+
+from lavuelib import imageSource
+from lavuelib import sourceWidget
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+#  Qt-application
+app = None
+
+
+# test fixture
+class GeneratorSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        global app
+        if app is None:
+            app = QtGui.QApplication([])
+
+    def __source(self, configuration):
+        source = imageSource.GeneratorSource()
+        source.setConfiguration(configuration)
+        self.assertTrue(source.connect())
+        return source
+
+    def test_configuration(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        params = imageSource.GeneratorSource.parseConfiguration("")
+        self.assertEqual(params["shape"], [2048, 4096])
+        self.assertEqual(params["rate"], 0)
+        params = imageSource.GeneratorSource.parseConfiguration(
+            "shape=4096x4096, dtype=uint16, rate=100, channels=2, "
+            "pattern=Peaks, frameids=False")
+        self.assertEqual(params["shape"], [4096, 4096])
+        self.assertEqual(params["dtype"], "uint16")
+        self.assertEqual(params["rate"], 100.0)
+        self.assertEqual(params["channels"], 2)
+        self.assertEqual(params["pattern"], "peaks")
+        self.assertEqual(params["frameids"], False)
+        # NaN pixels need a float type
+        params = imageSource.GeneratorSource.parseConfiguration(
+            "dtype=uint16,nan=0.1")
+        self.assertEqual(params["dtype"], "float32")
+        for wrong in ["shape=12", "pattern=stars", "color=red", "rate"]:
+            self.assertRaises(
+                ValueError,
+                imageSource.GeneratorSource.parseConfiguration, wrong)
+
+        source = imageSource.GeneratorSource()
+        source.setConfiguration("shape=0x10")
+        self.assertTrue(not source.connect())
+        self.assertEqual(source.getData()[1], "__ERROR__")
+
+    def test_patterns(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for pattern in imageSource.GeneratorSource.patterns:
+            source = self.__source(
+                "shape=64x96,dtype=uint16,pattern=%s" % pattern)
+            img, name, meta = source.getData()
+            self.assertEqual(img.shape, (64, 96))
+            self.assertEqual(img.dtype, np.uint16)
+            self.assertEqual(name, "generator_1")
+            self.assertEqual(json.loads(meta), {"frame": 1})
+            source.disconnect()
+
+        # the frames are reproducible
+        images = []
+        for _ in range(2):
+            source = self.__source("shape=32x32,pattern=peaks,seed=7")
+            images.append(source.getData()[0])
+            source.disconnect()
+        self.assertTrue(np.array_equal(images[0], images[1]))
+
+    def test_channels(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(
+            "shape=20x30,dtype=float32,channels=3,nan=0.25,"
+            "geometry=True,labels=True,frameids=False")
+        img, _, meta = source.getData()
+        self.assertEqual(img.shape, (3, 20, 30))
+        self.assertTrue(0.1 < np.isnan(img).mean() < 0.4)
+        mdata = json.loads(meta)
+        self.assertEqual(
+            mdata["channellabels"],
+            {"0": "channel 0", "1": "channel 1", "2": "channel 2"})
+        self.assertEqual(mdata["beam_center_x"], 15.)
+        self.assertEqual(mdata["beam_center_y"], 10.)
+        self.assertTrue("frame" not in mdata)
+        source.disconnect()
+
+    def test_rate(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("shape=16x16,rate=50")
+        names = []
+        start = time.time()
+        while time.time() - start < 0.5:
+            if source.wait(0.1):
+                _, name, _ = source.getData()
+                if name is not None:
+                    names.append(name)
+        self.assertTrue(15 < len(names) < 35)
+        self.assertEqual(len(set(names)), len(names))
+
+        # a slow consumer misses frames
+        time.sleep(0.2)
+        source.getData()
+        stats = source.getThroughput()
+        self.assertTrue(stats["produced"] > stats["consumed"])
+        self.assertEqual(
+            stats["dropped"], stats["produced"] - stats["consumed"])
+        self.assertTrue(stats["fps"] > 0)
+        source.disconnect()
+
+        source = self.__source("shape=16x16")
+        for _ in range(100):
+            source.getData()
+        stats = source.getThroughput()
+        self.assertEqual(stats["produced"], 100)
+        self.assertEqual(stats["consumed"], 100)
+        source.disconnect()
+
+    def test_widget(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        widget = sourceWidget.GeneratorSourceWidget()
+        # the default rate generates a frame on every fetch
+        params = imageSource.GeneratorSource.parseConfiguration(
+            widget.configuration())
+        self.assertEqual(params["rate"], 0)
+        self.assertEqual(params["shape"], [2048, 4096])
+
+        configuration = "shape=64x32, dtype=uint16, rate=5, " \
+            "pattern=peaks, peaks=3, frames=8, seed=4, " \
+            "frameids=false, labels=true"
+        widget.configure(configuration)
+        params = imageSource.GeneratorSource.parseConfiguration(
+            widget.configuration())
+        expected = imageSource.GeneratorSource.parseConfiguration(
+            configuration)
+        self.assertEqual(params, expected)
+        self.assertEqual(params["peaks"], 3)
+        self.assertEqual(params["frames"], 8)
+        self.assertEqual(params["seed"], 4)
+        self.assertEqual(params["frameids"], False)
+
+        widget.configure("shape=16x16")
+        params = imageSource.GeneratorSource.parseConfiguration(
+            widget.configuration())
+        self.assertEqual(params["peaks"], 10)
+        self.assertEqual(params["labels"], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import fabio
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+#: python3 running
+PY3 = (sys.version_info > (3,))
+if PY3:
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import TCPServer, ThreadingMixIn
+else:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import TCPServer, ThreadingMixIn
+
+
+class MonitorHandler(BaseHTTPRequestHandler):
+
+    """ detector monitor interface with conditional requests """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.clients.add(self.client_address)
+            etag, modified, data = server.image
+        if etag is not None and \
+           self.headers.get("If-None-Match") == etag:
+            server.notmodified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if modified is not None and \
+           self.headers.get("If-Modified-Since") == modified:
+            server.notmodified += 1
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/tiff")
+        self.send_header("Content-Length", str(len(data)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if modified is not None:
+            self.send_header("Last-Modified", modified)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class MonitorServer(ThreadingMixIn, TCPServer):
+
+    """ test detector monitor server """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        TCPServer.__init__(self, ("localhost", 0), MonitorHandler)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.notmodified = 0
+        self.clients = set()
+        self.image = (None, None, b"")
+
+    def url(self):
+        return "http://localhost:%s/monitor/api/1.5.0/images/monitor" \
+            % self.server_address[1]
+
+
+# test fixture
+class HTTPSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__server = None
+        self.__thread = None
+        self.__images = []
+        self.__pipelining = imageSource.HTTPPIPELINING
+
+    def setUp(self):
+        tdir = os.path.join(os.path.dirname(__file__), "images")
+        self.__images = []
+        for fname in ["00001.tif", "00002.tif"]:
+            fname = os.path.join(tdir, fname)
+            with open(fname, "rb") as fl:
+                data = fl.read()
+            self.__images.append(
+                (data, np.transpose(fabio.open(fname).data)))
+        self.__server = MonitorServer()
+        self.__thread = threading.Thread(target=self.__server.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def tearDown(self):
+        imageSource.HTTPPIPELINING = self.__pipelining
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def __source(self):
+        source = imageSource.HTTPSource(3000)
+        source.setConfiguration(self.__server.url())
+        self.assertTrue(source.connect())
+        return source
+
+    def test_etag(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.__server.image = ('"1"', None, self.__images[0][0])
+        source = self.__source()
+        img, name, _ = source.getData()
+        self.assertTrue(name.startswith(self.__server.url()))
+        self.assertTrue(np.array_equal(img, self.__images[0][1]))
+        for _ in range(5):
+            self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(self.__server.notmodified, 5)
+
+        self.__server.image = ('"2"', None, self.__images[1][0])
+        img, name, _ = source.getData()
+        self.assertTrue(np.array_equal(img, self.__images[1][1]))
+        self.assertEqual(source.getData(), (None, None, None))
+        # connect probe + 8 frames over a single keep-alive connection
+        self.assertEqual(self.__server.requests, 9)
+        self.assertEqual(len(self.__server.clients), 1)
+        source.disconnect()
+
+    def test_lastmodified(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        modified = "Mon, 19 Oct 2026 10:00:00 GMT"
+        self.__server.image = (None, modified, self.__images[0][0])
+        source = self.__source()
+        img, _, _ = source.getData()
+        self.assertTrue(np.array_equal(img, self.__images[0][1]))
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(self.__server.notmodified, 1)
+        source.disconnect()
+
+        # a reconnected source fetches the current image in full
+        source = self.__source()
+        img, _, _ = source.getData()
+        self.assertTrue(np.array_equal(img, self.__images[0][1]))
+        self.assertEqual(self.__server.notmodified, 1)
+        source.disconnect()
+
+    def test_novalidators(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.__server.image = (None, None, self.__images[0][0])
+        source = self.__source()
+        for _ in range(3):
+            img, _, _ = source.getData()
+            self.assertTrue(np.array_equal(img, self.__images[0][1]))
+        self.assertEqual(self.__server.notmodified, 0)
+        source.disconnect()
+
+    def test_pipelining(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not imageSource.FUTURES:
+            return
+        imageSource.HTTPPIPELINING = True
+        self.__server.image = ('"1"', None, self.__images[0][0])
+        source = self.__source()
+        img, _, _ = source.getData()
+        self.assertTrue(np.array_equal(img, self.__images[0][1]))
+        # the next request has been sent already
+        self.assertEqual(source.getData(), (None, None, None))
+        # connect probe + 3 requests
+        for _ in range(100):
+            if self.__server.requests == 4:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.__server.requests, 4)
+        self.__server.image = ('"2"', None, self.__images[1][0])
+        # the response to the request sent before the update
+        self.assertEqual(source.getData(), (None, None, None))
+        img, _, _ = source.getData()
+        self.assertTrue(np.array_equal(img, self.__images[1][1]))
+        source.disconnect()
+        self.assertEqual(len(self.__server.clients), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,443 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import time
+
+import itertools
+import numpy as np
+from pyqtgraph import QtCore
+
+from lavuelib import imageProcessing
+from lavuelib import processingThread
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+def _job(jobid, image, **kwargs):
+    args = dict(
+        jobid=jobid, imagename="img%s" % jobid, rawgreyimage=image,
+        backgroundimage=None, bfmdfimage=None,
+        maskindices=None, maskvalue=None, nanmask=False,
+        floattype="float32", trafoname="none", keepcoords=False,
+        scalingtype="linear", scalefloattype=None,
+        statsflag=(True,) * 6, statswoscaling=True, samplingerror=0.0,
+        secstream=False)
+    args.update(kwargs)
+    return imageProcessing.ProcessingJob(**args)
+
+
+# test fixture
+class ImageProcessingTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_process(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.arange(12, dtype="uint16").reshape(3, 4)
+        bkg = np.full((3, 4), 5, dtype="uint16")
+        bfmdf = np.full((3, 4), 2., dtype="float32")
+        mask = np.zeros((3, 4), dtype=bool)
+        mask[0, 0] = True
+        orig = np.array(image)
+        res = imageProcessing.processImage(
+            _job(1, image, backgroundimage=bkg, bfmdfimage=bfmdf,
+                 maskindices=mask, trafoname="rot90 (clockwise)",
+                 scalingtype="sqrt"))
+        display = (orig.astype("int32") - 5) * 2.
+        display[0, 0] = 0
+        display = np.swapaxes(np.flipud(display), 0, 1)
+        self.assertEqual(res.jobid, 1)
+        self.assertEqual(res.imagename, "img1")
+        self.assertEqual(res.errors, [])
+        self.assertTrue(np.array_equal(res.displayimage, display))
+        self.assertTrue(np.allclose(
+            res.scaledimage, np.sqrt(np.clip(display, 0, np.inf))))
+        self.assertEqual(
+            res.transformations, (False, False, False, True, False, True))
+        self.assertEqual(res.stats[0], display.max())
+        self.assertEqual(res.stats[4], 11)
+        # input arrays are not modified
+        self.assertTrue(np.array_equal(image, orig))
+        self.assertIs(res.rawgreyimage, image)
+
+    def test_highvaluemask(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.array([[1., np.nan], [7., 3.]])
+        res = imageProcessing.processImage(
+            _job(2, image, maskvalue=2.5, nanmask=True,
+                 floattype="float64"))
+        self.assertEqual(res.errors, [])
+        self.assertTrue(np.array_equal(
+            res.maskvalueindices, [[False, False], [True, True]]))
+        self.assertEqual(res.displayimage[0, 0], 1.)
+        self.assertTrue(np.isnan(res.displayimage[1, 0]))
+        self.assertTrue(np.isnan(res.displayimage[1, 1]))
+        self.assertEqual(image[1, 0], 7.)
+
+        res = imageProcessing.processImage(
+            _job(3, np.array([[1, 2], [7, 3]]), maskvalue=2.5))
+        self.assertTrue(np.array_equal(res.displayimage, [[1, 2], [0, 0]]))
+
+    def test_errors(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.ones((3, 4))
+        res = imageProcessing.processImage(
+            _job(4, image, backgroundimage=np.ones((2, 2)),
+                 maskindices=np.ones((5, 5), dtype=bool)))
+        self.assertEqual(
+            [stage for stage, _ in res.errors], ["background", "mask"])
+        self.assertTrue(np.array_equal(res.displayimage, image))
+
+        res = imageProcessing.processImage(
+            _job(5, None, backgroundimage=np.ones((2, 2))))
+        self.assertEqual(res.errors, [])
+        self.assertEqual(res.displayimage, None)
+        self.assertEqual(res.stats, (0.0,) * 6)
+
+    def test_transform(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.arange(6).reshape(2, 3)
+        tr, flags = imageProcessing.transform(image, "rot180", False)
+        self.assertTrue(np.array_equal(tr, image[::-1, ::-1]))
+        self.assertEqual(flags, (False, False, False, False, True, True))
+        tr, flags = imageProcessing.transform(image, "rot180", True)
+        self.assertIs(tr, image)
+        self.assertEqual(flags, (False, True, True, False, True, True))
+        tr, flags = imageProcessing.transform(image, "transpose", True)
+        self.assertTrue(np.array_equal(tr, image.T))
+        self.assertEqual(flags, (True, False, False, True, False, False))
+
+
+def _calcStats(flag, display, scaled, raw, statswoscaling):
+    # separate nan-aware reductions of the former implementation
+    if statswoscaling and display is not None and display.size > 0:
+        maxval = np.nanmax(display) if flag[0] else 0.0
+        meanval = np.nanmean(display) if flag[1] else 0.0
+        varval = np.nanvar(display) if flag[2] else 0.0
+        maxsval = np.nanmax(scaled) if flag[5] else 0.0
+    elif (not statswoscaling and scaled is not None and display.size > 0):
+        maxval = np.nanmax(scaled) if flag[0] or flag[5] else 0.0
+        meanval = np.nanmean(scaled) if flag[1] else 0.0
+        varval = np.nanvar(scaled) if flag[2] else 0.0
+        maxsval = maxval
+    else:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+    maxrawval = np.nanmax(raw) if flag[4] else 0.0
+    minval = np.nanmin(scaled) if flag[3] else 0.0
+    return (maxval, meanval, varval, minval, maxrawval, maxsval)
+
+
+class ImageStatsTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def checkStats(self, image):
+        res = imageProcessing.imageStats(image)
+        # nanvar subtracts the mean in the input precision
+        fimage = np.asarray(image, dtype=np.float64)
+        ref = (np.nanmin(image), np.nanmax(image),
+               np.nanmean(fimage), np.nanvar(fimage))
+        self.assertEqual(res[0], ref[0])
+        self.assertEqual(res[1], ref[1])
+        self.assertTrue(np.isclose(res[2], ref[2], rtol=1e-10))
+        self.assertTrue(np.isclose(res[3], ref[3], rtol=1e-10))
+
+    def test_imagestats(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(301, 517) * 1000 + 1e4
+        self.checkStats(image)
+        self.checkStats(image.T)
+        self.checkStats(np.flipud(image))
+        self.checkStats(image.astype("float32"))
+        self.checkStats(image.astype("uint16"))
+        self.checkStats(image.astype("int64").reshape(301, 47, 11))
+        self.checkStats(image[:, 5])
+        image[3, 7] = np.nan
+        image[200:, :] = np.nan
+        self.checkStats(image)
+        self.checkStats(image.T)
+        self.assertEqual(
+            imageProcessing.imageStats(image, False)[3], 0.0)
+        res = imageProcessing.imageStats(np.full((3, 3), np.nan))
+        self.assertTrue(np.isnan(res).all())
+
+    def test_calcstats(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        raw = np.random.randint(0, 1000, size=(64, 96)).astype("uint16")
+        display = raw - 100.
+        display[1, 2] = np.nan
+        scaled = np.log10(np.clip(display, 10e-3, np.inf))
+        for flag in itertools.product([False, True], repeat=6):
+            for statswoscaling in [False, True]:
+                for sc in [scaled, display]:
+                    for rw in [raw, display]:
+                        res = imageProcessing.calcStats(
+                            flag, display, sc, rw, statswoscaling)
+                        ref = _calcStats(
+                            flag, display, sc, rw, statswoscaling)
+                        self.assertTrue(
+                            np.allclose(res, ref, rtol=1e-10),
+                            (flag, statswoscaling, res, ref))
+        self.assertEqual(
+            imageProcessing.calcStats(
+                (True,) * 6, None, None, None, True), (0.0,) * 6)
+
+    def test_sampled(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(2000, 3000)
+        self.assertEqual(imageProcessing.sampledRange(image, 0), None)
+        self.assertEqual(
+            imageProcessing.sampledRange(image[:10, :10], 0.01), None)
+        minval, maxval = imageProcessing.sampledRange(image, 0.001)
+        self.assertTrue(np.mean(image > maxval) <= 0.001)
+        self.assertTrue(np.mean(image < minval) <= 0.001)
+        self.assertTrue(minval >= image.min())
+        self.assertTrue(maxval <= image.max())
+
+        # auto-levels only: sampled range
+        flag = (False, False, False, True, False, True)
+        res = imageProcessing.calcStats(
+            flag, image, np.sqrt(image), image, True, 0.001)
+        self.assertTrue(np.mean(np.sqrt(image) > res[5]) <= 0.001)
+        # the max value is displayed: exact range
+        flag = (True, True, False, True, False, True)
+        res = imageProcessing.calcStats(
+            flag, image, image, image, False, 0.001)
+        self.assertEqual(res[0], image.max())
+        self.assertEqual(res[5], image.max())
+        self.assertEqual(res[3], image.min())
+
+
+class CorrectionKernelTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_fused(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        shape = (17, 23)
+        mask = np.random.randint(0, 5, size=shape) == 0
+        for dtype in ["uint16", "int32", "float32", "float64"]:
+            image = (np.random.rand(*shape) * 1000).astype(dtype)
+            bkgs = [None, (np.random.rand(*shape) * 100).astype(dtype)]
+            bfs = [None, np.random.rand(*shape).astype("float32")]
+            for bkg in bkgs:
+                for bfmdf in bfs:
+                    for maskindices in [None, mask]:
+                        for maskvalue in [None, 500]:
+                            for nanmask in [False, True]:
+                                for floattype in ["float32", "float64"]:
+                                    job = _job(
+                                        1, image, backgroundimage=bkg,
+                                        bfmdfimage=bfmdf,
+                                        maskindices=maskindices,
+                                        maskvalue=maskvalue,
+                                        nanmask=nanmask,
+                                        floattype=floattype)
+                                    kernel = \
+                                        imageProcessing.CorrectionKernel()
+                                    res = imageProcessing.processImage(
+                                        job, kernel)
+                                    ref = imageProcessing.processImage(job)
+                                    self.assertEqual(
+                                        res.displayimage.dtype,
+                                        ref.displayimage.dtype)
+                                    self.assertTrue(np.array_equal(
+                                        res.displayimage, ref.displayimage,
+                                        equal_nan=True))
+                                    if maskvalue is None:
+                                        self.assertEqual(
+                                            res.maskvalueindices, None)
+                                    else:
+                                        self.assertTrue(np.array_equal(
+                                            res.maskvalueindices,
+                                            ref.maskvalueindices))
+                                    self.assertEqual(res.errors, [])
+
+    def test_buffers(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.arange(20, dtype="uint16").reshape(4, 5)
+        bkg = np.ones((4, 5), dtype="uint16")
+        kernel = imageProcessing.CorrectionKernel(2)
+        job = _job(1, image, backgroundimage=bkg, trafoname="transpose")
+        res = imageProcessing.processImage(job, kernel)
+        first = res.displayimage
+        self.assertEqual(len(res.buffers), 1)
+        self.assertTrue(np.shares_memory(first, res.buffers[0]))
+        # buffers which are not released are not overwritten
+        job2 = _job(2, image + 5, backgroundimage=bkg, trafoname="transpose")
+        res2 = imageProcessing.processImage(job2, kernel)
+        self.assertFalse(np.shares_memory(res2.displayimage, first))
+        self.assertTrue(np.array_equal(
+            first, (image.astype("int32") - 1).T))
+        # the released buffer is reused by the next frame
+        kernel.release(res.buffers)
+        kernel.release(res.buffers)
+        res3 = imageProcessing.processImage(job2, kernel)
+        self.assertIs(res3.buffers[0], res.buffers[0])
+        self.assertFalse(np.shares_memory(
+            res3.displayimage, res2.displayimage))
+        self.assertTrue(np.array_equal(
+            res3.displayimage, (image.astype("int32") + 4).T))
+        self.assertTrue(np.array_equal(
+            res2.displayimage, (image.astype("int32") + 4).T))
+        # a buffer released twice is handed out only once
+        res4 = imageProcessing.processImage(job, kernel)
+        self.assertFalse(np.shares_memory(
+            res4.displayimage, res3.displayimage))
+
+        # at most nbuffers released buffers are kept per shape and type
+        results = [imageProcessing.processImage(job, kernel)
+                   for _ in range(4)]
+        for rs in results:
+            kernel.release(rs.buffers)
+        reused = [imageProcessing.processImage(job, kernel)
+                  for _ in range(3)]
+        self.assertEqual(
+            sum(any(rs.buffers[0] is r.buffers[0] for r in results)
+                for rs in reused), 2)
+        # buffers of other kernels are not taken
+        other = imageProcessing.CorrectionKernel(2)
+        other.release(res2.buffers)
+        self.assertFalse(np.shares_memory(
+            imageProcessing.processImage(job, other).displayimage,
+            res2.displayimage))
+        # high value mask indices are also kernel buffers
+        res = imageProcessing.processImage(
+            _job(4, image, maskvalue=10), kernel)
+        self.assertEqual(len(res.buffers), 2)
+        self.assertIs(res.buffers[1], res.maskvalueindices)
+
+        # mismatching shapes fall back to the staged corrections
+        res = imageProcessing.processImage(
+            _job(2, image, backgroundimage=np.ones((2, 2))), kernel)
+        self.assertEqual(res.errors[0][0], "background")
+        self.assertIs(res.displayimage, image)
+        # broadcasting corrections are applied by the staged path
+        res = imageProcessing.processImage(
+            _job(3, image, bfmdfimage=np.full((5,), 2.)), kernel)
+        self.assertEqual(res.errors, [])
+        self.assertTrue(np.array_equal(res.displayimage, image * 2.))
+
+
+class ProcessingThreadTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_latest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        results = []
+        pt = processingThread.ProcessingThread()
+        pt.imageProcessed.connect(
+            results.append, QtCore.Qt.DirectConnection)
+        for i in range(5):
+            pt.submit(_job(i, np.full((4, 4), i)))
+        self.assertEqual(pt.skipped(), 4)
+        pt.start()
+        try:
+            end = time.time() + 10
+            while not results and time.time() < end:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0].jobid, 4)
+            self.assertEqual(results[0].stats[0], 4)
+
+            pt.submit(_job(5, "wrong"))
+            end = time.time() + 10
+            while len(results) < 2 and time.time() < end:
+                time.sleep(0.01)
+            self.assertEqual(results[1].jobid, 5)
+            self.assertEqual(results[1].errors[0][0], "processing")
+        finally:
+            pt.stop()
+            pt.wait()
+        self.assertFalse(pt.isRunning())
+
+    def test_slow(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        process = imageProcessing.processImage
+
+        def slowProcess(job, kernel=None):
+            time.sleep(0.05)
+            return process(job, kernel)
+
+        results = []
+        pt = processingThread.ProcessingThread()
+        pt.imageProcessed.connect(
+            results.append, QtCore.Qt.DirectConnection)
+        imageProcessing.processImage = slowProcess
+        pt.start()
+        try:
+            # frames come faster than they are processed
+            for i in range(50):
+                pt.submit(_job(i, np.full((4, 4), i)))
+                time.sleep(0.01)
+            end = time.time() + 10
+            while (not results or results[-1].jobid != 49) \
+                    and time.time() < end:
+                time.sleep(0.01)
+        finally:
+            imageProcessing.processImage = process
+            pt.stop()
+            pt.wait()
+        jobids = [res.jobid for res in results]
+        self.assertTrue(len(jobids) > 2)
+        self.assertEqual(jobids, sorted(jobids))
+        self.assertEqual(jobids[-1], 49)
+        self.assertEqual(pt.skipped() + len(jobids), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+
+from pyqtgraph import QtGui
+
+from lavuelib import imageSource
+from lavuelib import sourceWidget
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+#: (:obj:`str`) benchmark script
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "lavuebenchmark")
+
+#  Qt-application
+app = None
+
+
+def _loadScript():
+    """ loads the benchmark script as a module
+    """
+    if sys.version_info > (3,):
+        import importlib.machinery
+        import types
+        loader = importlib.machinery.SourceFileLoader(
+            "lavuebenchmark", SCRIPT)
+        module = types.ModuleType(loader.name)
+        loader.exec_module(module)
+        return module
+    else:
+        import imp
+        return imp.load_source("lavuebenchmark", SCRIPT)
+
+
+# test fixture
+class LavueBenchmarkTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        global app
+        if app is None:
+            app = QtGui.QApplication([])
+
+    def test_default(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        benchmark = _loadScript()
+        options = benchmark.createParser().parse_args([])
+        self.assertEqual(options.source, "generator")
+        self.assertEqual(
+            benchmark.rateLimits(options.source, options.configuration), [])
+        self.assertTrue(benchmark.REFRESHRATE <= 0.001)
+        # the configuration passed through the source widget
+        widget = sourceWidget.GeneratorSourceWidget()
+        widget.configure(options.configuration)
+        params = imageSource.GeneratorSource.parseConfiguration(
+            widget.configuration())
+        self.assertEqual(params["rate"], 0)
+        self.assertEqual(params["shape"], [2048, 2048])
+
+    def test_ratelimits(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        benchmark = _loadScript()
+        self.assertEqual(
+            benchmark.rateLimits("generator", "shape=64x64,rate=100"),
+            [("generator", 100.0)])
+        self.assertEqual(
+            benchmark.rateLimits("generator", "shape=64x64"), [])
+        self.assertEqual(
+            benchmark.rateLimits("replay", "/tmp/frames.lrec"),
+            [("replay", "original")])
+        self.assertEqual(
+            benchmark.rateLimits("replay", "/tmp/frames.lrec,max,True"), [])
+        self.assertEqual(
+            benchmark.rateLimits("replay", "/tmp/frames.lrec,25,false"),
+            [("replay", 25.0)])
+        self.assertEqual(
+            benchmark.rateLimits(
+                "generator;replay;zmq",
+                "rate=5;/tmp/frames.lrec,fast;localhost:5535"),
+            [("generator", 5.0)])
+        # the default lavue refresh time
+        self.assertEqual(
+            benchmark.rateLimits("generator", "rate=0", 0.2),
+            [("refreshrate", 5.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -468,6 +468,34 @@ class LavueControllerTest(unittest.TestCase):
 
         self.__lcsu.proxy.unsubscribe_event(cb_id)
 
+    def test_PipelineMetrics(self):
+        """Test for PipelineMetrics"""
+        print("Run: %s.%s() " % (
+            self.__class__.__name__, sys._getframe().f_code.co_name))
+        testvalues = [
+            '{"stages": {"getdata": {"count": 10, "p50": 3.1, '
+            '"p99": 4.2, "histogram": [0, 10, 0]}}, '
+            '"rates": {"frames": 9.8}}',
+            '{"stages": {}, "rates": {}}',
+            '{"stages": {"plot": {"count": 1, "p50": 15.2}}, '
+            '"rates": {"frames": 1.0}, "tool": "intensity"}',
+        ]
+
+        queue = Queue.Queue()
+        cb = TangoCB(queue)
+        cb_id = self.__lcsu.proxy.subscribe_event(
+            "PipelineMetrics", tango.EventType.CHANGE_EVENT, cb)
+        elem = queue.get(block=True, timeout=3)
+
+        for wvl in testvalues:
+            self.__lcsu.proxy.PipelineMetrics = wvl
+            rvl = self.__lcsu.proxy.PipelineMetrics
+            self.assertEqual(wvl, rvl)
+            elem = queue.get(block=True, timeout=3)
+            self.assertEqual(wvl, elem)
+
+        self.__lcsu.proxy.unsubscribe_event(cb_id)
+
 
 def main():
     """ main function"""
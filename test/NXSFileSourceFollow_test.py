@@ -0,0 +1,137 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import numpy as np
+import h5py
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class NXSFileSourceFollowTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__fname = "%s.h5" % self.__class__.__name__
+        self.__follow = imageSource.NXSFOLLOW
+        self.__images = np.random.randint(
+            0, 1000, size=(8, 4, 3)).astype("u2")
+        self.__file = None
+        self.__dset = None
+
+    def tearDown(self):
+        imageSource.NXSFOLLOW = self.__follow
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        if os.path.exists(self.__fname):
+            os.remove(self.__fname)
+
+    def startWriter(self, nframes):
+        self.__file = h5py.File(self.__fname, "w", libver="latest")
+        self.__dset = self.__file.create_dataset(
+            "entry/data/data", data=self.__images[:nframes],
+            chunks=(2, 4, 3), maxshape=(None, 4, 3))
+        self.__file.swmr_mode = True
+
+    def append(self, nframes):
+        old = self.__dset.shape[0]
+        self.__dset.resize((old + nframes, 4, 3))
+        self.__dset[old:] = self.__images[old:old + nframes]
+        self.__dset.flush()
+
+    def source(self, nxslast=False):
+        imageSource.NXSFOLLOW = True
+        source = imageSource.NXSFileSource(100)
+        source.setConfiguration(
+            "%s,entry/data/data,-1,0,False,%s" % (self.__fname, nxslast))
+        self.assertTrue(source.connect())
+        reader = source._NXSFileSource__reader
+        refreshes = []
+        framecount = reader.frameCount
+
+        def counted(refresh=True):
+            if refresh:
+                refreshes.append(True)
+            return framecount(refresh=refresh)
+
+        reader.frameCount = counted
+        return source, refreshes
+
+    def checkFrame(self, result, frame):
+        img, name, _ = result
+        self.assertEqual(name, "%s/entry/data/data:%s" % (
+            self.__fname, frame))
+        self.assertTrue(
+            np.array_equal(img, np.transpose(self.__images[frame])))
+
+    def test_follow(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.startWriter(3)
+        source, refreshes = self.source()
+        img, name, meta = source.getData()
+        self.checkFrame((img, name, meta), 0)
+        self.checkFrame(source.getData(), 1)
+        self.checkFrame(source.getData(), 2)
+        # the unchanged file is not refreshed
+        for _ in range(5):
+            self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(refreshes, [])
+
+        self.append(2)
+        # the appended frames are delivered in order
+        self.checkFrame(source.getData(), 3)
+        self.checkFrame(source.getData(), 4)
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(len(refreshes), 1)
+        source.disconnect()
+
+    def test_last(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.startWriter(3)
+        source, refreshes = self.source(nxslast=True)
+        self.checkFrame(source.getData(), 2)
+        self.assertEqual(source.getData(), (None, None, None))
+
+        self.append(4)
+        # only the newest frame is delivered
+        self.checkFrame(source.getData(), 6)
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(len(refreshes), 1)
+        source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,322 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import time
+import threading
+import numpy as np
+import h5py
+
+from lavuelib import imageFileHandler
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+class SlowNode(object):
+
+    """ field node blocking reads of the given frames"""
+
+    def __init__(self, images, slow):
+        self.images = images
+        self.shape = images.shape
+        self.dtype = images.dtype
+        self.h5object = self
+        self.chunks = None
+        self.slow = slow
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def refresh(self):
+        pass
+
+    def __getitem__(self, index):
+        start = index[0].start if isinstance(index[0], slice) else index[0]
+        if start in self.slow:
+            self.started.set()
+            self.release.wait(10)
+        return self.images[index]
+
+
+# test fixture
+class NexusFrameReaderTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__fname = "%s.h5" % self.__class__.__name__
+
+    def tearDown(self):
+        if os.path.exists(self.__fname):
+            os.remove(self.__fname)
+
+    def createFile(self, images, **kwargs):
+        with h5py.File(self.__fname, "w") as fl:
+            fl.create_dataset(
+                "entry/data/data", data=images, **kwargs)
+
+    def openNode(self, writer="h5py"):
+        handler = imageFileHandler.NexusFieldHandler(
+            self.__fname, writer=writer)
+        return handler, handler.getNode("entry/data/data")
+
+    def waitFor(self, reader, frame):
+        for _ in range(100):
+            image = reader.getFrame(frame, load=False)
+            if image is not None:
+                return image
+            time.sleep(0.01)
+
+    def test_chunked(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(30, 11, 7)).astype("u4")
+        self.createFile(images, chunks=(4, 11, 7), compression="gzip")
+        self.assertEqual(
+            imageFileHandler.NexusFrameReader._memmap(
+                self.openNode()[1]), None)
+        for gdim in range(3):
+            handler, node = self.openNode()
+            reader = imageFileHandler.NexusFrameReader(prefetch=5)
+            try:
+                reader.setNode(node, gdim)
+                nframes = images.shape[gdim]
+                self.assertEqual(reader.frameCount(), nframes)
+                for fr in list(range(nframes)) + [-1, -3]:
+                    self.assertTrue(np.array_equal(
+                        reader.getFrame(fr),
+                        np.take(images, fr, axis=gdim)))
+                self.assertEqual(reader.getFrame(nframes), None)
+
+                # prefetching backwards
+                reader.getFrame(nframes - 1)
+                reader.getFrame(nframes - 2)
+                self.assertTrue(np.array_equal(
+                    self.waitFor(reader, nframes - 7),
+                    np.take(images, nframes - 7, axis=gdim)))
+            finally:
+                reader.close()
+
+    def test_prefetch(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(40, 5, 6)).astype("i2")
+        self.createFile(images, chunks=(1, 5, 6))
+        handler, node = self.openNode()
+        reader = imageFileHandler.NexusFrameReader(prefetch=4)
+        try:
+            reader.setNode(node, 0)
+            self.assertTrue(np.array_equal(reader.getFrame(10), images[10]))
+            self.assertTrue(np.array_equal(
+                self.waitFor(reader, 14), images[14]))
+            self.assertEqual(reader.getFrame(15, load=False), None)
+            self.assertEqual(reader.getFrame(9, load=False), None)
+
+            # requested frame is read in the background
+            self.assertEqual(reader.getFrame(30, load=False), None)
+            reader.request(30)
+            self.assertTrue(np.array_equal(
+                self.waitFor(reader, 30), images[30]))
+
+            # cached frames stay available after detaching
+            reader.detach()
+            self.assertTrue(np.array_equal(
+                reader.getFrame(12, load=False), images[12]))
+            self.assertEqual(reader.getFrame(20), None)
+        finally:
+            reader.close()
+        self.assertEqual(reader.getFrame(10, load=False), None)
+
+    def test_unblocked(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(10, 4, 3)).astype("u2")
+        node = SlowNode(images, [8])
+        reader = imageFileHandler.NexusFrameReader(prefetch=0)
+        try:
+            reader.setNode(node, 0)
+            self.assertTrue(np.array_equal(reader.getFrame(2), images[2]))
+            reader.request(8)
+            self.assertTrue(node.started.wait(10))
+            # cached and newly read frames do not wait for the prefetch
+            tm = time.time()
+            self.assertTrue(np.array_equal(
+                reader.getFrame(2, load=False), images[2]))
+            self.assertTrue(np.array_equal(reader.getFrame(5), images[5]))
+            self.assertTrue(time.time() - tm < 5)
+            node.release.set()
+            self.assertTrue(np.array_equal(
+                self.waitFor(reader, 8), images[8]))
+        finally:
+            node.release.set()
+            reader.close()
+
+    def test_stale(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(10, 4, 3)).astype("u2")
+        images2 = images + 1
+        node = SlowNode(images, [8])
+        reader = imageFileHandler.NexusFrameReader(prefetch=0)
+        try:
+            reader.setNode(node, 0, fingerprint=1)
+            reader.request(8)
+            self.assertTrue(node.started.wait(10))
+            # the file is rewritten while the block is read
+            node2 = SlowNode(images2, [])
+            reader.setNode(node2, 0, fingerprint=2)
+            node.release.set()
+            time.sleep(0.1)
+            self.assertEqual(reader.getFrame(8, load=False), None)
+            self.assertTrue(np.array_equal(reader.getFrame(8), images2[8]))
+        finally:
+            node.release.set()
+            reader.close()
+
+    def test_cachesize(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(20, 10, 10)).astype("u1")
+        self.createFile(images, chunks=(10, 10, 10), compression="gzip")
+        handler, node = self.openNode()
+        reader = imageFileHandler.NexusFrameReader(cachesize=800, prefetch=0)
+        try:
+            reader.setNode(node, 0)
+            for fr in range(20):
+                self.assertTrue(np.array_equal(
+                    reader.getFrame(fr), images[fr]))
+                self.assertTrue(np.array_equal(
+                    reader.getFrame(fr, load=False), images[fr]))
+            self.assertEqual(reader.getFrame(0, load=False), None)
+            self.assertTrue(np.array_equal(
+                reader.getFrame(12, load=False), images[12]))
+            reader.setCacheSize(0)
+            self.assertEqual(reader.getFrame(19, load=False), None)
+            self.assertTrue(np.array_equal(
+                reader.getFrame(12, load=False), images[12]))
+        finally:
+            reader.close()
+
+    def test_contiguous(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(12, 9, 8)).astype(">i4")
+        self.createFile(images)
+        handler, node = self.openNode()
+        self.assertTrue(isinstance(
+            imageFileHandler.NexusFrameReader._memmap(node), np.memmap))
+        reader = imageFileHandler.NexusFrameReader()
+        try:
+            reader.setNode(node, 1, fingerprint=(1, 2))
+            self.assertTrue(reader.matches((1, 2)))
+            self.assertTrue(not reader.matches((1, 3)))
+            reader.detach()
+            del node
+            del handler
+            for fr in range(9):
+                image = reader.getFrame(fr, load=False)
+                self.assertTrue(not isinstance(image, np.memmap))
+                self.assertTrue(np.array_equal(image, images[:, fr, :]))
+        finally:
+            reader.close()
+
+    def test_growing(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(10, 4, 3)).astype("u2")
+        with h5py.File(self.__fname, "w", libver="latest") as fl:
+            dset = fl.create_dataset(
+                "entry/data/data", data=images[:3],
+                chunks=(4, 4, 3), maxshape=(None, 4, 3))
+        handler, node = self.openNode()
+        reader = imageFileHandler.NexusFrameReader(prefetch=0)
+        try:
+            reader.setNode(node, 0)
+            self.assertEqual(reader.frameCount(), 3)
+            self.assertTrue(np.array_equal(reader.getFrame(2), images[2]))
+            self.assertEqual(reader.getFrame(3), None)
+            del node
+            del handler
+            reader.detach()
+
+            with h5py.File(self.__fname, "a", libver="latest") as fl:
+                dset = fl["entry/data/data"]
+                dset.resize((10, 4, 3))
+                dset[3:] = images[3:]
+            handler, node = self.openNode()
+            reader.setNode(node, 0)
+            self.assertEqual(reader.frameCount(), 10)
+            for fr in range(10):
+                self.assertTrue(np.array_equal(
+                    reader.getFrame(fr), images[fr]))
+        finally:
+            reader.close()
+
+    def test_readframes(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(0, 1000, size=(10, 4, 3)).astype("u2")
+        fl = h5py.File(self.__fname, "w", libver="latest")
+        try:
+            dset = fl.create_dataset(
+                "entry/data/data", data=images[:3],
+                chunks=(4, 4, 3), maxshape=(None, 4, 3),
+                compression="gzip")
+            fl.swmr_mode = True
+            handler, node = self.openNode()
+            reader = imageFileHandler.NexusFrameReader(prefetch=0)
+            try:
+                reader.setNode(node, 0)
+                self.assertEqual(reader.frameCount(), 3)
+                self.assertTrue(
+                    np.array_equal(reader.getFrame(1), images[1]))
+
+                dset.resize((10, 4, 3))
+                dset[3:] = images[3:]
+                dset.flush()
+                self.assertEqual(reader.frameCount(), 10)
+                # the partially cached block is completed
+                self.assertEqual(reader.readFrames(3, 10), 7)
+                for fr in range(10):
+                    self.assertTrue(np.array_equal(
+                        reader.getFrame(fr, load=False), images[fr]))
+                self.assertEqual(reader.readFrames(10, 12), 0)
+            finally:
+                reader.close()
+        finally:
+            fl.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+
+import numpy as np
+
+from lavuelib import imageSource
+from lavuelib import frameRecorder
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class ReplaySourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__fname = os.path.join(self.__dir, "frames,1.lrec")
+        recorder = frameRecorder.FrameRecorder(self.__fname)
+        # frames recorded with 0.2 s interval
+        for i in range(5):
+            recorder.write(
+                np.full((4, 6), i, dtype="uint16"), "frame%s" % i,
+                '{"frame": %s}' % i, 100. + 0.2 * i)
+        recorder.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir)
+
+    def __source(self, configuration):
+        source = imageSource.ReplaySource()
+        source.setConfiguration(configuration)
+        self.assertTrue(source.connect())
+        return source
+
+    def __replay(self, source, number, timeout=5):
+        frames = []
+        start = time.time()
+        while len(frames) < number and time.time() - start < timeout:
+            if source.wait(0.1):
+                img, name, meta = source.getData()
+                if name is not None:
+                    frames.append((time.time(), img, name, meta))
+        return frames
+
+    def test_original(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("%s,original,False" % self.__fname)
+        frames = self.__replay(source, 5)
+        self.assertEqual([fr[2] for fr in frames],
+                         ["frame%s" % i for i in range(5)])
+        self.assertTrue(np.array_equal(frames[3][1], np.full((4, 6), 3)))
+        self.assertEqual(frames[3][3], '{"frame": 3}')
+        elapsed = frames[-1][0] - frames[0][0]
+        self.assertTrue(0.75 < elapsed < 1.5)
+        # without the loop the replay stops
+        self.assertTrue(not source.wait(0.05))
+        self.assertEqual(source.getData(), (None, None, None))
+        stats = source.getThroughput()
+        self.assertEqual(stats["frames"], 5)
+        self.assertEqual(stats["loops"], 0)
+        source.disconnect()
+
+    def test_fast(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(self.__fname + ",max")
+        frames = self.__replay(source, 12)
+        self.assertTrue(frames[-1][0] - frames[0][0] < 0.5)
+        # the record is replayed in a loop with distinct names
+        self.assertEqual(frames[5][2], "frame0 #1")
+        self.assertEqual(frames[11][2], "frame1 #2")
+        stats = source.getThroughput()
+        self.assertEqual(stats["frames"], 12)
+        self.assertEqual(stats["loops"], 2)
+        self.assertTrue(stats["fps"] > 0)
+        self.assertTrue(stats["mbps"] > 0)
+        source.disconnect()
+
+    def test_rate(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(self.__fname + ",20,True")
+        frames = self.__replay(source, 5)
+        elapsed = frames[-1][0] - frames[0][0]
+        self.assertTrue(0.15 < elapsed < 0.5)
+        source.disconnect()
+
+    def test_error(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = imageSource.ReplaySource()
+        source.setConfiguration(os.path.join(self.__dir, "missing.lrec"))
+        self.assertTrue(not source.connect())
+        self.assertEqual(source.getData()[1], "__ERROR__")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import time
+
+import numpy as np
+
+from lavuelib import stageTimer
+from lavuelib import imageProcessing
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class StageTimerTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def tearDown(self):
+        stageTimer.TIMER.enabled = False
+        stageTimer.TIMER.reset()
+
+    def test_disabled(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        self.assertTrue(not timer.enabled)
+        with timer.measure("stage"):
+            pass
+        timer.increment("frames")
+        self.assertEqual(timer.stages(), [])
+        summary = timer.summary()
+        self.assertEqual(summary["stages"], {})
+        self.assertEqual(summary["counters"], {})
+        self.assertEqual(summary["throughput"], {})
+
+    def test_measure(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        timer.enabled = True
+        for _ in range(3):
+            with timer.measure("sleep"):
+                time.sleep(0.01)
+        with timer.measure("noop"):
+            pass
+        self.assertEqual(timer.stages(), ["noop", "sleep"])
+        samples = timer.samples("sleep")
+        self.assertEqual(samples.shape, (3,))
+        self.assertTrue(np.all(samples >= 0.009))
+        self.assertEqual(timer.samples("unknown").shape, (0,))
+        stat = timer.summary()["stages"]["sleep"]
+        self.assertEqual(stat["count"], 3)
+        self.assertTrue(stat["min"] >= 9.)
+        self.assertTrue(stat["min"] <= stat["p50"] <= stat["max"])
+        self.assertTrue(abs(stat["total"] - 3 * stat["mean"]) < 1e-6)
+
+    def test_percentiles(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer(maxsamples=100)
+        for i in range(200):
+            timer.add("stage", (i + 1) / 1000.)
+        # only the newest samples are kept
+        self.assertEqual(timer.samples("stage").shape, (100,))
+        stat = timer.summary(percentiles=(50, 99.5))["stages"]["stage"]
+        self.assertEqual(stat["count"], 100)
+        self.assertAlmostEqual(stat["min"], 101.)
+        self.assertAlmostEqual(stat["max"], 200.)
+        self.assertAlmostEqual(stat["p50"], 150.5)
+        self.assertTrue("p99.5" in stat)
+        self.assertTrue("p90" not in stat)
+
+    def test_counters(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        timer.enabled = True
+        timer.increment("frames")
+        timer.increment("frames", 4)
+        time.sleep(0.05)
+        summary = timer.summary()
+        self.assertEqual(summary["counters"], {"frames": 5})
+        self.assertTrue(summary["elapsed"] >= 0.05)
+        self.assertTrue(
+            abs(summary["throughput"]["frames"]
+                - 5 / summary["elapsed"]) < 5)
+        timer.reset()
+        summary = timer.summary()
+        self.assertEqual(summary["counters"], {})
+        self.assertTrue(summary["elapsed"] < 0.05)
+
+    def test_processimage(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.TIMER
+        timer.reset()
+        timer.enabled = True
+        job = imageProcessing.ProcessingJob(
+            jobid=1, imagename="img1",
+            rawgreyimage=np.arange(12, dtype="uint16").reshape(3, 4),
+            backgroundimage=None, bfmdfimage=None,
+            maskindices=None, maskvalue=None, nanmask=False,
+            floattype="float32", trafoname="none", keepcoords=False,
+            scalingtype="log", scalefloattype=None,
+            statsflag=(True,) * 6, statswoscaling=True, samplingerror=0.0,
+            secstream=False)
+        imageProcessing.processImage(job)
+        self.assertEqual(
+            timer.stages(), ["corrections", "scale", "stats", "transform"])
+        for stat in timer.summary()["stages"].values():
+            self.assertEqual(stat["count"], 1)
+
+    def test_samples_last(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer(maxsamples=5)
+        for i in range(8):
+            timer.add("stage", float(i))
+        self.assertEqual(timer.totals(), {"stage": 8})
+        self.assertEqual(list(timer.samples("stage")), [3., 4., 5., 6., 7.])
+        self.assertEqual(list(timer.samples("stage", 2)), [6., 7.])
+        self.assertEqual(list(timer.samples("stage", 0)), [])
+        self.assertEqual(timer.samples("stage", 10).shape, (5,))
+
+    def test_maxsamples(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        for i in range(stageTimer.MAXSAMPLES + 10):
+            timer.add("stage", float(i))
+        smp = timer.samples("stage")
+        self.assertEqual(smp.shape, (stageTimer.MAXSAMPLES,))
+        self.assertEqual(smp[0], 10.)
+        self.assertEqual(smp[-1], stageTimer.MAXSAMPLES + 9.)
+        self.assertTrue(np.all(np.diff(smp) == 1))
+        # the samples wrapped around the end of the ring
+        self.assertEqual(
+            list(timer.samples("stage", 15)),
+            [float(i) for i in range(
+                stageTimer.MAXSAMPLES - 5, stageTimer.MAXSAMPLES + 10)])
+
+        timer.setMaxSamples(stageTimer.BENCHMARKSAMPLES)
+        self.assertEqual(timer.totals(), {})
+        self.assertEqual(timer.samples("stage").shape, (0,))
+        for i in range(stageTimer.MAXSAMPLES + 10):
+            timer.add("stage", float(i))
+        self.assertEqual(
+            timer.summary()["stages"]["stage"]["count"],
+            stageTimer.MAXSAMPLES + 10)
+
+    def test_metrics(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        timer.enabled = True
+        metrics = stageTimer.PipelineMetrics(timer, edges=[1., 10.])
+        for ms in [0.5, 2., 3., 20.]:
+            timer.add("getdata", ms / 1000.)
+        timer.increment("frames", 4)
+        time.sleep(0.01)
+        mt = metrics.update()
+        self.assertEqual(mt["edges"], [1., 10.])
+        stat = mt["stages"]["getdata"]
+        self.assertEqual(stat["count"], 4)
+        self.assertEqual(stat["histogram"], [1, 2, 1])
+        self.assertAlmostEqual(stat["max"], 20.)
+        self.assertAlmostEqual(stat["p50"], 2.5)
+        self.assertTrue(stat["p50"] <= stat["p90"] <= stat["p99"])
+        self.assertEqual(mt["counters"], {"frames": 4})
+        self.assertTrue(mt["rates"]["frames"] > 0)
+        self.assertTrue(mt["interval"] >= 0.01)
+
+        # only durations measured since the previous update
+        timer.add("getdata", 0.005)
+        timer.add("plot", 0.0001)
+        mt = metrics.update()
+        self.assertEqual(mt["stages"]["getdata"]["count"], 1)
+        self.assertEqual(mt["stages"]["getdata"]["histogram"], [0, 1, 0])
+        self.assertAlmostEqual(mt["stages"]["getdata"]["max"], 5.)
+        self.assertEqual(mt["stages"]["plot"]["histogram"], [1, 0, 0])
+        self.assertEqual(mt["rates"]["frames"], 0.0)
+        self.assertEqual(mt["counters"], {"frames": 4})
+        self.assertEqual(metrics.update()["stages"], {})
+
+        # reset of the timer starts a new interval
+        timer.reset()
+        timer.add("getdata", 0.001)
+        self.assertEqual(metrics.update()["stages"]["getdata"]["count"], 1)
+
+    def test_metrics_text(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timer = stageTimer.StageTimer()
+        timer.enabled = True
+        metrics = stageTimer.PipelineMetrics(timer)
+        timer.add("zstage", 0.001)
+        timer.add("imageplot", 0.002)
+        timer.add("getdata", 0.003)
+        timer.increment("frames")
+        lines = stageTimer.PipelineMetrics.text(metrics.update()).split("\n")
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith("stage [ms]"))
+        # stages in the pipeline order
+        self.assertEqual(
+            [line.split()[0] for line in lines[1:4]],
+            ["getdata", "imageplot", "zstage"])
+        self.assertEqual(lines[1].split()[1:], ["3.00", "3.00", "3.00"])
+        self.assertTrue(lines[4].startswith("frames "))
+        self.assertTrue(lines[4].endswith(" Hz"))
+        metrics.reset()
+        self.assertEqual(
+            stageTimer.PipelineMetrics.text(metrics.update()).split("\n"),
+            [lines[0], "frames 0.0 Hz"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+
+import numpy as np
+
+from lavuelib import imageSource
+
+try:
+    from .TestImageServerSetUp import TestImageServerSetUp
+except Exception:
+    from TestImageServerSetUp import TestImageServerSetUp
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class TangoAttrSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__tisu = TestImageServerSetUp()
+        self.__device = self.__tisu.new_device_info.name
+
+    def setUp(self):
+        self.__tisu.setUp()
+
+    def tearDown(self):
+        self.__tisu.tearDown()
+
+    def __source(self, configuration):
+        source = imageSource.TangoAttrSource(3000)
+        source.setConfiguration(configuration)
+        self.assertTrue(source.connect())
+        return source
+
+    def __reads(self):
+        return self.__tisu.proxy.LastImageReads
+
+    def test_single(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.__tisu.proxy.Init()
+        self.__tisu.proxy.StartAcq()
+        lastimage = self.__tisu.proxy.LastImage
+        source = self.__source("%s/LastImage" % self.__device)
+        img, name, meta = source.getData()
+        self.assertTrue(np.array_equal(img, np.transpose(lastimage)))
+        self.assertTrue(name.startswith("%s/LastImage" % self.__device))
+        self.assertEqual(meta, "")
+        source.disconnect()
+
+    def test_grouped(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.__tisu.proxy.Init()
+        self.__tisu.proxy.StartAcq()
+        lastimage = self.__tisu.proxy.LastImage
+        spectrum = self.__tisu.proxy.Spectrum1
+        source = self.__source(
+            "%s/LastImage,ImageCounter,Spectrum1" % self.__device)
+        img, _, meta = source.getData()
+        self.assertTrue(np.array_equal(img, np.transpose(lastimage)))
+        mdata = json.loads(meta)
+        self.assertEqual(mdata["ImageCounter"], 1)
+        self.assertEqual(mdata["Spectrum1"], list(spectrum))
+        source.disconnect()
+
+    def test_counter(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.__tisu.proxy.Init()
+        self.__tisu.proxy.StartAcq()
+        source = self.__source(
+            "%s/LastImage,@ImageCounter" % self.__device)
+        reads = self.__reads()
+        img, _, meta = source.getData()
+        self.assertTrue(img is not None)
+        self.assertEqual(json.loads(meta), {"ImageCounter": 1})
+        self.assertEqual(self.__reads(), reads + 1)
+
+        # the unchanged image is not transferred again
+        for _ in range(5):
+            self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(self.__reads(), reads + 1)
+
+        self.__tisu.proxy.StartAcq()
+        lastimage = self.__tisu.proxy.LastImage
+        reads = self.__reads()
+        img, _, meta = source.getData()
+        self.assertTrue(np.array_equal(img, np.transpose(lastimage)))
+        self.assertEqual(json.loads(meta), {"ImageCounter": 2})
+        self.assertEqual(self.__reads(), reads + 1)
+        self.assertEqual(source.getData(), (None, None, None))
+        source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
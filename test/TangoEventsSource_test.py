@@ -0,0 +1,166 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import time
+
+import numpy as np
+
+from lavuelib import imageSource
+
+try:
+    from .TestImageServerSetUp import TestImageServerSetUp
+except Exception:
+    from TestImageServerSetUp import TestImageServerSetUp
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class TangoEventsSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__tisu = TestImageServerSetUp()
+        self.__device = self.__tisu.new_device_info.name
+        self.__mode = imageSource.TANGOEVENTSMODE
+
+    def setUp(self):
+        self.__tisu.setUp()
+        self.__tisu.proxy.Init()
+
+    def tearDown(self):
+        imageSource.TANGOEVENTSMODE = self.__mode
+        self.__tisu.tearDown()
+
+    def __source(self, attr, mode):
+        imageSource.TANGOEVENTSMODE = mode
+        source = imageSource.TangoEventsSource(3000)
+        source.setConfiguration("%s/%s" % (self.__device, attr))
+        self.assertTrue(source.connect())
+        return source
+
+    def __frame(self, source):
+        self.assertTrue(source.wait(5))
+        img, name, _ = source.getData()
+        self.assertTrue(name is not None)
+        return img
+
+    def __events(self, source, number):
+        for _ in range(500):
+            if source.getLatency()["events"] >= number:
+                break
+            time.sleep(0.01)
+        return source.getLatency()["events"]
+
+    def test_change(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("ChangeEventImage", "change")
+        # the initial event of the subscription
+        self.__frame(source)
+        self.__tisu.proxy.ChangeEventAcq()
+        img = self.__frame(source)
+        self.assertTrue(np.array_equal(
+            img, np.transpose(self.__tisu.proxy.ChangeEventImage)))
+        stats = source.getLatency()
+        self.assertEqual(stats["mode"], "change")
+        self.assertEqual(stats["reads"], 0)
+        self.assertEqual(stats["frames"], 2)
+        self.assertTrue(stats["maxlatency"] >= stats["latency"] >= 0)
+        source.disconnect()
+
+    def test_user(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("UserEventImage", "user")
+        self.__frame(source)
+        self.__tisu.proxy.UserEventAcq()
+        img = self.__frame(source)
+        self.assertTrue(np.array_equal(
+            img, np.transpose(self.__tisu.proxy.UserEventImage)))
+        stats = source.getLatency()
+        self.assertEqual(stats["mode"], "user")
+        self.assertEqual(stats["reads"], 0)
+        source.disconnect()
+
+    def test_ready(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("ReadyEventImage", "ready")
+        self.assertEqual(source.getData(), (None, None, None))
+        self.__tisu.proxy.ReadyEventAcq()
+        img = self.__frame(source)
+        self.assertTrue(np.array_equal(
+            img, np.transpose(self.__tisu.proxy.ReadyEventImage)))
+        stats = source.getLatency()
+        self.assertEqual(stats["mode"], "ready")
+        self.assertEqual(stats["events"], 1)
+        self.assertEqual(stats["reads"], 1)
+        self.assertEqual(stats["frames"], 1)
+        source.disconnect()
+
+    def test_batch(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("ReadyEventImage", "batch")
+        self.assertEqual(source.getData(), (None, None, None))
+        for _ in range(3):
+            self.__tisu.proxy.ReadyEventAcq()
+        self.assertEqual(self.__events(source, 3), 3)
+        # three ready events are served by one read
+        img = self.__frame(source)
+        self.assertTrue(np.array_equal(
+            img, np.transpose(self.__tisu.proxy.ReadyEventImage)))
+        self.assertEqual(source.getData(), (None, None, None))
+        stats = source.getLatency()
+        self.assertEqual(stats["mode"], "batch")
+        self.assertEqual(stats["events"], 3)
+        self.assertEqual(stats["reads"], 1)
+        self.assertEqual(stats["frames"], 1)
+        source.disconnect()
+
+    def test_auto(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source("ChangeEventImage", "auto")
+        self.assertEqual(source.getLatency()["mode"], "change")
+        source.disconnect()
+        # ReadyEventImage does not push change events
+        source = self.__source("ReadyEventImage", "auto")
+        self.assertEqual(source.getLatency()["mode"], "batch")
+        source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
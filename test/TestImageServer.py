@@ -36,6 +36,10 @@ class TestImageServer (tango.Device_4Impl):
             [i + 100 * j for i in range(128)] for j in range(256)]
         self.attr_ChangeEventImage_read = [
             [i + 100 * j for i in range(512)] for j in range(128)]
+        self.attr_UserEventImage_read = [
+            [i + 100 * j for i in range(256)] for j in range(128)]
+        self.attr_ImageCounter_read = 0
+        self.attr_LastImageReads_read = 0
         self.set_change_event("ChangeEventImage", True, False)
         self.ReadyEventImage = self.get_device_attr().get_attr_by_name(
             "ReadyEventImage")
@@ -54,8 +58,15 @@ class TestImageServer (tango.Device_4Impl):
         self.attr_LastImagePath_read = attr.get_write_value()
 
     def read_LastImage(self, attr):
+        self.attr_LastImageReads_read += 1
         attr.set_value(self.attr_LastImage_read)
 
+    def read_ImageCounter(self, attr):
+        attr.set_value(self.attr_ImageCounter_read)
+
+    def read_LastImageReads(self, attr):
+        attr.set_value(self.attr_LastImageReads_read)
+
     def read_Spectrum1(self, attr):
         attr.set_value(self.attr_Spectrum1_read)
 
@@ -68,6 +79,9 @@ class TestImageServer (tango.Device_4Impl):
     def read_ReadyEventImage(self, attr):
         attr.set_value(self.attr_ReadyEventImage_read)
 
+    def read_UserEventImage(self, attr):
+        attr.set_value(self.attr_UserEventImage_read)
+
     def StartAcq(self):
         """ Start the acquisition. """
         self.attr_LastImage_read = \
@@ -76,6 +90,7 @@ class TestImageServer (tango.Device_4Impl):
             [random.randint(0, 1000) for j in range(256)]
         self.attr_Spectrum2_read = \
             [random.randint(0, 1000) for j in range(256)]
+        self.attr_ImageCounter_read += 1
 
     def ReadyEventAcq(self):
         """ Start the acquisition. """
@@ -90,6 +105,13 @@ class TestImageServer (tango.Device_4Impl):
         self.push_change_event("ChangeEventImage",
                                self.attr_ChangeEventImage_read)
 
+    def UserEventAcq(self):
+        """ Start the acquisition. """
+        self.attr_UserEventImage_read = \
+            [[random.randint(0, 1000) for i in range(256)] for j in range(128)]
+        self.push_event("UserEventImage", [], [],
+                        self.attr_UserEventImage_read)
+
 
 class TestImageServerClass(tango.DeviceClass):
 
@@ -101,6 +123,9 @@ class TestImageServerClass(tango.DeviceClass):
         [[tango.DevVoid, "none"],
          [tango.DevVoid, "none"]],
         'ChangeEventAcq':
+        [[tango.DevVoid, "none"],
+         [tango.DevVoid, "none"]],
+        'UserEventAcq':
         [[tango.DevVoid, "none"],
          [tango.DevVoid, "none"]],
         }
@@ -130,6 +155,22 @@ class TestImageServerClass(tango.DeviceClass):
              'label': "LastImage",
              'description': "provide last image data",
          }],
+        'ImageCounter':
+        [[tango.DevLong,
+          tango.SCALAR,
+          tango.READ],
+         {
+             'label': "ImageCounter",
+             'description': "provide number of taken images",
+         }],
+        'LastImageReads':
+        [[tango.DevLong,
+          tango.SCALAR,
+          tango.READ],
+         {
+             'label': "LastImageReads",
+             'description': "provide number of LastImage reads",
+         }],
         'Spectrum1':
         [[tango.DevLong,
           tango.SPECTRUM,
@@ -162,6 +203,14 @@ class TestImageServerClass(tango.DeviceClass):
              'label': "ChangeEventImage",
              'description': "provide change event image data",
          }],
+        'UserEventImage':
+        [[tango.DevLong,
+          tango.IMAGE,
+          tango.READ, 4096, 4096],
+         {
+             'label': "UserEventImage",
+             'description': "provide user event image data",
+         }],
     }
 
 
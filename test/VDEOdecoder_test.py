@@ -0,0 +1,295 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import struct
+import time
+
+import numpy as np
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+#: (:obj:`bool`) run benchmarks
+BENCHMARK = bool(os.environ.get("LAVUE_BENCHMARK"))
+
+
+def _frame(mode, width, height, payload, endianness=0, frame=7):
+    header = struct.pack(
+        '!IHHqiiHHHH', 0x5644454f, 1, mode, frame, width, height,
+        endianness, 32, 0, 0)
+    return ["VIDEO_IMAGE", header + payload]
+
+
+def _clip(value):
+    return min(max(int(value + 0.5), 0), 255)
+
+
+def _yuv(y, u, v):
+    u -= 128
+    v -= 128
+    return (_clip(y + 1.402 * v),
+            _clip(y - 0.344136 * u - 0.714136 * v),
+            _clip(y + 1.772 * u))
+
+
+def decodeold(data):
+    """ LIMA video decoding of lavue 2.54 used as the benchmark reference
+
+    :param data: encoded data
+    :type data: [:obj:`str`, :obj:`str`]
+    :returns: the decoded data
+    :rtype: :class:`numpy.ndarray`
+    """
+    headerformat = '!IHHqiiHHHH'
+    hdr = struct.unpack(
+        headerformat, data[1][:struct.calcsize(headerformat)])
+    mode, width, height, fendian = hdr[2], hdr[4], hdr[5], hdr[6]
+    dtype = {0: 'uint8', 1: 'uint16', 2: 'uint32', 3: 'uint64'}[mode]
+    image = data[1][struct.calcsize(headerformat):]
+    dformat = {0: 'B', 1: 'H', 2: 'I', 3: 'Q'}[mode]
+    fSize = struct.calcsize(dformat)
+    value = np.array(
+        struct.unpack(dformat * (len(image) // fSize), image),
+        dtype=dtype).reshape(height, width).T
+    lendian = ord(struct.pack('=H', 1).decode()[-1])
+    if fendian != lendian:
+        try:
+            value.byteswap(inplace=False)
+        except TypeError:
+            value = value.byteswap()
+    return value
+
+
+# test fixture
+class VDEOdecoderTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def decode(self, data):
+        dec = imageSource.VDEOdecoder()
+        dec.load(data)
+        value = dec.decode()
+        # the decoded image is cached
+        self.assertIs(dec.decode(), value)
+        return dec, value
+
+    def test_grey(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for mode, dtype in enumerate(
+                ["uint8", "uint16", "uint32", "uint64"]):
+            for endianness, order in enumerate("<>"):
+                image = np.random.randint(
+                    0, 250, size=(5, 7)).astype(dtype)
+                dec, value = self.decode(_frame(
+                    mode, 7, 5, image.astype(
+                        np.dtype(dtype).newbyteorder(order)).tobytes(),
+                    endianness))
+                self.assertEqual(dec.dtype, dtype)
+                self.assertEqual(dec.shape(), [5, 7])
+                self.assertEqual(dec.frameNumber(), 7)
+                self.assertEqual(value.shape, (7, 5))
+                self.assertTrue(np.array_equal(value, image.T))
+                # a view on the encoded buffer
+                self.assertFalse(value.flags.owndata)
+                self.assertFalse(value.flags.writeable)
+
+    def test_rgb(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 256, size=(4, 6, 4)).astype("uint8")
+        expected = np.swapaxes(np.moveaxis(image[:, :, :3], -1, 0), 1, 2)
+        for mode, depth, order in [
+                (6, 3, slice(None)), (7, 4, slice(None)),
+                (8, 3, [2, 1, 0]), (9, 4, [2, 1, 0, 3])]:
+            pix = image[:, :, :depth][:, :, order]
+            dec, value = self.decode(_frame(mode, 6, 4, pix.tobytes()))
+            self.assertEqual(value.shape, (3, 6, 4))
+            self.assertEqual(dec.dtype, "uint8")
+            self.assertTrue(np.array_equal(value, expected))
+            self.assertFalse(value.flags.owndata)
+
+        pix = np.random.randint(0, 1 << 16, size=(4, 6)).astype("uint16")
+        for mode, gbits in [(4, 5), (5, 6)]:
+            for endianness, order in enumerate("<>"):
+                dec, value = self.decode(_frame(
+                    mode, 6, 4, pix.astype(order + "u2").tobytes(),
+                    endianness))
+                self.assertEqual(value.shape, (3, 6, 4))
+                for r in range(4):
+                    for c in range(6):
+                        p = int(pix[r, c])
+                        red = (p >> (5 + gbits)) & 31
+                        green = (p >> 5) & ((1 << gbits) - 1)
+                        blue = p & 31
+                        # bit replication to 8 bits
+                        self.assertEqual(
+                            list(value[:, c, r]),
+                            [(red << 3) | (red >> 2),
+                             (green << (8 - gbits)) |
+                             (green >> (2 * gbits - 8)),
+                             (blue << 3) | (blue >> 2)])
+
+    def test_bayer(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for mode, dtype, pattern in [
+                (10, "uint8", "RG"), (11, "uint16", "RG"),
+                (12, "uint8", "BG"), (13, "uint16", "BG")]:
+            raw = np.random.randint(
+                0, np.iinfo(dtype).max + 1, size=(4, 6)).astype(dtype)
+            dec, value = self.decode(_frame(mode, 6, 4, raw.tobytes()))
+            self.assertEqual(value.shape, (3, 6, 4))
+            self.assertEqual(value.dtype, dtype)
+            for r in range(4):
+                for c in range(6):
+                    r0, c0 = r // 2 * 2, c // 2 * 2
+                    first = int(raw[r0, c0])
+                    last = int(raw[r0 + 1, c0 + 1])
+                    green = (int(raw[r0, c0 + 1]) +
+                             int(raw[r0 + 1, c0])) // 2
+                    if pattern == "BG":
+                        first, last = last, first
+                    self.assertEqual(
+                        list(value[:, c, r]), [first, green, last])
+
+    def test_yuv(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        height, width = 4, 8
+        y = np.random.randint(0, 256, size=(height, width)).astype("uint8")
+        u = np.random.randint(0, 256, size=(height, width)).astype("uint8")
+        v = np.random.randint(0, 256, size=(height, width)).astype("uint8")
+
+        # I420: planar with 2x2 subsampled chroma
+        uu = u[::2, ::2]
+        vv = v[::2, ::2]
+        dec, value = self.decode(_frame(
+            14, width, height, y.tobytes() + uu.tobytes() + vv.tobytes()))
+        self.assertEqual(value.shape, (3, width, height))
+        for r in range(height):
+            for c in range(width):
+                self.assertEqual(
+                    tuple(value[:, c, r]),
+                    _yuv(int(y[r, c]), int(uu[r // 2, c // 2]),
+                         int(vv[r // 2, c // 2])))
+
+        for modes, step, layout in [
+                ((15, 18), 4, "UYYVYY"), ((16, 19), 2, "UYVY"),
+                ((17, 20), 1, "UYV")]:
+            payload = bytearray()
+            for r in range(height):
+                for c in range(0, width, step):
+                    cy = iter(y[r, c:c + step])
+                    for ch in layout:
+                        if ch == "U":
+                            payload.append(u[r, c])
+                        elif ch == "V":
+                            payload.append(v[r, c])
+                        else:
+                            payload.append(next(cy))
+            for mode in modes:
+                dec, value = self.decode(
+                    _frame(mode, width, height, bytes(payload)))
+                self.assertEqual(value.shape, (3, width, height))
+                for r in range(height):
+                    for c in range(width):
+                        c0 = c // step * step
+                        self.assertEqual(
+                            tuple(value[:, c, r]),
+                            _yuv(int(y[r, c]), int(u[r, c0]),
+                                 int(v[r, c0])))
+
+    @unittest.skipUnless(BENCHMARK, "set LAVUE_BENCHMARK=1 to run")
+    def test_benchmark(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        def best(decode, data, repeat=3):
+            times = []
+            for _ in range(repeat):
+                start = time.time()
+                value = decode(data)
+                times.append(time.time() - start)
+            return min(times), value
+
+        def decodenew(data):
+            dec = imageSource.VDEOdecoder()
+            dec.load(data)
+            return dec.decode()
+
+        height, width = 2048, 2048
+        native = 0 if sys.byteorder == "little" else 1
+        for name, mode, dtype in [
+                ("Y8", 0, "uint8"), ("Y16", 1, "uint16"),
+                ("Y32", 2, "uint32")]:
+            image = np.random.randint(
+                0, 250, size=(height, width)).astype(dtype)
+            data = _frame(mode, width, height, image.tobytes(), native)
+            told, old = best(decodeold, data)
+            tnew, new = best(decodenew, data)
+            self.assertTrue(np.array_equal(old, image.T))
+            self.assertTrue(np.array_equal(new, image.T))
+            print("%s %sx%s: %.2f ms -> %.2f ms" % (
+                name, width, height, told * 1000, tnew * 1000))
+
+        # the old decoder ignores the byte order of the frame
+        image = np.random.randint(
+            0, 1 << 16, size=(height, width)).astype("uint16")
+        order = ">" if native == 0 else "<"
+        data = _frame(1, width, height,
+                      image.astype(order + "u2").tobytes(), 1 - native)
+        told, old = best(decodeold, data)
+        tnew, new = best(decodenew, data)
+        self.assertTrue(np.array_equal(new, image.T))
+        print("Y16 swapped %sx%s: %.2f ms -> %.2f ms" % (
+            width, height, told * 1000, tnew * 1000))
+
+        # modes not supported by the old decoder
+        pixels = np.random.randint(
+            0, 256, size=(height * width * 3,)).astype("uint8").tobytes()
+        for name, mode, size in [
+                ("RGB24", 6, 3), ("RGB565", 5, 2), ("BAYER_RG16", 11, 2),
+                ("I420", 14, 1.5), ("YUV422", 16, 2)]:
+            data = _frame(mode, width, height,
+                          pixels[:int(height * width * size)])
+            tnew, new = best(decodenew, data)
+            self.assertEqual(new.shape, (3, width, height))
+            print("%s %sx%s: unsupported -> %.2f ms" % (
+                name, width, height, tnew * 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import zmq
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+# test fixture
+class ZMQFanInSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__context = None
+        self.__sockets = []
+        self.__ports = []
+
+    def setUp(self):
+        self.__context = zmq.Context()
+        self.__sockets = [self.__context.socket(zmq.PUB) for _ in range(2)]
+        self.__ports = [sock.bind_to_random_port("tcp://127.0.0.1")
+                        for sock in self.__sockets]
+
+    def tearDown(self):
+        for sock in self.__sockets:
+            sock.close(linger=0)
+        self.__context.destroy()
+
+    def __source(self, waittime=200, policy="drop"):
+        source = imageSource.ZMQFanInSource(1000)
+        source.setConfiguration(
+            "%s/topic/100/%s/%s" % (
+                ",".join("127.0.0.1:%s" % port for port in self.__ports),
+                waittime, policy))
+        self.assertTrue(source.connect())
+        # wait for the slow joiner subscriptions
+        for _ in range(50):
+            for module in range(2):
+                self.__send(module, np.zeros((1, 1), dtype="uint8"),
+                            {"frame": -1})
+            if source.wait(0.1):
+                break
+        time.sleep(0.1)
+        source.getData()
+        return source
+
+    def __send(self, module, image, metadata):
+        mdata = {"shape": list(image.shape), "dtype": str(image.dtype)}
+        mdata.update(metadata)
+        self.__sockets[module].send_multipart(
+            [b"topic", image.tobytes(), json.dumps(mdata).encode(),
+             b"JSON"])
+
+    def __fetch(self, source, timeout=2):
+        start = time.time()
+        while time.time() - start < timeout:
+            if source.wait(0.1):
+                img, name, meta = source.getData()
+                if name is not None:
+                    return img, name, meta
+        return None, None, None
+
+    def test_assemble(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source()
+        module0 = np.arange(12, dtype="uint16").reshape(3, 4)
+        module1 = module0 + 100
+        self.__send(1, module1, {"frame": 5, "exposure": 0.1})
+        self.__send(0, module0, {"frame": 5})
+        img, name, meta = self.__fetch(source)
+        self.assertTrue(np.array_equal(img, np.vstack([module0, module1])))
+        self.assertEqual(img.dtype, np.uint16)
+        self.assertTrue(name.endswith("/topic (5)"))
+        self.assertEqual(json.loads(meta), {"exposure": 0.1})
+        source.disconnect()
+
+    def test_newest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(waittime=5000)
+        counters = source._ZMQFanInSource__counters
+        received = sum(counters)
+        nframes = source.frames
+        dropped = source.dropped
+        module = np.ones((2, 2), dtype="float32")
+        shown = []
+        # the frames are pending in the order of the second module
+        # and the first module completes the newest frame first
+        for mod, frames in [(1, [1, 2, 3]), (0, [3, 2, 1])]:
+            for frame in frames:
+                self.__send(mod, module * frame * (mod + 1),
+                            {"frameid": frame})
+            received += 3
+            end = time.time() + 10
+            while sum(counters) < received and time.time() < end:
+                if source.wait(0.1):
+                    img, name, _ = source.getData()
+                    if name is not None:
+                        shown.append((img, name))
+            self.assertEqual(sum(counters), received)
+        self.assertEqual(len(shown), 1)
+        img, name = shown[0]
+        self.assertTrue(name.endswith("(3)"))
+        self.assertTrue(np.array_equal(
+            img, np.vstack([module * 3, module * 6])))
+        # older frames are not shown anymore
+        self.assertEqual(source.getData(), (None, None, None))
+        self.assertEqual(source.frames, nframes + 1)
+        self.assertTrue(source.dropped >= dropped + 2)
+        source.disconnect()
+
+    def test_drop(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(waittime=100)
+        dropped = source.dropped
+        self.__send(0, np.ones((2, 2), dtype="int32"), {"frame": 1})
+        self.assertEqual(self.__fetch(source, 0.5), (None, None, None))
+        self.assertEqual(source.dropped, dropped + 1)
+        source.disconnect()
+
+    def test_fill(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source(waittime=100, policy="fill")
+        module = np.ones((2, 3), dtype="int32")
+        self.__send(1, module, {"frame": 1})
+        img, name, meta = self.__fetch(source)
+        self.assertTrue(name.endswith("(1)"))
+        self.assertEqual(img.shape, (3, 3))
+        self.assertTrue(np.all(np.isnan(img[:1])))
+        self.assertTrue(np.array_equal(img[1:], module))
+        self.assertEqual(json.loads(meta), {"missingmodules": [0]})
+        self.assertTrue(source.filled >= 1)
+        source.disconnect()
+
+    def test_origin(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = self.__source()
+        module = np.ones((2, 3), dtype="uint8")
+        self.__send(0, module, {"frame": 7, "origin": [0, 4]})
+        self.__send(1, module * 2, {"frame": 7, "origin": [3, 0]})
+        img, _, meta = self.__fetch(source)
+        expected = np.zeros((5, 7), dtype="uint8")
+        expected[0:2, 4:7] = 1
+        expected[3:5, 0:3] = 2
+        self.assertTrue(np.array_equal(img, expected))
+        self.assertEqual(meta, "")
+        source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import time
+import zlib
+
+import numpy as np
+import zmq
+
+from lavuelib import imageSource
+
+
+# Path
+path = os.path.join(os.path.dirname(__file__), os.pardir)
+sys.path.insert(0, os.path.abspath(path))
+
+
+def compress(value, blocks=1):
+    """ compresses the image in zlib blocks
+    """
+    raw = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+    blocksize = -(-raw.size // blocks)
+    parts = [zlib.compress(raw[i * blocksize:(i + 1) * blocksize].tobytes())
+             for i in range(blocks)]
+    return b"".join(parts), {
+        "compression": "zlib",
+        "blocks": [len(part) for part in parts],
+        "blocksize": blocksize}
+
+
+# test fixture
+class ZMQSourceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self.__workers = imageSource.DECODEWORKERS
+        self.__context = None
+        self.__socket = None
+
+    def setUp(self):
+        self.__context = zmq.Context()
+        self.__socket = self.__context.socket(zmq.PUB)
+        self.__port = self.__socket.bind_to_random_port("tcp://127.0.0.1")
+
+    def tearDown(self):
+        imageSource.DECODEWORKERS = self.__workers
+        self.__socket.close(linger=0)
+        self.__context.destroy()
+
+    def __source(self):
+        source = imageSource.ZMQSource(1000)
+        source.setConfiguration("127.0.0.1:%s/topic/100" % self.__port)
+        self.assertTrue(source.connect())
+        return source
+
+    def __send(self, source, payload, metadata):
+        message = [b"topic", payload, json.dumps(metadata).encode(), b"JSON"]
+        for _ in range(50):
+            self.__socket.send_multipart(message)
+            if source.wait(0.1):
+                return source.getData()
+        return None, None, None
+
+    def test_decompressor(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(64, 48)).astype("uint16")
+        for threads in [0, 3]:
+            decompressor = imageSource.PayloadDecompressor(threads)
+            for blocks in [1, 4, 7]:
+                payload, cmeta = compress(image, blocks)
+                img = decompressor.decompress(
+                    payload, [64, 48], "uint16", "zlib",
+                    cmeta["blocks"], cmeta["blocksize"])
+                self.assertTrue(np.array_equal(img, image))
+            # a kept image is not overwritten by the next payloads
+            view = img[10:20]
+            del img
+            img = decompressor.decompress(
+                bytearray(zlib.compress(image.tobytes())),
+                [64, 48], "uint16", "zlib")
+            img2 = decompressor.decompress(
+                memoryview(zlib.compress((image + 1).tobytes())),
+                [64, 48], "uint16", "zlib")
+            self.assertTrue(np.array_equal(view, image[10:20]))
+            self.assertTrue(np.array_equal(img, image))
+            self.assertTrue(np.array_equal(img2, image + 1))
+            self.assertRaises(
+                Exception, decompressor.decompress,
+                zlib.compress(image[:10].tobytes()),
+                [64, 48], "uint16", "zlib")
+            self.assertRaises(
+                Exception, decompressor.decompress,
+                payload, [64, 48], "uint16", "unknown")
+            decompressor.shutdown()
+
+    def test_compressed(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(128, 96)).astype("int32")
+        for workers in [0, 4]:
+            imageSource.DECODEWORKERS = workers
+            source = self.__source()
+            time.sleep(0.1)
+            payload, cmeta = compress(image, 4)
+            metadata = {"shape": [128, 96], "dtype": "int32",
+                        "name": "frame1", "exposure": 0.1}
+            metadata.update(cmeta)
+            img, name, jmeta = self.__send(source, payload, metadata)
+            self.assertEqual(name, "frame1")
+            self.assertTrue(np.array_equal(img, image))
+            # the compression keys are not passed as image metadata
+            self.assertEqual(
+                json.loads(jmeta), {"name": "frame1", "exposure": 0.1})
+
+            # raw payloads are still supported
+            metadata = {"shape": [128, 96], "dtype": "int32",
+                        "name": "frame2"}
+            img, name, _ = self.__send(source, image.tobytes(), metadata)
+            self.assertEqual(name, "frame2")
+            self.assertTrue(np.array_equal(img, image))
+
+            metadata = {"shape": [128, 96], "dtype": "int32",
+                        "compression": "unknown"}
+            _, name, _ = self.__send(source, payload, metadata)
+            self.assertEqual(name, "__ERROR__")
+            source.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
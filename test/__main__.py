@@ -60,9 +60,25 @@ except ImportError as e:
 
 import unittest
 import CommandLineArgument_test
+import DataFetchThread_test
+import CBFLoader_test
+import ImageProcessing_test
+import VDEOdecoder_test
+import DecodePool_test
+import ASAPOSource_test
+import EpicsPVSource_test
+import DirectorySource_test
+import ZMQSource_test
+import ZMQFanInSource_test
+import FrameRecorder_test
+import ReplaySource_test
+import GeneratorSource_test
+import StageTimer_test
+import LavueBenchmark_test
 import HidraImageSource_test
 import ASAPOImageSource_test
 import HttpImageSource_test
+import HTTPSource_test
 import PyTineImageSource_test
 import EpicsImageSource_test
 
@@ -79,12 +95,16 @@ if TANGO_AVAILABLE:
     import SpecializedTool_test
     import DiffractogramTool_test
     import TangoAttrImageSource_test
+    import TangoAttrSource_test
+    import TangoEventsSource_test
     import ZMQStreamImageSource_test
 
 if H5PY_AVAILABLE:
     import H5PYWriter_test
     import FileWriterH5PY_test
     import ASAPOImageSourceH5PY_test
+    import NexusFrameReader_test
+    import NXSFileSourceFollow_test
 if H5CPP_AVAILABLE:
     import H5CppWriter_test
     import FileWriterH5Cpp_test
@@ -130,6 +150,51 @@ def main():
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             CommandLineArgument_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            DataFetchThread_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            CBFLoader_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImageProcessing_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            VDEOdecoder_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            DecodePool_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ASAPOSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            EpicsPVSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            DirectorySource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ZMQSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ZMQFanInSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            FrameRecorder_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ReplaySource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            GeneratorSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            StageTimer_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            LavueBenchmark_test))
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             HidraImageSource_test))
@@ -139,6 +204,9 @@ def main():
     httpsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             HttpImageSource_test))
+    httpsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            HTTPSource_test))
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             PyTineImageSource_test))
@@ -154,6 +222,12 @@ def main():
         basicsuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
                 ASAPOImageSourceH5PY_test))
+        basicsuite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NexusFrameReader_test))
+        basicsuite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NXSFileSourceFollow_test))
     if H5CPP_AVAILABLE:
         basicsuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
@@ -186,6 +260,12 @@ def main():
         tangosuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
                 TangoAttrImageSource_test))
+        tangosuite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                TangoAttrSource_test))
+        tangosuite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                TangoEventsSource_test))
         basicsuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
                 ZMQStreamImageSource_test))
@@ -34,6 +34,18 @@ gtoken_cache = ""
 server_cache = ""
 stream_cache = ""
 usermeta = None
+#: (:obj:`int`) number of messages in a substream, 0 for a new message
+#:              at every get_last call
+stream_size = 0
+
+
+class AsapoEndOfStreamError(Exception):
+    """ mock end of stream error """
+
+    def __init__(self, message, id_max=None, next_substream=None):
+        Exception.__init__(self, message)
+        self.id_max = id_max
+        self.next_substream = next_substream
 
 
 def create_server_broker(server_name, source_path, has_filesystem,
@@ -61,6 +73,8 @@ class Broker(object):
         self.counter = 1
         self.gid = 1
         self.metaonly = True
+        self.markers = {}
+        self.requests = []
 
     def generate_group_id(self):
         print("Broker.generate_group_id()")
@@ -70,11 +84,46 @@ class Broker(object):
         print("Broker.get_substream_list()")
         return substreams
 
+    def get_current_size(self, substream="default"):
+        print("Broker.get_current_size(%s)" % substream)
+        self.requests.append("get_current_size")
+        return stream_size
+
+    def set_lastread_marker(self, value, gid, substream="default"):
+        print("Broker.set_lastread_marker(%s, %s, %s)"
+              % (value, gid, substream))
+        self.requests.append("set_lastread_marker")
+        self.markers[substream] = value
+
+    def get_next(self, gid, substream="default", meta_only=True):
+        print("Broker.get_next(%s, %s, %s)" % (gid, substream, meta_only))
+        self.requests.append("get_next")
+        self.gid = gid
+        self.metaonly = meta_only
+        marker = self.markers.get(substream, 0)
+        if marker >= stream_size:
+            raise AsapoEndOfStreamError(
+                "End of stream", id_max=stream_size)
+        self.markers[substream] = marker + 1
+        return self.__message(marker + 1, meta_only)
+
+    def __message(self, iid, meta_only):
+        data = None
+        if filename and not meta_only:
+            data = np.fromfile(filename, dtype="int8")
+        metadata = {"name": filename.split("/")[-1], "_id": iid}
+        if usermeta:
+            metadata["meta"] = dict(usermeta)
+        return data, metadata
+
     def get_last(self, gid, substream="default", meta_only=True):
         print("Broker.get_last(%s, %s, %s)" % (gid, substream, meta_only))
         global filename
+        self.requests.append("get_last")
         self.gid = gid
         self.metaonly = meta_only
+        if stream_size:
+            return self.__message(stream_size, meta_only)
         self.data = None
         if filename:
             self.data = np.fromfile(filename, dtype="int8")
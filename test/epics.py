@@ -31,17 +31,44 @@ filename = ""
 
 class PV(object):
 
-    def __init__(self, pvname):
+    def __init__(self, pvname, auto_monitor=None):
         self.pvname = pvname
         self.timeout = None
         self.as_numpy = True
         self.data = None
+        self.auto_monitor = auto_monitor
+        self.callbacks = {}
+        self.gets = 0
+        self.connected = True
 
     def get(self, as_numpy, timeout):
         global filename
+        self.gets += 1
         self.timeout = timeout
         self.as_numpy = as_numpy
         if filename:
             image = fabio.open(filename)
             data = image.data
             return data
+
+    def add_callback(self, callback):
+        index = len(self.callbacks) + 1
+        self.callbacks[index] = callback
+        return index
+
+    def clear_callbacks(self):
+        self.callbacks = {}
+
+    def clear_auto_monitor(self):
+        self.auto_monitor = False
+
+    def disconnect(self):
+        self.connected = False
+        self.callbacks = {}
+
+    def post(self, value, timestamp):
+        """ calls monitor callbacks as Channel Access would do
+        """
+        for callback in list(self.callbacks.values()):
+            callback(pvname=self.pvname, value=value,
+                     timestamp=timestamp, status=0)